@@ -41,15 +41,42 @@
 #if __STDC_VERSION__ >= 199901L
   /* "inline" is a keyword */
 #else
-# define inline static
+# define inline
 #endif
 
+/* Bit flags for the SIMD features that simd_features() can report */
+#define SIMD_SSE 1
+#define SIMD_SSE2 2
+#define SIMD_AVX 4
+#define SIMD_AVX2 8
+#define SIMD_FMA 16
+#define SIMD_AVX512F 32
+#define SIMD_NEON 64
+#define SIMD_SVE 128
+
 #if defined(__amd64__) || defined (_M_X64) || defined(__i386__) || defined(_M_IX86) || defined(_X86_)
 
   #define AVX_WORD 2
   #define AVX_BIT 28
+  #define FMA_WORD 2
+  #define FMA_BIT 12
+  #define OSXSAVE_WORD 2
+  #define OSXSAVE_BIT 27
   #define SSE_WORD 3
   #define SSE_BIT 25
+  #define SSE2_WORD 3
+  #define SSE2_BIT 26
+
+  /* In the extended features (cpuid function 7) */
+  #define AVX2_WORD 1
+  #define AVX2_BIT 5
+  #define AVX512F_WORD 1
+  #define AVX512F_BIT 16
+
+  /* The XCR0 bits for the register state saved by the OS: XMM and YMM for
+   * AVX, and additionally the opmask and both halves of ZMM for AVX-512 */
+  #define XCR0_AVX_MASK 0x6
+  #define XCR0_AVX512_MASK 0xe6
 
   #ifdef _MSC_VER
     /* Visual Studio Code */
@@ -57,44 +84,143 @@
     #define cpuid(func, cpuinfo)\
       __cpuid(cpuinfo, func);
 
+    #define cpuid_count(func, subfunc, cpuinfo)\
+      __cpuidex(cpuinfo, func, subfunc);
+
+    #define xgetbv() _xgetbv(0)
+
   #else
     /* generic x86 Assembly code (based on wikipedia example)
      * Firstly it's necessary to move ebx into an interim
      * register to protect it (cpuid clobbers eax, ebx ecx and edx)
      * */
     #define cpuid(func, cpuinfo)\
+      cpuid_count(func, 0, cpuinfo)
+
+    #define cpuid_count(func, subfunc, cpuinfo)\
       cpuinfo[0] = func; /* Load the first entry with the func id */\
+      cpuinfo[2] = subfunc; /* and the third with the sub-function */\
       __asm__ __volatile__ \
       ("mov %%ebx, %%edi;" /* 32bit PIC: don't clobber ebx */ \
        "cpuid;" \
        "mov %%ebx, %%esi;" \
        "mov %%edi, %%ebx;" \
        :"+a" (cpuinfo[0]), "=S" (cpuinfo[1]), /* eax rw, esi read */ \
-       "=c" (cpuinfo[2]), "=d" (cpuinfo[3]) /* ecx read, edx read */\
+       "+c" (cpuinfo[2]), "=d" (cpuinfo[3]) /* ecx rw, edx read */\
        : :"edi")
-  
+
+    /* xgetbv is emitted as bytes for the sake of old assemblers */
+    static inline unsigned long long xgetbv(void){
+        unsigned int eax, edx;
+
+        __asm__ __volatile__ (".byte 0x0f, 0x01, 0xd0"
+                : "=a" (eax), "=d" (edx) : "c" (0));
+
+        return ((unsigned long long)edx << 32) | eax;
+    }
+
   #endif
 
-/* Returns the byte alignment for optimum simd operations */
-inline int simd_alignment(void){
+/* Returns a bitwise OR of the SIMD_* flags for the features that both the
+ * CPU and the OS support */
+static inline int simd_features(void){
     int cpuinfo[4];
+    int features = 0;
+    int max_func;
+    unsigned long long xcr0 = 0;
+
+    cpuid(0, cpuinfo);
+    max_func = cpuinfo[0];
 
     /* This gets the cpuinfo (set by 1)*/
     cpuid(1, cpuinfo);
 
-    if (cpuinfo[AVX_WORD] & (1<<AVX_BIT))  /* AVX */
-        return 32;
-    else if (cpuinfo[SSE_WORD] & (1<<SSE_BIT))  /* SSE */
-        return 16;
-    else  /* No SIMD */
-        return 4;
+    if (cpuinfo[SSE_WORD] & (1<<SSE_BIT))
+        features |= SIMD_SSE;
+
+    if (cpuinfo[SSE2_WORD] & (1<<SSE2_BIT))
+        features |= SIMD_SSE2;
+
+    /* The AVX registers are only usable if the OS saves them */
+    if (cpuinfo[OSXSAVE_WORD] & (1<<OSXSAVE_BIT))
+        xcr0 = xgetbv();
+
+    if ((xcr0 & XCR0_AVX_MASK) == XCR0_AVX_MASK){
+        if (cpuinfo[AVX_WORD] & (1<<AVX_BIT))
+            features |= SIMD_AVX;
+
+        if (cpuinfo[FMA_WORD] & (1<<FMA_BIT))
+            features |= SIMD_FMA;
+
+        if (max_func >= 7){
+            cpuid_count(7, 0, cpuinfo);
+
+            if (cpuinfo[AVX2_WORD] & (1<<AVX2_BIT))
+                features |= SIMD_AVX2;
+
+            if ((xcr0 & XCR0_AVX512_MASK) == XCR0_AVX512_MASK &&
+                    cpuinfo[AVX512F_WORD] & (1<<AVX512F_BIT))
+                features |= SIMD_AVX512F;
+        }
+    }
+
+    return features;
+}
+
+#elif defined(__aarch64__) || defined(_M_ARM64) || defined(__arm__) || defined(_M_ARM)
+
+  #if defined(__linux__)
+    #include <sys/auxv.h>
+  #endif
+
+  /* The Linux hwcap bits */
+  #define HWCAP_ARM_NEON_BIT 12
+  #define HWCAP_AARCH64_SVE_BIT 22
+
+/* Returns a bitwise OR of the SIMD_* flags for the features that both the
+ * CPU and the OS support */
+static inline int simd_features(void){
+    int features = 0;
+
+  #if defined(__aarch64__) || defined(_M_ARM64)
+    /* NEON is mandatory on AArch64 */
+    features |= SIMD_NEON;
+
+    #if defined(__linux__) && defined(AT_HWCAP)
+      if (getauxval(AT_HWCAP) & (1UL<<HWCAP_AARCH64_SVE_BIT))
+          features |= SIMD_SVE;
+    #endif
+
+  #elif defined(__ARM_NEON) || defined(__ARM_NEON__)
+    features |= SIMD_NEON;
+
+  #elif defined(__linux__) && defined(AT_HWCAP)
+    if (getauxval(AT_HWCAP) & (1UL<<HWCAP_ARM_NEON_BIT))
+        features |= SIMD_NEON;
+  #endif
+
+    return features;
 }
 
 #else
 
-inline int simd_alignment(void){
-    return 4;
+static inline int simd_features(void){
+    return 0;
 }
 #endif
 
+/* Returns the byte alignment for optimum simd operations */
+static inline int simd_alignment(void){
+    int features = simd_features();
+
+    if (features & SIMD_AVX512F)
+        return 64;
+    else if (features & SIMD_AVX)
+        return 32;
+    else if (features & (SIMD_SSE | SIMD_NEON | SIMD_SVE))
+        return 16;
+    else  /* No SIMD */
+        return 4;
+}
+
 #endif /* Header guard */
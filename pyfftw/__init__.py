@@ -4,7 +4,8 @@
 ''' The core of ``pyfftw`` consists of the :class:`FFTW` class, 
 :ref:`wisdom functions <wisdom_functions>` and a couple of
 :ref:`utility functions <utility_functions>` for dealing with aligned
-arrays.
+arrays. The :class:`Convolver` class builds on :class:`FFTW` to provide
+fast FIR filtering of long signals.
 
 This module represents the full interface to the underlying `FFTW
 library <http://www.fftw.org/>`_. However, users may find it easier to
@@ -15,10 +16,12 @@ from ._version import version
 
 from .pyfftw import (
         FFTW,
+        Convolver,
         export_wisdom,
         import_wisdom,
         forget_wisdom,
         simd_alignment,
+        cpu_info,
         n_byte_align_empty,
         n_byte_align,
         is_n_byte_aligned,
@@ -27,8 +30,11 @@ from .pyfftw import (
         empty_aligned,
         ones_aligned,
         zeros_aligned,
+        next_fast_len,
 )
 
+from .tuning import autotune
+
 from . import builders
 from . import interfaces
 
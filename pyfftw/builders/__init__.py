@@ -2,6 +2,9 @@
 
 from .builders import *
 from . import _utils
+from . import distributed
+from . import chirpz
+from .chirpz import czt, zoom_fft, pruned_fft
 
 __doc__ = builders.__doc__
-__all__ = builders.__all__
+__all__ = builders.__all__ + ['czt', 'zoom_fft', 'pruned_fft']
@@ -52,9 +52,15 @@ and may change in future versions.
 
 import pyfftw
 import numpy
+import itertools
+import operator
 
-__all__ = ['_FFTWWrapper', '_rc_dtype_pairs', '_default_dtype', '_Xfftn',
-        '_setup_input_slicers', '_compute_array_shapes', '_precook_1d_args',
+from ..pyfftw import (_fftshift_array, _copy_array, _zero_padding,
+        next_fast_len)
+from ..tuning import _resolve_auto
+
+__all__ = ['_FFTWWrapper', '_PrunedFFTW', '_rc_dtype_pairs', '_default_dtype', '_Xfftn',
+        '_setup_input_slicers', '_setup_shifted_input_slicers', '_compute_array_shapes', '_precook_1d_args',
         '_cook_nd_args']
 
 _valid_efforts = ('FFTW_ESTIMATE', 'FFTW_MEASURE', 
@@ -71,58 +77,122 @@ _rc_dtype_pairs = {numpy.dtype('float32'): numpy.dtype('complex64'),
 
 _default_dtype = numpy.dtype('float64')
 
+# The largest stride (in items) that FFTW can take
+_max_item_stride = numpy.iinfo(numpy.intc).max
+
 def _Xfftn(a, s, axes, overwrite_input, 
         planner_effort, threads, auto_align_input, auto_contiguous, 
-        avoid_copy, inverse, real):
+        avoid_copy, inverse, real, shift_input=False, shift_output=False,
+        r2r_kinds=None, planning_timelimit=None, prune_padding=False,
+        pad=None, input_array=None, output_array=None):
     '''Generic transform interface for all the transforms. No
     defaults exist. The transform must be specified exactly.
+
+    ``shift_input`` and ``shift_output`` are as documented with the
+    :ref:`builders arguments <builders_args>`.
+
+    If ``r2r_kinds`` is not ``None``, it is the kind of real to real
+    transform along all the axes, or a list of the kinds along each axis
+    (and ``inverse`` and ``real`` should be ``False``).
+
+    ``planning_timelimit`` is passed on to the :class:`pyfftw.FFTW`
+    object.
+
+    If ``prune_padding`` is ``True``, a forward complex or real to complex
+    transform that zero pads the input along more than one axis returns
+    a :class:`~pyfftw.builders._utils._PrunedFFTW` object.
+
+    ``input_array`` and ``output_array`` are arrays to plan on, as
+    checked by :func:`~pyfftw.builders._utils._check_planning_array`, or
+    ``None`` for them to be made here.
     '''
     a_orig = a
     invreal = inverse and real
 
-    if inverse:
+    if r2r_kinds is not None:
+        direction = r2r_kinds
+    elif inverse:
         direction = 'FFTW_BACKWARD'
     else:
         direction = 'FFTW_FORWARD'
 
-    if planner_effort not in _valid_efforts:
+    if planner_effort not in _valid_efforts + ('auto',):
         raise ValueError('Invalid planner effort: ', planner_effort)
 
     s, axes = _cook_nd_args(a, s, axes, invreal)
+
+    if pad is not None:
+        s = _pad_lengths(s, pad, real)
     
     input_shape, output_shape = _compute_array_shapes(
             a, s, axes, inverse, real)
 
     a_is_complex = numpy.iscomplexobj(a)
 
+    # A complex forward transform of real data is done with a real 
+    # transform into the full length output, the other half of which is
+    # filled in from the Hermitian symmetry. This saves both promoting
+    # the input to complex and half the work of the transform.
+    hermitian = (not real and not inverse and not a_is_complex and
+            r2r_kinds is None)
+
+    real_input = ((real and not inverse) or hermitian or
+            r2r_kinds is not None)
+
     # Make the input dtype correct
     if a.dtype not in _rc_dtype_pairs:
         # We make it the default dtype
-        if not real or inverse:
+        if not real_input:
             # It's going to be complex
             a = numpy.asarray(a, dtype=_rc_dtype_pairs[_default_dtype])
         else:
             a = numpy.asarray(a, dtype=_default_dtype)
     
-    elif not (real and not inverse) and not a_is_complex:
+    elif not real_input and not a_is_complex:
         # We need to make it a complex dtype
         a = numpy.asarray(a, dtype=_rc_dtype_pairs[a.dtype])
 
-    elif (real and not inverse) and a_is_complex:
+    elif real_input and a_is_complex:
         # It should be real
         a = numpy.asarray(a, dtype=_rc_dtype_pairs[a.dtype])
 
     # Make the output dtype correct
-    if not real:
+    if not real and not hermitian:
         output_dtype = a.dtype
     
     else:
         output_dtype = _rc_dtype_pairs[a.dtype]
 
-    if not avoid_copy:
-        a_copy = a.copy()
+    if threads == 'auto' or planner_effort == 'auto':
+        threads, planner_effort = _resolve_auto(threads, planner_effort,
+                input_shape, a.dtype, axes, _tuning_transform(
+                    inverse, real, hermitian, r2r_kinds))
+
+    if output_array is None:
+        output_array = pyfftw.empty_aligned(output_shape, output_dtype)
+    else:
+        _check_planning_array(output_array, 'output', output_shape,
+                output_dtype, auto_align_input)
+
+        # Planning would overwrite `a` through the output array
+        a = _copy_if_planning_overwrites(a, output_array, planner_effort)
+
+    # The unique axes, in the order of the transform. Half of the
+    # spectrum of a real transform is not shifted along the last of them.
+    unique_axes = []
+    for axis in axes:
+        if axis % a.ndim not in unique_axes:
+            unique_axes.append(axis % a.ndim)
 
-    output_array = pyfftw.empty_aligned(output_shape, output_dtype)
+    input_shift_axes = None
+    output_shift_axes = None
+
+    if shift_input:
+        input_shift_axes = unique_axes[:-1] if invreal else unique_axes
+
+    if shift_output:
+        output_shift_axes = (
+                unique_axes[:-1] if real and not inverse else unique_axes)
 
     flags = [planner_effort]
 
@@ -132,68 +202,310 @@ def _Xfftn(a, s, axes, overwrite_input,
     if overwrite_input:
         flags.append('FFTW_DESTROY_INPUT')
 
-    if not a.shape == input_shape:
+    if not a.shape == input_shape or shift_input:
+
+        if avoid_copy and shift_input:
+            raise ValueError('Cannot avoid copy: '
+                    'The input array is shifted into the internal array. '
+                    '(from avoid_copy flag)')
 
         if avoid_copy:
             raise ValueError('Cannot avoid copy: '
                     'The transform shape is not the same as the array size. '
                     '(from avoid_copy flag)')
 
+        if prune_padding and input_array is None and not (inverse or
+                hermitian or shift_input or shift_output or
+                r2r_kinds is not None):
+
+            stage_axes = _pruned_stage_axes(
+                    a.shape, input_shape, unique_axes, real)
+
+            if stage_axes is not None:
+                return _PrunedFFTW(a, input_shape, output_array, stage_axes,
+                        flags, threads, planning_timelimit)
+
         # This means we need to use an _FFTWWrapper object
         # and so need to create slicers.
         update_input_array_slicer, FFTW_array_slicer = (
                 _setup_input_slicers(a.shape, input_shape))
 
+        if shift_input:
+            shifted_input_slicers = _setup_shifted_input_slicers(
+                    a.shape, input_shape, input_shift_axes)
+        else:
+            shifted_input_slicers = None
+
         # Also, the input array will be a different shape to the shape of 
         # `a`, so we need to create a new array.
-        input_array = pyfftw.empty_aligned(input_shape, a.dtype)
+        if input_array is None:
+            input_array = pyfftw.empty_aligned(input_shape, a.dtype)
+        else:
+            _check_planning_array(input_array, 'input', input_shape,
+                    a.dtype, auto_align_input)
+            a = _copy_if_planning_overwrites(a, input_array, planner_effort)
 
         FFTW_object = _FFTWWrapper(input_array, output_array, axes, direction,
                 flags, threads, input_array_slicer=update_input_array_slicer,
-                FFTW_array_slicer=FFTW_array_slicer)
+                FFTW_array_slicer=FFTW_array_slicer,
+                shifted_input_slicers=shifted_input_slicers,
+                output_shift_axes=output_shift_axes,
+                planning_timelimit=planning_timelimit)
 
         # We copy the data back into the internal FFTW object array
         internal_array = FFTW_object.input_array
         internal_array[:] = 0
-        internal_array[FFTW_array_slicer] = (
-                a_copy[update_input_array_slicer])
 
-    else:
-        # Otherwise we can use `a` as-is
+        if shift_input:
+            for each_input_slicer, each_FFTW_slicer in shifted_input_slicers:
+                internal_array[each_FFTW_slicer] = a[each_input_slicer]
+        else:
+            internal_array[FFTW_array_slicer] = a[update_input_array_slicer]
 
-        input_array = a
+    else:
+        # Otherwise we can use `a` as-is, unless we are given an input
+        # array to use.
+        if input_array is None:
+            input_array = a
+
+            # Whether input_array holds the data in `a`
+            input_array_filled = True
+
+            if auto_contiguous:
+                # We only need to create a new array if it's not already 
+                # contiguous, and if planning on its strides is not as good
+                if not (a.flags['C_CONTIGUOUS'] or a.flags['F_CONTIGUOUS'] or
+                        _plans_on_strides(a)):
+                    if avoid_copy:
+                        raise ValueError('Cannot avoid copy: '
+                                'The input array is not contiguous and '
+                                'auto_contiguous is set. '
+                                '(from avoid_copy flag)')
+
+                    input_array = pyfftw.empty_aligned(a.shape, a.dtype)
+                    input_array_filled = False
+
+            if (auto_align_input and not pyfftw.is_byte_aligned(input_array)):
 
-        if auto_contiguous:
-            # We only need to create a new array if it's not already 
-            # contiguous
-            if not (a.flags['C_CONTIGUOUS'] or a.flags['F_CONTIGUOUS']):
                 if avoid_copy:
                     raise ValueError('Cannot avoid copy: '
-                            'The input array is not contiguous and '
-                            'auto_contiguous is set. (from avoid_copy flag)')
+                            'The input array is not aligned and '
+                            'auto_align is set. (from avoid_copy flag)')
+
+                input_array = pyfftw.byte_align(input_array)
 
-                input_array = pyfftw.empty_aligned(a.shape, a.dtype)
+        else:
+            # The data in `a` is copied into the given input array
+            _check_planning_array(input_array, 'input', input_shape,
+                    a.dtype, auto_align_input)
 
-        if (auto_align_input and not pyfftw.is_byte_aligned(input_array)):
+            input_array_filled = input_array is a
 
-            if avoid_copy:
-                raise ValueError('Cannot avoid copy: '
-                        'The input array is not aligned and '
-                        'auto_align is set. (from avoid_copy flag)')
+            if not input_array_filled:
+                if avoid_copy:
+                    raise ValueError('Cannot avoid copy: '
+                            'The input array is copied into the given '
+                            'input_array. (from avoid_copy flag)')
+
+                a = _copy_if_planning_overwrites(a, input_array,
+                        planner_effort)
+
+        # Planning with anything other than FFTW_ESTIMATE is likely to
+        # destroy the contents of the input array.
+        planning_destroys_input = planner_effort != 'FFTW_ESTIMATE'
+
+        # The output can only be shifted by an _FFTWWrapper, which then 
+        # passes the input straight through.
+        if shift_output:
+            FFTW_class = _FFTWWrapper
+            wrapper_kwargs = {'input_array_slicer': None,
+                    'FFTW_array_slicer': None,
+                    'output_shift_axes': output_shift_axes}
+        else:
+            FFTW_class = pyfftw.FFTW
+            wrapper_kwargs = {}
 
-            input_array = pyfftw.byte_align(input_array)
+        if input_array is a and planning_destroys_input and not avoid_copy:
+            # Rather than backing up `a`, we plan on a scratch array that
+            # looks the same to FFTW and then swap `a` in.
+            FFTW_object = FFTW_class(_planning_scratch_array(a),
+                    output_array, axes, direction, flags, threads,
+                    planning_timelimit=planning_timelimit, **wrapper_kwargs)
 
+            FFTW_object.update_arrays(a, output_array)
 
-        FFTW_object = pyfftw.FFTW(input_array, output_array, axes, direction,
-                flags, threads)
+        else:
+            FFTW_object = FFTW_class(input_array, output_array, axes,
+                    direction, flags, threads,
+                    planning_timelimit=planning_timelimit, **wrapper_kwargs)
 
-        if not avoid_copy:
-            # Copy the data back into the (likely) destroyed array
-            FFTW_object.input_array[:] = a_copy
+            if input_array is not a and (
+                    planning_destroys_input or not input_array_filled):
+                FFTW_object.input_array[:] = a
     
     return FFTW_object
 
 
+def _tuning_transform(inverse, real, hermitian, r2r_kinds):
+    '''Return the kind of transform, as named by :func:`pyfftw.autotune`,
+    that the FFTW object is planned for, or ``None`` for the real to real
+    transforms, which are not tuned. The hermitian transforms are real
+    to complex transforms.
+    '''
+    if r2r_kinds is not None:
+        return None
+    elif real or hermitian:
+        return 'irfftn' if inverse else 'rfftn'
+    else:
+        return 'ifftn' if inverse else 'fftn'
+
+def _check_planning_array(array, name, shape, dtype, auto_align_input):
+    '''Raise a ``ValueError`` unless the array ``array``, given to a
+    builder as its ``name`` (``'input'`` or ``'output'``) array, can be
+    planned on as it is for an array of ``shape`` and ``dtype``. If
+    ``auto_align_input`` is set, it should be aligned for SIMD
+    instructions.
+    '''
+    if not isinstance(array, numpy.ndarray):
+        raise ValueError('Invalid %s array: '
+                'The %s array needs to be an instance '
+                'of numpy.ndarray' % (name, name))
+
+    if array.shape != tuple(shape):
+        raise ValueError('Invalid %s array: '
+                'The %s array should be of shape %s, not %s.' %
+                (name, name, tuple(shape), array.shape))
+
+    if array.dtype != dtype:
+        raise ValueError('Invalid %s dtype: '
+                'The %s array should be of dtype %s, not %s.' %
+                (name, name, dtype, array.dtype))
+
+    if not array.flags.writeable:
+        raise ValueError('Invalid %s array: '
+                'The %s array is not writeable.' % (name, name))
+
+    if not array.flags.aligned:
+        raise ValueError('Invalid %s alignment: '
+                'The %s array is not aligned for its dtype.' % (name, name))
+
+    if auto_align_input and not pyfftw.is_byte_aligned(array):
+        raise ValueError('Invalid %s alignment: '
+                'The %s array is not aligned for SIMD instructions, '
+                'and auto_align_input is set.' % (name, name))
+
+def _copy_if_planning_overwrites(a, array, planner_effort):
+    '''Return a copy of ``a`` if it shares memory with ``array``, the
+    contents of which planning with ``planner_effort`` might overwrite,
+    or otherwise ``a`` itself.
+    '''
+    if planner_effort != 'FFTW_ESTIMATE' and numpy.may_share_memory(
+            a, array):
+        return a.copy()
+
+    return a
+
+def _plans_on_strides(array):
+    '''Return whether a :class:`pyfftw.FFTW` object can be planned on the
+    strides of the non-contiguous ``array``, and whether that is likely
+    to be faster than planning on a contiguous copy of it.
+
+    FFTW can take strides that are whole numbers of items and that fit in
+    a C int. Zero strides (as with broadcast arrays) are not used, as the
+    input might be overwritten.
+
+    Planning on the strides is generally at least as fast as a copy if the
+    axis with the smallest stride is the last one, whatever the gaps
+    between the items or the rows, as FFTW then works through the array
+    in the order of a C contiguous array. This includes strided slices,
+    reversed arrays and the channels of interleaved data. Otherwise (as
+    with most transposes), copying into C order is generally much faster.
+    '''
+    smallest_stride = None
+
+    for axis, (length, stride) in enumerate(
+            zip(array.shape, array.strides)):
+
+        if stride % array.itemsize != 0:
+            return False
+
+        if abs(stride // array.itemsize) >= _max_item_stride:
+            return False
+
+        if length > 1:
+            if stride == 0:
+                return False
+
+            if smallest_stride is None or abs(stride) < smallest_stride:
+                smallest_stride = abs(stride)
+                smallest_stride_axis = axis
+
+            last_axis = axis
+
+    return smallest_stride is None or smallest_stride_axis == last_axis
+
+def _planning_scratch_array(array):
+    '''Return an uninitialised array with the same shape, dtype and
+    strides as ``array``, and with the same offset from the largest
+    alignment boundary that is of interest, so an :class:`pyfftw.FFTW`
+    object planned on it can be updated to use ``array``.
+    '''
+    alignment = max(pyfftw.simd_alignment, array.dtype.alignment)
+
+    # The offsets in bytes of the lowest and highest elements from the
+    # first element (strides might be negative).
+    lowest_offset = 0
+    highest_offset = 0
+    for length, stride in zip(array.shape, array.strides):
+        if stride < 0:
+            lowest_offset += (length - 1) * stride
+        else:
+            highest_offset += (length - 1) * stride
+
+    offset = array.ctypes.data % alignment - lowest_offset
+    extent = offset + highest_offset + array.itemsize
+
+    buffer = pyfftw.empty_aligned(extent, dtype='int8', n=alignment)
+
+    return numpy.ndarray(array.shape, array.dtype, buffer=buffer,
+            offset=offset, strides=array.strides)
+
+
+def _copy_box_shape(shape, FFTW_array_slicers):
+    '''Return the shape of the box at the start of an array of ``shape``
+    that the slices ``FFTW_array_slicers`` of it cover between them.
+    Each slicer is anything that can index the array. Several slicers
+    are taken to be the pieces of the box, as returned by
+    :func:`~pyfftw.builders._utils._setup_shifted_input_slicers`. If a
+    slicer is not made of contiguous slices (or a single one does not
+    start at 0), the box is empty, so all of the array is zeroed before
+    it is copied into.
+    '''
+    ndim = len(shape)
+    box_shape = [0] * ndim
+
+    for slicer in FFTW_array_slicers:
+        if isinstance(slicer, list):
+            slicer = tuple(slicer)
+
+        slicer = numpy.index_exp[slicer]
+
+        if Ellipsis in slicer or len(slicer) > ndim or not all(
+                isinstance(each, slice) for each in slicer):
+            return (0,) * ndim
+
+        slicer = slicer + (slice(None),) * (ndim - len(slicer))
+
+        for axis in range(ndim):
+            start, stop, step = slicer[axis].indices(shape[axis])
+
+            if step != 1 or (start != 0 and len(FFTW_array_slicers) == 1):
+                return (0,) * ndim
+
+            box_shape[axis] = max(box_shape[axis], stop)
+
+    return tuple(box_shape)
+
 class _FFTWWrapper(pyfftw.FFTW):
     ''' A class that wraps :class:`pyfftw.FFTW`, providing a slicer on the input
     stage during calls to :meth:`~pyfftw.builders._utils._FFTWWrapper.__call__`.
@@ -212,11 +524,24 @@ class _FFTWWrapper(pyfftw.FFTW):
 
         The arrays that are returned from both of these slicing operations
         should be the same size. The data is then copied from the sliced
-        input array into the sliced internal array.
+        input array into the sliced internal array. If both are ``None``,
+        the input array is passed straight to :meth:`pyfftw.FFTW.__call__`.
+
+        Two further optional keyword arguments shift the arrays as 
+        :func:`numpy.fft.ifftshift` and :func:`numpy.fft.fftshift` do. 
+        ``shifted_input_slicers`` is a list of pairs of slicers like the
+        above, as returned by
+        :func:`~pyfftw.builders._utils._setup_shifted_input_slicers`, 
+        which is used instead of them to copy the input array. 
+        ``output_shift_axes`` is a list of axes over which the output array
+        is shifted in place after every transform.
         '''
 
         self._input_array_slicer = kwargs.pop('input_array_slicer')
         self._FFTW_array_slicer = kwargs.pop('FFTW_array_slicer')
+        self._shifted_input_slicers = kwargs.pop(
+                'shifted_input_slicers', None)
+        self._output_shift_axes = kwargs.pop('output_shift_axes', None)
 
         if 'FFTW_DESTROY_INPUT' in flags:
             self._input_destroyed = True
@@ -226,6 +551,24 @@ class _FFTWWrapper(pyfftw.FFTW):
         super(_FFTWWrapper, self).__init__(input_array, output_array, 
                 axes, direction, flags, threads, *args, **kwargs)
 
+        # The input is copied with as many threads as the transform uses
+        self._copy_threads = threads
+
+        # The input is only ever copied into a box at the start of the
+        # internal array (made up of several pieces when it is shifted).
+        # Only the rest of the array needs zeroing.
+        if self._shifted_input_slicers is not None:
+            FFTW_array_slicers = [pair[1]
+                    for pair in self._shifted_input_slicers]
+        else:
+            FFTW_array_slicers = [self._FFTW_array_slicer]
+
+        if FFTW_array_slicers[0] is None:
+            self._copy_box_shape = None
+        else:
+            self._copy_box_shape = _copy_box_shape(self.input_array.shape,
+                    FFTW_array_slicers)
+
     def __call__(self, input_array=None, output_array=None, 
             normalise_idft=True):
         '''Wrap :meth:`pyfftw.FFTW.__call__` by firstly slicing the 
@@ -237,10 +580,18 @@ class _FFTWWrapper(pyfftw.FFTW):
         the internal array.
 
         ``output_array`` and ``normalise_idft`` are passed through to
-        :meth:`pyfftw.FFTW.__call__` untouched.
+        :meth:`pyfftw.FFTW.__call__` untouched. If the output is shifted,
+        that is done in place on the returned array.
         '''
 
-        if input_array is not None:
+        if self._shifted_input_slicers is not None:
+            slicers = self._shifted_input_slicers
+        elif self._input_array_slicer is not None:
+            slicers = [(self._input_array_slicer, self._FFTW_array_slicer)]
+        else:
+            slicers = None
+
+        if input_array is not None and slicers is not None:
             # Do the update here (which is a copy, so it's alignment
             # safe etc).
 
@@ -248,9 +599,188 @@ class _FFTWWrapper(pyfftw.FFTW):
             input_array = numpy.asanyarray(input_array)
 
             if self._input_destroyed:
-                internal_input_array[:] = 0
+                _zero_padding(internal_input_array, self._copy_box_shape,
+                        self._copy_threads)
+
+            for input_array_slicer, FFTW_array_slicer in slicers:
+                sliced_internal = internal_input_array[FFTW_array_slicer]
+                sliced_input = input_array[input_array_slicer]
+
+                if sliced_internal.shape != sliced_input.shape:
+                    raise ValueError('Invalid input shape: '
+                            'The new input array should be the same shape '
+                            'as the input array used to instantiate the '
+                            'object.')
+
+                _copy_array(sliced_internal, sliced_input,
+                        self._copy_threads)
+
+            input_array = None
+
+        output = super(_FFTWWrapper, self).__call__(input_array=input_array,
+                output_array=output_array, normalise_idft=normalise_idft)
+
+        if self._output_shift_axes:
+            _fftshift_array(output, self._output_shift_axes)
 
-            sliced_internal = internal_input_array[self._FFTW_array_slicer]
+        return output
+
+
+def _pruned_stage_axes(a_shape, input_shape, axes, real):
+    '''Return the axes of the transform in the order that
+    :class:`~pyfftw.builders._utils._PrunedFFTW` transforms them, or
+    ``None`` if the input is not zero padded along any axis but the
+    first of them, so nothing would be pruned.
+
+    The last axis of a real transform is transformed first. Otherwise,
+    the axes that are padded the least are transformed first, so the
+    fewest rows are transformed.
+    '''
+    def padding(axis):
+        return input_shape[axis] / float(min(a_shape[axis], input_shape[axis]))
+
+    if real:
+        stage_axes = [axes[-1]] + sorted(axes[-2::-1], key=padding)
+    else:
+        stage_axes = sorted(axes[::-1], key=padding)
+
+    if all(padding(axis) == 1 for axis in stage_axes[1:]):
+        return None
+
+    return stage_axes
+
+class _PrunedFFTW(object):
+    '''A forward n-D transform of a zero padded array, in which the
+    transform along each axis skips the rows that are still all zeros.
+
+    The transform is taken one axis at a time with a :class:`pyfftw.FFTW`
+    object for each. The first takes the padded input to the part of the
+    output array that is not from padding along the other axes. Each of
+    the others then pads that part along its axis with zeros and
+    transforms it in place. With the input padded by a factor of 2 along
+    each of 3 axes, this does 7/12 of the 1-D transforms of a
+    :class:`pyfftw.FFTW` object over all of the padded array.
+
+    The call interface follows :class:`_FFTWWrapper`, but
+    :meth:`pyfftw.FFTW.update_arrays` is not offered.
+    '''
+
+    def __init__(self, a, input_shape, output_array, stage_axes, flags,
+            threads, planning_timelimit=None):
+        '''``a`` is the array to be transformed, which is copied into the
+        internal input array. ``input_shape`` is the padded shape of the
+        transform and ``stage_axes`` is as returned by
+        :func:`~pyfftw.builders._utils._pruned_stage_axes`. The rest of
+        the arguments are as per :class:`pyfftw.FFTW`.
+        '''
+        # The shape of the nonzero part of the padded arrays
+        region_shape = [min(a_length, length)
+                for a_length, length in zip(a.shape, input_shape)]
+
+        first_axis = stage_axes[0]
+        region_shape[first_axis] = input_shape[first_axis]
+
+        slicers = _setup_input_slicers(a.shape, region_shape)
+        self._input_array_slicer = tuple(slicers[0])
+        self._FFTW_array_slicer = tuple(slicers[1])
+
+        self._input_array = pyfftw.empty_aligned(region_shape, a.dtype)
+        self._output_array = output_array
+        self._axes = tuple(sorted(stage_axes))
+
+        region_shape[first_axis] = output_array.shape[first_axis]
+
+        self._stages = [pyfftw.FFTW(self._input_array,
+                output_array[tuple(slice(0, n) for n in region_shape)],
+                (first_axis,), 'FFTW_FORWARD', flags, threads,
+                planning_timelimit=planning_timelimit)]
+
+        # The parts of the output array that each stage pads with zeros
+        self._zero_slicers = []
+
+        for axis in stage_axes[1:]:
+            region_slicer = [slice(0, n) for n in region_shape]
+            region_slicer[axis] = slice(region_shape[axis], None)
+            self._zero_slicers.append(tuple(region_slicer))
+
+            region_shape[axis] = output_array.shape[axis]
+            region = output_array[tuple(slice(0, n) for n in region_shape)]
+
+            self._stages.append(pyfftw.FFTW(region, region, (axis,),
+                'FFTW_FORWARD', flags, threads,
+                planning_timelimit=planning_timelimit))
+
+        # Planning is likely to have trashed the input array
+        self._input_array[:] = 0
+        self._input_array[self._FFTW_array_slicer] = (
+                a[self._input_array_slicer])
+
+    def _get_input_array(self):
+        '''Return the internal input array, which holds the nonzero part
+        of the padded input.
+        '''
+        return self._input_array
+
+    input_array = property(_get_input_array)
+
+    def _get_output_array(self):
+        '''Return the output array.
+        '''
+        return self._output_array
+
+    output_array = property(_get_output_array)
+
+    def _get_input_shape(self):
+        '''Return the shape of the internal input array.
+        '''
+        return self._input_array.shape
+
+    input_shape = property(_get_input_shape)
+
+    def _get_output_shape(self):
+        '''Return the shape of the output array.
+        '''
+        return self._output_array.shape
+
+    output_shape = property(_get_output_shape)
+
+    def _get_axes(self):
+        '''Return the axes of the transform.
+        '''
+        return self._axes
+
+    axes = property(_get_axes)
+
+    def _get_direction(self):
+        '''Return the direction of the transform, which is always
+        ``'FFTW_FORWARD'``.
+        '''
+        return 'FFTW_FORWARD'
+
+    direction = property(_get_direction)
+
+    def execute(self):
+        '''Transform the internal input array into the output array.
+        '''
+        self._stages[0].execute()
+
+        for zero_slicer, stage in zip(self._zero_slicers, self._stages[1:]):
+            self._output_array[zero_slicer] = 0
+            stage.execute()
+
+    def __call__(self, input_array=None, normalise_idft=True):
+        '''Copy ``input_array`` (if it is not ``None``) into the internal
+        input array, as :meth:`_FFTWWrapper.__call__` does, transform it
+        and return the output array.
+
+        ``normalise_idft`` is accepted for compatibility with
+        :meth:`pyfftw.FFTW.__call__`, and has no effect on a forward
+        transform.
+        '''
+        if input_array is not None:
+            input_array = numpy.asanyarray(input_array)
+
+            sliced_internal = self._input_array[self._FFTW_array_slicer]
             sliced_input = input_array[self._input_array_slicer]
 
             if sliced_internal.shape != sliced_input.shape:
@@ -261,10 +791,9 @@ class _FFTWWrapper(pyfftw.FFTW):
 
             sliced_internal[:] = sliced_input
 
-        output = super(_FFTWWrapper, self).__call__(input_array=None,
-                output_array=output_array, normalise_idft=normalise_idft)
+        self.execute()
 
-        return output
+        return self._output_array
 
 
 def _setup_input_slicers(a_shape, input_shape):
@@ -305,6 +834,52 @@ def _setup_input_slicers(a_shape, input_shape):
 
     return update_input_array_slicer, FFTW_array_slicer
 
+def _setup_shifted_input_slicers(a_shape, input_shape, shift_axes):
+    ''' This function returns a list of pairs of slicers, like those
+    returned by :func:`~pyfftw.builders._utils._setup_input_slicers`,
+    with which the input array is copied to the FFTW object internal 
+    array as if it had first been shifted over ``shift_axes`` with
+    :func:`numpy.fft.ifftshift`:
+
+    ``[(update_input_array_slicer, FFTW_array_slicer), ...]``
+
+    Each of the pairs copies one of the (up to two) contiguous parts of
+    each shifted axis.
+    '''
+    axis_slicers = []
+
+    for axis in range(len(a_shape)):
+        # The length of the input that is copied
+        length = min(a_shape[axis], input_shape[axis])
+
+        if axis not in shift_axes:
+            axis_slicers.append(
+                    ((slice(0, length), slice(0, length)),))
+            continue
+
+        # The shifted input array starts at a_shape[axis]//2 and wraps
+        # around to the start at ``split``.
+        shift = a_shape[axis]//2
+        split = a_shape[axis] - shift
+
+        pairs = [(slice(shift, shift + min(length, split)),
+            slice(0, min(length, split)))]
+
+        if length > split:
+            pairs.append((slice(0, length - split), slice(split, length)))
+
+        axis_slicers.append(tuple(pairs))
+
+    shifted_input_slicers = []
+    for pairs in itertools.product(*axis_slicers):
+        update_input_array_slicer = tuple(pair[0] for pair in pairs)
+        FFTW_array_slicer = tuple(pair[1] for pair in pairs)
+
+        shifted_input_slicers.append(
+                (update_input_array_slicer, FFTW_array_slicer))
+
+    return shifted_input_slicers
+
 def _compute_array_shapes(a, s, axes, inverse, real):
     '''Given a passed in array ``a``, and the rest of the arguments
     (that have been fleshed out with 
@@ -341,6 +916,42 @@ def _compute_array_shapes(a, s, axes, inverse, real):
 
     return tuple(input_shape), tuple(output_shape)
 
+def _next_bucket_len(n):
+    '''Return the smallest length that is at least ``n`` in the ladder of
+    lengths 8, 10, 12 and 14 times the powers of 2, or ``n`` if it is no
+    more than 8. All of these are lengths that FFTW is fast with (see
+    :func:`pyfftw.next_fast_len`), there are 4 of them per octave and the
+    padding is less than a quarter of each.
+    '''
+    n = operator.index(n)
+
+    if n <= 8:
+        return n
+
+    # The step between the lengths of the octave that n is in
+    step = 2 << (((n - 1) >> 3).bit_length() - 1)
+
+    return step * -(-n // step)
+
+def _pad_lengths(s, pad, real):
+    '''Return the lengths ``s`` of a transform rounded up as set by
+    ``pad``, which is ``'fast'`` for the next length that FFTW is fast with
+    (from :func:`pyfftw.next_fast_len`) or ``'bucket'`` for the next
+    length in the ladder of :func:`_next_bucket_len`. If ``real`` is
+    ``True``, the last of the lengths is that of a real transform.
+    '''
+    if pad == 'fast':
+        padded = [next_fast_len(n) for n in s[:-1]]
+        padded.append(next_fast_len(s[-1], real))
+
+    elif pad == 'bucket':
+        padded = [_next_bucket_len(n) for n in s]
+
+    else:
+        raise ValueError('Invalid pad: %r' % (pad,))
+
+    return padded
+
 def _precook_1d_args(a, n, axis):
     '''Turn ``*(n, axis)`` into ``(s, axes)``
     '''
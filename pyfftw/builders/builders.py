@@ -88,6 +88,15 @@ array is passed to a real transform routine, or vice-versa), then an
 attempt is made to convert the array to an array of the correct
 complexity. This results in a copy being made.
 
+The exception is a real array passed to one of the complex forward
+transforms (:func:`~pyfftw.builders.fft`,
+:func:`~pyfftw.builders.fft2` or :func:`~pyfftw.builders.fftn`). Rather
+than being copied to a complex array, it is transformed directly with a
+real to complex transform into a complex output of the full length, the
+rest of which is filled in from the Hermitian symmetry of the result.
+The returned :class:`pyfftw.FFTW` object then has a real input array, as
+for :func:`~pyfftw.builders.rfft`.
+
 Although the array that is internal to the :class:`pyfftw.FFTW` object
 will be correctly loaded with the values within the input array, it is
 not necessarily the case that the internal array *is* the input array.
@@ -123,6 +132,10 @@ same calling signature as their respective functions in
 * :func:`~pyfftw.builders.fftn`
 * :func:`~pyfftw.builders.ifftn`
 
+Versions of :func:`~pyfftw.builders.fftn` and
+:func:`~pyfftw.builders.ifftn` that spread the transform across several
+processes are in :mod:`pyfftw.builders.distributed`.
+
 **Real FFTs**
 
 * :func:`~pyfftw.builders.rfft`
@@ -132,6 +145,19 @@ same calling signature as their respective functions in
 * :func:`~pyfftw.builders.rfftn`
 * :func:`~pyfftw.builders.irfftn`
 
+**Discrete cosine and sine transforms**
+
+* :func:`~pyfftw.builders.dct`
+* :func:`~pyfftw.builders.dst`
+* :func:`~pyfftw.builders.dctn`
+* :func:`~pyfftw.builders.dstn`
+
+These are FFTW's real to real transforms, of ``type`` 1 to 4 with the
+unnormalised definitions of :func:`scipy.fft.dct` and
+:func:`scipy.fft.dst`. As type 3 is the inverse of type 2, calling an
+object of type 3 normalises the output as for the inverse FFTs. The
+other types are not normalised.
+
 The first caveat is that the dtype of the input array must match the
 transform. For example, for ``fft`` and ``ifft``, the dtype must
 be complex, for ``rfft`` it must be real, and so on. The other point
@@ -186,7 +212,18 @@ following additional keyword arguments:
   :func:`pyfftw.import_wisdom`) is used during the creation of
   :class:`pyfftw.FFTW` objects.
 
-* ``threads``: The number of threads used to perform the FFT.
+  With ``'auto'``, the planner effort that :func:`pyfftw.autotune` found
+  to be fastest for the transform on this kind of CPU is used, or
+  ``'FFTW_MEASURE'`` if it has not been tuned. This is not offered by
+  the cosine and sine transforms, which are never tuned.
+
+* ``threads``: The number of threads used to perform the FFT. With
+  ``'auto'``, the number that :func:`pyfftw.autotune` found to be
+  fastest is used, or 1 if the transform has not been tuned.
+
+* ``planning_timelimit``: A rough upper bound in seconds on the time
+  spent planning the transform, as with :class:`pyfftw.FFTW`. The
+  default is ``None``, which sets no limit.
 
 * ``auto_align_input``: Correctly byte align the input array for optimal
   usage of vector instructions. This can lead to a substantial speedup.
@@ -216,26 +253,35 @@ following additional keyword arguments:
   the array is contiguous or not.
 
 * ``auto_contiguous``: Make sure the input array is contiguous in
-  memory before performing the transform on it. If the array is not
-  contiguous, it is copied into an interim array. This is because it
+  memory before performing the transform on it, unless the transform
+  of the non-contiguous array is likely to be as fast. If the array is
+  not contiguous, it is copied into an interim array. This is because it
   is often faster to copy the data before the transform and then transform
   a contiguous array than it is to try to take the transform of a 
   non-contiguous array. This is particularly true in conjunction with
   the ``auto_align_input`` argument which is used to make sure that the 
   transform is taken of an aligned array.
 
+  The exception is an array whose axis with the smallest stride is the
+  last one, such as a strided slice, a reversed array or a channel of
+  interleaved data. FFTW then works through it much as it would a C
+  contiguous array, so the transform is planned on the array itself.
+
   Like ``auto_align_input``, If a new array is created, it is 
   up to the calling code to acquire that new input array using 
   :attr:`pyfftw.FFTW.input_array`.
 
-* ``avoid_copy``: By default, these functions will always create a copy 
-  (and sometimes more than one) of the passed in input array. This is 
-  because the creation of the :class:`pyfftw.FFTW` object generally
-  destroys the contents of the input array. Setting this argument to
-  ``True`` will try not to create a copy of the input array, likely
-  resulting in the input array being destroyed. If it is not possible
-  to create the object without a copy being made, a ``ValueError`` is
-  raised.
+* ``avoid_copy``: The creation of the :class:`pyfftw.FFTW` object
+  generally destroys the contents of the input array. By default, these
+  functions preserve the passed in input array, either by planning on a
+  private scratch array laid out in the same way and then updating the
+  object to use the input array, or by planning on a copy of the input
+  array when a copy is needed anyway (for example, to align it). With
+  ``'FFTW_ESTIMATE'`` the input array is not touched by planning, so it is
+  used directly. Setting this argument to ``True`` will try not to create
+  a copy of the input array, likely resulting in the input array being
+  destroyed. If it is not possible to create the object without a copy
+  being made, a ``ValueError`` is raised.
 
   Example situations that require a copy, and so cause the exception
   to be raised when this flag is set:
@@ -246,12 +292,89 @@ following additional keyword arguments:
   * The dtypes are incompatible with the FFT routine.
 
   * The ``auto_contiguous`` or ``auto_align`` flags are True and 
-    the input array is not already contiguous or aligned.
+    the input array is not already contiguous (and not planned on as it
+    is, as above) or aligned.
 
   This argument is distinct from ``overwrite_input`` in that it only
   influences a copy during the creation of the object. It changes no
   flags in the :class:`pyfftw.FFTW` object.
 
+* ``shift_input``: Shift the input array over the axes of the
+  transform as :func:`numpy.fft.ifftshift` would before it is
+  transformed, so the zero frequency (or the origin) can be in the
+  middle of the input. The shift is done when the input array is
+  copied into the internal array, so it always results in that copy
+  (and in a ``ValueError`` being raised if ``avoid_copy`` is set).
+
+* ``shift_output``: Shift the output array over the axes of the
+  transform as :func:`numpy.fft.fftshift` would, in place after every
+  transform, so the zero frequency is in the middle of the output.
+
+  For the real transforms, the half spectrum is not shifted along
+  the last axis of the transform. That is, ``rfft2(a, shift_output=True)``
+  is ``numpy.fft.fftshift(numpy.fft.rfft2(a), axes=(-2,))``.
+
+  When either of these is set, the returned object is an
+  :class:`~pyfftw.builders._utils._FFTWWrapper`, which does the shifting
+  when it is called.
+
+* ``prune_padding``: Only offered by :func:`~pyfftw.builders.fft2`,
+  :func:`~pyfftw.builders.fftn`, :func:`~pyfftw.builders.rfft2` and
+  :func:`~pyfftw.builders.rfftn`. When ``s`` zero pads the input along
+  more than one axis of the transform (as is common for convolution and
+  interpolation), skip the 1-D transforms of the rows that are all
+  zeros. The axes are transformed one at a time, with each padded only
+  just before it is transformed, so with a padding of 2 along each of 3
+  axes, 7/12 of the 1-D transforms are done. The returned object is then
+  a :class:`~pyfftw.builders._utils._PrunedFFTW`, which is called like a
+  :class:`~pyfftw.builders._utils._FFTWWrapper` but is not a
+  :class:`pyfftw.FFTW` object. Otherwise (including when the input is
+  shifted, or is real with :func:`~pyfftw.builders.fftn`), this argument
+  has no effect. The default is ``False``.
+
+* ``pad``: Round the lengths of the transform (those of ``s``, or of the
+  input array if ``s`` is ``None``) up, as if ``s`` had been passed with
+  the rounded lengths. That is, the input is zero padded to them and the
+  output has them. This is not offered by the cosine and sine transforms.
+
+  With ``'fast'``, each length is rounded up to the next one that FFTW is
+  fast with, as given by :func:`pyfftw.next_fast_len` (which is even for
+  the real length of the real transforms). This avoids the lengths with
+  large prime factors that FFTW is slow with.
+
+  With ``'bucket'``, each length is rounded up to the next of the lengths
+  8, 10, 12 and 14 times a power of 2 (or left alone if it is at most 8).
+  These are also lengths that FFTW is fast with, and less than a quarter
+  of each is padding. Arrays of many different lengths then only need a
+  few different plans, which bounds the size of the
+  :mod:`interfaces cache <pyfftw.interfaces.cache>`.
+
+  The default is ``None``, which leaves the lengths as they are.
+
+* ``output_array``: An array to plan the transform into, in place of the
+  aligned array that is otherwise made for it, so the output of every
+  call lands in it (say, in a slot of a larger buffer) with no copy. It
+  should have the shape and dtype of the output of the transform and be
+  writeable. With ``auto_align_input``, it should also be aligned for
+  SIMD instructions, as :func:`pyfftw.is_byte_aligned` checks. Otherwise
+  a ``ValueError`` is raised. Planning overwrites its contents (unless
+  ``planner_effort`` is ``'FFTW_ESTIMATE'``), and ``a`` is first copied
+  if it shares memory with it.
+
+* ``input_array``: Likewise, an array to plan the transform from, in
+  place of the internal input array, with the shape of the input of the
+  transform (that is, of ``a`` zero padded or truncated as ``s``
+  dictates) and the dtype of ``a`` (after it is made complex or real as
+  the transform needs). The data in ``a`` is copied into it after
+  planning. A :class:`pyfftw.FFTW` object called with a new input array
+  might go on to use that array instead, as
+  :meth:`~pyfftw.FFTW.__call__` documents, so to keep using
+  ``input_array``, fill it and call the object with no arguments.
+  Passing the same array as ``input_array`` and ``output_array`` (or
+  views of the same memory) makes the transform in place. With
+  ``avoid_copy``, it should be ``a`` itself. It is not used with
+  ``prune_padding``.
+
 The exceptions raised by each of these functions are as per their
 equivalents in :mod:`numpy.fft`, or as documented above.
 '''
@@ -260,13 +383,31 @@ from ._utils import _precook_1d_args, _Xfftn
 
 __all__ = ['fft','ifft', 'fft2', 'ifft2', 'fftn',
            'ifftn', 'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 
-           'irfftn']
+           'irfftn', 'dct', 'dst', 'dctn', 'dstn']
+
+_dct_kinds = {1: 'FFTW_REDFT00', 2: 'FFTW_REDFT10', 3: 'FFTW_REDFT01',
+        4: 'FFTW_REDFT11'}
+
+_dst_kinds = {1: 'FFTW_RODFT00', 2: 'FFTW_RODFT10', 3: 'FFTW_RODFT01',
+        4: 'FFTW_RODFT11'}
+
+def _r2r_kind(kinds, type):
+    '''Return the FFTW real to real kind of the transform of ``type``
+    in ``kinds``.
+    '''
+    try:
+        return kinds[type]
+    except (KeyError, TypeError):
+        raise ValueError('Invalid type: '
+                'The type of the transform should be 1, 2, 3 or 4.')
 
 
 def fft(a, n=None, axis=-1, overwrite_input=False, 
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 1D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fft`; 
@@ -280,12 +421,16 @@ def fft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def ifft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 1D 
     inverse FFT.
     
@@ -301,13 +446,17 @@ def ifft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 
 def fft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, prune_padding=False,
+        pad=None, input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 2D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fft2`; 
@@ -321,12 +470,17 @@ def fft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit,
+            prune_padding=prune_padding, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def ifft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 
     2D inverse FFT.
     
@@ -341,13 +495,17 @@ def ifft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 
 def fftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, prune_padding=False,
+        pad=None, input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a n-D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fftn`; 
@@ -361,12 +519,17 @@ def fftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit,
+            prune_padding=prune_padding, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def ifftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing an n-D 
     inverse FFT.
     
@@ -381,12 +544,16 @@ def ifftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def rfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 1D 
     real FFT.
     
@@ -403,12 +570,16 @@ def rfft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def irfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 1D 
     real inverse FFT.
     
@@ -425,12 +596,16 @@ def irfft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def rfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, prune_padding=False,
+        pad=None, input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 2D 
     real FFT.
     
@@ -444,12 +619,17 @@ def rfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit,
+            prune_padding=prune_padding, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 def irfft2(a, s=None, axes=(-2,-1),
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing a 2D 
     real inverse FFT.
     
@@ -466,13 +646,17 @@ def irfft2(a, s=None, axes=(-2,-1),
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 
 def rfftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, prune_padding=False,
+        pad=None, input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing an n-D 
     real FFT.
     
@@ -487,13 +671,18 @@ def rfftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit,
+            prune_padding=prune_padding, pad=pad,
+            input_array=input_array, output_array=output_array)
 
 
 def irfftn(a, s=None, axes=None,
         planner_effort='FFTW_MEASURE', threads=1,
         auto_align_input=True, auto_contiguous=True,
-        avoid_copy=False):
+        avoid_copy=False, shift_input=False, shift_output=False,
+        planning_timelimit=None, pad=None,
+        input_array=None, output_array=None):
     '''Return a :class:`pyfftw.FFTW` object representing an n-D 
     real inverse FFT.
     
@@ -510,7 +699,98 @@ def irfftn(a, s=None, axes=None,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            avoid_copy, inverse, real)
+            avoid_copy, inverse, real, shift_input, shift_output,
+            planning_timelimit=planning_timelimit, pad=pad,
+            input_array=input_array, output_array=output_array)
+
+def dct(a, n=None, axis=-1, overwrite_input=False,
+        planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True,
+        avoid_copy=False, type=2, planning_timelimit=None,
+        input_array=None, output_array=None):
+    '''Return a :class:`pyfftw.FFTW` object representing a 1D
+    discrete cosine transform of type ``type``.
+    
+    The first three arguments and ``type`` are as per
+    :func:`scipy.fft.dct`; the rest of the arguments are documented 
+    :ref:`in the module docs <builders_args>`.
+    '''
+    inverse = False
+    real = False
+
+    s, axes = _precook_1d_args(a, n, axis)
+
+    return _Xfftn(a, s, axes, overwrite_input, planner_effort,
+            threads, auto_align_input, auto_contiguous, 
+            avoid_copy, inverse, real,
+            r2r_kinds=_r2r_kind(_dct_kinds, type),
+            planning_timelimit=planning_timelimit,
+            input_array=input_array, output_array=output_array)
+
+def dst(a, n=None, axis=-1, overwrite_input=False,
+        planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True,
+        avoid_copy=False, type=2, planning_timelimit=None,
+        input_array=None, output_array=None):
+    '''Return a :class:`pyfftw.FFTW` object representing a 1D
+    discrete sine transform of type ``type``.
+    
+    The first three arguments and ``type`` are as per
+    :func:`scipy.fft.dst`; the rest of the arguments are documented 
+    :ref:`in the module docs <builders_args>`.
+    '''
+    inverse = False
+    real = False
+
+    s, axes = _precook_1d_args(a, n, axis)
+
+    return _Xfftn(a, s, axes, overwrite_input, planner_effort,
+            threads, auto_align_input, auto_contiguous, 
+            avoid_copy, inverse, real,
+            r2r_kinds=_r2r_kind(_dst_kinds, type),
+            planning_timelimit=planning_timelimit,
+            input_array=input_array, output_array=output_array)
 
+def dctn(a, s=None, axes=None, overwrite_input=False,
+        planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True,
+        avoid_copy=False, type=2, planning_timelimit=None,
+        input_array=None, output_array=None):
+    '''Return a :class:`pyfftw.FFTW` object representing an n-D
+    discrete cosine transform of type ``type``.
+    
+    The first three arguments and ``type`` are as per
+    :func:`scipy.fft.dctn`; the rest of the arguments are documented 
+    :ref:`in the module docs <builders_args>`.
+    '''
+    inverse = False
+    real = False
 
+    return _Xfftn(a, s, axes, overwrite_input, planner_effort,
+            threads, auto_align_input, auto_contiguous, 
+            avoid_copy, inverse, real,
+            r2r_kinds=_r2r_kind(_dct_kinds, type),
+            planning_timelimit=planning_timelimit,
+            input_array=input_array, output_array=output_array)
+
+def dstn(a, s=None, axes=None, overwrite_input=False,
+        planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True,
+        avoid_copy=False, type=2, planning_timelimit=None,
+        input_array=None, output_array=None):
+    '''Return a :class:`pyfftw.FFTW` object representing an n-D
+    discrete sine transform of type ``type``.
+    
+    The first three arguments and ``type`` are as per
+    :func:`scipy.fft.dstn`; the rest of the arguments are documented 
+    :ref:`in the module docs <builders_args>`.
+    '''
+    inverse = False
+    real = False
 
+    return _Xfftn(a, s, axes, overwrite_input, planner_effort,
+            threads, auto_align_input, auto_contiguous, 
+            avoid_copy, inverse, real,
+            r2r_kinds=_r2r_kind(_dst_kinds, type),
+            planning_timelimit=planning_timelimit,
+            input_array=input_array, output_array=output_array)
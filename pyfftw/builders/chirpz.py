@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+This module contains functions that return
+:class:`~pyfftw.builders.chirpz.ChirpZ` objects, which evaluate the
+z-transform of an array along one axis at points on a spiral contour
+(the chirp z-transform) using Bluestein's algorithm. Among other things,
+this gives a band of the spectrum of an array at a finer resolution than
+its length gives, without computing the rest of the spectrum.
+
+:func:`czt` takes the contour as per :func:`scipy.signal.czt` and
+:func:`zoom_fft` takes a band of frequencies as per
+:func:`scipy.signal.zoom_fft`. :func:`pruned_fft` gives ``m`` consecutive
+bins of the ``n`` point DFT of an array, as
+``numpy.fft.fft(a, n)[start:start + m]`` would, without the array being
+zero padded to ``n``.
+
+Each object holds two :class:`pyfftw.FFTW` objects along the axis, which
+are planned when it is created. Their length is set by the length of the
+array plus the number of points in the output, rather than by the
+length of the DFT the points are taken from. The chirps that are set by
+the contour are cached, so objects with the same contour and lengths
+share them.
+
+**Example:**
+
+.. doctest::
+
+    >>> import pyfftw, numpy
+    >>> a = numpy.random.randn(1000)
+    >>> band = pyfftw.builders.pruned_fft(a, 50, start=1000, n=2**20)
+    >>> numpy.allclose(band(), numpy.fft.fft(a, 2**20)[1000:1050])
+    True
+'''
+
+import collections
+import math
+
+import numpy
+
+import pyfftw
+from ._utils import _valid_efforts, _rc_dtype_pairs, _default_dtype
+
+__all__ = ['czt', 'zoom_fft', 'pruned_fft', 'ChirpZ']
+
+# The chirps of recently created objects, keyed by their contour, lengths
+# and dtype.
+_chirp_cache = collections.OrderedDict()
+_max_chirp_cache_entries = 16
+
+def _contour_chirps(contour, input_length, m, fft_length, dtype):
+    '''Return the chirp that the input is multiplied by, the spectrum of
+    the chirp filter (scaled by ``1/fft_length``) and the chirp that the
+    output is multiplied by, for the chirp z-transform of an array of
+    ``input_length`` points to ``m`` points with FFTs of ``fft_length``
+    points.
+
+    ``contour`` is either ``('dft', n, start)``, for the bins from
+    ``start`` of the ``n`` point DFT (for which the phases are reduced
+    exactly), or ``('czt', w, z0)`` as per :func:`czt`.
+    '''
+    key = (contour, input_length, m, fft_length, dtype)
+
+    try:
+        return _chirp_cache[key]
+    except KeyError:
+        pass
+
+    # The chirps are computed in at least double precision
+    chirp_dtype = numpy.result_type(dtype, numpy.complex128)
+    real_dtype = numpy.zeros(0, chirp_dtype).real.dtype
+
+    j = numpy.arange(max(input_length, m))
+
+    if contour[0] == 'dft':
+        n, start = contour[1:]
+        period = 2 * n
+
+        # The chirps are exp(-i pi k/n) for integer k, which are reduced
+        # modulo 2n so the phases are exact for any length.
+        def chirp(phases):
+            return numpy.exp(-1j * (numpy.pi / n) *
+                    (phases % period).astype(real_dtype))
+
+        squares = (j * j) % period
+        pre = chirp(squares[:input_length] +
+                2 * (start % n) * j[:input_length])
+        post = chirp(squares[:m])
+        filter_chirp = chirp(-squares)
+
+    else:
+        log_w, log_z0 = numpy.log(numpy.array(contour[1:], chirp_dtype))
+        half_squares = j.astype(real_dtype)**2 / 2
+
+        pre = numpy.exp(log_w * half_squares[:input_length] -
+                log_z0 * j[:input_length])
+        post = numpy.exp(log_w * half_squares[:m])
+        filter_chirp = numpy.exp(-log_w * half_squares)
+
+    # The filter is the chirp at -(input_length - 1) to m - 1, wrapped
+    # around the FFT length.
+    filter_array = pyfftw.empty_aligned(fft_length, chirp_dtype)
+    filter_array[:] = 0
+    filter_array[:m] = filter_chirp[:m]
+    filter_array[fft_length - input_length + 1:] = (
+            filter_chirp[input_length - 1:0:-1])
+
+    filter_spectrum = pyfftw.empty_aligned(fft_length, chirp_dtype)
+    pyfftw.FFTW(filter_array, filter_spectrum,
+            flags=('FFTW_ESTIMATE',)).execute()
+    filter_spectrum /= fft_length
+
+    chirps = tuple(numpy.asarray(chirp, dtype) for chirp in
+            (pre, filter_spectrum, post))
+
+    for each_chirp in chirps:
+        each_chirp.flags.writeable = False
+
+    _chirp_cache[key] = chirps
+
+    while len(_chirp_cache) > _max_chirp_cache_entries:
+        _chirp_cache.popitem(last=False)
+
+    return chirps
+
+class ChirpZ(object):
+    '''The chirp z-transform of an array along one axis, computed with
+    Bluestein's algorithm from two :class:`pyfftw.FFTW` objects.
+
+    Instances should be created with :func:`czt`, :func:`zoom_fft` or
+    :func:`pruned_fft`.
+    '''
+
+    def __init__(self, input_array, m, contour, axis, flags, threads,
+            input_length=None):
+        '''``input_array`` is the array that is transformed when the
+        object is called without an array, of which the first
+        ``input_length`` points (by default, all of them) along ``axis``
+        are transformed. ``contour`` is as per
+        :func:`_contour_chirps`. ``flags`` and ``threads`` are as per
+        :class:`pyfftw.FFTW`.
+
+        If ``contour`` is a DFT for which a single FFT of its length is
+        likely to be faster than the two FFTs of Bluestein's algorithm,
+        that is used instead.
+        '''
+        if input_array.dtype in _rc_dtype_pairs:
+            if numpy.iscomplexobj(input_array):
+                dtype = input_array.dtype
+            else:
+                dtype = _rc_dtype_pairs[input_array.dtype]
+        else:
+            dtype = _rc_dtype_pairs[_default_dtype]
+
+        if input_length is None:
+            input_length = input_array.shape[axis]
+
+        self._input_array = input_array
+        self._input_shape = input_array.shape
+        self._axis = axis
+        self._m = m
+        self._input_slicer = (
+                (slice(None),) * axis + (slice(0, input_length),))
+
+        fft_length = pyfftw.next_fast_len(input_length + m - 1)
+
+        def cost(length):
+            return length * math.log(length + 1)
+
+        # A DFT of length n is then computed with an FFT of length n
+        self._direct = contour[0] == 'dft' and (
+                input_length <= contour[1] and
+                cost(contour[1]) <= 2 * cost(fft_length))
+
+        if self._direct:
+            n, start = contour[1:]
+            fft_length = n
+            self._band = (start + numpy.arange(m)) % n
+
+        shape = list(input_array.shape)
+        shape[axis] = fft_length
+
+        self._padded_array = pyfftw.empty_aligned(shape, dtype)
+        self._spectrum = pyfftw.empty_aligned(shape, dtype)
+
+        self._forward = pyfftw.FFTW(self._padded_array, self._spectrum,
+                axes=(axis,), direction='FFTW_FORWARD', flags=flags,
+                threads=threads)
+
+        if not self._direct:
+            # The inverse transform is in place
+            self._inverse = pyfftw.FFTW(self._spectrum, self._spectrum,
+                    axes=(axis,), direction='FFTW_BACKWARD', flags=flags,
+                    threads=threads)
+
+            # The chirps are broadcast along the other axes
+            broadcast_shape = [1] * input_array.ndim
+
+            self._pre, self._filter, self._post = [
+                    chirp.reshape(broadcast_shape[:axis] + [-1] +
+                        broadcast_shape[axis + 1:])
+                    for chirp in _contour_chirps(contour, input_length, m,
+                        fft_length, dtype)]
+
+        shape[axis] = m
+        self._output_array = pyfftw.empty_aligned(shape, dtype)
+
+        # Planning will have trashed the padding
+        self._padded_array[:] = 0
+
+    def _get_input_array(self):
+        '''Return the array that is transformed when the object is called
+        without an array.
+        '''
+        return self._input_array
+
+    input_array = property(_get_input_array)
+
+    def _get_output_array(self):
+        '''Return the array that the output is written to.
+        '''
+        return self._output_array
+
+    output_array = property(_get_output_array)
+
+    def _get_axis(self):
+        '''Return the axis of the transform.
+        '''
+        return self._axis
+
+    axis = property(_get_axis)
+
+    def _get_fft_length(self):
+        '''Return the length of the FFTs that are used.
+        '''
+        return self._forward.input_shape[self._axis]
+
+    fft_length = property(_get_fft_length)
+
+    def __call__(self, input_array=None):
+        '''Compute the transform of ``input_array``, or of
+        :attr:`input_array` if it is ``None``, and return
+        :attr:`output_array`. ``input_array`` should have the same shape
+        as :attr:`input_array`, else a ``ValueError`` is raised.
+        '''
+        if input_array is None:
+            input_array = self._input_array
+        else:
+            input_array = numpy.asanyarray(input_array)
+
+            if input_array.shape != self._input_shape:
+                raise ValueError('Invalid input shape: '
+                        'The new input array should be the same shape as '
+                        'the input array used to instantiate the object.')
+
+        input_array = input_array[self._input_slicer]
+        padded_head = self._padded_array[self._input_slicer]
+
+        if self._direct:
+            padded_head[...] = input_array
+            self._forward.execute()
+
+            numpy.take(self._spectrum, self._band, axis=self._axis,
+                    out=self._output_array)
+
+        else:
+            numpy.multiply(input_array, self._pre, out=padded_head)
+            self._forward.execute()
+
+            self._spectrum *= self._filter
+            self._inverse.execute()
+
+            band_slicer = (slice(None),) * self._axis + (slice(0, self._m),)
+            numpy.multiply(self._spectrum[band_slicer], self._post,
+                    out=self._output_array)
+
+        return self._output_array
+
+def _chirpz(a, m, contour, axis, planner_effort, threads, crop=None):
+    '''Return the :class:`ChirpZ` object for the arguments of the
+    functions in this module, after checking them. If ``crop`` is not
+    ``None``, only the first ``crop`` points of ``a`` along ``axis`` are
+    transformed.
+    '''
+    if planner_effort not in _valid_efforts:
+        raise ValueError('Invalid planner effort: ', planner_effort)
+
+    a = numpy.asanyarray(a)
+
+    if not -a.ndim <= axis < a.ndim:
+        raise IndexError('Invalid axis: '
+                'The axis is out of range for the array.')
+
+    if m < 1:
+        raise ValueError('Invalid m: '
+                'The number of output points should be at least 1.')
+
+    if a.shape[axis] == 0:
+        raise ValueError('Zero length array: '
+                'The input array should have no zero length axis over '
+                'which the transform is to be taken.')
+
+    input_length = None
+
+    if crop is not None:
+        input_length = min(crop, a.shape[axis])
+
+    return ChirpZ(a, int(m), contour, axis % a.ndim, (planner_effort,),
+            threads, input_length)
+
+def czt(a, m=None, w=None, z0=1, axis=-1, planner_effort='FFTW_MEASURE',
+        threads=1):
+    '''Return a :class:`ChirpZ` object representing the z-transform of
+    ``a`` along ``axis`` at the ``m`` points ``z0 * w**-k`` for ``k`` in
+    ``range(m)``.
+
+    ``m``, ``w`` and ``z0`` (``a`` in :func:`scipy.signal.czt`) are as per
+    :func:`scipy.signal.czt`, so ``m`` defaults to the length of ``a``
+    along ``axis``, and ``w`` to ``exp(-2j*pi/m)``, which with ``z0``
+    being 1 gives the DFT. ``planner_effort`` and ``threads`` are as per
+    :func:`pyfftw.builders.fft`.
+    '''
+    a = numpy.asanyarray(a)
+
+    if m is None:
+        m = a.shape[axis]
+
+    if w is None and z0 == 1:
+        contour = ('dft', int(m), 0)
+    else:
+        if w is None:
+            w = numpy.exp(-2j * numpy.pi / m)
+
+        if w == 0 or z0 == 0:
+            raise ValueError('Invalid contour: '
+                    'w and z0 should not be zero.')
+
+        contour = ('czt', complex(w), complex(z0))
+
+    return _chirpz(a, m, contour, axis, planner_effort, threads)
+
+def zoom_fft(a, fn, m=None, fs=2, endpoint=False, axis=-1,
+        planner_effort='FFTW_MEASURE', threads=1):
+    '''Return a :class:`ChirpZ` object representing the DFT of ``a`` along
+    ``axis`` at ``m`` frequencies from ``fn[0]`` to ``fn[1]``.
+
+    The first six arguments are as per :func:`scipy.signal.zoom_fft`, so
+    ``fn`` can also be a single frequency ``f2``, meaning ``[0, f2]``,
+    ``m`` defaults to the length of ``a`` along ``axis``, the frequencies
+    are relative to the sampling frequency ``fs`` and ``endpoint`` sets
+    whether ``fn[1]`` is included. ``planner_effort`` and ``threads`` are
+    as per :func:`pyfftw.builders.fft`.
+    '''
+    a = numpy.asanyarray(a)
+
+    if m is None:
+        m = a.shape[axis]
+
+    if numpy.size(fn) == 2:
+        f1, f2 = fn
+    elif numpy.size(fn) == 1:
+        f1, f2 = 0.0, numpy.ravel(fn)[0]
+    else:
+        raise ValueError('Invalid fn: '
+                'fn should be a single frequency or a pair of frequencies.')
+
+    if endpoint and m > 1:
+        step = (f2 - f1) / float(m - 1)
+    else:
+        step = (f2 - f1) / float(m)
+
+    contour = ('czt', complex(numpy.exp(-2j * numpy.pi * step / fs)),
+            complex(numpy.exp(2j * numpy.pi * f1 / fs)))
+
+    return _chirpz(a, m, contour, axis, planner_effort, threads)
+
+def pruned_fft(a, m, start=0, n=None, axis=-1,
+        planner_effort='FFTW_MEASURE', threads=1):
+    '''Return a :class:`ChirpZ` object representing the ``m`` bins from
+    ``start`` of the ``n`` point DFT of ``a`` along ``axis``. That is,
+    the transform of ``numpy.fft.fft(a, n, axis)`` that is then sliced to
+    the bins ``start`` to ``start + m`` along the axis (which wrap around
+    ``n``).
+
+    ``n`` and ``axis`` are as per :func:`numpy.fft.fft`, so if ``n`` is
+    less than the length of ``a``, ``a`` is cropped. Otherwise, the
+    cost scales with the length of ``a`` plus ``m``, unless the FFT of
+    length ``n`` is cheaper, in which case that is used.
+    ``planner_effort`` and ``threads`` are as per
+    :func:`pyfftw.builders.fft`.
+    '''
+    a = numpy.asanyarray(a)
+
+    if n is None:
+        n = a.shape[axis]
+
+    if n < 1:
+        raise ValueError('Invalid number of FFT data points (%d) specified.'
+                % n)
+
+    return _chirpz(a, m, ('dft', int(n), int(start)), axis, planner_effort,
+            threads, n)
@@ -0,0 +1,470 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+This module contains functions that return
+:class:`~pyfftw.builders.distributed.DistributedFFTW` objects, which
+perform a complex multi-dimensional FFT using a pool of worker processes
+rather than threads. This can scale better than FFTW's own threads
+across several sockets, without needing MPI.
+
+The calling signatures mirror :func:`pyfftw.builders.fftn` and
+:func:`pyfftw.builders.ifftn`, with ``processes`` giving the number of
+worker processes.
+
+The data lives in a single shared memory array that is decomposed into
+slabs. The transform is performed in two stages:
+
+1. Each worker takes a contiguous slab along the first transformed axis
+   and performs a batched transform of its slab over all the other
+   transformed axes, in-place.
+2. Each worker then gathers a slab along the second transformed axis
+   from all the other slabs into a private contiguous array (the
+   all-to-all transpose) and transforms it along the first transformed
+   axis, writing the result back into its slab of the shared array.
+
+The workers synchronise with the calling process between the stages.
+Since the transform is in-place in the shared array,
+:attr:`~pyfftw.builders.distributed.DistributedFFTW.input_array` and
+:attr:`~pyfftw.builders.distributed.DistributedFFTW.output_array` are the
+same array.
+
+**Example:**
+
+.. doctest::
+
+    >>> import pyfftw, numpy
+    >>> a = numpy.random.randn(64, 64, 64) + 0j
+    >>> with pyfftw.builders.distributed.fftn(a, processes=4) as fft:
+    ...     numpy.allclose(fft(), numpy.fft.fftn(a))
+    True
+'''
+
+import multiprocessing
+import traceback
+
+import numpy
+
+import pyfftw
+from ._utils import (_cook_nd_args, _compute_array_shapes,
+        _setup_input_slicers, _valid_efforts, _rc_dtype_pairs,
+        _default_dtype)
+
+__all__ = ['fftn', 'ifftn', 'DistributedFFTW']
+
+def _slab_bounds(length, n_slabs):
+    '''Return a list of ``(start, stop)`` tuples that split ``length``
+    into ``n_slabs`` contiguous slabs that differ in length by at most one.
+    '''
+    step, remainder = divmod(length, n_slabs)
+
+    bounds = []
+    start = 0
+    for n in range(n_slabs):
+        stop = start + step + (1 if n < remainder else 0)
+        bounds.append((start, stop))
+        start = stop
+
+    return bounds
+
+def _slab(array, axis, bounds):
+    '''Return the view of ``array`` from ``bounds[0]`` to ``bounds[1]``
+    along ``axis``.
+    '''
+    slicer = [slice(None)] * array.ndim
+    slicer[axis] = slice(*bounds)
+
+    return array[tuple(slicer)]
+
+def _shared_view(shared_buffer, offset, shape, dtype):
+    '''Return the array of ``shape`` and ``dtype`` that begins ``offset``
+    bytes into ``shared_buffer``.
+    '''
+    dtype = numpy.dtype(dtype)
+    n_bytes = int(numpy.prod(shape)) * dtype.itemsize
+
+    byte_array = numpy.frombuffer(shared_buffer, dtype=numpy.uint8)
+
+    return byte_array[offset:offset + n_bytes].view(dtype).reshape(shape)
+
+def _worker(shared_buffer, offset, shape, dtype, axes, row_bounds,
+        column_bounds, direction, flags, threads, wisdom, connection):
+    '''The main loop of a worker process.
+
+    The FFTW objects for both stages are planned on the slabs that this
+    worker owns, then the worker waits for commands from ``connection``.
+    '''
+    try:
+        pyfftw.import_wisdom(wisdom)
+
+        array = _shared_view(shared_buffer, offset, shape, dtype)
+
+        rows = _slab(array, axes[0], row_bounds)
+        row_fftw = pyfftw.FFTW(rows, rows, axes[1:], direction, flags,
+                threads)
+
+        # The columns, with the column axis moved to the front. Because
+        # axes[0] < axes[1], the row axis ends up at axes[0] + 1.
+        columns = numpy.rollaxis(
+                _slab(array, axes[1], column_bounds), axes[1], 0)
+
+        scratch = pyfftw.empty_aligned(columns.shape, dtype=dtype)
+        column_fftw = pyfftw.FFTW(scratch, columns, (axes[0] + 1,),
+                direction, list(flags) + ['FFTW_DESTROY_INPUT'], threads)
+
+        connection.send(('ready', pyfftw.export_wisdom()))
+
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+        return
+
+    while True:
+        command = connection.recv()
+
+        try:
+            if command[0] == 'rows':
+                row_fftw.execute()
+
+            elif command[0] == 'columns':
+                scaling = command[1]
+
+                if scaling == 1.0:
+                    scratch[:] = columns
+                else:
+                    numpy.multiply(columns, scaling, out=scratch)
+
+                column_fftw.execute()
+
+            else:
+                break
+
+            connection.send(('done', None))
+
+        except Exception:
+            connection.send(('error', traceback.format_exc()))
+
+class DistributedFFTW(object):
+    '''A complex multi-dimensional FFT that is performed by a pool of
+    worker processes on an array in shared memory.
+
+    Instances should be created with :func:`fftn` or :func:`ifftn`.
+
+    The worker processes live as long as the object, or until
+    :meth:`close` is called. The object can also be used as a context
+    manager, which closes it on exit.
+    '''
+
+    def __init__(self, input_shape, dtype, axes, direction, flags,
+            threads, processes, input_array_slicer=None,
+            FFTW_array_slicer=None):
+        '''The arguments are as per :class:`pyfftw.FFTW`, except that the
+        input array is described by ``input_shape`` and ``dtype`` and
+        is created in shared memory, and ``processes`` is the number of
+        worker processes. ``axes`` should be a sorted sequence of at
+        least two non-negative axes.
+
+        ``input_array_slicer`` and ``FFTW_array_slicer`` are as per
+        :class:`~pyfftw.builders._utils._FFTWWrapper`.
+        '''
+        self._connections = []
+        self._processes = []
+
+        dtype = numpy.dtype(dtype)
+        alignment = pyfftw.simd_alignment or 1
+
+        n_bytes = int(numpy.prod(input_shape)) * dtype.itemsize
+        self._shared_buffer = multiprocessing.RawArray(
+                'b', n_bytes + alignment)
+
+        address = numpy.frombuffer(
+                self._shared_buffer, dtype=numpy.uint8).ctypes.data
+        offset = (-address) % alignment
+
+        self._array = _shared_view(self._shared_buffer, offset,
+                input_shape, dtype)
+
+        self._axes = tuple(axes)
+        self._direction = direction
+        self._input_array_slicer = input_array_slicer
+        self._FFTW_array_slicer = FFTW_array_slicer
+        self._N = int(numpy.prod([input_shape[axis] for axis in axes]))
+
+        processes = max(min(processes, input_shape[axes[0]],
+            input_shape[axes[1]]), 1)
+
+        row_bounds = _slab_bounds(input_shape[axes[0]], processes)
+        column_bounds = _slab_bounds(input_shape[axes[1]], processes)
+
+        wisdom = pyfftw.export_wisdom()
+
+        for n in range(processes):
+            parent_connection, child_connection = multiprocessing.Pipe()
+
+            process = multiprocessing.Process(target=_worker,
+                    args=(self._shared_buffer, offset, input_shape, dtype,
+                        self._axes, row_bounds[n], column_bounds[n],
+                        direction, flags, threads, wisdom,
+                        child_connection))
+
+            process.daemon = True
+            process.start()
+
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+
+        try:
+            for worker_wisdom in self._collect('ready'):
+                pyfftw.import_wisdom(worker_wisdom)
+
+        except:
+            self.close()
+            raise
+
+        # Planning will have trashed the array
+        self._array[:] = 0
+
+    def _get_input_array(self):
+        '''Return the shared array that the transform reads from.
+        '''
+        return self._array
+
+    input_array = property(_get_input_array)
+
+    def _get_output_array(self):
+        '''Return the shared array that the transform writes to. This is
+        the same array as :attr:`input_array`.
+        '''
+        return self._array
+
+    output_array = property(_get_output_array)
+
+    def _get_axes(self):
+        '''Return the axes of the transform.
+        '''
+        return self._axes
+
+    axes = property(_get_axes)
+
+    def _get_direction(self):
+        '''Return the planned FFT direction. Either ``'FFTW_FORWARD'``
+        or ``'FFTW_BACKWARD'``.
+        '''
+        return self._direction
+
+    direction = property(_get_direction)
+
+    def _get_processes(self):
+        '''Return the number of worker processes.
+        '''
+        return len(self._processes)
+
+    processes = property(_get_processes)
+
+    def _collect(self, expected):
+        '''Wait for every worker to reply, raising a ``RuntimeError`` if
+        any of them failed, and return the payloads of the replies.
+        '''
+        replies = [connection.recv() for connection in self._connections]
+
+        for reply, payload in replies:
+            if reply != expected:
+                raise RuntimeError('Worker error: ' + str(payload))
+
+        return [payload for reply, payload in replies]
+
+    def _broadcast(self, command):
+        for connection in self._connections:
+            connection.send(command)
+
+    def execute(self, normalise_idft=True):
+        '''Execute the transform on the data currently in the shared
+        array. ``normalise_idft`` is as per :meth:`pyfftw.FFTW.__call__`.
+        '''
+        if len(self._processes) == 0:
+            raise RuntimeError('Invalid state: The object has been closed.')
+
+        if self._direction == 'FFTW_BACKWARD' and normalise_idft:
+            scaling = 1.0/self._N
+        else:
+            scaling = 1.0
+
+        self._broadcast(('rows',))
+        self._collect('done')
+
+        self._broadcast(('columns', scaling))
+        self._collect('done')
+
+    def __call__(self, input_array=None, normalise_idft=True):
+        '''Copy ``input_array`` (if it is not ``None``) into the shared
+        array, execute the transform and return :attr:`output_array`.
+
+        Like :class:`~pyfftw.builders._utils._FFTWWrapper`, the input
+        array is sliced to the shape of the shared array and zero padded
+        as necessary. If ``input_array`` is ``None``, the transform is
+        performed on whatever is currently in the shared array, which
+        after a previous call is the previous output.
+        '''
+        if input_array is not None:
+            input_array = numpy.asanyarray(input_array)
+
+            if self._FFTW_array_slicer is not None:
+                self._array[:] = 0
+                sliced_internal = self._array[self._FFTW_array_slicer]
+                sliced_input = input_array[self._input_array_slicer]
+            else:
+                sliced_internal = self._array
+                sliced_input = input_array
+
+            if sliced_internal.shape != sliced_input.shape:
+                raise ValueError('Invalid input shape: '
+                        'The new input array should be the same shape '
+                        'as the input array used to instantiate the '
+                        'object.')
+
+            sliced_internal[:] = sliced_input
+
+        self.execute(normalise_idft)
+
+        return self._array
+
+    def close(self):
+        '''Stop the worker processes. The object cannot be executed
+        afterwards.
+        '''
+        for connection in self._connections:
+            try:
+                connection.send(('stop',))
+            except (IOError, OSError):
+                pass
+
+        for process in self._processes:
+            process.join()
+
+        for connection in self._connections:
+            connection.close()
+
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+def _Xfftn(a, s, axes, planner_effort, threads, processes, inverse):
+    '''Generic distributed transform interface. No defaults exist.
+    '''
+    if planner_effort not in _valid_efforts:
+        raise ValueError('Invalid planner effort: ', planner_effort)
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    if processes < 1:
+        raise ValueError('Invalid processes: '
+                'The number of processes should be at least one.')
+
+    a = numpy.asanyarray(a)
+
+    s, axes = _cook_nd_args(a, s, axes)
+    input_shape, output_shape = _compute_array_shapes(
+            a, s, axes, inverse, False)
+
+    axes = sorted(set(axis % a.ndim for axis in axes))
+
+    if len(axes) < 2:
+        raise ValueError('Invalid axes: '
+                'A distributed transform needs at least two axes.')
+
+    if a.dtype in _rc_dtype_pairs:
+        if not numpy.iscomplexobj(a):
+            a = numpy.asarray(a, dtype=_rc_dtype_pairs[a.dtype])
+    else:
+        a = numpy.asarray(a, dtype=_rc_dtype_pairs[_default_dtype])
+
+    if inverse:
+        direction = 'FFTW_BACKWARD'
+    else:
+        direction = 'FFTW_FORWARD'
+
+    if a.shape == input_shape:
+        input_array_slicer, FFTW_array_slicer = None, None
+    else:
+        input_array_slicer, FFTW_array_slicer = (
+                _setup_input_slicers(a.shape, input_shape))
+
+        input_array_slicer = tuple(input_array_slicer)
+        FFTW_array_slicer = tuple(FFTW_array_slicer)
+
+    FFTW_object = DistributedFFTW(input_shape, a.dtype, axes, direction,
+            (planner_effort,), threads, processes,
+            input_array_slicer=input_array_slicer,
+            FFTW_array_slicer=FFTW_array_slicer)
+
+    if FFTW_array_slicer is None:
+        FFTW_object.input_array[:] = a
+    else:
+        FFTW_object.input_array[FFTW_array_slicer] = a[input_array_slicer]
+
+    return FFTW_object
+
+def fftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        processes=None):
+    '''Return a :class:`DistributedFFTW` object representing an n-D FFT.
+
+    The first three arguments are as per :func:`numpy.fft.fftn`.
+    ``planner_effort`` is as per :func:`pyfftw.builders.fftn`, ``threads``
+    is the number of threads used by each worker process and
+    ``processes`` is the number of worker processes, defaulting to the
+    number of CPUs. At least two axes should be transformed.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, processes, False)
+
+def ifftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        processes=None):
+    '''Return a :class:`DistributedFFTW` object representing an n-D
+    inverse FFT.
+
+    The arguments are as per :func:`fftn`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, processes, True)
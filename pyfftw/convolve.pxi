@@ -0,0 +1,396 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from libc.string cimport memcpy, memmove, memset
+
+ctypedef fused _spectrum_real_t:
+    float
+    double
+    long double
+
+cdef void _multiply_spectra(_spectrum_real_t *a, _spectrum_real_t *b,
+        int64_t n_bins) nogil:
+    '''Multiply the interleaved complex array ``a`` in place by the
+    interleaved complex array ``b``, both of length ``n_bins``.
+    '''
+    cdef int64_t n
+    cdef _spectrum_real_t re, im
+
+    for n in range(n_bins):
+        re = a[2*n]*b[2*n] - a[2*n + 1]*b[2*n + 1]
+        im = a[2*n]*b[2*n + 1] + a[2*n + 1]*b[2*n]
+        a[2*n] = re
+        a[2*n + 1] = im
+
+def _optimal_convolver_block_size(n_taps):
+    '''Return the power of two block size that minimises the number of
+    floating point operations per output sample of an overlap-save
+    convolution with a filter of ``n_taps`` taps.
+
+    The cost of a block is taken as proportional to ``N*log2(N)``, and
+    each block yields ``N - n_taps + 1`` valid output samples.
+    '''
+    block_size = 2
+    while block_size < 2 * n_taps:
+        block_size *= 2
+
+    best_block_size = block_size
+    best_cost = None
+
+    # Beyond a few orders of magnitude the cost curve is flat and the
+    # larger buffers just cost memory.
+    for n in range(8):
+        cost = (block_size * np.log2(block_size) /
+                (block_size - n_taps + 1))
+
+        if best_cost is None or cost < best_cost:
+            best_cost = cost
+            best_block_size = block_size
+
+        block_size *= 2
+
+    return best_block_size
+
+
+cdef class Convolver:
+    '''
+    Convolver is a class for filtering arbitrarily long 1D real signals
+    with a real FIR filter, using the overlap-save method.
+
+    On instantiation, a forward real FFT and an inverse real FFT are
+    planned for a block length chosen to minimise the work per output
+    sample (or that is given by ``block_size``), and the spectrum of the
+    filter is computed once and cached.
+
+    Each block of the input is copied into an internal buffer, transformed,
+    multiplied by the cached filter spectrum and inverse transformed. All of
+    this is done in C, without any temporary arrays and with the GIL
+    released.
+
+    The object is stateful: calling it (or equivalently calling
+    :meth:`~pyfftw.Convolver.filter`) with consecutive chunks of a stream
+    returns exactly what a single call on the concatenated chunks would
+    have returned. The last ``len(taps) - 1`` input samples are carried
+    between calls. :meth:`~pyfftw.Convolver.reset` clears that state.
+    '''
+    cdef FFTW _forward_fftw
+    cdef FFTW _backward_fftw
+
+    cdef np.ndarray _block
+    cdef np.ndarray _spectrum
+    cdef np.ndarray _filter_spectrum
+    cdef np.ndarray _output_block
+
+    cdef int64_t _n_taps
+    cdef int64_t _block_size
+    cdef int64_t _step
+    cdef int64_t _n_bins
+    cdef int _precision
+    cdef object _dtype
+
+    def _get_n_taps(self):
+        '''
+        Return the number of taps of the filter.
+        '''
+        return self._n_taps
+
+    n_taps = property(_get_n_taps)
+
+    def _get_block_size(self):
+        '''
+        Return the length of the FFTs that are used to process each block.
+        '''
+        return self._block_size
+
+    block_size = property(_get_block_size)
+
+    def _get_step(self):
+        '''
+        Return the number of output samples that are produced by
+        each block. This is ``block_size - n_taps + 1``.
+        '''
+        return self._step
+
+    step = property(_get_step)
+
+    def _get_dtype(self):
+        '''
+        Return the dtype of the input and output arrays.
+        '''
+        return self._dtype
+
+    dtype = property(_get_dtype)
+
+    def __cinit__(self, taps, block_size=None, dtype=None,
+            planner_effort='FFTW_MEASURE', threads=1):
+
+        taps = np.asanyarray(taps)
+
+        if dtype is None:
+            if taps.dtype in (np.dtype('float32'), np.dtype('float64'),
+                    np.dtype('longdouble')):
+                dtype = taps.dtype
+            else:
+                dtype = np.dtype('float64')
+
+        dtype = np.dtype(dtype)
+
+        if dtype.kind != 'f':
+            raise ValueError('Invalid dtype: '
+                    'The dtype should be a real floating point type.')
+
+        try:
+            complex_dtype = np.result_type(dtype, np.complex64)
+            scheme = fftw_schemes[(dtype, complex_dtype)]
+        except KeyError:
+            raise ValueError('Invalid dtype: '
+                    'The dtype should be a real floating point type.')
+
+        if np.iscomplexobj(taps):
+            raise TypeError('Invalid taps: The taps should be real.')
+
+        if taps.ndim != 1 or len(taps) == 0:
+            raise ValueError('Invalid taps: '
+                    'The taps should be a non-empty 1D array.')
+
+        n_taps = len(taps)
+
+        if block_size is None:
+            block_size = _optimal_convolver_block_size(n_taps)
+
+        block_size = int(block_size)
+
+        if block_size < n_taps:
+            raise ValueError('Invalid block size: '
+                    'The block size should be at least as long as '
+                    'the filter.')
+
+        self._dtype = dtype
+        self._precision = scheme_functions[scheme]['generic_precision']
+        self._n_taps = n_taps
+        self._block_size = block_size
+        self._step = block_size - n_taps + 1
+        self._n_bins = block_size//2 + 1
+
+        self._block = empty_aligned(block_size, dtype=dtype)
+        self._spectrum = empty_aligned(self._n_bins, dtype=complex_dtype)
+        self._output_block = empty_aligned(block_size, dtype=dtype)
+
+        flags = [planner_effort]
+
+        self._forward_fftw = FFTW(self._block, self._spectrum,
+                direction='FFTW_FORWARD', flags=flags, threads=threads)
+
+        # The spectrum is scratch space, so it can be destroyed by the
+        # inverse transform.
+        self._backward_fftw = FFTW(self._spectrum, self._output_block,
+                direction='FFTW_BACKWARD',
+                flags=flags + ['FFTW_DESTROY_INPUT'], threads=threads)
+
+        # The normalisation of the inverse FFT is folded into the cached
+        # filter spectrum.
+        self._block[:] = 0
+        self._block[:n_taps] = taps
+        self._forward_fftw.execute()
+
+        self._filter_spectrum = empty_aligned(
+                self._n_bins, dtype=complex_dtype)
+        self._filter_spectrum[:] = self._spectrum
+        self._filter_spectrum *= 1.0/block_size
+
+        self.reset()
+
+    def __init__(self, taps, block_size=None, dtype=None,
+            planner_effort='FFTW_MEASURE', threads=1):
+        '''
+        **Arguments**:
+
+        * ``taps`` is a 1D real array of the filter coefficients. The
+          filter is applied as per :func:`numpy.convolve`, so ``taps[0]``
+          multiplies the most recent sample.
+
+        * ``block_size`` is the length of the FFTs used for each block. It
+          must be at least ``len(taps)``. If it is ``None`` (the default),
+          the power of two that minimises the work per output sample is
+          used.
+
+        * ``dtype`` is the real dtype on which the filtering is performed
+          (one of ``float32``, ``float64`` or ``longdouble``). If it is
+          ``None``, the dtype of ``taps`` is used if that is a supported
+          real type, otherwise ``float64``. Inputs are converted to this
+          dtype.
+
+        * ``planner_effort`` and ``threads`` are passed to the 
+          :class:`pyfftw.FFTW` objects that are created, as per
+          :ref:`the builders arguments <builders_args>`.
+        '''
+        pass
+
+    def reset(self):
+        '''reset()
+
+        Clear the stream state, so the next call behaves as though
+        all the preceding input had been zeros.
+        '''
+        self._block[:] = 0
+
+    def __call__(self, x):
+        '''__call__(x)
+
+        Equivalent to :meth:`~pyfftw.Convolver.filter`.
+        '''
+        return self.filter(x)
+
+    def filter(self, x):
+        '''filter(x)
+
+        Filter the next chunk ``x`` of the stream, returning an array of
+        the same length as ``x``. The history of the stream that is
+        needed by the filter is kept between calls, so splitting a signal
+        into chunks makes no difference to the result.
+
+        ``x`` can be of any length and is converted to a contiguous 1D array
+        of the dtype of the object if necessary.
+        '''
+        x = np.ascontiguousarray(x, dtype=self._dtype)
+
+        if x.ndim != 1:
+            raise ValueError('Invalid input shape: '
+                    'The input array should be 1D.')
+
+        output_array = np.empty(len(x), dtype=self._dtype)
+        self._filter(x, output_array)
+
+        return output_array
+
+    def convolve(self, x):
+        '''convolve(x)
+
+        Return the full discrete linear convolution of ``x`` with the
+        filter, exactly as per :func:`numpy.convolve` with the default
+        ``mode='full'``. The output is ``len(x) + n_taps - 1`` long.
+
+        This does not affect the stream state used by
+        :meth:`~pyfftw.Convolver.filter`.
+        '''
+        x = np.asanyarray(x)
+
+        if x.ndim != 1:
+            raise ValueError('Invalid input shape: '
+                    'The input array should be 1D.')
+
+        padded_x = np.zeros(len(x) + self._n_taps - 1, dtype=self._dtype)
+        padded_x[:len(x)] = x
+
+        history = self._block[:self._n_taps - 1].copy()
+        self.reset()
+
+        try:
+            self._filter(padded_x, padded_x)
+        finally:
+            self._block[:self._n_taps - 1] = history
+
+        return padded_x
+
+    cdef _filter(self, np.ndarray input_array, np.ndarray output_array):
+        '''Run the overlap-save loop over the contiguous input array, 
+        writing to the contiguous output array (which may be the same
+        array as the input).
+        '''
+        cdef int64_t itemsize = input_array.itemsize
+        cdef int64_t n_samples = len(input_array)
+        cdef int64_t history = self._n_taps - 1
+        cdef int64_t block_size = self._block_size
+        cdef int64_t step = self._step
+        cdef int64_t n_bins = self._n_bins
+        cdef int64_t n_done = 0
+        cdef int64_t n_new
+        cdef int precision = self._precision
+
+        cdef char *input_pointer = <char *>np.PyArray_DATA(input_array)
+        cdef char *output_pointer = <char *>np.PyArray_DATA(output_array)
+        cdef char *block = <char *>np.PyArray_DATA(self._block)
+        cdef char *output_block = <char *>np.PyArray_DATA(self._output_block)
+        cdef void *spectrum = np.PyArray_DATA(self._spectrum)
+        cdef void *filter_spectrum = np.PyArray_DATA(self._filter_spectrum)
+
+        cdef void *forward_plan = self._forward_fftw._plan
+        cdef void *backward_plan = self._backward_fftw._plan
+        cdef fftw_generic_execute forward_execute = (
+                self._forward_fftw._fftw_execute)
+        cdef fftw_generic_execute backward_execute = (
+                self._backward_fftw._fftw_execute)
+
+        with nogil:
+            while n_done < n_samples:
+                n_new = n_samples - n_done
+                if n_new > step:
+                    n_new = step
+
+                # The block is the history followed by the new samples,
+                # padded with zeros if the chunk ends part way through.
+                memcpy(block + history*itemsize,
+                        input_pointer + n_done*itemsize, n_new*itemsize)
+
+                if history + n_new < block_size:
+                    memset(block + (history + n_new)*itemsize, 0,
+                            (block_size - history - n_new)*itemsize)
+
+                forward_execute(forward_plan, <void *>block, spectrum)
+
+                if precision == 0:
+                    _multiply_spectra(<double *>spectrum,
+                            <double *>filter_spectrum, n_bins)
+                elif precision == 1:
+                    _multiply_spectra(<float *>spectrum,
+                            <float *>filter_spectrum, n_bins)
+                else:
+                    _multiply_spectra(<long double *>spectrum,
+                            <long double *>filter_spectrum, n_bins)
+
+                backward_execute(backward_plan, spectrum, 
+                        <void *>output_block)
+
+                # The first `history` samples of the circular convolution
+                # are aliased, the rest are the valid linear convolution.
+                memcpy(output_pointer + n_done*itemsize,
+                        output_block + history*itemsize, n_new*itemsize)
+
+                # Keep the most recent samples for the next block.
+                memmove(block, block + n_new*itemsize, history*itemsize)
+
+                n_done += n_new
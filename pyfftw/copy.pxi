@@ -0,0 +1,296 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+# The copy of the input array into the internal input array of the
+# builders' FFTW objects. Each line along the last axis is copied (or
+# zeroed) with a single memcpy (or memset) where it is contiguous, with
+# the GIL released, and the lines are shared between threads when the
+# arrays are large enough for that to pay.
+
+import threading
+
+from libc.string cimport memcpy, memmove, memset
+
+# The fewest bytes copied by each thread
+_min_copy_bytes_per_thread = 1 << 20
+
+cdef void _copy_lines(char *dest, np.npy_intp *dest_strides, char *src,
+        np.npy_intp *src_strides, int ndim, np.npy_intp *shape,
+        np.npy_intp start, np.npy_intp stop, np.npy_intp itemsize,
+        np.npy_intp *counters) nogil:
+    ''' Copy the lines along the last axis of ``src`` whose index along
+    the first axis is from ``start`` to ``stop`` into ``dest``, which is
+    the same shape. Both arrays are at least 2-D and the strides are in
+    bytes.
+
+    ``counters`` is scratch space for ``ndim`` indices.
+    '''
+    cdef int d
+    cdef np.npy_intp k, dest_offset, src_offset
+    cdef np.npy_intp n = shape[ndim - 1]
+    cdef np.npy_intp dest_stride = dest_strides[ndim - 1]
+    cdef np.npy_intp src_stride = src_strides[ndim - 1]
+    cdef bint contiguous = (
+            dest_stride == itemsize and src_stride == itemsize)
+
+    if start >= stop:
+        return
+
+    for d in range(ndim):
+        counters[d] = 0
+
+    counters[0] = start
+
+    while True:
+        dest_offset = 0
+        src_offset = 0
+
+        for d in range(ndim - 1):
+            dest_offset += counters[d] * dest_strides[d]
+            src_offset += counters[d] * src_strides[d]
+
+        if contiguous:
+            memmove(dest + dest_offset, src + src_offset, n * itemsize)
+        else:
+            for k in range(n):
+                memcpy(dest + dest_offset + k * dest_stride,
+                        src + src_offset + k * src_stride, itemsize)
+
+        d = ndim - 2
+        while d >= 0:
+            counters[d] += 1
+            if counters[d] < (stop if d == 0 else shape[d]):
+                break
+
+            counters[d] = 0
+            d -= 1
+
+        if d < 0:
+            break
+
+cdef void _zero_lines(char *data, np.npy_intp *strides, int ndim,
+        np.npy_intp *shape, np.npy_intp *box_shape, np.npy_intp start,
+        np.npy_intp stop, np.npy_intp itemsize,
+        np.npy_intp *counters) nogil:
+    ''' Zero the values outside the box ``box_shape`` at the start of
+    the lines along the last axis of ``data`` whose index along the
+    first axis is from ``start`` to ``stop``. The array is at least 2-D
+    and the strides are in bytes.
+
+    ``counters`` is scratch space for ``ndim`` indices.
+    '''
+    cdef int d
+    cdef np.npy_intp k, offset, first
+    cdef np.npy_intp n = shape[ndim - 1]
+    cdef np.npy_intp stride = strides[ndim - 1]
+
+    if start >= stop:
+        return
+
+    for d in range(ndim):
+        counters[d] = 0
+
+    counters[0] = start
+
+    while True:
+        offset = 0
+        first = box_shape[ndim - 1]
+
+        for d in range(ndim - 1):
+            offset += counters[d] * strides[d]
+
+            # Lines outside the box are zeroed all along
+            if counters[d] >= box_shape[d]:
+                first = 0
+
+        if first < n:
+            if stride == itemsize:
+                memset(data + offset + first * stride, 0,
+                        (n - first) * itemsize)
+            else:
+                for k in range(first, n):
+                    memset(data + offset + k * stride, 0, itemsize)
+
+        d = ndim - 2
+        while d >= 0:
+            counters[d] += 1
+            if counters[d] < (stop if d == 0 else shape[d]):
+                break
+
+            counters[d] = 0
+            d -= 1
+
+        if d < 0:
+            break
+
+cdef _copy_chunk(np.ndarray dest, np.ndarray src, np.npy_intp start,
+        np.npy_intp stop):
+    cdef int ndim = np.PyArray_NDIM(dest)
+    cdef np.npy_intp *counters = <np.npy_intp *>malloc(
+            ndim * sizeof(np.npy_intp))
+    cdef char *dest_data = <char *>np.PyArray_DATA(dest)
+    cdef char *src_data = <char *>np.PyArray_DATA(src)
+    cdef np.npy_intp *dest_strides = np.PyArray_STRIDES(dest)
+    cdef np.npy_intp *src_strides = np.PyArray_STRIDES(src)
+    cdef np.npy_intp *shape = np.PyArray_DIMS(dest)
+    cdef np.npy_intp itemsize = np.PyArray_ITEMSIZE(dest)
+
+    if counters == NULL:
+        raise MemoryError
+
+    try:
+        with nogil:
+            _copy_lines(dest_data, dest_strides, src_data, src_strides,
+                    ndim, shape, start, stop, itemsize, counters)
+    finally:
+        free(counters)
+
+cdef _zero_chunk(np.ndarray array, box_shape, np.npy_intp start,
+        np.npy_intp stop):
+    cdef int d
+    cdef int ndim = np.PyArray_NDIM(array)
+    cdef np.npy_intp *counters = <np.npy_intp *>malloc(
+            2 * ndim * sizeof(np.npy_intp))
+    cdef np.npy_intp *box = counters + ndim
+    cdef char *data = <char *>np.PyArray_DATA(array)
+    cdef np.npy_intp *strides = np.PyArray_STRIDES(array)
+    cdef np.npy_intp *shape = np.PyArray_DIMS(array)
+    cdef np.npy_intp itemsize = np.PyArray_ITEMSIZE(array)
+
+    if counters == NULL:
+        raise MemoryError
+
+    try:
+        for d in range(ndim):
+            box[d] = box_shape[d]
+
+        with nogil:
+            _zero_lines(data, strides, ndim, shape, box, start, stop,
+                    itemsize, counters)
+    finally:
+        free(counters)
+
+cdef _run_chunks(chunk, np.npy_intp n, nbytes, int threads):
+    ''' Call ``chunk(start, stop)`` over the indices from ``0`` to
+    ``n`` split into up to ``threads`` parts, each in its own thread,
+    but with no more threads than there are
+    ``_min_copy_bytes_per_thread`` in ``nbytes``.
+    '''
+    cdef int k
+
+    threads = max(1, min(threads, n, nbytes // _min_copy_bytes_per_thread))
+
+    if threads == 1:
+        chunk(0, n)
+        return
+
+    bounds = [k * n // threads for k in range(threads + 1)]
+    errors = []
+
+    def run(start, stop):
+        try:
+            chunk(start, stop)
+        except BaseException as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=run, args=(bounds[k], bounds[k+1]))
+            for k in range(1, threads)]
+
+    for worker in workers:
+        worker.start()
+
+    run(bounds[0], bounds[1])
+
+    for worker in workers:
+        worker.join()
+
+    if errors:
+        raise errors[0]
+
+def _copy_array(np.ndarray dest, np.ndarray src, int threads=1):
+    '''_copy_array(dest, src, threads=1)
+
+    Copy ``src`` into ``dest``, which is the same shape, as
+    ``dest[...] = src`` would, but with the GIL released and with up to
+    ``threads`` threads for large arrays. When the arrays are not of the
+    same dtype, the copy is left to numpy.
+    '''
+    if (<object>dest).shape != (<object>src).shape:
+        raise ValueError('Invalid shapes: '
+                'The arrays should be the same shape.')
+
+    if (dest.dtype != src.dtype or dest.dtype.hasobject or
+            np.PyArray_NDIM(dest) == 0):
+        dest[...] = src
+        return
+
+    if dest.size == 0:
+        return
+
+    if np.PyArray_NDIM(dest) == 1:
+        dest = dest[None]
+        src = src[None]
+
+    _run_chunks(lambda start, stop: _copy_chunk(dest, src, start, stop),
+            np.PyArray_DIM(dest, 0), dest.nbytes, threads)
+
+def _zero_padding(np.ndarray array, box_shape, int threads=1):
+    '''_zero_padding(array, box_shape, threads=1)
+
+    Zero all of ``array`` but the box ``box_shape`` at its start, that
+    is, all but ``array[:box_shape[0], :box_shape[1], ...]``, with the
+    GIL released and with up to ``threads`` threads for large arrays.
+    '''
+    if len(box_shape) != np.PyArray_NDIM(array):
+        raise ValueError('Invalid box shape: '
+                'There should be a length for each axis of the array.')
+
+    if array.dtype.hasobject:
+        for axis, n in enumerate(box_shape):
+            array[(slice(None),)*axis + (slice(n, None),)] = 0
+        return
+
+    if array.size == 0 or np.PyArray_NDIM(array) == 0:
+        return
+
+    if np.PyArray_NDIM(array) == 1:
+        array = array[None]
+        box_shape = (1,) + tuple(box_shape)
+
+    _run_chunks(
+            lambda start, stop: _zero_chunk(array, box_shape, start, stop),
+            np.PyArray_DIM(array, 0), array.nbytes, threads)
@@ -34,4 +34,14 @@
 
 cdef extern from "cpu.h":
 
+    int SIMD_SSE
+    int SIMD_SSE2
+    int SIMD_AVX
+    int SIMD_AVX2
+    int SIMD_FMA
+    int SIMD_AVX512F
+    int SIMD_NEON
+    int SIMD_SVE
+
     int simd_alignment()
+    int simd_features()
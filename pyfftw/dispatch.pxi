@@ -0,0 +1,278 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+# The dispatch for the functions in pyfftw.interfaces. This is the part
+# of pyfftw.interfaces._utils._Xfftn that runs on every call, so it is
+# compiled. Planning on a cache miss is left to _utils.
+
+# These are imported on first use, as they import this module.
+cdef object _interfaces_cache = None
+cdef object _interfaces_utils = None
+
+cdef object _reloading_funcs = frozenset(('irfft2', 'irfftn'))
+
+cdef inline object _as_tuple(arg):
+    '''Coerce ``arg`` to a tuple if it is iterable, as the interfaces
+    allow lists for ``s`` and ``axes``.
+    '''
+    if arg is None or type(arg) is tuple or type(arg) is int:
+        return arg
+
+    try:
+        return tuple(arg)
+    except TypeError:
+        return arg
+
+cdef np.ndarray _empty_output(shape, dtype, int alignment):
+    '''Return an empty C-contiguous array aligned to ``alignment``,
+    avoiding the over-allocation of :func:`empty_aligned` when numpy's
+    own allocation happens to be aligned (which it usually is).
+    '''
+    cdef np.ndarray array = np.empty(shape, dtype)
+
+    if <intptr_t>np.PyArray_DATA(array) % alignment == 0:
+        return array
+    else:
+        return empty_aligned(shape, dtype, n=alignment)
+
+def _interfaces_check_out(FFTW FFTW_object, out):
+    '''_interfaces_check_out(FFTW_object, out)
+
+    Check that ``out`` can hold the output of ``FFTW_object``, raising a
+    ``ValueError`` if it cannot. Returns whether ``out`` can also be used
+    directly as the output array of ``FFTW_object``; if not, the output
+    needs to be copied into it.
+    '''
+    if not isinstance(out, np.ndarray):
+        raise ValueError('Invalid output array: '
+                'out should be an instance of numpy.ndarray')
+
+    if not out.shape == FFTW_object._output_shape:
+        raise ValueError('Invalid output shape: '
+                'out should be of shape %s' % (FFTW_object._output_shape,))
+
+    if not out.dtype == FFTW_object._output_dtype:
+        raise ValueError('Invalid output dtype: '
+                'out should be of dtype %s' % (FFTW_object._output_dtype,))
+
+    return (out.strides == FFTW_object._output_strides and
+            <intptr_t>np.PyArray_DATA(out) %
+            FFTW_object._output_array_alignment == 0)
+
+cdef void _conjugate_line(_hermitian_real_t *line, Py_ssize_t stride,
+        np.npy_intp n, double scaling, bint is_complex) nogil:
+    '''Conjugate and scale the ``n`` complex values of a line in place,
+    or if ``is_complex`` is false, reverse the ``n`` real values (other
+    than the first) and scale them. The stride is in bytes.
+    '''
+    cdef np.npy_intp k
+    cdef _hermitian_real_t *value
+    cdef _hermitian_real_t *reflected_value
+    cdef _hermitian_real_t tmp
+
+    if is_complex:
+        for k in range(n):
+            value = <_hermitian_real_t *>(<char *>line + k*stride)
+            value[0] = value[0] * scaling
+            value[1] = -value[1] * scaling
+
+        return
+
+    line[0] = line[0] * scaling
+
+    for k in range(1, n//2 + 1):
+        value = <_hermitian_real_t *>(<char *>line + k*stride)
+        reflected_value = <_hermitian_real_t *>(<char *>line + (n-k)*stride)
+
+        tmp = value[0]
+        value[0] = reflected_value[0] * scaling
+
+        if reflected_value != value:
+            reflected_value[0] = tmp * scaling
+
+def _interfaces_conjugate_output(FFTW FFTW_object, np.ndarray output_array,
+        double scaling):
+    '''_interfaces_conjugate_output(FFTW_object, output_array, scaling)
+
+    Turn ``output_array``, the output of ``FFTW_object``, into the output
+    of the transform of the conjugate of its input, multiplied by
+    ``scaling``. This is done in place in a single pass.
+
+    For a complex output, this is the conjugate of the output. For a
+    real output, it is the output reversed along the axis of the
+    transform (leaving the first value where it is), so the transform
+    should then be one dimensional.
+    '''
+    cdef int axis = FFTW_object._axes[0]
+    cdef np.flatiter lines
+    cdef void *line
+    cdef Py_ssize_t stride = output_array.strides[axis]
+    cdef np.npy_intp n = output_array.shape[axis]
+    cdef bint is_complex = np.PyArray_ISCOMPLEX(output_array)
+    cdef int precision = FFTW_object._precision
+
+    if output_array.size == 0:
+        return
+
+    lines = np.PyArray_IterAllButAxis(output_array, &axis)
+
+    while np.PyArray_ITER_NOTDONE(lines):
+        line = np.PyArray_ITER_DATA(lines)
+
+        with nogil:
+            if precision == 0:
+                _conjugate_line(<double *>line, stride, n, scaling,
+                        is_complex)
+            elif precision == 1:
+                _conjugate_line(<float *>line, stride, n, scaling,
+                        is_complex)
+            else:
+                _conjugate_line(<long double *>line, stride, n, scaling,
+                        is_complex)
+
+        np.PyArray_ITER_NEXT(lines)
+
+def _interfaces_Xfftn(a, s, axes, overwrite_input, planner_effort,
+        threads, auto_align_input, auto_contiguous, calling_func,
+        normalise_idft=True, out=None, conjugate=False, shift_input=False,
+        shift_output=False, planning_timelimit=None, pad=None):
+    '''_interfaces_Xfftn(a, s, axes, overwrite_input, planner_effort,
+    threads, auto_align_input, auto_contiguous, calling_func,
+    normalise_idft=True, out=None, conjugate=False, shift_input=False,
+    shift_output=False, planning_timelimit=None, pad=None)
+
+    The implementation of :func:`pyfftw.interfaces._utils._Xfftn`.
+
+    If ``conjugate`` is true, the result is that of the transform of the
+    conjugate of ``a`` (which should then be a one dimensional
+    transform if the output is real), and ``normalise_idft`` means scaling it by 1/N whatever
+    the direction of the transform. That is done in a single pass over
+    the output with :func:`_interfaces_conjugate_output`.
+
+    When the cache is enabled, the key is built and an object is checked
+    out of the cache once, and on a hit the cached :class:`FFTW` object is
+    executed on ``a`` and a new output array (or ``out``, if it is
+    suitable) without going through any Python level code. Everything else
+    is passed on to :func:`pyfftw.interfaces._utils._Xfftn_plan`, and
+    ``planning_timelimit`` is only used if a new object is planned.
+
+    If ``pad`` is not ``None``, ``a`` and ``s`` are first replaced by
+    those returned by :func:`pyfftw.interfaces._utils._pad_input`, so the
+    cache key is that of the padded array.
+    '''
+    global _interfaces_cache, _interfaces_utils
+
+    cdef FFTW FFTW_object
+    cdef np.ndarray output_array
+    cdef object key = None
+    cdef object _cache
+
+    if _interfaces_cache is None:
+        from pyfftw.interfaces import cache as _interfaces_cache
+        from pyfftw.interfaces import _utils as _interfaces_utils
+
+    if not isinstance(a, np.ndarray):
+        a = np.asanyarray(a)
+
+    if pad is not None:
+        a, s = _interfaces_utils._pad_input(a, s, axes, calling_func, pad,
+                shift_input)
+
+    s = _as_tuple(s)
+    axes = _as_tuple(axes)
+
+    _cache = _interfaces_cache._fftw_cache
+
+    if _cache is not None:
+        key = (calling_func, a.shape, a.strides, a.dtype, s, axes,
+                overwrite_input, planner_effort, threads,
+                auto_align_input, auto_contiguous, shift_input, shift_output)
+
+        # The object is checked out of the cache while it is in use, so
+        # no other thread can rebind its arrays under it.
+        try:
+            cached_object = _cache.checkout(key)
+        except KeyError:
+            cached_object = None
+
+        if cached_object is not None:
+            reload_after_transform = (
+                    calling_func in _reloading_funcs and not overwrite_input)
+
+            if reload_after_transform:
+                a_copy = a.copy()
+
+            FFTW_object = cached_object
+
+            try:
+                if out is not None and _interfaces_check_out(
+                        FFTW_object, out):
+                    output_array = out
+                else:
+                    output_array = _empty_output(FFTW_object._output_shape,
+                            FFTW_object._output_dtype,
+                            FFTW_object._output_array_alignment)
+
+                # Subclasses such as _FFTWWrapper might override __call__
+                if not (type(cached_object) is FFTW and
+                        FFTW_object._execute_arrays(a, output_array,
+                            normalise_idft and not conjugate)):
+
+                    cached_object(input_array=a, output_array=output_array,
+                            normalise_idft=normalise_idft and not conjugate)
+
+                if conjugate:
+                    _interfaces_conjugate_output(FFTW_object, output_array,
+                            FFTW_object._normalisation_scaling
+                            if normalise_idft else 1.0)
+
+            finally:
+                _cache.release(cached_object, key)
+
+            if reload_after_transform:
+                a[:] = a_copy
+
+            if out is not None and output_array is not out:
+                out[...] = output_array
+                return out
+
+            return output_array
+
+    return _interfaces_utils._Xfftn_plan(a, s, axes, overwrite_input,
+            planner_effort, threads, auto_align_input, auto_contiguous,
+            calling_func, normalise_idft, out, key, conjugate,
+            shift_input, shift_output, planning_timelimit)
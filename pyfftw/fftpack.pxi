@@ -0,0 +1,378 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+# The scipy.fftpack style real FFTs for pyfftw.interfaces.scipy_fftpack.
+# scipy.fftpack packs the half spectrum of a real FFT of length n into a
+# real array of length n, as
+#
+#     r0, r1, i1, r2, i2, ..., r(n/2)
+#
+# (r(n/2) is only there when n is even). The transforms are done with the
+# FFTW objects for the real FFTs, kept in the interfaces cache, and the
+# internal complex output array of the object is packed into the real
+# output (or the real input unpacked into the internal complex input
+# array) in a single pass, so no complex array is created on a call.
+
+import time
+
+ctypedef fused _fftpack_real_t:
+    float
+    double
+    long double
+
+cdef inline _fftpack_real_t *_fftpack_item(_fftpack_real_t *line,
+        Py_ssize_t stride, int64_t k) nogil:
+    return <_fftpack_real_t *>(<char *>line + k*stride)
+
+cdef void _fftpack_repack_line(_fftpack_real_t *spectrum,
+        Py_ssize_t spectrum_stride, _fftpack_real_t *packed,
+        Py_ssize_t packed_stride, int64_t packed_length, int64_t n,
+        bint unpack) nogil:
+    '''Pack the ``n//2 + 1`` complex values of a line of the spectrum of
+    a real FFT of length ``n`` into the real values of a line of the packed
+    array, or unpack them the other way if ``unpack`` is true. The
+    strides are in bytes.
+
+    When unpacking, the packed line has ``packed_length`` values, and is
+    truncated or zero padded to ``n`` values as it is unpacked.
+    '''
+    cdef int64_t k, real_index, imag_index
+    cdef _fftpack_real_t *value
+
+    for k in range(n//2 + 1):
+        value = _fftpack_item(spectrum, spectrum_stride, k)
+
+        if k == 0:
+            real_index = 0
+        else:
+            real_index = 2*k - 1
+
+        # The first value, and the Nyquist value if n is even, are real
+        if k > 0 and 2*k < n:
+            imag_index = 2*k
+        else:
+            imag_index = -1
+
+        if unpack:
+            if real_index < packed_length:
+                value[0] = _fftpack_item(packed, packed_stride,
+                        real_index)[0]
+            else:
+                value[0] = 0
+
+            if imag_index != -1 and imag_index < packed_length:
+                value[1] = _fftpack_item(packed, packed_stride,
+                        imag_index)[0]
+            else:
+                value[1] = 0
+
+        else:
+            _fftpack_item(packed, packed_stride, real_index)[0] = value[0]
+
+            if imag_index != -1:
+                _fftpack_item(packed, packed_stride,
+                        imag_index)[0] = value[1]
+
+cdef int _fftpack_repack(np.ndarray spectrum, np.ndarray packed, int axis,
+        int64_t n, bint unpack, int precision) except -1:
+    '''Pack the complex array ``spectrum``, the output of a real FFT of
+    length ``n`` along ``axis``, into the real array ``packed``, or
+    unpack ``packed`` into ``spectrum`` if ``unpack`` is true. The arrays
+    should agree on all the other axes, and both have the generic
+    precision ``precision`` of the :class:`FFTW` object.
+    '''
+    cdef int spectrum_axis = axis
+    cdef int packed_axis = axis
+    cdef np.flatiter spectrum_lines
+    cdef np.flatiter packed_lines
+
+    cdef Py_ssize_t spectrum_stride = spectrum.strides[axis]
+    cdef Py_ssize_t packed_stride = packed.strides[axis]
+    cdef int64_t packed_length = packed.shape[axis]
+    cdef void *spectrum_line
+    cdef void *packed_line
+
+    if spectrum.size == 0 or packed.size == 0:
+        return 0
+
+    spectrum_lines = np.PyArray_IterAllButAxis(spectrum, &spectrum_axis)
+    packed_lines = np.PyArray_IterAllButAxis(packed, &packed_axis)
+
+    while np.PyArray_ITER_NOTDONE(packed_lines):
+        spectrum_line = np.PyArray_ITER_DATA(spectrum_lines)
+        packed_line = np.PyArray_ITER_DATA(packed_lines)
+
+        with nogil:
+            if precision == 0:
+                _fftpack_repack_line(<double *>spectrum_line,
+                        spectrum_stride, <double *>packed_line,
+                        packed_stride, packed_length, n, unpack)
+            elif precision == 1:
+                _fftpack_repack_line(<float *>spectrum_line,
+                        spectrum_stride, <float *>packed_line,
+                        packed_stride, packed_length, n, unpack)
+            else:
+                _fftpack_repack_line(<long double *>spectrum_line,
+                        spectrum_stride, <long double *>packed_line,
+                        packed_stride, packed_length, n, unpack)
+
+        np.PyArray_ITER_NEXT(spectrum_lines)
+        np.PyArray_ITER_NEXT(packed_lines)
+
+    return 0
+
+cdef object _fftpack_real_dtypes
+_fftpack_real_dtypes = {np.dtype('float32'): np.dtype('complex64'),
+        np.dtype('float64'): np.dtype('complex128'),
+        np.dtype('longdouble'): np.dtype('clongdouble')}
+
+cdef np.ndarray _fftpack_output(out, shape, dtype):
+    '''Return ``out`` if it is a valid output array with ``shape`` and
+    ``dtype`` (raising a ``ValueError`` if it is not), or a new array if
+    ``out`` is ``None``.
+    '''
+    if out is None:
+        return np.empty(shape, dtype)
+
+    if not isinstance(out, np.ndarray):
+        raise ValueError('Invalid output array: '
+                'out should be an instance of numpy.ndarray')
+
+    if not out.shape == shape:
+        raise ValueError('Invalid output shape: '
+                'out should be of shape %s' % (shape,))
+
+    if not out.dtype == dtype:
+        raise ValueError('Invalid output dtype: '
+                'out should be of dtype %s' % (dtype,))
+
+    return out
+
+cdef tuple _plan_fftpack_object(a, n, axis, overwrite_input,
+        planner_effort, threads, auto_align_input, auto_contiguous,
+        calling_func):
+    '''Plan the object for the transform, returning
+    ``(FFTW_object, planning_time)``.
+    '''
+    planning_start = time.time()
+    FFTW_object = _interfaces_utils._plan_fftw_object(a, n, axis,
+            overwrite_input, planner_effort, threads, auto_align_input,
+            auto_contiguous, calling_func)
+
+    return FFTW_object, time.time() - planning_start
+
+cdef _return_fftpack_object(_cache, FFTW_object, key, planning_time):
+    '''Give the object back to the cache it was checked out of, or put
+    it in the cache if it was newly planned (``planning_time`` is not
+    ``None``).
+    '''
+    if key is None:
+        return
+
+    if planning_time is None:
+        _cache.release(FFTW_object, key)
+    else:
+        _cache.insert(FFTW_object, key, planning_time)
+
+def _interfaces_fftpack_rfft(x, n, int axis, overwrite_input,
+        planner_effort, threads, auto_align_input, auto_contiguous,
+        out=None):
+    '''_interfaces_fftpack_rfft(x, n, axis, overwrite_input,
+    planner_effort, threads, auto_align_input, auto_contiguous, out=None)
+
+    The implementation of :func:`pyfftw.interfaces.scipy_fftpack.rfft`,
+    for a real ``x``.
+    '''
+    global _interfaces_cache, _interfaces_utils
+
+    cdef FFTW FFTW_object
+    cdef np.ndarray output_array
+    cdef object key = None
+
+    if _interfaces_cache is None:
+        from pyfftw.interfaces import cache as _interfaces_cache
+        from pyfftw.interfaces import _utils as _interfaces_utils
+
+    if axis < 0:
+        axis += x.ndim
+
+    if axis < 0 or axis >= x.ndim:
+        raise IndexError('Invalid axes: '
+                'The axis is not valid for the input array.')
+
+    _cache = _interfaces_cache._fftw_cache
+
+    if _cache is not None:
+        key = ('rfft_fftpack', x.shape, x.strides, x.dtype, n, axis,
+                overwrite_input, planner_effort, threads,
+                auto_align_input, auto_contiguous, False, False)
+
+    cached_object = None
+    planning_time = None
+
+    if key is not None:
+        try:
+            cached_object = _cache.checkout(key)
+        except KeyError:
+            pass
+
+    if cached_object is None:
+        cached_object, planning_time = _plan_fftpack_object(x, n, axis,
+                overwrite_input, planner_effort, threads,
+                auto_align_input, auto_contiguous, 'rfft_fftpack')
+
+    FFTW_object = cached_object
+
+    try:
+        # The internal output array of the object is only used here, as
+        # the object is not shared with numpy_fft.rfft.
+        if not (type(cached_object) is FFTW and
+                FFTW_object._execute_arrays(x, FFTW_object._output_array,
+                    True)):
+            cached_object(input_array=x)
+
+        output_shape = list(x.shape)
+        if n is not None:
+            output_shape[axis] = n
+
+        output_array = _fftpack_output(out, tuple(output_shape),
+                FFTW_object._input_dtype)
+
+        _fftpack_repack(FFTW_object._output_array, output_array, axis,
+                output_shape[axis], False, FFTW_object._precision)
+
+    finally:
+        _return_fftpack_object(_cache, cached_object, key, planning_time)
+
+    return output_array
+
+def _interfaces_fftpack_irfft(x, n, int axis, planner_effort, threads,
+        auto_align_input, auto_contiguous, out=None):
+    '''_interfaces_fftpack_irfft(x, n, axis, planner_effort, threads,
+    auto_align_input, auto_contiguous, out=None)
+
+    The implementation of :func:`pyfftw.interfaces.scipy_fftpack.irfft`,
+    for a real ``x``.
+    '''
+    global _interfaces_cache, _interfaces_utils
+
+    cdef FFTW FFTW_object
+    cdef np.ndarray output_array
+    cdef object key = None
+    cdef Py_ssize_t stride
+
+    if _interfaces_cache is None:
+        from pyfftw.interfaces import cache as _interfaces_cache
+        from pyfftw.interfaces import _utils as _interfaces_utils
+
+    if axis < 0:
+        axis += x.ndim
+
+    if axis < 0 or axis >= x.ndim:
+        raise IndexError('Invalid axes: '
+                'The axis is not valid for the input array.')
+
+    if x.dtype not in _fftpack_real_dtypes:
+        x = np.asarray(x, dtype='float64')
+
+    if n is None:
+        n = x.shape[axis]
+
+    if n < 1:
+        raise ValueError('Invalid number of data points (%d) '
+                'specified.' % n)
+
+    # The transform is from a C contiguous complex array of this shape,
+    # which belongs to the object.
+    spectrum_dtype = _fftpack_real_dtypes[x.dtype]
+    spectrum_shape = list(x.shape)
+    spectrum_shape[axis] = n//2 + 1
+    spectrum_shape = tuple(spectrum_shape)
+
+    _cache = _interfaces_cache._fftw_cache
+
+    if _cache is not None:
+        spectrum_strides = []
+        stride = spectrum_dtype.itemsize
+        for length in reversed(spectrum_shape):
+            spectrum_strides.insert(0, stride)
+            stride *= length
+
+        # The internal array is overwritten on every call anyway
+        key = ('irfft_fftpack', spectrum_shape, tuple(spectrum_strides),
+                spectrum_dtype, n, axis, True, planner_effort, threads,
+                auto_align_input, auto_contiguous, False, False)
+
+    cached_object = None
+    planning_time = None
+
+    if key is not None:
+        try:
+            cached_object = _cache.checkout(key)
+        except KeyError:
+            pass
+
+    if cached_object is None:
+        cached_object, planning_time = _plan_fftpack_object(
+                empty_aligned(spectrum_shape, spectrum_dtype), n, axis,
+                True, planner_effort, threads, auto_align_input,
+                auto_contiguous, 'irfft_fftpack')
+
+    FFTW_object = cached_object
+
+    try:
+        _fftpack_repack(FFTW_object._input_array, x, axis, n, True,
+                FFTW_object._precision)
+
+        output_array = _fftpack_output(out, FFTW_object._output_shape,
+                FFTW_object._output_dtype)
+
+        # The internal output array might be one that has been returned
+        # before, so a new one is used if output_array cannot be.
+        if not FFTW_object._execute_arrays(FFTW_object._input_array,
+                output_array, True):
+            aligned_output = _empty_output(FFTW_object._output_shape,
+                    FFTW_object._output_dtype,
+                    FFTW_object._output_array_alignment)
+            FFTW_object._execute_arrays(FFTW_object._input_array,
+                    aligned_output, True)
+            output_array[...] = aligned_output
+
+    finally:
+        _return_fftpack_object(_cache, cached_object, key, planning_time)
+
+    return output_array
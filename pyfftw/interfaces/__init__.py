@@ -12,7 +12,9 @@ intention is to satisfy two clear use cases:
 2. A library that can be dropped into code that is already written to
    use a supported FFT library, with no significant change to the existing
    code. The power of python allows this to be done at runtime to a third
-   party library, without changing any of that library's code.
+   party library, without changing any of that library's code. For
+   :mod:`numpy.fft`, this is done by :func:`patched` (or by
+   :func:`pyfftw.interfaces.numpy_fft.install`).
 
 The :mod:`pyfftw.interfaces` implementation is designed to sacrifice a small
 amount of the flexibility compared to accessing the :class:`pyfftw.FFTW`
@@ -80,8 +82,12 @@ Implemented Functions
 ---------------------
 
 The implemented functions are listed below. :mod:`numpy.fft` is implemented
-by :mod:`pyfftw.interfaces.numpy_fft` and :mod:`scipy.fftpack` by
-:mod:`pyfftw.interfaces.scipy_fftpack`. All the implemented functions are
+by :mod:`pyfftw.interfaces.numpy_fft`, :mod:`scipy.fft` by
+:mod:`pyfftw.interfaces.scipy_fft` and :mod:`scipy.fftpack` by
+:mod:`pyfftw.interfaces.scipy_fftpack`. The FFT based convolution functions
+of :mod:`scipy.signal` are implemented by
+:mod:`pyfftw.interfaces.scipy_signal`, and :mod:`dask.array.fft` by
+:mod:`pyfftw.interfaces.dask_fft`. All the implemented functions are
 extended by the use of additional arguments, which are 
 :ref:`documented below<interfaces_additional_args>`.
 
@@ -116,6 +122,36 @@ being taken along that axes as many times as the axis occurs.
 * :func:`pyfftw.interfaces.numpy_fft.hfft`
 * :func:`pyfftw.interfaces.numpy_fft.ihfft`
 
+:mod:`~pyfftw.interfaces.scipy_fft`
+"""""""""""""""""""""""""""""""""""
+
+* :func:`pyfftw.interfaces.scipy_fft.fft`
+* :func:`pyfftw.interfaces.scipy_fft.ifft`
+* :func:`pyfftw.interfaces.scipy_fft.fft2`
+* :func:`pyfftw.interfaces.scipy_fft.ifft2`
+* :func:`pyfftw.interfaces.scipy_fft.fftn`
+* :func:`pyfftw.interfaces.scipy_fft.ifftn`
+* :func:`pyfftw.interfaces.scipy_fft.rfft`
+* :func:`pyfftw.interfaces.scipy_fft.irfft`
+* :func:`pyfftw.interfaces.scipy_fft.rfft2`
+* :func:`pyfftw.interfaces.scipy_fft.irfft2`
+* :func:`pyfftw.interfaces.scipy_fft.rfftn`
+* :func:`pyfftw.interfaces.scipy_fft.irfftn`
+* :func:`pyfftw.interfaces.scipy_fft.hfft`
+* :func:`pyfftw.interfaces.scipy_fft.ihfft`
+* :func:`pyfftw.interfaces.scipy_fft.hfft2`
+* :func:`pyfftw.interfaces.scipy_fft.ihfft2`
+* :func:`pyfftw.interfaces.scipy_fft.hfftn`
+* :func:`pyfftw.interfaces.scipy_fft.ihfftn`
+* :func:`pyfftw.interfaces.scipy_fft.dct`
+* :func:`pyfftw.interfaces.scipy_fft.idct`
+* :func:`pyfftw.interfaces.scipy_fft.dst`
+* :func:`pyfftw.interfaces.scipy_fft.idst`
+* :func:`pyfftw.interfaces.scipy_fft.dctn`
+* :func:`pyfftw.interfaces.scipy_fft.idctn`
+* :func:`pyfftw.interfaces.scipy_fft.dstn`
+* :func:`pyfftw.interfaces.scipy_fft.idstn`
+
 :mod:`~pyfftw.interfaces.scipy_fftpack`
 """""""""""""""""""""""""""""""""""""""
 
@@ -128,6 +164,31 @@ being taken along that axes as many times as the axis occurs.
 * :func:`pyfftw.interfaces.scipy_fftpack.rfft`
 * :func:`pyfftw.interfaces.scipy_fftpack.irfft`
 
+:mod:`~pyfftw.interfaces.dask_fft`
+""""""""""""""""""""""""""""""""""
+
+* :func:`pyfftw.interfaces.dask_fft.fft`
+* :func:`pyfftw.interfaces.dask_fft.ifft`
+* :func:`pyfftw.interfaces.dask_fft.fft2`
+* :func:`pyfftw.interfaces.dask_fft.ifft2`
+* :func:`pyfftw.interfaces.dask_fft.fftn`
+* :func:`pyfftw.interfaces.dask_fft.ifftn`
+* :func:`pyfftw.interfaces.dask_fft.rfft`
+* :func:`pyfftw.interfaces.dask_fft.irfft`
+* :func:`pyfftw.interfaces.dask_fft.rfft2`
+* :func:`pyfftw.interfaces.dask_fft.irfft2`
+* :func:`pyfftw.interfaces.dask_fft.rfftn`
+* :func:`pyfftw.interfaces.dask_fft.irfftn`
+* :func:`pyfftw.interfaces.dask_fft.hfft`
+* :func:`pyfftw.interfaces.dask_fft.ihfft`
+
+:mod:`~pyfftw.interfaces.scipy_signal`
+""""""""""""""""""""""""""""""""""""""
+
+* :func:`pyfftw.interfaces.scipy_signal.fftconvolve`
+* :func:`pyfftw.interfaces.scipy_signal.oaconvolve`
+* :func:`pyfftw.interfaces.scipy_signal.correlate`
+
 
 .. _interfaces_additional_args:
 
@@ -148,10 +209,14 @@ different defaults.
   Unlike with :mod:`pyfftw.builders`, this argument is included with
   *every* function in this package.
 
-  In :mod:`~pyfftw.interfaces.scipy_fftpack`, this argument is replaced
+  In :mod:`~pyfftw.interfaces.scipy_fftpack` and
+  :mod:`~pyfftw.interfaces.scipy_fft`, this argument is replaced
   by ``overwrite_x``, to which it is equivalent (albeit at the same 
   position).
 
+  It is not offered by :mod:`~pyfftw.interfaces.dask_fft`, as the chunks
+  of a dask array may be used by other tasks.
+
   The default is ``False`` to be consistent with :mod:`numpy.fft`.
 
 * ``planner_effort``: A string dictating how much effort is spent 
@@ -176,7 +241,16 @@ different defaults.
   potentially results in a slightly suboptimal plan being used, but with
   a substantially quicker first-time planner step.
 
-* ``threads``: The number of threads used to perform the FFT.
+  With ``'auto'``, the planner effort is looked up in the table written
+  by :func:`pyfftw.autotune`, as with :mod:`pyfftw.builders`.
+
+* ``threads``: The number of threads used to perform the FFT. With
+  ``'auto'``, it is looked up in the table written by
+  :func:`pyfftw.autotune`, as with :mod:`pyfftw.builders`.
+
+  In :mod:`~pyfftw.interfaces.scipy_fft`, this argument is replaced by
+  the ``workers`` argument of :mod:`scipy.fft`, which also takes
+  ``'auto'``.
 
   The default is ``1``.
 
@@ -207,16 +281,63 @@ different defaults.
   a contiguous array than it is to try to take the transform of a 
   non-contiguous array. This is particularly true in conjunction with
   the ``auto_align_input`` argument which is used to make sure that the 
-  transform is taken of an aligned array.
+  transform is taken of an aligned array. As with
+  :mod:`pyfftw.builders`, an array whose axis with the smallest stride
+  is the last one (such as a strided slice or a channel of interleaved
+  data) is not copied, as its transform is likely to be as fast.
 
   The default is ``True``.
 
+* ``out``: An array into which the result is written, and which is then
+  returned. It should have the shape and dtype of the result, else a
+  ``ValueError`` is raised. If it also has the strides and alignment of
+  the output array of the intermediate :class:`pyfftw.FFTW` object, the
+  result is written straight into it, so a loop that reuses the same
+  ``out`` array does not allocate anything once the object is cached (see
+  :mod:`pyfftw.interfaces.cache`). Otherwise, the result is computed into
+  a new array and copied into ``out``. This is not offered by
+  :mod:`~pyfftw.interfaces.scipy_fft` or
+  :mod:`~pyfftw.interfaces.dask_fft`.
+
+  The default is ``None``, in which case a new array is returned.
+
+* ``shift_input`` and ``shift_output``: Shift the input as
+  :func:`numpy.fft.ifftshift` would, and the output as
+  :func:`numpy.fft.fftshift` would, over the axes of the transform. So,
+  for example, ``fft2(a, shift_input=True, shift_output=True)`` is
+  ``fftshift(fft2(ifftshift(a)))``, but without the intermediate arrays.
+  The input is shifted as it is copied into the intermediate 
+  :class:`pyfftw.FFTW` object, and the output is shifted in place. As
+  with :mod:`pyfftw.builders`, the half spectrum of the real transforms
+  is not shifted along the last axis of the transform.
+
+  These are only offered by the functions in
+  :mod:`~pyfftw.interfaces.numpy_fft` other than ``hfft`` and ``ihfft``.
+  The defaults are ``False``.
+
+* ``pad``: Round the lengths of the transform up to ones that FFTW is
+  fast with, as with :mod:`pyfftw.builders`. With ``'fast'``, they are
+  rounded up with :func:`pyfftw.next_fast_len`. With ``'bucket'``, they
+  are rounded up to the next of a fixed ladder of lengths with 4 per
+  octave. The input is zero padded to the rounded lengths before it is
+  transformed, so the :mod:`cache <pyfftw.interfaces.cache>` holds one
+  object per rounded shape, however many different shapes of array are
+  transformed.
+
+  This is only offered by the functions in
+  :mod:`~pyfftw.interfaces.numpy_fft` other than ``hfft`` and ``ihfft``.
+  The default is ``None``, which leaves the lengths as they are.
+
 '''
 
 from . import (
         numpy_fft,
+        scipy_fft,
+        scipy_signal,
         cache,)
 
+from .numpy_fft import patched
+
 try:
     import scipy.fftpack
 except ImportError:
@@ -225,3 +346,10 @@ else:
     del scipy
     from . import scipy_fftpack
 
+try:
+    import dask.array.fft
+except ImportError:
+    pass
+else:
+    del dask
+    from . import dask_fft
@@ -40,92 +40,143 @@ Utility functions for the interfaces routines
 
 import pyfftw.builders as builders
 import pyfftw
-import numpy
+import time
 from . import cache
 
-def _Xfftn(a, s, axes, overwrite_input, planner_effort,
-        threads, auto_align_input, auto_contiguous, 
-        calling_func, normalise_idft=True):
+from ..pyfftw import (
+        _interfaces_Xfftn as _Xfftn,
+        _interfaces_check_out as _check_out,
+        _interfaces_conjugate_output as _conjugate_output)
 
-    reload_after_transform = False
+_fftpack_builders = {'rfft_fftpack': 'rfft', 'irfft_fftpack': 'irfft'}
 
-    a = numpy.asanyarray(a)
+# The cosine and sine transforms are planned by dctn and dstn, with the
+# type in the name of the calling function (and so in the cache key).
+_r2r_builders = dict(('%s_%d' % (func, r2r_type), (func, r2r_type))
+        for func in ('dctn', 'dstn') for r2r_type in (1, 2, 3, 4))
 
-    try:
-        s = tuple(s)
-    except TypeError:
-        pass
+def _pad_input(a, s, axes, calling_func, pad, shift_input=False):
+    '''Return the array and the lengths with which the transform of ``a``
+    with lengths ``s`` is taken, once its lengths are rounded up as set by
+    ``pad`` (as with :mod:`pyfftw.builders`).
 
-    try:
-        axes = tuple(axes)
-    except TypeError:
-        pass
+    The array is ``a`` zero padded (or cropped) to the input shape of the
+    transform, so it is planned and cached for the padded shape whatever
+    the shape of ``a``. If ``shift_input`` is ``True``, ``a`` is returned
+    as it is, as it is shifted before it is padded.
+    '''
+    builder = _fftpack_builders.get(calling_func, calling_func)
+    inverse = builder.startswith('i')
+    real = 'rfft' in builder
+
+    one_dimensional = builder in ('fft', 'ifft', 'rfft', 'irfft')
+
+    if one_dimensional:
+        s, axes = builders._utils._precook_1d_args(a, s, axes)
+
+    s, axes = builders._utils._cook_nd_args(a, s, axes, inverse and real)
+    s = builders._utils._pad_lengths(s, pad, real)
+
+    if one_dimensional:
+        s = s[0]
+
+    if shift_input:
+        return a, s
+
+    input_shape = builders._utils._compute_array_shapes(
+            a, s if not one_dimensional else [s], axes, inverse, real)[0]
+
+    if a.shape == input_shape:
+        return a, s
+
+    input_slicer, padded_slicer = builders._utils._setup_input_slicers(
+            a.shape, input_shape)
+
+    padded = pyfftw.zeros_aligned(input_shape, a.dtype)
+    padded[tuple(padded_slicer)] = a[tuple(input_slicer)]
+
+    return padded, s
+
+def _plan_fftw_object(a, s, axes, overwrite_input, planner_effort,
+        threads, auto_align_input, auto_contiguous, calling_func,
+        shift_input=False, shift_output=False, planning_timelimit=None):
+    '''Return the :class:`pyfftw.FFTW` object for the transform described
+    by the arguments, as planned by :mod:`pyfftw.builders`.
+    '''
+    # The scipy.fftpack real transforms use their own objects for the
+    # real transforms, as they use the internal arrays.
+    calling_func = _fftpack_builders.get(calling_func, calling_func)
 
     if calling_func in ('irfft2', 'irfftn'):
         # overwrite_input is not an argument to irfft2 or irfftn
         args = (a, s, axes, planner_effort, threads, 
                 auto_align_input, auto_contiguous)
-
-        if not overwrite_input:
-            # Only irfft2 and irfftn have overwriting the input
-            # as the default (and so require the input array to 
-            # be reloaded).
-            reload_after_transform = True
     else:
         args = (a, s, axes, overwrite_input, planner_effort, threads, 
                 auto_align_input, auto_contiguous)
-    
-    if cache.is_enabled():
-        key = (calling_func, a.shape, a.strides, a.dtype, s.__hash__(), 
-                axes.__hash__(), args[3:])
-
-        try:
-            if key in cache._fftw_cache:
-                FFTW_object = cache._fftw_cache.lookup(key)
-            else:
-                FFTW_object = None
-
-        except KeyError:
-            # This occurs if the object has fallen out of the cache between
-            # the check and the lookup
-            FFTW_object = None
-
-    if not cache.is_enabled() or FFTW_object is None:
-
-        # If we're going to create a new FFTW object, we need to copy
-        # the input array to preserve it, otherwise we can't actually
-        # take the transform of the input array! (in general, we have
-        # to assume that the input array will be destroyed during 
-        # planning).
-        a_copy = a.copy()
 
-        FFTW_object = getattr(builders, calling_func)(*args)
-    
-        # Only copy if the input array is what was actually used
-        # (otherwise it shouldn't be overwritten)
-        if FFTW_object.input_array is a:
-            a[:] = a_copy
+    if calling_func in _r2r_builders:
+        calling_func, r2r_type = _r2r_builders[calling_func]
+        return getattr(builders, calling_func)(*args, type=r2r_type,
+                planning_timelimit=planning_timelimit)
+
+    if shift_input or shift_output:
+        return getattr(builders, calling_func)(*args,
+                shift_input=shift_input, shift_output=shift_output,
+                planning_timelimit=planning_timelimit)
+
+    return getattr(builders, calling_func)(*args,
+            planning_timelimit=planning_timelimit)
+
+def _Xfftn_plan(a, s, axes, overwrite_input, planner_effort,
+        threads, auto_align_input, auto_contiguous,
+        calling_func, normalise_idft, out, key, conjugate=False,
+        shift_input=False, shift_output=False, planning_timelimit=None):
+    '''The slow path of :func:`_Xfftn`, called when there is no usable
+    object in the cache. ``key`` is the cache key for the transform, or
+    ``None`` if the cache is disabled. ``conjugate``, ``shift_input``,
+    ``shift_output`` and ``planning_timelimit`` are as for :func:`_Xfftn`.
+    '''
+    # Only irfft2 and irfftn have overwriting the input as the default
+    # (and so require the input array to be reloaded).
+    reload_after_transform = (
+            calling_func in ('irfft2', 'irfftn') and not overwrite_input)
 
-        if cache.is_enabled():
-            cache._fftw_cache.insert(FFTW_object, key)
-        
-        output_array = FFTW_object(normalise_idft=normalise_idft)
+    if reload_after_transform:
+        a_copy = a.copy()
+
+    # The builders leave the input array intact when planning.
+    planning_start = time.time()
+    FFTW_object = _plan_fftw_object(a, s, axes, overwrite_input,
+            planner_effort, threads, auto_align_input, auto_contiguous,
+            calling_func, shift_input, shift_output, planning_timelimit)
+    planning_time = time.time() - planning_start
 
+    if out is not None and _check_out(FFTW_object, out):
+        output_array = FFTW_object(output_array=out,
+                normalise_idft=normalise_idft and not conjugate)
     else:
-        if reload_after_transform:
-            a_copy = a.copy()
+        output_array = FFTW_object(
+                normalise_idft=normalise_idft and not conjugate)
+
+        if out is not None:
+            out[...] = output_array
+            output_array = out
+
+    if conjugate:
+        if normalise_idft:
+            scaling = 1.0/FFTW_object.N
+        else:
+            scaling = 1.0
 
-        orig_output_array = FFTW_object.output_array
-        output_shape = orig_output_array.shape
-        output_dtype = orig_output_array.dtype
-        output_alignment = FFTW_object.output_alignment
+        _conjugate_output(FFTW_object, output_array, scaling)
 
-        output_array = pyfftw.empty_aligned(
-            output_shape, output_dtype, n=output_alignment)
+    # The object is only put in the cache once it has been used, so that
+    # no other thread can get it in the meantime.
+    _fftw_cache = cache._fftw_cache
+    if key is not None and _fftw_cache is not None:
+        _fftw_cache.insert(FFTW_object, key, planning_time)
 
-        FFTW_object(input_array=a, output_array=output_array, 
-                normalise_idft=normalise_idft)
-    
     if reload_after_transform:
         a[:] = a_copy
 
@@ -50,22 +50,47 @@ if the properties of the array (shape, strides, dtype) change in any way, then
 the cache lookup will fail.
 
 The cache temporarily stores a copy of any interim :class:`pyfftw.FFTW`
-objects that are created. If they are not used for some period of time,
+objects that are created. An object is only ever used by one call at a
+time: a call takes the object out of the cache for the duration of the
+transform and puts it back afterwards. If another thread performs an
+equivalent transform in the meantime, it creates a new object (which,
+with the wisdom from the first, is quick), and both are then kept. This
+means that the interfaces can safely be used from many threads at once. If they are not used for some period of time,
 which can be set with :func:`pyfftw.interfaces.cache.set_keepalive_time`,
 then they are removed from the cache (liberating any associated memory).
-The default keepalive time is 0.1 seconds.
+The default keepalive time is 0.1 seconds. Objects that took a long time
+to plan are kept for longer; the time spent planning an object, multiplied
+by 10, is added to its keepalive time.
+
+The cache is also bounded, both in the number of objects it holds and in
+the total size of the arrays of those objects. These bounds can be set with
+:func:`pyfftw.interfaces.cache.set_max_entries` and
+:func:`pyfftw.interfaces.cache.set_max_bytes`. When a bound is exceeded,
+objects are evicted in an order that favours keeping those that are both
+recently used and expensive to plan.
 
 Enable the cache by calling :func:`pyfftw.interfaces.cache.enable`. 
 Disable it by calling :func:`pyfftw.interfaces.cache.disable`. By default,
 the cache is disabled.
 
+The cache records each transform that it has seen, along with how often
+an object for it was found in the cache and how long planning it took.
+:func:`pyfftw.interfaces.cache.dump` writes these records to a file,
+together with the current wisdom, and
+:func:`pyfftw.interfaces.cache.warm` reads such a file back and plans the
+recorded transforms into the cache. Calling ``dump`` before a process exits
+and ``warm`` when the next one starts means the next process does not
+spend time planning those transforms when they are first used.
+
 Note that even with the cache enabled, there is a fixed overhead associated 
 with lookups. This means that for small transforms, the overhead may exceed
 the transform. At this point, it's worth looking at using :class:`pyfftw.FFTW`
 directly.
 
-When the cache is enabled, the module spawns a new thread to keep track
-of the objects. If :mod:`threading` is not available, then the cache
+When the cache is enabled, the module spawns a new thread to remove
+objects once their keepalive time has expired. The thread sleeps until the
+next object is due to expire, and sleeps indefinitely when the cache is
+empty. If :mod:`threading` is not available, then the cache
 is not available and trying to use it will raise an ImportError exception.
 
 The actual implementation of the cache is liable to change, but the 
@@ -79,13 +104,37 @@ except ImportError as e:
     _threading_import_error = e
     _threading == None
 
+import base64
+import json
 import time
 import weakref
 
-__all__ = ['enable', 'disable', 'set_keepalive_time']
+import numpy
+import pyfftw
+
+__all__ = ['enable', 'disable', 'is_enabled', 'set_keepalive_time',
+        'set_max_entries', 'set_max_bytes', 'dump', 'warm']
 
 _fftw_cache = None
 
+# The default bounds on the cache.
+_default_max_entries = 64
+_default_max_bytes = 2**30
+
+# The number of seconds of extra keepalive time per second of planning.
+_cost_keepalive_factor = 10.0
+
+# The most transforms for which the cache keeps records.
+_max_records = 4096
+
+# The names of the parts of a cache key, in order, as written by dump.
+_key_fields = ('func', 'shape', 'strides', 'dtype', 's', 'axes',
+        'overwrite_input', 'planner_effort', 'threads', 'auto_align_input',
+        'auto_contiguous', 'shift_input', 'shift_output')
+
+# The values of the fields that might be missing from older dumps.
+_key_field_defaults = {'shift_input': False, 'shift_output': False}
+
 class CacheError(Exception):
     pass
 
@@ -123,9 +172,9 @@ def set_keepalive_time(keepalive_time):
     this function. If the object is not used for the that time, it is 
     removed from the cache. Using the object zeros the timer.
 
-    The time is not precise, and sets a minimum time to be alive. In 
-    practice, it may be up to twice as long before the object is
-    deleted from the cache (due to implementational details).
+    Objects that were expensive to plan are kept alive for longer than
+    this. Objects may also be removed sooner if the cache exceeds its
+    bounds.
     '''
     global _fftw_cache
     
@@ -134,128 +183,543 @@ def set_keepalive_time(keepalive_time):
     else:
         _fftw_cache.set_keepalive_time(keepalive_time)
 
+def set_max_entries(max_entries):
+    '''Set the maximum number of :mod:`pyfftw.FFTW` objects that the
+    cache holds. ``None`` means there is no limit.
+
+    The default is 64.
+    '''
+    global _fftw_cache
+
+    if _fftw_cache is None:
+        raise CacheError('Cache is not currently enabled')
+    else:
+        _fftw_cache.set_max_entries(max_entries)
+
+def set_max_bytes(max_bytes):
+    '''Set the maximum total size in bytes of the arrays of the
+    :mod:`pyfftw.FFTW` objects that the cache holds. ``None`` means there
+    is no limit.
+
+    The default is 1 GiB.
+    '''
+    global _fftw_cache
+
+    if _fftw_cache is None:
+        raise CacheError('Cache is not currently enabled')
+    else:
+        _fftw_cache.set_max_bytes(max_bytes)
+
+def dump(path):
+    '''Write a record of the transforms that the cache has seen to the
+    file at ``path``, along with the current wisdom (see
+    :func:`pyfftw.export_wisdom`).
+
+    Each transform is recorded with the number of times an object for it
+    was found in the cache and the time in seconds it took to plan. The
+    file is JSON, and can be read back with
+    :func:`~pyfftw.interfaces.cache.warm`.
+    '''
+    global _fftw_cache
+
+    if _fftw_cache is None:
+        raise CacheError('Cache is not currently enabled')
+
+    transforms = []
+    for key, hits, planning_time in _fftw_cache.records():
+        record = _key_to_record(key)
+
+        if record is not None:
+            record['hits'] = hits
+            record['planning_time'] = planning_time
+            transforms.append(record)
+
+    # The most used first
+    transforms.sort(key=lambda record: -record['hits'])
+
+    wisdom = [base64.b64encode(each_wisdom).decode('ascii')
+            for each_wisdom in pyfftw.export_wisdom()]
+
+    with open(path, 'w') as f:
+        json.dump({'wisdom': wisdom, 'transforms': transforms}, f,
+                indent=1, sort_keys=True)
+
+def warm(path):
+    '''Import the wisdom in the file at ``path``, which should have been
+    written by :func:`~pyfftw.interfaces.cache.dump`, and plan each of the
+    transforms recorded in it into the cache. A transform that fails to
+    plan is skipped. Returns the number of transforms that were planned.
+
+    Each object is inserted with the planning time that was recorded for
+    it, so it is kept alive as long as it would have been had it been
+    planned afresh.
+    '''
+    global _fftw_cache
+
+    if _fftw_cache is None:
+        raise CacheError('Cache is not currently enabled')
+
+    from ._utils import _plan_fftw_object
+
+    with open(path, 'r') as f:
+        contents = json.load(f)
+
+    pyfftw.import_wisdom(tuple(base64.b64decode(each_wisdom)
+        for each_wisdom in contents['wisdom']))
+
+    n_planned = 0
+    for record in contents.get('transforms', []):
+        try:
+            key = _record_to_key(record)
+            a = _empty_strided(key[1], key[2], key[3])
+
+            planning_start = time.time()
+            FFTW_object = _plan_fftw_object(a, *key[4:11] + (key[0],) +
+                    key[11:])
+            planning_time = time.time() - planning_start
+
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+
+        _fftw_cache.insert(FFTW_object, key,
+                max(planning_time, record['planning_time']))
+        n_planned += 1
+
+    return n_planned
+
+def _to_json(value):
+    '''Convert tuples in ``value`` to lists and numpy integers to ints,
+    raising a ``TypeError`` for anything else that JSON cannot represent.
+    '''
+    if isinstance(value, (tuple, list)):
+        return [_to_json(each_value) for each_value in value]
+    elif isinstance(value, numpy.integer):
+        return int(value)
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    else:
+        raise TypeError('Invalid value: %r cannot be recorded' % (value,))
+
+def _from_json(value):
+    '''Reverse :func:`_to_json`, converting lists back to tuples.
+    '''
+    if isinstance(value, list):
+        return tuple(_from_json(each_value) for each_value in value)
+    else:
+        return value
+
+def _key_to_record(key):
+    '''Return a dictionary describing the cache key ``key``, or ``None``
+    if it is not a key that the interfaces create or it cannot be
+    represented.
+    '''
+    if not (isinstance(key, tuple) and len(key) == len(_key_fields)):
+        return None
+
+    try:
+        key = list(key)
+        key[3] = numpy.dtype(key[3]).str
+        return dict(zip(_key_fields, _to_json(key)))
+    except TypeError:
+        return None
+
+def _record_to_key(record):
+    '''Return the cache key described by ``record``, the reverse of
+    :func:`_key_to_record`.
+    '''
+    key = [_from_json(record[field] if field in record
+        else _key_field_defaults[field]) for field in _key_fields]
+    key[3] = numpy.dtype(key[3])
+
+    return tuple(key)
+
+def _empty_strided(shape, strides, dtype):
+    '''Return an uninitialised array with the given shape, strides and
+    dtype, aligned as :func:`pyfftw.empty_aligned` would be, so that a
+    transform of it is planned as for the arrays the cache key came from.
+    '''
+    lowest_offset = 0
+    highest_offset = 0
+    for length, stride in zip(shape, strides):
+        if stride < 0:
+            lowest_offset += (length - 1) * stride
+        else:
+            highest_offset += (length - 1) * stride
+
+    buffer = pyfftw.empty_aligned(
+            highest_offset - lowest_offset + dtype.itemsize, dtype='int8')
+
+    return numpy.ndarray(shape, dtype, buffer=buffer,
+            offset=-lowest_offset, strides=strides)
+
+def _object_nbytes(obj):
+    '''Return the number of bytes in the arrays of ``obj``.
+    '''
+    try:
+        input_array = obj.input_array
+        output_array = obj.output_array
+    except AttributeError:
+        return 0
+
+    if input_array is output_array:
+        return input_array.nbytes
+    else:
+        return input_array.nbytes + output_array.nbytes
+
+class _CacheEntry(object):
+    '''The objects in the cache for a key that are not currently checked
+    out, as ``(object, nbytes)`` pairs, along with the cost of creating an
+    object and what is needed to decide when to evict them. ``record`` is
+    the record of the key, if it has one, and ``objs`` is set to ``None``
+    once the entry is removed from the cache.
+    '''
+    __slots__ = ('objs', 'cost', 'nbytes', 'priority', 'last_used',
+            'record')
+
+    def __init__(self, cost):
+        self.objs = []
+        self.cost = cost
+        self.nbytes = 0
+        self.record = None
+
 class _Cache(object):
+    '''The cache of objects.
+
+    Eviction under the bounds is in the manner of the GreedyDual
+    algorithm: each entry is given a priority of its cost plus an
+    inflation value that is raised to the priority of each evicted entry,
+    and using an entry resets its priority. The entry with the lowest
+    priority is evicted first, so cheap entries age out before expensive
+    ones, but an expensive entry that is not used is eventually evicted.
+
+    Each key maps to a pool of equivalent objects. :meth:`checkout` takes
+    an object out of the pool, so that no other caller can get it, and
+    :meth:`release` puts it back in.
+    '''
 
     @property
     def keepalive_time(self):
         return self._keepalive_time
 
-    def __init__(self, keepalive_time=0.1):
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @property
+    def nbytes(self):
+        '''The total number of bytes in the arrays of the cached objects.
+        '''
+        return self._nbytes
+
+    @property
+    def n_objects(self):
+        '''The number of objects in the cache, not counting those that
+        are checked out.
+        '''
+        return self._n_objects
+
+    def __init__(self, keepalive_time=0.1,
+            max_entries=_default_max_entries, max_bytes=_default_max_bytes):
 
         self._cache_dict = {}
-        self.set_keepalive_time(keepalive_time)
+        self._nbytes = 0
+        self._n_objects = 0
 
-        # A set of objects to be kept alive during the next cull
-        self._keepalive_set = set()
+        # [hits, planning time] for each key seen, surviving eviction
+        self._records = {}
 
-        self._cull_lock = _threading.Lock()
-        self._keepalive_set_lock = _threading.Lock()
+        # The entry and nbytes of each checked out object, by id, for its
+        # release
+        self._leases = {}
+        self._inflation = 0.0
 
-        self.initialised = _threading.Event()
+        # Protects everything above, and is waited on by the cull thread.
+        # The lookups take the lock itself, which is quicker to acquire
+        # than the condition.
+        self._lock = _threading.RLock()
+        self._condition = _threading.Condition(self._lock)
 
-        self._parent_thread = _threading.current_thread()
+        self.set_keepalive_time(keepalive_time)
+        self._max_entries = None
+        self._max_bytes = None
+        self.set_max_entries(max_entries)
+        self.set_max_bytes(max_bytes)
 
-        self._initialised = _threading.Event()
-        self._initialised.clear() # Explicitly clear it for clarity
-        
+        # The thread only holds a weak reference to the cache, so that the
+        # cache can be deleted, which then stops the thread.
         self._thread_object = _threading.Thread(target=_Cache._run,
-                args=(weakref.proxy(self), ))
+                args=(weakref.ref(self), self._condition))
 
         self._thread_object.daemon = True
         self._thread_object.start()
 
-        while not self._initialised.is_set():
-            # This loop is necessary to stop the main thread doing 
-            # anything until the exception handler in _run can deal with 
-            # the object being deleted.
-            pass
-
     def __del__(self):
-        # Wait until the thread object has quit before
-        # exiting (which it will because a reference error will
-        # be raised).
+        # Wake the thread up, which will then find that the cache has
+        # gone and quit.
         try:
-            self._thread_object.join()
-        except TypeError:
-            # Not sure what's going on here, but IPython baulks on exit
+            with self._condition:
+                self._condition.notify()
+        except (AttributeError, TypeError):
+            # Either __init__ failed or we're in interpreter shutdown
             pass
 
     def __contains__(self, key):
         return key in self._cache_dict
 
-    def _run(self):
+    def __len__(self):
+        return len(self._cache_dict)
 
-        last_cull_time = time.time()
-
-        try:
-            self._initialised.set()
+    @staticmethod
+    def _run(cache_ref, condition):
 
+        with condition:
             while True:
-                if not self._parent_thread.is_alive():
+                cache = cache_ref()
+                if cache is None:
                     break
 
-                if time.time() - last_cull_time > self._keepalive_time:
-                    # Perform a cull
-                    last_cull_time = time.time()
+                timeout = cache._cull()
 
-                    with self._cull_lock:
-                        # Operate on a copy of the cache dict
-                        # so lookups continue.
-                        new_cache_dict = self._cache_dict.copy()
+                # Don't keep the cache alive while waiting
+                del cache
+                if cache_ref() is None:
+                    break
 
-                        with self._keepalive_set_lock:
-                            # Work out which should be culled
-                            cull_set = set(new_cache_dict).difference(
-                                    self._keepalive_set)
+                condition.wait(timeout)
 
-                            self._keepalive_set = set()
+    def _expiry_time(self, entry):
+        return (entry.last_used + self._keepalive_time +
+                entry.cost * _cost_keepalive_factor)
 
-                        for each_key in cull_set:
-                            del new_cache_dict[each_key]
+    def _cull(self):
+        '''Remove the entries whose keepalive time has expired, returning
+        the time until the next entry is due to expire, or ``None`` if the
+        cache is empty. Must be called with the lock held.
+        '''
+        now = time.time()
+        next_expiry = None
 
-                        # Necessarily atomic, so no problem with
-                        # the lookups continuing
-                        self._cache_dict = new_cache_dict
+        for key, entry in list(self._cache_dict.items()):
+            expiry = self._expiry_time(entry)
 
-                time.sleep(self._wakeup_time)
+            if expiry <= now:
+                self._remove(key)
+            elif next_expiry is None or expiry < next_expiry:
+                next_expiry = expiry
 
-        except ReferenceError:
-            pass
+        if next_expiry is None:
+            return None
+        else:
+            return next_expiry - now
+
+    def _remove(self, key):
+        entry = self._cache_dict.pop(key)
+        self._nbytes -= entry.nbytes
+        self._n_objects -= len(entry.objs)
+        entry.objs = None
+
+        return entry
+
+    def _enforce_bounds(self):
+        '''Evict entries in order of increasing priority until the cache
+        is within its bounds. Must be called with the lock held.
+        '''
+        while self._n_objects and (
+                (self._max_entries is not None and
+                    self._n_objects > self._max_entries) or
+                (self._max_bytes is not None and
+                    self._nbytes > self._max_bytes)):
+
+            # Ties go to the least recently used. Entries that have all
+            # their objects checked out have nothing to evict.
+            key = min((key for key in self._cache_dict
+                    if self._cache_dict[key].objs),
+                    key=lambda key: (self._cache_dict[key].priority,
+                        self._cache_dict[key].last_used))
+
+            self._inflation = self._remove(key).priority
 
     def set_keepalive_time(self, keepalive_time=0.1):
         '''Set the minimum time in seconds for which any object in the cache
         is kept alive.
+        '''
+        keepalive_time = float(keepalive_time)
 
-        The time is not precise, and sets a minimum time to be alive. In 
-        practice, it may be up to twice as long before the object is
-        deleted from the cache (due to implementational details).
+        with self._condition:
+            self._keepalive_time = keepalive_time
+            self._condition.notify()
+
+    def set_max_entries(self, max_entries):
+        '''Set the maximum number of objects in the cache, or ``None`` for
+        no limit.
         '''
-        self._keepalive_time = float(keepalive_time)
+        if max_entries is not None:
+            max_entries = int(max_entries)
 
-        if self._keepalive_time/2 > 0.1:
-            self._wakeup_time = 0.1
-        else:
-            self._wakeup_time = self._keepalive_time/2
+            if max_entries < 0:
+                raise ValueError('Invalid max_entries: '
+                        'The maximum number of entries cannot be negative.')
 
-    def _refresh(self, key):
-        '''Refresh the object referenced by key to stop it being culled
-        on the next round.
+        with self._condition:
+            self._max_entries = max_entries
+            self._enforce_bounds()
+
+    def set_max_bytes(self, max_bytes):
+        '''Set the maximum total size in bytes of the arrays of the objects
+        in the cache, or ``None`` for no limit.
         '''
-        with self._keepalive_set_lock:
-            self._keepalive_set.add(key)
+        if max_bytes is not None:
+            max_bytes = int(max_bytes)
+
+            if max_bytes < 0:
+                raise ValueError('Invalid max_bytes: '
+                        'The maximum number of bytes cannot be negative.')
 
-    def insert(self, obj, key):
+        with self._condition:
+            self._max_bytes = max_bytes
+            self._enforce_bounds()
+
+    def insert(self, obj, key, cost=0.0):
         '''Insert the passed object into the cache, referenced by key, 
-        a hashable.
+        a hashable. ``cost`` is the time in seconds it took to create the
+        object, and is recorded as the planning time for key.
+
+        If there are already objects for ``key``, ``obj`` is added to them
+        (unless it is one of them already).
+        '''
+        self._put(obj, key, float(cost), True)
+
+    def release(self, obj, key):
+        '''Put an object that was checked out with :meth:`checkout` back
+        into the cache.
+        '''
+        with self._lock:
+            entry, nbytes = self._leases.pop(id(obj), (None, 0))
+
+            # The usual case, of an entry that is still in the cache, only
+            # needs the object put back in its pool. The entry was refreshed
+            # at checkout, and no object is added that could break the
+            # bounds or a key that could expire before the thread wakes.
+            if entry is not None and entry.objs is not None:
+                entry.objs.append((obj, nbytes))
+                entry.nbytes += nbytes
+                self._nbytes += nbytes
+                self._n_objects += 1
+                return
+
+        self._put(obj, key, 0.0, False)
+
+    def _put(self, obj, key, cost, record):
+        nbytes = _object_nbytes(obj)
+
+        with self._condition:
+            entry = self._cache_dict.get(key)
+
+            if entry is None:
+                entry = _CacheEntry(cost)
+                self._cache_dict[key] = entry
+            else:
+                entry.cost = max(entry.cost, cost)
+
+            if record:
+                self._record(key, 0, cost)
+
+            entry.record = self._records.get(key)
+
+            if not any(each_obj is obj for each_obj, _ in entry.objs):
+                entry.objs.append((obj, nbytes))
+                entry.nbytes += nbytes
+                self._nbytes += nbytes
+                self._n_objects += 1
+
+            entry.priority = self._inflation + entry.cost
+            entry.last_used = time.time()
+
+            self._enforce_bounds()
+
+            # The new entry might expire before the thread next wakes
+            self._condition.notify()
+
+    def _lookup_entry(self, key):
+        '''Return the entry for key, refreshing it, or raise a
+        ``KeyError`` if there is no object in it. Must be called with the
+        lock held.
         '''
-        with self._cull_lock:
-            self._cache_dict[key] = obj
-            self._refresh(key)
+        entry = self._cache_dict[key]
+
+        now = time.time()
+
+        if self._expiry_time(entry) <= now:
+            self._remove(key)
+            raise KeyError(key)
+
+        if not entry.objs:
+            raise KeyError(key)
+
+        entry.last_used = now
+        entry.priority = self._inflation + entry.cost
+
+        if entry.record is not None:
+            entry.record[0] += 1
+
+        return entry
+
+    def _record(self, key, hits, planning_time):
+        '''Add ``hits`` to the hits recorded for key and, if it is not
+        ``None``, set its recorded planning time. Must be called with the
+        lock held.
+        '''
+        record = self._records.get(key)
+
+        if record is None:
+            # Only keys that have been planned are recorded
+            if planning_time is None or len(self._records) >= _max_records:
+                return
+
+            record = [0, 0.0]
+            self._records[key] = record
+
+        record[0] += hits
+
+        if planning_time is not None:
+            record[1] = planning_time
+
+    def records(self):
+        '''Return a list of ``(key, hits, planning_time)`` tuples, one
+        for each key that an object has been inserted for, whether or not
+        the key is still in the cache.
+        '''
+        with self._condition:
+            return [(key, record[0], record[1])
+                    for key, record in self._records.items()]
 
     def lookup(self, key):
-        '''Lookup the object referenced by key and return it, refreshing
-        the cache at the same time.
+        '''Lookup an object referenced by key and return it, refreshing
+        the cache at the same time. The object is left in the cache, so
+        might be returned to other callers too.
+        '''
+        with self._lock:
+            return self._lookup_entry(key).objs[-1][0]
+
+    def checkout(self, key):
+        '''Lookup an object referenced by key, take it out of the cache
+        and return it, refreshing the cache at the same time. No other
+        caller gets the object until it is put back with :meth:`release`.
+        A ``KeyError`` is raised if there is no object that is not already
+        checked out.
         '''
-        self._refresh(key)        
-        return self._cache_dict[key]
+        with self._lock:
+            entry = self._lookup_entry(key)
+
+            obj, nbytes = entry.objs.pop()
+            entry.nbytes -= nbytes
+            self._nbytes -= nbytes
+            self._n_objects -= 1
+
+            self._leases[id(obj)] = (entry, nbytes)
 
+            return obj
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+This module implements those functions that replace aspects of the
+:mod:`dask.array.fft` module. This module *provides* the entire documented
+namespace of :mod:`dask.array.fft`, but those functions that are not
+included here are imported directly from :mod:`dask.array.fft`.
+
+The functions wrap those of :mod:`pyfftw.interfaces.numpy_fft` with
+:func:`dask.array.fft.fft_wrap`, so as with :mod:`dask.array.fft`, the
+transform is performed on each chunk of the array, and the array must
+have only one chunk along each axis that is transformed.
+
+Every process that transforms a chunk enables the
+:mod:`pyfftw.interfaces.cache` if it is not already enabled, so each
+process (or each dask worker) plans the transform only once for each
+shape of chunk, and then reuses the plan for all the other chunks of
+that shape. The ``planner_effort``, ``threads``, ``auto_align_input``
+and ``auto_contiguous`` arguments are passed on to the transform of
+every chunk, as documented in the
+:ref:`additional argument docs<interfaces_additional_args>`.
+'''
+
+from . import numpy_fft, cache
+from ..builders._utils import _rc_dtype_pairs, _default_dtype
+import functools
+import numpy
+
+from dask.array.fft import fft_wrap
+import dask.array
+
+# Complete the namespace (these are not actually used in this module)
+from dask.array.fft import fftfreq, rfftfreq, fftshift, ifftshift
+
+__all__ = ['fft','ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
+           'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 'irfftn',
+           'hfft', 'ihfft', 'fftfreq', 'rfftfreq', 'fftshift', 'ifftshift']
+
+# The transforms with a real output
+_real_output_funcs = frozenset(('irfft', 'irfft2', 'irfftn', 'hfft'))
+
+def _output_dtype(calling_func, dtype):
+    '''Return the dtype of the output of the transform ``calling_func``
+    of an array of ``dtype``, so dask does not need to work it out by
+    performing a sample transform.
+    '''
+    dtype = numpy.dtype(dtype)
+
+    if dtype not in _rc_dtype_pairs:
+        dtype = _default_dtype
+
+    if dtype.kind != 'c':
+        dtype = _rc_dtype_pairs[dtype]
+
+    if calling_func in _real_output_funcs:
+        return _rc_dtype_pairs[dtype]
+    else:
+        return dtype
+
+def _transform_chunk(x, s=None, axes=None, calling_func=None,
+        kwargs=None):
+    '''Perform the transform ``calling_func`` of
+    :mod:`pyfftw.interfaces.numpy_fft` of the chunk ``x``, enabling the
+    cache first if it is not already enabled.
+    '''
+    if not cache.is_enabled():
+        cache.enable()
+
+    return getattr(numpy_fft, calling_func)(x, s, axes, **kwargs)
+
+def _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+        auto_contiguous, calling_func):
+    '''Perform the transform ``calling_func`` of each chunk of ``a``.
+    '''
+    a = dask.array.asarray(a)
+
+    kwargs = {'planner_effort': planner_effort, 'threads': threads,
+            'auto_align_input': auto_align_input,
+            'auto_contiguous': auto_contiguous}
+
+    # The chunk transform is a partial (rather than a closure) so that it
+    # can be pickled for the workers. fft_wrap takes its name and module
+    # from it, which a partial does not have of its own.
+    chunk_transform = functools.partial(_transform_chunk,
+            calling_func=calling_func, kwargs=kwargs)
+    chunk_transform.__name__ = calling_func
+    chunk_transform.__module__ = __name__
+    chunk_transform.__doc__ = None
+
+    return fft_wrap(chunk_transform, kind=calling_func,
+            dtype=_output_dtype(calling_func, a.dtype))(a, s, axes)
+
+def fft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.fft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'fft')
+
+def ifft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.ifft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'ifft')
+
+def fft2(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.fft2`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'fft2')
+
+def ifft2(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.ifft2`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'ifft2')
+
+def fftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.fftn`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'fftn')
+
+def ifftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.ifftn`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'ifftn')
+
+def rfft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D real FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.rfft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'rfft')
+
+def irfft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D real inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.irfft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'irfft')
+
+def rfft2(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D real FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.rfft2`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'rfft2')
+
+def irfft2(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D real inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.irfft2`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'irfft2')
+
+def rfftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D real FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.rfftn`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'rfftn')
+
+def irfftn(a, s=None, axes=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D real inverse FFT of each chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.irfftn`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, s, axes, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'irfftn')
+
+def hfft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D FFT of a signal with Hermitian symmetry in each
+    chunk.
+    
+    The first three arguments are as per :func:`dask.array.fft.hfft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'hfft')
+
+def ihfft(a, n=None, axis=None, planner_effort='FFTW_MEASURE', threads=1,
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse FFT of a real-spectrum in each chunk, yielding
+    a signal with Hermitian symmetry.
+    
+    The first three arguments are as per :func:`dask.array.fft.ihfft`; 
+    the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn(a, n, axis, planner_effort, threads, auto_align_input,
+            auto_contiguous, 'ihfft')
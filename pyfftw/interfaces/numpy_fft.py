@@ -55,9 +55,35 @@ the DFT being taken along that axes as many times as the axis occurs.
 The exceptions raised by each of these functions are mostly as per their
 equivalents in :mod:`numpy.fft`, though there are some corner cases in
 which this may not be true.
+
+Code that calls :mod:`numpy.fft` directly, such as a third party library,
+can be made to use FFTW without being changed with :func:`install`, which
+replaces the transforms in the :mod:`numpy.fft` module with ones that use
+the functions of this module (and :func:`uninstall` puts the originals
+back). :func:`pyfftw.interfaces.patched` does the same for the duration of
+a ``with`` block:
+
+.. code-block:: python
+
+    with pyfftw.interfaces.patched(threads=4):
+        result = third_party_library.filter(data) # uses numpy.fft.fft
+
+Unlike the functions above, the replacements keep the arguments of the
+:mod:`numpy.fft` functions (including ``norm``) and the dtype of their
+output, so they can stand in for them exactly. The FFTW specific arguments
+are instead set once by :func:`install`, and the
+:mod:`~pyfftw.interfaces.cache` is enabled while they are installed.
+Only the :mod:`numpy.fft` module is patched, so functions that were
+imported from it before :func:`install` was called are not replaced.
 '''
 
 from ._utils import _Xfftn
+from .scipy_fft import _Xfftn_norm
+from ..builders._utils import _valid_efforts
+from . import cache
+import contextlib
+import functools
+import inspect
 
 # Complete the namespace (these are not actually used in this module)
 from numpy.fft import fftfreq, fftshift, ifftshift
@@ -69,7 +95,8 @@ __all__ = ['fft','ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
 
 def fft(a, n=None, axis=-1, overwrite_input=False, 
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 1D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fft`; 
@@ -81,11 +108,13 @@ def fft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, n, axis, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def ifft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 1D inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.ifft`; 
@@ -96,12 +125,14 @@ def ifft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, n, axis, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 
 def fft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 2D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fft2`; 
@@ -112,11 +143,13 @@ def fft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def ifft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 2D inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.ifft2`; 
@@ -127,12 +160,14 @@ def ifft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 
 def fftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform an n-D FFT.
     
     The first three arguments are as per :func:`numpy.fft.fftn`; 
@@ -143,11 +178,13 @@ def fftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def ifftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform an n-D inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.ifftn`; 
@@ -158,11 +195,13 @@ def ifftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def rfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 1D real FFT.
     
     The first three arguments are as per :func:`numpy.fft.rfft`; 
@@ -173,11 +212,13 @@ def rfft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, n, axis, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def irfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 1D real inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.irfft`; 
@@ -188,11 +229,13 @@ def irfft(a, n=None, axis=-1, overwrite_input=False,
 
     return _Xfftn(a, n, axis, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def rfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 2D real FFT.
     
     The first three arguments are as per :func:`numpy.fft.rfft2`; 
@@ -203,11 +246,13 @@ def rfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def irfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform a 2D real inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.irfft2`; 
@@ -218,12 +263,14 @@ def irfft2(a, s=None, axes=(-2,-1), overwrite_input=False,
     
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 
 def rfftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform an n-D real FFT.
     
     The first three arguments are as per :func:`numpy.fft.rfftn`; 
@@ -234,12 +281,14 @@ def rfftn(a, s=None, axes=None, overwrite_input=False,
 
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 
 def irfftn(a, s=None, axes=None, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None,
+        shift_input=False, shift_output=False, pad=None):
     '''Perform an n-D real inverse FFT.
     
     The first three arguments are as per :func:`numpy.fft.rfftn`; 
@@ -250,11 +299,12 @@ def irfftn(a, s=None, axes=None, overwrite_input=False,
     
     return _Xfftn(a, s, axes, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func)
+            calling_func, out=out, shift_input=shift_input,
+            shift_output=shift_output, pad=pad)
 
 def hfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D FFT of a signal with hermitian symmetry.
     This yields a real output spectrum. See :func:`numpy.fft.hfft`
     for more information.
@@ -267,18 +317,17 @@ def hfft(a, n=None, axis=-1, overwrite_input=False,
     # The hermitian symmetric transform is equivalent to the 
     # irfft of the conjugate of the input (do the maths!) without
     # any normalisation of the result (so normalise_idft is set to 
-    # False).
-    a = numpy.conjugate(a)
-
+    # False). The conjugation is done on the output, so no copy of the
+    # input is needed.
     calling_func = 'irfft'
 
     return _Xfftn(a, n, axis, overwrite_input, planner_effort,
             threads, auto_align_input, auto_contiguous, 
-            calling_func, normalise_idft=False)
+            calling_func, normalise_idft=False, out=out, conjugate=True)
 
 def ihfft(a, n=None, axis=-1, overwrite_input=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D inverse FFT of a real-spectrum, yielding
     a signal with hermitian symmetry. See :func:`numpy.fft.ihfft`
     for more information.
@@ -291,15 +340,198 @@ def ihfft(a, n=None, axis=-1, overwrite_input=False,
     # Result is equivalent to the conjugate of the output of
     # the rfft of a.
     # It is necessary to perform the inverse scaling, as this
-    # is not done by rfft.
-    if n is None:
-        if not isinstance(a, numpy.ndarray):
-            a = numpy.asarray(a)
+    # is not done by rfft. Both are done in a single pass over the
+    # output.
+    calling_func = 'rfft'
+
+    return _Xfftn(a, n, axis, overwrite_input, planner_effort,
+            threads, auto_align_input, auto_contiguous, 
+            calling_func, normalise_idft=True, out=out, conjugate=True)
+
+
+# The transforms of numpy.fft that are replaced by install, with the
+# arguments of _Xfftn_norm that perform them.
+_patched_transforms = {
+        'fft': ('fft', False, {}),
+        'ifft': ('ifft', True, {'normalises': True}),
+        'fft2': ('fft2', False, {}),
+        'ifft2': ('ifft2', True, {'normalises': True}),
+        'fftn': ('fftn', False, {}),
+        'ifftn': ('ifftn', True, {'normalises': True}),
+        'rfft': ('rfft', False, {}),
+        'irfft': ('irfft', True, {'invreal': True, 'normalises': True}),
+        'rfft2': ('rfft2', False, {}),
+        'irfft2': ('irfft2', True, {'invreal': True, 'normalises': True}),
+        'rfftn': ('rfftn', False, {}),
+        'irfftn': ('irfftn', True, {'invreal': True, 'normalises': True}),
+        'hfft': ('irfft', False, {'invreal': True, 'conjugate': True}),
+        'ihfft': ('rfft', True, {'conjugate': True})}
+
+# The original numpy.fft functions and the arguments to install while
+# they are replaced, and otherwise None.
+_installed = None
+
+def _numpy_input_dtypes(numpy_fft_fft):
+    '''Return a dict from each floating point dtype to the dtype that
+    ``numpy_fft_fft`` (the original :func:`numpy.fft.fft`) converts it to
+    before the transform, if that is a different one. This depends on the
+    version of numpy.
+    '''
+    input_dtypes = {}
+    for char in numpy.typecodes['Float'] + numpy.typecodes['Complex']:
+        dtype = numpy.dtype(char)
+        output_dtype = numpy_fft_fft(numpy.zeros(1, dtype)).dtype
+
+        if dtype.kind == 'f':
+            output_dtype = numpy.zeros(0, output_dtype).real.dtype
+
+        if output_dtype != dtype:
+            input_dtypes[dtype] = output_dtype
+
+    return input_dtypes
+
+def _patched_transform(name, original, input_dtypes, threads,
+        planner_effort, planning_timelimit):
+    '''Return the replacement for the :mod:`numpy.fft` function ``name``,
+    the original of which is ``original``.
+    '''
+    calling_func, inverse, kwargs = _patched_transforms[name]
+
+    def transform(a, s, axes, norm, out):
+        a = numpy.asarray(a)
+
+        if a.dtype in input_dtypes:
+            a = a.astype(input_dtypes[a.dtype])
+
+        output = _Xfftn_norm(a, s, axes, False, norm, threads, None,
+                planner_effort, True, True, calling_func, inverse,
+                planning_timelimit=planning_timelimit, **kwargs)
+
+        if out is None:
+            return output
+
+        out[...] = output
+        return out
+
+    # Only the versions of numpy.fft that have out (from numpy 2.0) take
+    # it, so that the replacements raise the same errors as the originals.
+    try:
+        has_out = 'out' in inspect.signature(original).parameters
+    except (TypeError, ValueError):
+        has_out = False
+
+    one_dimensional = name in ('fft', 'ifft', 'rfft', 'irfft', 'hfft',
+            'ihfft')
+
+    if one_dimensional and has_out:
+        def patched_transform(a, n=None, axis=-1, norm=None, out=None):
+            return transform(a, n, axis, norm, out)
+
+    elif one_dimensional:
+        def patched_transform(a, n=None, axis=-1, norm=None):
+            return transform(a, n, axis, norm, None)
+
+    else:
+        default_axes = (-2, -1) if name.endswith('2') else None
 
-        n = a.shape[axis]
+        if has_out:
+            def patched_transform(a, s=None, axes=default_axes, norm=None,
+                    out=None):
+                return transform(a, s, axes, norm, out)
+
+        else:
+            def patched_transform(a, s=None, axes=default_axes,
+                    norm=None):
+                return transform(a, s, axes, norm, None)
+
+    # The name, docstring and (through __wrapped__) signature are those of
+    # the numpy.fft function
+    return functools.wraps(original)(patched_transform)
+
+def install(threads=1, planner_effort='FFTW_MEASURE',
+        planning_timelimit=None):
+    '''Replace the transforms in the :mod:`numpy.fft` module with ones
+    that use the functions of this module, and enable the
+    :mod:`~pyfftw.interfaces.cache` if it is not already enabled.
+    
+    ``threads`` and ``planner_effort`` are used by every transform, as
+    documented in the :ref:`additional arguments
+    docs<interfaces_additional_args>`, and ``planning_timelimit`` is as
+    for :class:`pyfftw.FFTW`. It limits the time spent planning each new
+    transform.
+
+    Calling this again while the transforms are replaced changes the
+    arguments that they use.
+    '''
+    global _installed
+
+    if planner_effort not in _valid_efforts + ('auto',):
+        raise ValueError('Invalid planner effort: %r' % (planner_effort,))
+
+    if threads != 'auto' and threads < 1:
+        raise ValueError('Invalid threads: %r; should be at least 1.'
+                % (threads,))
+
+    if _installed is None:
+        originals = dict((name, getattr(numpy.fft, name))
+                for name in _patched_transforms)
+
+        # The cache is only disabled again by uninstall if it is enabled
+        # here.
+        enables_cache = not cache.is_enabled()
+
+    else:
+        originals = _installed['originals']
+        enables_cache = _installed['enables_cache']
+
+    input_dtypes = _numpy_input_dtypes(originals['fft'])
+
+    for name, original in originals.items():
+        setattr(numpy.fft, name, _patched_transform(name, original,
+            input_dtypes, threads, planner_effort, planning_timelimit))
+
+    if enables_cache:
+        cache.enable()
+
+    _installed = {'originals': originals, 'enables_cache': enables_cache,
+            'arguments': (threads, planner_effort, planning_timelimit)}
+
+def uninstall():
+    '''Put back the transforms in the :mod:`numpy.fft` module that were
+    replaced by :func:`install`, and disable the
+    :mod:`~pyfftw.interfaces.cache` if it was enabled by :func:`install`.
+    Nothing is done if the transforms are not replaced.
+    '''
+    global _installed
+
+    if _installed is None:
+        return
+
+    for name, original in _installed['originals'].items():
+        setattr(numpy.fft, name, original)
+
+    if _installed['enables_cache']:
+        cache.disable()
+
+    _installed = None
+
+@contextlib.contextmanager
+def patched(threads=1, planner_effort='FFTW_MEASURE',
+        planning_timelimit=None):
+    '''Return a context manager that replaces the transforms in the
+    :mod:`numpy.fft` module as :func:`install` does with the same
+    arguments, and puts back the previous ones on leaving the ``with``
+    block. This is also available as :func:`pyfftw.interfaces.patched`.
+    '''
+    previous = _installed
 
-    scaling = 1.0/n
+    install(threads, planner_effort, planning_timelimit)
 
-    return scaling * rfft(a, n, axis, overwrite_input, planner_effort,
-            threads, auto_align_input, auto_contiguous).conj()
+    try:
+        yield
 
+    finally:
+        if previous is None:
+            uninstall()
+        else:
+            install(*previous['arguments'])
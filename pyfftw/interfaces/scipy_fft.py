@@ -0,0 +1,633 @@
+#!/usr/bin/env python
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+This module implements those functions that replace aspects of the
+:mod:`scipy.fft` module. This module *provides* the documented transforms
+of :mod:`scipy.fft`, with the ``norm`` and ``workers`` arguments, and
+the helper functions are imported from :mod:`numpy.fft`.
+:func:`next_fast_len` is :func:`pyfftw.next_fast_len`, which is tuned
+to the lengths that FFTW is fastest with rather than those of
+:mod:`scipy.fft`.
+
+The module is also a backend for :mod:`scipy.fft`, so all the transforms
+of :mod:`scipy.fft` can be performed by pyFFTW with, for example:
+
+.. code-block:: python
+
+    import scipy.fft
+    from pyfftw.interfaces import scipy_fft, cache
+
+    cache.enable()
+    scipy.fft.set_global_backend(scipy_fft)
+
+Any function that this module does not implement falls back to the next
+backend.
+
+As with :mod:`~pyfftw.interfaces.scipy_fftpack`, the output arrays have
+the precision of the input array, and the ``workers`` argument (which
+sets the number of threads, with negative values counting back from
+the number of CPUs) and the ``plan`` argument are as per
+:mod:`scipy.fft`, except that passing a ``plan`` is not supported. When
+``workers`` is ``None``, the number of workers set with
+:func:`scipy.fft.set_workers` is used if :mod:`scipy.fft` has been
+imported, and otherwise one. With ``workers='auto'``, the number of
+threads is looked up in the table written by :func:`pyfftw.autotune`.
+'''
+
+from ._utils import _Xfftn
+from ..builders._utils import _cook_nd_args
+from ..pyfftw import next_fast_len
+import multiprocessing
+import operator
+import sys
+import numpy
+
+# Complete the namespace (these are not actually used in this module)
+from numpy.fft import fftfreq, rfftfreq, fftshift, ifftshift
+
+__all__ = ['fft','ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
+           'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 'irfftn',
+           'hfft', 'ihfft', 'hfft2', 'ihfft2', 'hfftn', 'ihfftn',
+           'dct', 'idct', 'dst', 'idst', 'dctn', 'idctn', 'dstn', 'idstn',
+           'fftfreq', 'rfftfreq', 'fftshift', 'ifftshift', 'next_fast_len']
+
+# The uarray backend protocol of scipy.fft
+__ua_domain__ = 'numpy.scipy.fft'
+
+# The FFTW objects of the inverse complex and real transforms (and of
+# the cosine and sine transforms of type 3) normalise the output by 1/N
+# when they are called.
+_normalising_funcs = frozenset(('ifft', 'ifft2', 'ifftn', 'irfft',
+        'irfft2', 'irfftn'))
+
+# The inverse of each type of cosine and sine transform
+_inverse_types = {1: 1, 2: 3, 3: 2, 4: 4}
+
+# The logical size of the cosine and sine transforms over an axis of
+# length n, by which they are normalised.
+_r2r_sizes = {
+        ('dctn', 1): lambda n: 2 * (n - 1),
+        ('dstn', 1): lambda n: 2 * (n + 1)}
+
+def _workers_to_threads(workers):
+    '''Return the number of threads for ``workers`` (or ``'auto'``).
+    '''
+    if workers == 'auto':
+        return workers
+
+    if workers is None:
+        get_workers = getattr(sys.modules.get('scipy.fft'), 'get_workers',
+                None)
+
+        if get_workers is None:
+            return 1
+        else:
+            return get_workers()
+
+    workers = operator.index(workers)
+
+    if workers < 0:
+        cpu_count = multiprocessing.cpu_count()
+
+        if workers < -cpu_count:
+            raise ValueError('Invalid workers: '
+                    'workers value out of range; got %d, must not be '
+                    'less than %d' % (workers, -cpu_count))
+
+        workers += cpu_count + 1
+
+    elif workers == 0:
+        raise ValueError('Invalid workers: workers must not be zero')
+
+    return workers
+
+def _norm_power(norm, inverse):
+    '''Return the power of 1/N by which the output of a transform of
+    logical size N is scaled for ``norm``.
+    '''
+    if norm is None or norm == 'backward':
+        return 1 if inverse else 0
+    elif norm == 'forward':
+        return 0 if inverse else 1
+    elif norm == 'ortho':
+        return 0.5
+    else:
+        raise ValueError('Invalid norm: %r; should be "backward", '
+                '"ortho" or "forward".' % (norm,))
+
+def _logical_size(x, s, axes, invreal=False, r2r=None):
+    '''Return the logical size of the transform of ``x``, with ``s`` and
+    ``axes`` as for :func:`pyfftw.builders.fftn`. ``r2r`` is the builder
+    and type of a cosine or sine transform.
+    '''
+    s, axes = _cook_nd_args(x, s, axes, invreal)
+    axis_size = _r2r_sizes.get(r2r, lambda n: 2 * n) if r2r else int
+
+    N = 1
+    transformed_axes = set()
+
+    # Repeated axes are only transformed once
+    for length, axis in zip(s, axes):
+        if axis % x.ndim not in transformed_axes:
+            transformed_axes.add(axis % x.ndim)
+            N *= axis_size(length)
+
+    return N
+
+def _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+        planner_effort, auto_align_input, auto_contiguous, calling_func,
+        inverse, invreal=False, conjugate=False, normalises=False,
+        r2r=None, planning_timelimit=None):
+    '''Perform the transform of :func:`pyfftw.interfaces._utils._Xfftn`
+    given by ``calling_func``, scaled as set by ``norm``. ``inverse`` is
+    whether the transform is the inverse for ``norm``. The scaling is
+    left to the :class:`pyfftw.FFTW` object where it can do it, which is
+    when ``normalises`` or ``conjugate`` is true. ``planning_timelimit``
+    is passed on to :func:`~pyfftw.interfaces._utils._Xfftn`.
+    '''
+    if plan is not None:
+        raise NotImplementedError('Passing a precomputed plan is not '
+                'supported by the pyfftw.interfaces.scipy_fft functions.')
+
+    threads = _workers_to_threads(workers)
+    power = _norm_power(norm, inverse)
+    normalise_idft = power == 1 and (normalises or conjugate)
+
+    x = numpy.asanyarray(x)
+
+    output = _Xfftn(x, s, axes, overwrite_x, planner_effort, threads,
+            auto_align_input, auto_contiguous, calling_func,
+            normalise_idft=normalise_idft, conjugate=conjugate,
+            planning_timelimit=planning_timelimit)
+
+    if power and not normalise_idft:
+        # The 1D transforms have an n and an axis
+        if axes is not None and numpy.ndim(axes) == 0:
+            s = None if s is None else (s,)
+            axes = (axes,)
+
+        output *= 1.0 / _logical_size(x, s, axes, invreal, r2r) ** power
+
+    return output
+
+def _r2r(x, type, s, axes, norm, overwrite_x, workers, orthogonalize,
+        planner_effort, auto_align_input, auto_contiguous, func, inverse):
+    '''Perform the cosine (if ``func`` is ``'dctn'``) or sine (if it is
+    ``'dstn'``) transform of ``type``, or its inverse.
+    '''
+    if type not in _inverse_types:
+        raise ValueError('Invalid type: '
+                'The type of the transform should be 1, 2, 3 or 4.')
+
+    if numpy.iscomplexobj(x):
+        # The real and imaginary parts are transformed separately
+        x = numpy.asanyarray(x)
+        output = _r2r(x.real, type, s, axes, norm, overwrite_x, workers,
+                orthogonalize, planner_effort, auto_align_input,
+                auto_contiguous, func, inverse)
+
+        return output + 1j * _r2r(x.imag, type, s, axes, norm,
+                overwrite_x, workers, orthogonalize, planner_effort,
+                auto_align_input, auto_contiguous, func, inverse)
+
+    if inverse:
+        type = _inverse_types[type]
+
+    if orthogonalize is None:
+        orthogonalize = norm == 'ortho'
+
+    x = numpy.asanyarray(x)
+
+    # With the orthogonalized transforms, the first and last values along
+    # each axis are scaled before and after the transform, as set out in
+    # the scipy.fft documentation.
+    if orthogonalize:
+        # The length of the transform along each axis (which is only
+        # transformed once if it is repeated)
+        cook_s, cook_axes = _cook_nd_args(x, s, axes)
+        lengths = {}
+        for length, axis in zip(cook_s, cook_axes):
+            lengths.setdefault(axis % x.ndim, length)
+
+        pre_scaled = (
+                [0, -1] if type == 1 and func == 'dctn' else
+                [0] if type == 3 and func == 'dctn' else
+                [-1] if type == 3 else [])
+        post_scaled = (
+                [0, -1] if type == 1 and func == 'dctn' else
+                [0] if type == 2 and func == 'dctn' else
+                [-1] if type == 2 else [])
+
+        if pre_scaled:
+            x = numpy.array(x,
+                    dtype=numpy.result_type(x.dtype, numpy.float32))
+            overwrite_x = True
+
+            for axis, length in lengths.items():
+                for index in pre_scaled:
+                    index = index % length
+                    if index < x.shape[axis]:
+                        x[(slice(None),) * axis + (index,)] *= numpy.sqrt(2)
+
+    calling_func = '%s_%d' % (func, type)
+
+    output = _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, None,
+            planner_effort, auto_align_input, auto_contiguous, calling_func,
+            inverse, normalises=type == 3, r2r=(func, type))
+
+    if orthogonalize:
+        for axis in lengths:
+            for index in post_scaled:
+                output[(slice(None),) * axis + (index,)] /= numpy.sqrt(2)
+
+    return output
+
+def fft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.fft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'fft',
+            False)
+
+def ifft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ifft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'ifft',
+            True, normalises=True)
+
+def fft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.fft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'fft2',
+            False)
+
+def ifft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ifft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'ifft2',
+            True, normalises=True)
+
+def fftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.fftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'fftn',
+            False)
+
+def ifftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ifftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'ifftn',
+            True, normalises=True)
+
+def rfft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D real FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.rfft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'rfft',
+            False)
+
+def irfft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D real inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.irfft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'irfft',
+            True, invreal=True, normalises=True)
+
+def rfft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D real FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.rfft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'rfft2',
+            False)
+
+def irfft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D real inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.irfft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'irfft2',
+            True, invreal=True, normalises=True)
+
+def rfftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D real FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.rfftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'rfftn',
+            False)
+
+def irfftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D real inverse FFT.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.irfftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'irfftn',
+            True, invreal=True, normalises=True)
+
+def hfft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D FFT of a signal with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.hfft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'irfft',
+            False, invreal=True, conjugate=True)
+
+def ihfft(x, n=None, axis=-1, norm=None, overwrite_x=False, workers=None,
+        plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse FFT of a real-spectrum, yielding
+    a signal with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ihfft`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, n, axis, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'rfft',
+            True, conjugate=True)
+
+def hfft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D FFT of a signal with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.hfft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return hfftn(x, s, axes, norm, overwrite_x, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous)
+
+def ihfft2(x, s=None, axes=(-2,-1), norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 2D inverse FFT of a real spectrum, yielding a signal
+    with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ihfft2`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return ihfftn(x, s, axes, norm, overwrite_x, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous)
+
+def hfftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D FFT of a signal with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.hfftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    # The conjugate is a new array, so it can be overwritten (which
+    # irfftn would otherwise need a copy of the input for).
+    return _Xfftn_norm(numpy.conj(x), s, axes, True, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'irfftn',
+            False, invreal=True, normalises=True)
+
+def ihfftn(x, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, plan=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D inverse FFT of a real spectrum, yielding a signal
+    with Hermitian symmetry.
+    
+    The first six arguments and ``plan`` are as per
+    :func:`scipy.fft.ihfftn`; the rest of the arguments are documented 
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _Xfftn_norm(x, s, axes, overwrite_x, norm, workers, plan,
+            planner_effort, auto_align_input, auto_contiguous, 'rfftn',
+            True, conjugate=True)
+
+def dct(x, type=2, n=None, axis=-1, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D discrete cosine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.dct`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, None if n is None else (n,), (axis,), norm,
+            overwrite_x, workers, orthogonalize, planner_effort,
+            auto_align_input, auto_contiguous, 'dctn', False)
+
+def idct(x, type=2, n=None, axis=-1, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse discrete cosine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.idct`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, None if n is None else (n,), (axis,), norm,
+            overwrite_x, workers, orthogonalize, planner_effort,
+            auto_align_input, auto_contiguous, 'dctn', True)
+
+def dst(x, type=2, n=None, axis=-1, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D discrete sine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.dst`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, None if n is None else (n,), (axis,), norm,
+            overwrite_x, workers, orthogonalize, planner_effort,
+            auto_align_input, auto_contiguous, 'dstn', False)
+
+def idst(x, type=2, n=None, axis=-1, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform a 1D inverse discrete sine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.idst`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, None if n is None else (n,), (axis,), norm,
+            overwrite_x, workers, orthogonalize, planner_effort,
+            auto_align_input, auto_contiguous, 'dstn', True)
+
+def dctn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D discrete cosine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.dctn`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, s, axes, norm, overwrite_x, workers,
+            orthogonalize, planner_effort, auto_align_input,
+            auto_contiguous, 'dctn', False)
+
+def idctn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D inverse discrete cosine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.idctn`; the
+    rest of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, s, axes, norm, overwrite_x, workers,
+            orthogonalize, planner_effort, auto_align_input,
+            auto_contiguous, 'dctn', True)
+
+def dstn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D discrete sine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.dstn`; the rest
+    of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, s, axes, norm, overwrite_x, workers,
+            orthogonalize, planner_effort, auto_align_input,
+            auto_contiguous, 'dstn', False)
+
+def idstn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False,
+        workers=None, orthogonalize=None, planner_effort='FFTW_MEASURE',
+        auto_align_input=True, auto_contiguous=True):
+    '''Perform an n-D inverse discrete sine transform.
+    
+    The first eight arguments are as per :func:`scipy.fft.idstn`; the
+    rest of the arguments are documented in the
+    :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    return _r2r(x, type, s, axes, norm, overwrite_x, workers,
+            orthogonalize, planner_effort, auto_align_input,
+            auto_contiguous, 'dstn', True)
+
+# The functions that are implemented for the scipy.fft backend
+_implemented = dict((name, globals()[name]) for name in __all__
+        if name not in ('fftfreq', 'rfftfreq', 'fftshift', 'ifftshift',
+            'next_fast_len'))
+
+def __ua_function__(method, args, kwargs):
+    '''The uarray backend protocol of :mod:`scipy.fft`. Perform
+    ``method`` with ``args`` and ``kwargs`` if it is implemented here,
+    or return ``NotImplemented`` if it is not.
+    '''
+    fn = _implemented.get(getattr(method, '__name__', None))
+
+    if fn is None:
+        return NotImplemented
+
+    return fn(*args, **kwargs)
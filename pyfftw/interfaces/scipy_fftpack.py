@@ -57,6 +57,9 @@ a 2D `shape` argument will return without exception whereas
 '''
 
 from . import numpy_fft
+from ..pyfftw import (
+        _interfaces_fftpack_rfft as _fftpack_rfft,
+        _interfaces_fftpack_irfft as _fftpack_irfft)
 import numpy
 
 # Complete the namespace (these are not actually used in this module)
@@ -76,7 +79,7 @@ __all__ = ['fft','ifft','fftn','ifftn','rfft','irfft', 'fft2','ifft2',
 
 def fft(x, n=None, axis=-1, overwrite_x=False, 
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.fft`; 
@@ -84,11 +87,11 @@ def fft(x, n=None, axis=-1, overwrite_x=False,
     in the :ref:`additional argument docs<interfaces_additional_args>`.
     '''
     return numpy_fft.fft(x, n, axis, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
+            threads, auto_align_input, auto_contiguous, out=out)
 
 def ifft(x, n=None, axis=-1, overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D inverse FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.ifft`; 
@@ -97,12 +100,12 @@ def ifft(x, n=None, axis=-1, overwrite_x=False,
     '''
 
     return numpy_fft.ifft(x, n, axis, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
+            threads, auto_align_input, auto_contiguous, out=out)
 
 
 def fft2(x, shape=None, axes=(-2,-1), overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 2D FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.fft2`; 
@@ -111,12 +114,12 @@ def fft2(x, shape=None, axes=(-2,-1), overwrite_x=False,
     '''
 
     return numpy_fft.fft2(x, shape, axes, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
+            threads, auto_align_input, auto_contiguous, out=out)
 
 
 def ifft2(x, shape=None, axes=(-2,-1), overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 2D inverse FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.ifft2`; 
@@ -125,12 +128,12 @@ def ifft2(x, shape=None, axes=(-2,-1), overwrite_x=False,
     '''
 
     return numpy_fft.ifft2(x, shape, axes, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
+            threads, auto_align_input, auto_contiguous, out=out)
 
 
 def fftn(x, shape=None, axes=None, overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform an n-D FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.fftn`; 
@@ -149,12 +152,12 @@ def fftn(x, shape=None, axes=None, overwrite_x=False,
                     'using the numpy interface.')
 
     return numpy_fft.fftn(x, shape, axes, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
+            threads, auto_align_input, auto_contiguous, out=out)
 
 
 def ifftn(x, shape=None, axes=None, overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform an n-D inverse FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.ifftn`; 
@@ -173,81 +176,11 @@ def ifftn(x, shape=None, axes=None, overwrite_x=False,
                     'using the numpy interface.')
 
     return numpy_fft.ifftn(x, shape, axes, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
-
-def _complex_to_rfft_output(complex_output, output_shape, axis):
-    '''Convert the complex output from pyfftw to the real output expected 
-    from :func:`scipy.fftpack.rfft`.
-    '''
-
-    rfft_output = numpy.empty(output_shape, dtype=complex_output.real.dtype)
-    source_slicer = [slice(None)] * complex_output.ndim
-    target_slicer = [slice(None)] * complex_output.ndim
-
-    # First element
-    source_slicer[axis] = slice(0, 1)
-    target_slicer[axis] = slice(0, 1)
-    rfft_output[target_slicer] = complex_output[source_slicer].real
-
-    # Real part
-    source_slicer[axis] = slice(1, None)
-    target_slicer[axis] = slice(1, None, 2)
-    rfft_output[target_slicer] = complex_output[source_slicer].real
-
-    # Imaginary part
-    if output_shape[axis] % 2 == 0:
-        end_val = -1
-    else:
-        end_val = None
-
-    source_slicer[axis] = slice(1, end_val, None)
-    target_slicer[axis] = slice(2, None, 2)
-    rfft_output[target_slicer] = complex_output[source_slicer].imag
-
-    return rfft_output
-
-
-def _irfft_input_to_complex(irfft_input, axis):
-    '''Convert the expected real input to :func:`scipy.fftpack.irfft` to
-    the complex input needed by pyfftw.
-    '''
-    complex_dtype = numpy.result_type(irfft_input, 1j)
-
-    input_shape = list(irfft_input.shape)
-    input_shape[axis] = input_shape[axis]//2 + 1
-
-    complex_input = numpy.empty(input_shape, dtype=complex_dtype)
-    source_slicer = [slice(None)] * len(input_shape)
-    target_slicer = [slice(None)] * len(input_shape)
-
-    # First element
-    source_slicer[axis] = slice(0, 1)
-    target_slicer[axis] = slice(0, 1)
-    complex_input[target_slicer] = irfft_input[source_slicer]
-
-    # Real part
-    source_slicer[axis] = slice(1, None, 2)
-    target_slicer[axis] = slice(1, None)
-    complex_input[target_slicer].real = irfft_input[source_slicer]
-
-    # Imaginary part
-    if irfft_input.shape[axis] % 2 == 0:
-        end_val = -1
-        target_slicer[axis] = slice(-1, None)
-        complex_input[target_slicer].imag = 0.0
-    else:
-        end_val = None
-
-    source_slicer[axis] = slice(2, None, 2)
-    target_slicer[axis] = slice(1, end_val)
-    complex_input[target_slicer].imag = irfft_input[source_slicer]
-
-    return complex_input
-
+            threads, auto_align_input, auto_contiguous, out=out)
 
 def rfft(x, n=None, axis=-1, overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D real FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.rfft`; 
@@ -260,18 +193,12 @@ def rfft(x, n=None, axis=-1, overwrite_x=False,
 
     x = numpy.asanyarray(x)
 
-    complex_output = numpy_fft.rfft(x, n, axis, overwrite_x, planner_effort,
-            threads, auto_align_input, auto_contiguous)
-
-    output_shape = list(x.shape)
-    if n is not None:
-        output_shape[axis] = n
-
-    return _complex_to_rfft_output(complex_output, output_shape, axis)
+    return _fftpack_rfft(x, n, axis, overwrite_x, planner_effort,
+            threads, auto_align_input, auto_contiguous, out=out)
 
 def irfft(x, n=None, axis=-1, overwrite_x=False,
         planner_effort='FFTW_MEASURE', threads=1,
-        auto_align_input=True, auto_contiguous=True):
+        auto_align_input=True, auto_contiguous=True, out=None):
     '''Perform a 1D real inverse FFT.
     
     The first three arguments are as per :func:`scipy.fftpack.irfft`; 
@@ -284,11 +211,7 @@ def irfft(x, n=None, axis=-1, overwrite_x=False,
 
     x = numpy.asanyarray(x)
 
-    if n is None:
-        n = x.shape[axis]
-
-    complex_input = _irfft_input_to_complex(x, axis)
-
-    return numpy_fft.irfft(complex_input, n, axis, overwrite_x, 
-            planner_effort, threads, auto_align_input, auto_contiguous)
-
+    # overwrite_x has no effect, as the input is always unpacked into
+    # an array that belongs to the transform.
+    return _fftpack_irfft(x, n, axis, planner_effort, threads,
+            auto_align_input, auto_contiguous, out=out)
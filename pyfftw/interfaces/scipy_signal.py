@@ -0,0 +1,467 @@
+#!/usr/bin/env python
+#
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+
+'''
+This module implements FFT-based replacements for the convolution and
+correlation functions of :mod:`scipy.signal`:
+:func:`~pyfftw.interfaces.scipy_signal.fftconvolve`,
+:func:`~pyfftw.interfaces.scipy_signal.oaconvolve` and
+:func:`~pyfftw.interfaces.scipy_signal.correlate`. Unlike the other
+interfaces, :mod:`scipy` is not needed to use this module and the rest of
+the :mod:`scipy.signal` namespace is *not* provided.
+
+Each call pads the inputs to a size that FFTW transforms quickly and
+performs two forward transforms, a spectral multiply and an inverse
+transform. The :class:`pyfftw.FFTW` objects for a given signature (the
+shapes of the inputs, the axes, the dtype and the planner arguments),
+along with the aligned scratch arrays they operate on, are kept and
+reused by subsequent calls with the same signature, so that repeated
+convolutions of same-sized data only pay for planning once. A small
+number of signatures are kept per thread, with the least recently used
+being discarded first.
+
+As with the other interfaces, the output has the same precision as the
+inputs, with type conversion defaulting to double precision. The output
+is real unless either of the inputs is complex.
+
+In addition to the arguments of the :mod:`scipy.signal` equivalents, the
+functions take the ``planner_effort`` and ``threads`` arguments that are
+described in the :ref:`additional argument docs<interfaces_additional_args>`.
+'''
+
+import collections
+import threading
+
+import numpy
+
+from ..pyfftw import (FFTW, empty_aligned, next_fast_len,
+        _optimal_convolver_block_size)
+
+__all__ = ['fftconvolve', 'oaconvolve', 'correlate']
+
+_valid_modes = ('full', 'same', 'valid')
+
+_real_dtypes = (numpy.dtype('float32'), numpy.dtype('float64'),
+        numpy.dtype('longdouble'))
+
+_complex_dtypes = (numpy.dtype('complex64'), numpy.dtype('complex128'),
+        numpy.dtype('clongdouble'))
+
+# The number of convolution plans kept per thread.
+_max_cached_plans = 16
+
+_plan_cache = threading.local()
+
+def _conv_dtype(in1, in2):
+    '''Return the dtype in which the convolution of ``in1`` and ``in2`` is
+    computed.
+    '''
+    dtype = numpy.result_type(in1.dtype, in2.dtype)
+
+    if dtype in _real_dtypes or dtype in _complex_dtypes:
+        return dtype
+    elif dtype.kind == 'c':
+        return numpy.dtype('complex128')
+    else:
+        return numpy.dtype('float64')
+
+def _init_conv_args(in1, in2, mode, axes):
+    '''Check the arguments of a convolution, returning the inputs as
+    arrays and the axes as a sorted tuple of non-negative integers.
+    '''
+    in1 = numpy.asanyarray(in1)
+    in2 = numpy.asanyarray(in2)
+
+    if mode not in _valid_modes:
+        raise ValueError('Invalid mode: The mode should be one of '
+                '\'full\', \'same\' or \'valid\'.')
+
+    if in1.ndim != in2.ndim:
+        raise ValueError('Invalid shapes: The inputs should have the same '
+                'number of dimensions.')
+
+    if axes is None:
+        axes = tuple(range(in1.ndim))
+    else:
+        try:
+            axes = tuple(axes)
+        except TypeError:
+            axes = (axes,)
+
+        _axes = []
+        for axis in axes:
+            if axis < -in1.ndim or axis >= in1.ndim:
+                raise IndexError('Invalid axes: The axes list cannot '
+                        'contain invalid axes.')
+
+            _axes.append(axis % in1.ndim)
+
+        if len(set(_axes)) != len(_axes):
+            raise ValueError('Invalid axes: The axes should not contain '
+                    'repeated axes.')
+
+        axes = tuple(sorted(_axes))
+
+    for n in range(in1.ndim):
+        if (n not in axes and in1.shape[n] != in2.shape[n]
+                and in1.shape[n] != 1 and in2.shape[n] != 1):
+            raise ValueError('Invalid shapes: The inputs should be the same '
+                    'shape or broadcastable along the axes that are not '
+                    'convolved.')
+
+    if mode == 'valid':
+        in1_larger = all(in1.shape[n] >= in2.shape[n] for n in axes)
+        in2_larger = all(in2.shape[n] >= in1.shape[n] for n in axes)
+
+        if not (in1_larger or in2_larger):
+            raise ValueError('Invalid shapes: In \'valid\' mode, one input '
+                    'should be at least as large as the other along every '
+                    'convolved axis.')
+
+    return in1, in2, axes
+
+def _apply_conv_mode(full, shape1, shape2, mode, axes):
+    '''Return the slices of the full convolution ``full`` of arrays of shapes
+    ``shape1`` and ``shape2`` that correspond to ``mode``.
+    '''
+    slicer = [slice(None)] * full.ndim
+
+    for n in axes:
+        full_length = shape1[n] + shape2[n] - 1
+
+        if mode == 'full':
+            length = full_length
+        elif mode == 'same':
+            length = shape1[n]
+        else:
+            length = abs(shape1[n] - shape2[n]) + 1
+
+        start = (full_length - length)//2
+        slicer[n] = slice(start, start + length)
+
+    return tuple(slicer)
+
+class _ConvolutionPlan(object):
+    '''Holds the :class:`pyfftw.FFTW` objects and the scratch arrays that
+    compute the (unnormalised and padded) circular convolution of arrays
+    of shapes ``shape1`` and ``shape2``, zero padded to ``fft_shape``
+    along ``axes``.
+
+    The shapes need only match along ``axes``; along the other axes they
+    are broadcast against each other.
+    '''
+
+    def __init__(self, shape1, shape2, fft_shape, axes, dtype,
+            planner_effort, threads):
+
+        real = dtype in _real_dtypes
+
+        if real:
+            complex_dtype = numpy.result_type(dtype, numpy.complex64)
+        else:
+            complex_dtype = dtype
+
+        def padded_shape(shape):
+            padded = list(shape)
+            for axis, length in zip(axes, fft_shape):
+                padded[axis] = length
+
+            return tuple(padded)
+
+        def spectrum_shape(shape):
+            spectrum = list(shape)
+            if real:
+                spectrum[axes[-1]] = spectrum[axes[-1]]//2 + 1
+
+            return tuple(spectrum)
+
+        padded_shape1 = padded_shape(shape1)
+        padded_shape2 = padded_shape(shape2)
+        out_shape = tuple(max(n1, n2) for n1, n2 in
+                zip(padded_shape1, padded_shape2))
+
+        self._input1 = empty_aligned(padded_shape1, dtype=dtype)
+        self._input2 = empty_aligned(padded_shape2, dtype=dtype)
+        self._spectrum1 = empty_aligned(spectrum_shape(padded_shape1),
+                dtype=complex_dtype)
+        self._spectrum2 = empty_aligned(spectrum_shape(padded_shape2),
+                dtype=complex_dtype)
+
+        if padded_shape1 == out_shape:
+            self._product = self._spectrum1
+        else:
+            self._product = empty_aligned(spectrum_shape(out_shape),
+                    dtype=complex_dtype)
+
+        self._output = empty_aligned(out_shape, dtype=dtype)
+
+        self._fftw1 = FFTW(self._input1, self._spectrum1, axes=axes,
+                direction='FFTW_FORWARD', flags=(planner_effort,),
+                threads=threads)
+
+        self._fftw2 = FFTW(self._input2, self._spectrum2, axes=axes,
+                direction='FFTW_FORWARD', flags=(planner_effort,),
+                threads=threads)
+
+        self._inverse_fftw = FFTW(self._product, self._output, axes=axes,
+                direction='FFTW_BACKWARD',
+                flags=(planner_effort, 'FFTW_DESTROY_INPUT'),
+                threads=threads)
+
+        # The inputs are copied into the same region of the scratch arrays
+        # on every call, so the padding only needs zeroing once (after
+        # planning, which can overwrite the arrays).
+        self._input1[:] = 0
+        self._input2[:] = 0
+
+        self._input1_slicer = tuple(slice(0, n) for n in shape1)
+        self._input2_slicer = tuple(slice(0, n) for n in shape2)
+
+        self._scaling = 1.0/numpy.prod(fft_shape)
+
+    def __call__(self, in1, in2, output_slicer):
+        '''Return the convolution of ``in1`` and ``in2``, restricted to
+        ``output_slicer``, as a new array.
+        '''
+        self._input1[self._input1_slicer] = in1
+        self._input2[self._input2_slicer] = in2
+
+        self._fftw1.execute()
+        self._fftw2.execute()
+
+        numpy.multiply(self._spectrum1, self._spectrum2, out=self._product)
+
+        self._inverse_fftw.execute()
+
+        return self._output[output_slicer] * self._scaling
+
+def _get_plan(shape1, shape2, fft_shape, axes, dtype, planner_effort,
+        threads):
+    '''Return a :class:`_ConvolutionPlan` for the arguments, reusing a
+    previously created one if possible.
+    '''
+    try:
+        plans = _plan_cache.plans
+    except AttributeError:
+        plans = _plan_cache.plans = collections.OrderedDict()
+
+    key = (shape1, shape2, fft_shape, axes, dtype, planner_effort, threads)
+
+    try:
+        plan = plans.pop(key)
+    except KeyError:
+        plan = _ConvolutionPlan(shape1, shape2, fft_shape, axes, dtype,
+                planner_effort, threads)
+
+        while len(plans) >= _max_cached_plans:
+            plans.popitem(last=False)
+
+    plans[key] = plan
+
+    return plan
+
+def _trivial_convolution(in1, in2, axes):
+    '''Return the result of convolving ``in1`` and ``in2`` if it does not
+    require a transform, otherwise ``None``.
+    '''
+    if in1.ndim == 0 or len(axes) == 0:
+        return in1 * in2
+
+    if in1.size == 0 or in2.size == 0:
+        return numpy.array([])
+
+    return None
+
+def fftconvolve(in1, in2, mode='full', axes=None,
+        planner_effort='FFTW_MEASURE', threads=1):
+    '''Convolve two N-dimensional arrays using FFTs.
+
+    The first four arguments are as per :func:`scipy.signal.fftconvolve`;
+    the rest of the arguments are documented
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    in1, in2, axes = _init_conv_args(in1, in2, mode, axes)
+
+    trivial = _trivial_convolution(in1, in2, axes)
+    if trivial is not None:
+        return trivial
+
+    dtype = _conv_dtype(in1, in2)
+
+    fft_shape = tuple(
+            next_fast_len(in1.shape[n] + in2.shape[n] - 1) for n in axes)
+
+    plan = _get_plan(in1.shape, in2.shape, fft_shape, axes, dtype,
+            planner_effort, threads)
+
+    return plan(in1, in2,
+            _apply_conv_mode(plan._output, in1.shape, in2.shape, mode, axes))
+
+def oaconvolve(in1, in2, mode='full', axes=None,
+        planner_effort='FFTW_MEASURE', threads=1):
+    '''Convolve two N-dimensional arrays using the overlap-add method.
+
+    The larger input is split into blocks along each of the convolved
+    axes along which that is worthwhile, and all the blocks are
+    transformed together. This is generally much faster than
+    :func:`fftconvolve` when one input is much larger than the other.
+    When the inputs are of similar size, this is equivalent to
+    :func:`fftconvolve`.
+
+    The first four arguments are as per :func:`scipy.signal.oaconvolve`;
+    the rest of the arguments are documented
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    in1, in2, axes = _init_conv_args(in1, in2, mode, axes)
+
+    trivial = _trivial_convolution(in1, in2, axes)
+    if trivial is not None:
+        return trivial
+
+    shape1 = in1.shape
+    shape2 = in2.shape
+
+    if all(shape2[n] <= shape1[n] for n in axes):
+        large, small = in1, in2
+    elif all(shape1[n] <= shape2[n] for n in axes):
+        large, small = in2, in1
+    else:
+        return fftconvolve(in1, in2, mode, axes, planner_effort, threads)
+
+    # Work out how each of the axes is to be split into blocks
+    steps = {}
+    for n in axes:
+        block_size = _optimal_convolver_block_size(small.shape[n])
+        step = block_size - small.shape[n] + 1
+
+        if step < large.shape[n]:
+            steps[n] = (step, block_size)
+
+    if len(steps) == 0:
+        return fftconvolve(in1, in2, mode, axes, planner_effort, threads)
+
+    dtype = _conv_dtype(in1, in2)
+
+    # Each blocked axis of the large array is reshaped into a pair of
+    # axes of (n_blocks, step), and the small array is given a length 1
+    # axis for it to broadcast along.
+    large_shape = []
+    padded_large_shape = []
+    small_shape = []
+    fft_axes = []
+    fft_shape = []
+    for n in range(large.ndim):
+        if n in steps:
+            step, block_size = steps[n]
+            n_blocks = -(-large.shape[n]//step)
+
+            large_shape += [n_blocks, step]
+            small_shape += [1, small.shape[n]]
+            padded_large_shape.append(n_blocks * step)
+            fft_axes.append(len(large_shape) - 1)
+            fft_shape.append(block_size)
+
+        else:
+            large_shape.append(large.shape[n])
+            small_shape.append(small.shape[n])
+            padded_large_shape.append(large.shape[n])
+
+            if n in axes:
+                fft_axes.append(len(large_shape) - 1)
+                fft_shape.append(
+                        next_fast_len(large.shape[n] + small.shape[n] - 1))
+
+    if tuple(padded_large_shape) != large.shape:
+        padded_large = numpy.zeros(padded_large_shape, dtype=large.dtype)
+        padded_large[tuple(slice(0, n) for n in large.shape)] = large
+        large = padded_large
+
+    large = large.reshape(large_shape)
+    small = small.reshape(small_shape)
+
+    plan = _get_plan(large.shape, small.shape, tuple(fft_shape),
+            tuple(fft_axes), dtype, planner_effort, threads)
+
+    blocks = plan(large, small, (slice(None),) * large.ndim)
+
+    # Add the overlapping blocks back together, working backwards so that
+    # the positions of the axes yet to be done are unchanged.
+    for n in reversed(sorted(steps)):
+        step, block_size = steps[n]
+        full_length = shape1[n] + shape2[n] - 1
+        position = fft_axes[axes.index(n)] - 1
+
+        # Move the (n_blocks, step) pair of axes to the end
+        blocks = numpy.rollaxis(blocks, position, blocks.ndim)
+        blocks = numpy.rollaxis(blocks, position, blocks.ndim)
+        n_blocks = blocks.shape[-2]
+
+        summed = numpy.zeros(blocks.shape[:-2] + (n_blocks + 1, step),
+                dtype=blocks.dtype)
+
+        summed[..., :-1, :] += blocks[..., :step]
+        summed[..., 1:, :block_size - step] += blocks[..., step:]
+
+        summed = summed.reshape(blocks.shape[:-2] + ((n_blocks + 1) * step,))
+        blocks = numpy.rollaxis(summed[..., :full_length], summed.ndim - 1,
+                position)
+
+    return blocks[_apply_conv_mode(blocks, shape1, shape2, mode, axes)]
+
+def correlate(in1, in2, mode='full', method='auto', axes=None,
+        planner_effort='FFTW_MEASURE', threads=1):
+    '''Cross-correlate two N-dimensional arrays using FFTs.
+
+    The first three arguments are as per :func:`scipy.signal.correlate`.
+    Only the FFT method is implemented, so ``method`` should be ``'auto'``
+    or ``'fft'``. ``axes`` restricts the correlation to the given axes, as
+    per :func:`fftconvolve`. The rest of the arguments are documented
+    in the :ref:`additional argument docs<interfaces_additional_args>`.
+    '''
+    if method not in ('auto', 'fft'):
+        raise ValueError('Invalid method: The method should be \'auto\' '
+                'or \'fft\'.')
+
+    in1, in2, axes = _init_conv_args(in1, in2, mode, axes)
+
+    reverser = tuple(
+            slice(None, None, -1) if n in axes else slice(None)
+            for n in range(in2.ndim))
+
+    in2 = in2[reverser]
+    if numpy.iscomplexobj(in2):
+        in2 = in2.conj()
+
+    return fftconvolve(in1, in2, mode, axes, planner_effort, threads)
@@ -73,6 +73,9 @@ cdef extern from 'fftw3.h':
     # we ignore the distinction in order to simplify the code.
     ctypedef struct fftw_iodim:
         pass
+
+    # The kind of a real to real transform (an enum in fftw3.h)
+    ctypedef int fftw_r2r_kind
     
     # Double precision complex planner
     fftw_plan fftw_plan_guru_dft(
@@ -137,6 +140,27 @@ cdef extern from 'fftw3.h':
             clongdouble *_in, long double *_out,
             unsigned flags)
 
+    # Double precision real to real planner
+    fftw_plan fftw_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            double *_in, double *_out,
+            fftw_r2r_kind *kind, unsigned flags)
+
+    # Single precision real to real planner
+    fftwf_plan fftwf_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            float *_in, float *_out,
+            fftw_r2r_kind *kind, unsigned flags)
+
+    # Long double precision real to real planner
+    fftwl_plan fftwl_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            long double *_in, long double *_out,
+            fftw_r2r_kind *kind, unsigned flags)
+
     # Double precision complex new array execute
     void fftw_execute_dft(fftw_plan,
           cdouble *_in, cdouble *_out) nogil
@@ -173,6 +197,18 @@ cdef extern from 'fftw3.h':
     void fftwl_execute_dft_c2r(fftwl_plan,
           clongdouble *_in, long double *_out) nogil
 
+    # Double precision real to real new array execute
+    void fftw_execute_r2r(fftw_plan,
+          double *_in, double *_out) nogil
+
+    # Single precision real to real new array execute
+    void fftwf_execute_r2r(fftwf_plan,
+          float *_in, float *_out) nogil
+
+    # Long double precision real to real new array execute
+    void fftwl_execute_r2r(fftwl_plan,
+          long double *_in, long double *_out) nogil
+
     # Double precision plan destroyer
     void fftw_destroy_plan(fftw_plan)
 
@@ -243,7 +279,7 @@ ctypedef void * (*fftw_generic_plan_guru)(
         int rank, fftw_iodim *dims,
         int howmany_rank, fftw_iodim *howmany_dims,
         void *_in, void *_out,
-        int sign, int flags)
+        int *directions, int flags)
 
 ctypedef void (*fftw_generic_execute)(void *_plan, void *_in, void *_out) nogil
 
@@ -264,6 +300,20 @@ cdef enum:
     FFTW_FORWARD = -1
     FFTW_BACKWARD = 1
 
+# Real to real kinds enum
+cdef enum:
+    FFTW_R2HC = 0
+    FFTW_HC2R = 1
+    FFTW_DHT = 2
+    FFTW_REDFT00 = 3
+    FFTW_REDFT01 = 4
+    FFTW_REDFT10 = 5
+    FFTW_REDFT11 = 6
+    FFTW_RODFT00 = 7
+    FFTW_RODFT01 = 8
+    FFTW_RODFT10 = 9
+    FFTW_RODFT11 = 10
+
 # Documented flags
 cdef enum:
     FFTW_MEASURE = 0
@@ -274,4 +324,5 @@ cdef enum:
     FFTW_PRESERVE_INPUT = 16
     FFTW_PATIENT = 32
     FFTW_ESTIMATE = 64
+    FFTW_WISDOM_ONLY = 2097152
 
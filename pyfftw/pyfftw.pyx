@@ -40,6 +40,9 @@ from libc cimport limits
 
 import warnings
 
+# Needed for the parts of the numpy C API that are not just macros
+np.import_array()
+
 include 'utils.pxi'
 
 cdef extern from *:
@@ -53,13 +56,34 @@ cdef object directions_lookup
 directions_lookup = {FFTW_FORWARD: 'FFTW_FORWARD',
         FFTW_BACKWARD: 'FFTW_BACKWARD'}
 
+# The kinds of real to real transform, which take the place of the
+# direction for the r2r schemes.
+cdef object r2r_kinds
+r2r_kinds = {'FFTW_R2HC': FFTW_R2HC,
+        'FFTW_HC2R': FFTW_HC2R,
+        'FFTW_DHT': FFTW_DHT,
+        'FFTW_REDFT00': FFTW_REDFT00,
+        'FFTW_REDFT01': FFTW_REDFT01,
+        'FFTW_REDFT10': FFTW_REDFT10,
+        'FFTW_REDFT11': FFTW_REDFT11,
+        'FFTW_RODFT00': FFTW_RODFT00,
+        'FFTW_RODFT01': FFTW_RODFT01,
+        'FFTW_RODFT10': FFTW_RODFT10,
+        'FFTW_RODFT11': FFTW_RODFT11}
+
+# The r2r kinds that are the inverses (up to scaling) of another kind,
+# and so are normalised like a backwards transform.
+cdef object r2r_inverse_kinds
+r2r_inverse_kinds = frozenset(('FFTW_HC2R', 'FFTW_REDFT01', 'FFTW_RODFT01'))
+
 cdef object flag_dict
 flag_dict = {'FFTW_MEASURE': FFTW_MEASURE,
         'FFTW_EXHAUSTIVE': FFTW_EXHAUSTIVE,
         'FFTW_PATIENT': FFTW_PATIENT,
         'FFTW_ESTIMATE': FFTW_ESTIMATE,
         'FFTW_UNALIGNED': FFTW_UNALIGNED,
-        'FFTW_DESTROY_INPUT': FFTW_DESTROY_INPUT}
+        'FFTW_DESTROY_INPUT': FFTW_DESTROY_INPUT,
+        'FFTW_WISDOM_ONLY': FFTW_WISDOM_ONLY}
 
 _flag_dict = flag_dict.copy()
 
@@ -80,43 +104,43 @@ cdef void* _fftw_plan_guru_dft(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftw_plan_guru_dft(rank, dims,
             howmany_rank, howmany_dims,
             <cdouble *>_in, <cdouble *>_out,
-            sign, flags)
+            directions[0], flags)
 
 # Complex single precision
 cdef void* _fftwf_plan_guru_dft(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwf_plan_guru_dft(rank, dims,
             howmany_rank, howmany_dims,
             <cfloat *>_in, <cfloat *>_out,
-            sign, flags)
+            directions[0], flags)
 
 # Complex long double precision
 cdef void* _fftwl_plan_guru_dft(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwl_plan_guru_dft(rank, dims,
             howmany_rank, howmany_dims,
             <clongdouble *>_in, <clongdouble *>_out,
-            sign, flags)
+            directions[0], flags)
 
 # real to complex double precision
 cdef void* _fftw_plan_guru_dft_r2c(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftw_plan_guru_dft_r2c(rank, dims,
             howmany_rank, howmany_dims,
@@ -128,7 +152,7 @@ cdef void* _fftwf_plan_guru_dft_r2c(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwf_plan_guru_dft_r2c(rank, dims,
             howmany_rank, howmany_dims,
@@ -140,7 +164,7 @@ cdef void* _fftwl_plan_guru_dft_r2c(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwl_plan_guru_dft_r2c(rank, dims,
             howmany_rank, howmany_dims,
@@ -152,7 +176,7 @@ cdef void* _fftw_plan_guru_dft_c2r(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftw_plan_guru_dft_c2r(rank, dims,
             howmany_rank, howmany_dims,
@@ -164,7 +188,7 @@ cdef void* _fftwf_plan_guru_dft_c2r(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwf_plan_guru_dft_c2r(rank, dims,
             howmany_rank, howmany_dims,
@@ -176,13 +200,49 @@ cdef void* _fftwl_plan_guru_dft_c2r(
             int rank, fftw_iodim *dims,
             int howmany_rank, fftw_iodim *howmany_dims,
             void *_in, void *_out,
-            int sign, int flags):
+            int *directions, int flags):
 
     return <void *>fftwl_plan_guru_dft_c2r(rank, dims,
             howmany_rank, howmany_dims,
             <clongdouble *>_in, <long double *>_out,
             flags)
 
+# real to real double precision
+cdef void* _fftw_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            void *_in, void *_out,
+            int *directions, int flags):
+
+    return <void *>fftw_plan_guru_r2r(rank, dims,
+            howmany_rank, howmany_dims,
+            <double *>_in, <double *>_out,
+            <fftw_r2r_kind *>directions, flags)
+
+# real to real single precision
+cdef void* _fftwf_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            void *_in, void *_out,
+            int *directions, int flags):
+
+    return <void *>fftwf_plan_guru_r2r(rank, dims,
+            howmany_rank, howmany_dims,
+            <float *>_in, <float *>_out,
+            <fftw_r2r_kind *>directions, flags)
+
+# real to real long double precision
+cdef void* _fftwl_plan_guru_r2r(
+            int rank, fftw_iodim *dims,
+            int howmany_rank, fftw_iodim *howmany_dims,
+            void *_in, void *_out,
+            int *directions, int flags):
+
+    return <void *>fftwl_plan_guru_r2r(rank, dims,
+            howmany_rank, howmany_dims,
+            <long double *>_in, <long double *>_out,
+            <fftw_r2r_kind *>directions, flags)
+
 #    Executors
 #    =========
 #
@@ -240,6 +300,24 @@ cdef void _fftwl_execute_dft_c2r(void *_plan, void *_in, void *_out) nogil:
     fftwl_execute_dft_c2r(<fftwl_plan>_plan, 
             <clongdouble *>_in, <long double *>_out)
 
+# real to real double precision
+cdef void _fftw_execute_r2r(void *_plan, void *_in, void *_out) nogil:
+
+    fftw_execute_r2r(<fftw_plan>_plan,
+            <double *>_in, <double *>_out)
+
+# real to real single precision
+cdef void _fftwf_execute_r2r(void *_plan, void *_in, void *_out) nogil:
+
+    fftwf_execute_r2r(<fftwf_plan>_plan,
+            <float *>_in, <float *>_out)
+
+# real to real long double precision
+cdef void _fftwl_execute_r2r(void *_plan, void *_in, void *_out) nogil:
+
+    fftwl_execute_r2r(<fftwl_plan>_plan,
+            <long double *>_in, <long double *>_out)
+
 #    Destroyers
 #    ==========
 #
@@ -263,7 +341,7 @@ cdef void _fftwl_destroy_plan(void *_plan):
 # ======================
 
 # Planner table (of side the number of planners).
-cdef fftw_generic_plan_guru planners[9]
+cdef fftw_generic_plan_guru planners[12]
 
 cdef fftw_generic_plan_guru * _build_planner_list():
 
@@ -276,9 +354,12 @@ cdef fftw_generic_plan_guru * _build_planner_list():
     planners[6] = <fftw_generic_plan_guru>&_fftw_plan_guru_dft_c2r
     planners[7] = <fftw_generic_plan_guru>&_fftwf_plan_guru_dft_c2r
     planners[8] = <fftw_generic_plan_guru>&_fftwl_plan_guru_dft_c2r
+    planners[9] = <fftw_generic_plan_guru>&_fftw_plan_guru_r2r
+    planners[10] = <fftw_generic_plan_guru>&_fftwf_plan_guru_r2r
+    planners[11] = <fftw_generic_plan_guru>&_fftwl_plan_guru_r2r
 
 # Executor table (of size the number of executors)
-cdef fftw_generic_execute executors[9]
+cdef fftw_generic_execute executors[12]
 
 cdef fftw_generic_execute * _build_executor_list():
 
@@ -291,6 +372,9 @@ cdef fftw_generic_execute * _build_executor_list():
     executors[6] = <fftw_generic_execute>&_fftw_execute_dft_c2r
     executors[7] = <fftw_generic_execute>&_fftwf_execute_dft_c2r
     executors[8] = <fftw_generic_execute>&_fftwl_execute_dft_c2r
+    executors[9] = <fftw_generic_execute>&_fftw_execute_r2r
+    executors[10] = <fftw_generic_execute>&_fftwf_execute_r2r
+    executors[11] = <fftw_generic_execute>&_fftwl_execute_r2r
 
 # Destroyer table (of size the number of destroyers)
 cdef fftw_generic_destroy_plan destroyers[3]
@@ -353,9 +437,12 @@ cdef bint _validate_r2c_arrays(np.ndarray input_array,
             return False
     
     # The critical axis is the last of those over which the 
-    # FFT is taken.
+    # FFT is taken. The output can also be the full length, in which
+    # case the rest of it is filled from the Hermitian symmetry.
     if not (out_shape[axes[axes_length-1]]
-            == in_shape[axes[axes_length-1]]//2 + 1):
+            == in_shape[axes[axes_length-1]]//2 + 1 or
+            out_shape[axes[axes_length-1]]
+            == in_shape[axes[axes_length-1]]):
         return False
 
     for n in range(input_array.ndim - axes_length):
@@ -442,13 +529,16 @@ fftw_schemes = {
         (np.dtype('float64'), np.dtype('complex128')): ('r2c', '64'),
         (np.dtype('float32'), np.dtype('complex64')): ('r2c', '32'),
         (np.dtype('complex128'), np.dtype('float64')): ('c2r', '64'),
-        (np.dtype('complex64'), np.dtype('float32')): ('c2r', '32')}
+        (np.dtype('complex64'), np.dtype('float32')): ('c2r', '32'),
+        (np.dtype('float64'), np.dtype('float64')): ('r2r', '64'),
+        (np.dtype('float32'), np.dtype('float32')): ('r2r', '32')}
 
 if np.dtype('longdouble') != np.dtype('float64'):
     fftw_schemes.update({
         (np.dtype('clongdouble'), np.dtype('clongdouble')): ('c2c', 'ld'),
         (np.dtype('longdouble'), np.dtype('clongdouble')): ('r2c', 'ld'),
-        (np.dtype('clongdouble'), np.dtype('longdouble')): ('c2r', 'ld')})
+        (np.dtype('clongdouble'), np.dtype('longdouble')): ('c2r', 'ld'),
+        (np.dtype('longdouble'), np.dtype('longdouble')): ('r2r', 'ld')})
 
 
 cdef object scheme_directions
@@ -461,7 +551,10 @@ scheme_directions = {
         ('r2c', 'ld'): ['FFTW_FORWARD'],
         ('c2r', '64'): ['FFTW_BACKWARD'],
         ('c2r', '32'): ['FFTW_BACKWARD'],
-        ('c2r', 'ld'): ['FFTW_BACKWARD']}
+        ('c2r', 'ld'): ['FFTW_BACKWARD'],
+        ('r2r', '64'): list(r2r_kinds),
+        ('r2r', '32'): list(r2r_kinds),
+        ('r2r', 'ld'): list(r2r_kinds)}
 
 # In the following, -1 denotes using the default. A segfault has been
 # reported on some systems when this is set to None. It seems 
@@ -492,7 +585,13 @@ scheme_functions = {
         'fft_shape_lookup': _lookup_shape_c2r_arrays},
     ('c2r', 'ld'): {'planner':8, 'executor':8, 'generic_precision':2,
         'validator': 1, 
-        'fft_shape_lookup': _lookup_shape_c2r_arrays}}
+        'fft_shape_lookup': _lookup_shape_c2r_arrays},
+    ('r2r', '64'): {'planner':9, 'executor':9, 'generic_precision':0,
+        'validator': -1, 'fft_shape_lookup': -1},
+    ('r2r', '32'): {'planner':10, 'executor':10, 'generic_precision':1,
+        'validator': -1, 'fft_shape_lookup': -1},
+    ('r2r', 'ld'): {'planner':11, 'executor':11, 'generic_precision':2,
+        'validator': -1, 'fft_shape_lookup': -1}}
 
 # Initialize the module
 
@@ -520,6 +619,329 @@ cdef void _cleanup():
 Py_AtExit(_cleanup)
 
 # Helper functions
+ctypedef fused _hermitian_real_t:
+    float
+    double
+    long double
+
+cdef void _fill_hermitian(_hermitian_real_t *data, int ndim,
+        np.npy_intp *shape, np.npy_intp *strides, char *reflect,
+        np.npy_intp *counters) nogil:
+    ''' Fill in the second half of the complex array ``data`` along the
+    axis for which ``reflect`` is 2, from the conjugate of the first half,
+    reflecting the indices along the other axes for which ``reflect`` is
+    1. That is, complete the DFT of a real array over those axes, of
+    which FFTW only computes the first ``n//2 + 1`` values along the
+    last axis. The strides are in bytes.
+
+    ``counters`` is scratch space for ``ndim`` indices.
+    '''
+    cdef int d
+    cdef int axis = -1
+    cdef np.npy_intp k, n, offset, reflected_offset
+    cdef _hermitian_real_t *value
+    cdef _hermitian_real_t *reflected_value
+
+    for d in range(ndim):
+        if shape[d] == 0:
+            return
+
+        if reflect[d] == 2:
+            axis = d
+
+        counters[d] = 0
+
+    n = shape[axis]
+
+    # Every line along the axis is visited in turn
+    while True:
+        offset = 0
+        reflected_offset = 0
+
+        for d in range(ndim):
+            if d == axis:
+                continue
+
+            offset += counters[d] * strides[d]
+
+            if reflect[d] and counters[d] != 0:
+                reflected_offset += (shape[d] - counters[d]) * strides[d]
+            else:
+                reflected_offset += counters[d] * strides[d]
+
+        for k in range(n//2 + 1, n):
+            value = <_hermitian_real_t *>(
+                    <char *>data + offset + k * strides[axis])
+            reflected_value = <_hermitian_real_t *>(
+                    <char *>data + reflected_offset + (n - k) * strides[axis])
+
+            value[0] = reflected_value[0]
+            value[1] = -reflected_value[1]
+
+        d = ndim - 1
+        while d >= 0:
+            if d != axis:
+                counters[d] += 1
+                if counters[d] < shape[d]:
+                    break
+
+                counters[d] = 0
+
+            d -= 1
+
+        if d < 0:
+            break
+
+cdef inline void _swap_values(_hermitian_real_t *line, Py_ssize_t stride,
+        np.npy_intp j, np.npy_intp k, Py_ssize_t inner_stride,
+        np.npy_intp inner_n, int width) nogil:
+    cdef np.npy_intp i
+    cdef int w
+    cdef _hermitian_real_t tmp
+    cdef char *value_j = <char *>line + j*stride
+    cdef char *value_k = <char *>line + k*stride
+
+    for i in range(inner_n):
+        for w in range(width):
+            tmp = (<_hermitian_real_t *>value_j)[w]
+            (<_hermitian_real_t *>value_j)[w] = (
+                    <_hermitian_real_t *>value_k)[w]
+            (<_hermitian_real_t *>value_k)[w] = tmp
+
+        value_j += inner_stride
+        value_k += inner_stride
+
+cdef inline void _reverse_values(_hermitian_real_t *line, Py_ssize_t stride,
+        np.npy_intp start, np.npy_intp stop, Py_ssize_t inner_stride,
+        np.npy_intp inner_n, int width) nogil:
+    stop -= 1
+
+    while start < stop:
+        _swap_values(line, stride, start, stop, inner_stride, inner_n, width)
+        start += 1
+        stop -= 1
+
+cdef void _fftshift_line(_hermitian_real_t *line, Py_ssize_t stride,
+        np.npy_intp n, Py_ssize_t inner_stride, np.npy_intp inner_n,
+        int width) nogil:
+    ''' Rotate the ``n`` values of a line in place as
+    :func:`numpy.fft.fftshift` does, moving the value at ``0`` to ``n//2``.
+    Each value is itself ``inner_n`` values ``inner_stride`` apart, each of
+    which is ``width`` reals. The strides are in bytes.
+    '''
+    cdef np.npy_intp k
+    cdef np.npy_intp half = n//2
+
+    if n % 2 == 0:
+        # Swapping the halves is the same thing
+        for k in range(half):
+            _swap_values(line, stride, k, k + half, inner_stride, inner_n,
+                    width)
+    else:
+        _reverse_values(line, stride, 0, n, inner_stride, inner_n, width)
+        _reverse_values(line, stride, 0, half, inner_stride, inner_n, width)
+        _reverse_values(line, stride, half, n, inner_stride, inner_n, width)
+
+cdef void _fftshift_even(_hermitian_real_t *data, int ndim,
+        np.npy_intp *shape, np.npy_intp *strides, char *shift,
+        int inner_axis, np.npy_intp *counters, int width) nogil:
+    ''' Shift ``data`` in place as :func:`numpy.fft.fftshift` does over 
+    the axes for which ``shift`` is true, all of which should be of even
+    length, in a single pass. That is, swap each value with the one
+    half the length along away along each of those axes. The values are
+    swapped a line along ``inner_axis`` at a time, and each is ``width``
+    reals. The strides are in bytes.
+
+    ``counters`` is scratch space for ``ndim`` indices.
+    '''
+    cdef int d
+    cdef int first_axis = -1
+    cdef np.npy_intp k, offset, partner_offset, index
+    cdef np.npy_intp n = shape[inner_axis]
+    cdef Py_ssize_t inner_stride = strides[inner_axis]
+    cdef np.npy_intp inner_half = n//2 if shift[inner_axis] else 0
+
+    for d in range(ndim):
+        if shape[d] == 0:
+            return
+
+        if first_axis == -1 and shift[d] and d != inner_axis:
+            first_axis = d
+
+        counters[d] = 0
+
+    # Every line along the inner axis is visited in turn
+    while True:
+        offset = 0
+        partner_offset = 0
+
+        for d in range(ndim):
+            if d == inner_axis:
+                continue
+
+            offset += counters[d] * strides[d]
+
+            index = counters[d]
+            if shift[d]:
+                index = (index + shape[d]//2) % shape[d]
+
+            partner_offset += index * strides[d]
+
+        if first_axis == -1:
+            # Only the inner axis is shifted
+            _swap_values(<_hermitian_real_t *>(<char *>data + offset),
+                    inner_stride, 0, inner_half, inner_stride, inner_half,
+                    width)
+
+        elif counters[first_axis] < shape[first_axis]//2:
+            # The partner line is in the other half along the first axis,
+            # so each pair of values is only swapped once.
+            for k in range(n):
+                _swap_values(data, 1, offset + k*inner_stride,
+                        partner_offset + ((k + inner_half) % n)*inner_stride,
+                        0, 1, width)
+
+        d = ndim - 1
+        while d >= 0:
+            if d != inner_axis:
+                counters[d] += 1
+                if counters[d] < shape[d]:
+                    break
+
+                counters[d] = 0
+
+            d -= 1
+
+        if d < 0:
+            break
+
+def _fftshift_array(np.ndarray array, axes):
+    '''_fftshift_array(array, axes)
+
+    Shift the floating point array ``array`` in place over ``axes`` as
+    ``array[:] = numpy.fft.fftshift(array, axes)`` would, but without 
+    making any temporary arrays.
+    '''
+    cdef int axis, each_axis, inner_axis, lines_axis
+    cdef int ndim = np.PyArray_NDIM(array)
+    cdef np.npy_intp *shape = np.PyArray_DIMS(array)
+    cdef np.npy_intp *strides = np.PyArray_STRIDES(array)
+    cdef void *data = np.PyArray_DATA(array)
+    cdef char *shift = NULL
+    cdef bint shift_even = False
+    cdef np.npy_intp *counters = NULL
+    cdef np.ndarray lines_array
+    cdef np.flatiter lines
+    cdef void *line
+    cdef Py_ssize_t stride, inner_stride
+    cdef np.npy_intp n, inner_n
+    cdef int width = 2 if np.PyArray_ISCOMPLEX(array) else 1
+    cdef int precision
+
+    if array.dtype.char in 'fF':
+        precision = 1
+    elif array.dtype.char in 'dD':
+        precision = 0
+    else:
+        precision = 2
+
+    if array.size == 0:
+        return
+
+    # The axes of even length are all shifted together in one pass
+    shift = <char *>calloc(ndim, sizeof(char))
+    counters = <np.npy_intp *>malloc(ndim * sizeof(np.npy_intp))
+
+    try:
+        if shift == NULL or counters == NULL:
+            raise MemoryError
+
+        odd_axes = []
+        for axis in axes:
+            if array.shape[axis] % 2 == 0:
+                shift[axis] = 1
+                shift_even = True
+            elif axis not in odd_axes:
+                odd_axes.append(axis)
+
+        # The lines along the axis with the smallest stride are accessed
+        # in order.
+        inner_axis = 0
+        for each_axis in range(ndim):
+            if abs(strides[each_axis]) < abs(strides[inner_axis]):
+                inner_axis = each_axis
+
+        if shift_even:
+            with nogil:
+                if precision == 0:
+                    _fftshift_even(<double *>data, ndim, shape, strides,
+                            shift, inner_axis, counters, width)
+                elif precision == 1:
+                    _fftshift_even(<float *>data, ndim, shape, strides,
+                            shift, inner_axis, counters, width)
+                else:
+                    _fftshift_even(<long double *>data, ndim, shape,
+                            strides, shift, inner_axis, counters, width)
+
+    finally:
+        free(shift)
+        free(counters)
+
+    # Each odd axis is rotated in turn
+    for axis in odd_axes:
+        stride = strides[axis]
+        n = shape[axis]
+
+        # Unless the axis has the smallest stride, the values along it
+        # are swapped a whole line along the axis with the smallest
+        # stride at a time.
+        if abs(strides[axis]) <= abs(strides[inner_axis]):
+            lines_array = array
+            lines_axis = axis
+            inner_stride = 0
+            inner_n = 1
+
+        else:
+            lines_array = array[(slice(None),)*inner_axis + (0,)]
+            lines_axis = axis if axis < inner_axis else axis - 1
+            inner_stride = strides[inner_axis]
+            inner_n = shape[inner_axis]
+
+        lines = np.PyArray_IterAllButAxis(lines_array, &lines_axis)
+
+        while np.PyArray_ITER_NOTDONE(lines):
+            line = np.PyArray_ITER_DATA(lines)
+
+            with nogil:
+                if precision == 0:
+                    _fftshift_line(<double *>line, stride, n, inner_stride,
+                            inner_n, width)
+                elif precision == 1:
+                    _fftshift_line(<float *>line, stride, n, inner_stride,
+                            inner_n, width)
+                else:
+                    _fftshift_line(<long double *>line, stride, n,
+                            inner_stride, inner_n, width)
+
+            np.PyArray_ITER_NEXT(lines)
+
+cdef int64_t _r2r_logical_N(kind, int64_t n) except -1:
+    ''' Returns the logical size of a real to real transform of kind
+    ``kind`` over an axis of length ``n``, which is the size of the DFT
+    to which it corresponds.
+    '''
+    if kind in ('FFTW_R2HC', 'FFTW_HC2R', 'FFTW_DHT'):
+        return n
+    elif kind == 'FFTW_REDFT00':
+        if n < 2:
+            raise ValueError('Invalid shapes: '
+                    'FFTW_REDFT00 needs an axis of length at least 2.')
+        return 2 * (n - 1)
+    elif kind == 'FFTW_RODFT00':
+        return 2 * (n + 1)
+    else:
+        return 2 * n
+
 cdef void make_axes_unique(int64_t *axes, int64_t axes_length, 
         int64_t **unique_axes, int64_t **not_axes, int64_t dimensions, 
         int64_t *unique_axes_length):
@@ -631,6 +1053,8 @@ cdef class FFTW:
     cdef np.ndarray _input_array
     cdef np.ndarray _output_array
     cdef int _direction
+    cdef int *_r2r_kinds
+    cdef object _r2r_kinds_used
     cdef int _flags
 
     cdef bint _simd_allowed
@@ -658,6 +1082,13 @@ cdef class FFTW:
     cdef int64_t *_axes
     cdef int64_t *_not_axes
 
+    # For a real forward transform to a full length output, which axes
+    # are reflected by the Hermitian symmetry.
+    cdef bint _hermitian_fill
+    cdef int _precision
+    cdef char *_hermitian_reflect
+    cdef np.npy_intp *_hermitian_counters
+
     cdef int64_t _N
     def _get_N(self):
         '''
@@ -783,8 +1214,12 @@ cdef class FFTW:
     def _get_direction(self):
         '''
         Return the planned FFT direction. Either `'FFTW_FORWARD'` or 
-        `'FFTW_BACKWARD'`.
+        `'FFTW_BACKWARD'`, or for a real to real transform, the list of
+        the kinds of transform along each axis.
         '''
+        if self._r2r_kinds_used is not None:
+            return list(self._r2r_kinds_used)
+
         return directions_lookup[self._direction]
     
     direction = property(_get_direction)
@@ -815,6 +1250,9 @@ cdef class FFTW:
 
         self._axes = NULL
         self._not_axes = NULL
+        self._hermitian_reflect = NULL
+        self._hermitian_counters = NULL
+        self._r2r_kinds = NULL
 
         flags = list(flags)
 
@@ -855,6 +1293,7 @@ cdef class FFTW:
         self._fftw_planner = planners[functions['planner']]
         self._fftw_execute = executors[functions['executor']]
         self._fftw_destroy = destroyers[functions['generic_precision']]
+        self._precision = functions['generic_precision']
 
         self._nthreads_plan_setter = (
                 nthreads_plan_setters[functions['generic_precision']])
@@ -918,12 +1357,34 @@ cdef class FFTW:
                     'The output array is expected to lie on a %d '
                     'byte boundary.' % self._output_array_alignment)
 
-        if not direction in scheme_directions[scheme]:
+        if scheme[0] == 'r2r':
+            # The direction is the kind of transform, either one for all
+            # the axes or a list with one for each axis.
+            if isinstance(direction, str):
+                direction_list = [direction] * len(axes)
+            else:
+                direction_list = list(direction)
+
+            if not len(direction_list) == len(axes):
+                raise ValueError('Invalid direction: '
+                        'There should be one kind of real to real '
+                        'transform for each axis.')
+
+            for each_kind in direction_list:
+                if not each_kind in scheme_directions[scheme]:
+                    raise ValueError('Invalid direction: '
+                            'The direction is not valid for the scheme. '
+                            'For a real to real transform it should be '
+                            'one of the real to real kinds.')
+
+        elif not direction in scheme_directions[scheme]:
             raise ValueError('Invalid direction: '
                     'The direction is not valid for the scheme. '
                     'Try setting it explicitly if it is not already.')
 
-        self._direction = directions[direction]
+        else:
+            self._direction = directions[direction]
+
         self._input_shape = input_array.shape
         self._output_shape = output_array.shape
         
@@ -946,6 +1407,31 @@ cdef class FFTW:
                 raise IndexError('Invalid axes: '
                     'The axes list cannot contain invalid axes.')
 
+        if scheme[0] == 'r2r':
+            # Only the kind for the first of any repeated axes is used,
+            # as for the axes themselves.
+            self._r2r_kinds_used = []
+            seen_axes = set()
+            for n in range(len(axes)):
+                if self._axes[n] not in seen_axes:
+                    seen_axes.add(self._axes[n])
+                    self._r2r_kinds_used.append(direction_list[n])
+
+            self._r2r_kinds = <int *>malloc(
+                    len(self._r2r_kinds_used) * sizeof(int))
+
+            if self._r2r_kinds == NULL:
+                raise MemoryError
+
+            for n, each_kind in enumerate(self._r2r_kinds_used):
+                self._r2r_kinds[n] = r2r_kinds[each_kind]
+
+            # Normalisation on calling applies to the inverse kinds
+            if r2r_inverse_kinds.issuperset(self._r2r_kinds_used):
+                self._direction = FFTW_BACKWARD
+            else:
+                self._direction = FFTW_FORWARD
+
         cdef int64_t unique_axes_length
         cdef int64_t *unique_axes
         cdef int64_t *not_axes
@@ -965,7 +1451,10 @@ cdef class FFTW:
                     'The input array should have no zero length'
                     'axes over which the FFT is to be taken')
 
-            if self._direction == FFTW_FORWARD:
+            if self._r2r_kinds != NULL:
+                total_N *= _r2r_logical_N(self._r2r_kinds_used[n],
+                        self._input_shape[self._axes[n]])
+            elif self._direction == FFTW_FORWARD:
                 total_N *= self._input_shape[self._axes[n]]
             else:
                 total_N *= self._output_shape[self._axes[n]]
@@ -991,6 +1480,28 @@ cdef class FFTW:
 
         self._rank = unique_axes_length
         self._howmany_rank = self._input_array.ndim - unique_axes_length
+
+        # A real forward transform with a full length output only has
+        # the first half (and a bit) of the last axis computed by FFTW.
+        hermitian_axis = self._axes[unique_axes_length - 1]
+        self._hermitian_fill = (scheme[0] == 'r2c' and
+                output_array.shape[hermitian_axis] > 
+                input_array.shape[hermitian_axis]//2 + 1)
+
+        if self._hermitian_fill:
+            self._hermitian_reflect = <char *>calloc(
+                    input_array.ndim, sizeof(char))
+            self._hermitian_counters = <np.npy_intp *>malloc(
+                    input_array.ndim * sizeof(np.npy_intp))
+
+            if (self._hermitian_reflect == NULL or
+                    self._hermitian_counters == NULL):
+                raise MemoryError
+
+            for n in range(unique_axes_length):
+                self._hermitian_reflect[self._axes[n]] = 1
+
+            self._hermitian_reflect[hermitian_axis] = 2
         
         self._flags = 0
         self._flags_used = []
@@ -1003,10 +1514,13 @@ cdef class FFTW:
                         each_flag + '\' is not a valid planner flag.')
 
         
+        destroys_input = scheme[0] == 'c2r' or (
+                scheme[0] == 'r2r' and 'FFTW_HC2R' in self._r2r_kinds_used)
+
         if ('FFTW_DESTROY_INPUT' not in flags) and (
-                (scheme[0] != 'c2r') or not self._rank > 1):
+                not destroys_input or not self._rank > 1):
             # The default in all possible cases is to preserve the input
-            # This is not possible for r2c arrays with rank > 1
+            # This is not possible for c2r or hc2r arrays with rank > 1
             self._flags |= FFTW_PRESERVE_INPUT
 
         # Set up the arrays of structs for holding the stride shape 
@@ -1082,15 +1596,26 @@ cdef class FFTW:
         # Set the timelimit
         set_timelimit_func(_planning_timelimit)
 
+        # The planners take an array of directions, which is only longer
+        # than the one direction for the r2r schemes.
+        cdef int *plan_directions = &self._direction
+        if self._r2r_kinds != NULL:
+            plan_directions = self._r2r_kinds
+
         # Finally, construct the plan
         self._plan = self._fftw_planner(
             self._rank, <fftw_iodim *>self._dims,
             self._howmany_rank, <fftw_iodim *>self._howmany_dims,
             <void *>np.PyArray_DATA(self._input_array),
             <void *>np.PyArray_DATA(self._output_array),
-            self._direction, self._flags)
+            plan_directions, self._flags)
 
         if self._plan == NULL:
+            if self._flags & FFTW_WISDOM_ONLY:
+                raise RuntimeError('No wisdom: '
+                        'FFTW_WISDOM_ONLY was passed and there is no '
+                        'wisdom for this transform.')
+
             raise RuntimeError('The data has an uncaught error that led '+
                     'to the planner returning NULL. This is a bug.')
 
@@ -1153,6 +1678,11 @@ cdef class FFTW:
             possible to preserve the input, making this flag implicit
             in that case. A little more on this is given 
             :ref:`below<scheme_table>`.
+          * ``'FFTW_WISDOM_ONLY'`` is supported.
+            This tells FFTW to only create a plan if there is wisdom for
+            it (at the planning effort that is also passed), without
+            touching the arrays. If there is no such wisdom, a
+            ``RuntimeError`` is raised.
 
           The `FFTW planner flags documentation 
           <http://www.fftw.org/fftw3_doc/Planner-Flags.html#Planner-Flags>`_
@@ -1245,6 +1775,12 @@ cdef class FFTW:
         found in the FFTW documentation on the `real DFT
         <http://www.fftw.org/fftw3_doc/Guru-Real_002ddata-DFTs.html>`_.
 
+        As an extension to this, the output of a Real transform in the
+        Forwards direction can instead be the same shape as the input
+        array, in which case the values FFTW does not compute are filled
+        in from the Hermitian symmetry of the result. The output is then
+        the same as for a Complex transform of the real input.
+
         The actual arrangement in memory is arbitrary and the scheme
         can be planned for any set of strides on either the input
         or the output. The user should not have to worry about this
@@ -1306,6 +1842,15 @@ cdef class FFTW:
         if not self._howmany_dims == NULL:
             free(self._howmany_dims)
 
+        if not self._hermitian_reflect == NULL:
+            free(self._hermitian_reflect)
+
+        if not self._hermitian_counters == NULL:
+            free(self._hermitian_counters)
+
+        if not self._r2r_kinds == NULL:
+            free(self._r2r_kinds)
+
     def __call__(self, input_array=None, output_array=None, 
             normalise_idft=True):
         '''__call__(input_array=None, output_array=None, normalise_idft=True)
@@ -1506,6 +2051,46 @@ cdef class FFTW:
         self._input_array = new_input_array
         self._output_array = new_output_array
 
+    cdef _execute_arrays(self, input_array, output_array,
+            bint normalise_idft):
+        ''' A C interface to :meth:`~pyfftw.FFTW.__call__` for the case
+        where both arrays are given, and the output array is known to have
+        been created to match the original output array. Returns ``False``
+        without doing anything if the output array does not match.
+        '''
+        if not (output_array.strides == self._output_strides and
+                <intptr_t>np.PyArray_DATA(output_array) %
+                self._output_array_alignment == 0):
+            return False
+
+        if (isinstance(input_array, np.ndarray) and
+                input_array.dtype == self._input_dtype and
+                input_array.strides == self._input_strides and
+                input_array.shape == self._input_shape and
+                <intptr_t>np.PyArray_DATA(input_array) %
+                self._input_array_alignment == 0):
+
+            self._update_arrays(input_array, output_array)
+
+        else:
+            input_array = np.asanyarray(input_array)
+
+            if not input_array.shape == self._input_shape:
+                raise ValueError('Invalid input shape: '
+                        'The new input array should be the same shape '
+                        'as the input array used to instantiate the '
+                        'object.')
+
+            self._input_array[:] = input_array
+            self._update_arrays(self._input_array, output_array)
+
+        self.execute()
+
+        if self._direction == FFTW_BACKWARD and normalise_idft:
+            self._output_array *= self._normalisation_scaling
+
+        return True
+
     def get_input_array(self):
         '''get_input_array()
 
@@ -1558,6 +2143,33 @@ cdef class FFTW:
         else:
             fftw_execute(self._plan, input_pointer, output_pointer)
 
+        if self._hermitian_fill:
+            self._fill_hermitian()
+
+    cdef void _fill_hermitian(self):
+        ''' Fill the part of the full length output of a real forward
+        transform that FFTW does not compute.
+        '''
+        cdef void *output_pointer = (
+                <void *>np.PyArray_DATA(self._output_array))
+        cdef int ndim = np.PyArray_NDIM(self._output_array)
+        cdef np.npy_intp *shape = np.PyArray_DIMS(self._output_array)
+        cdef np.npy_intp *strides = np.PyArray_STRIDES(self._output_array)
+
+        with nogil:
+            if self._precision == 0:
+                _fill_hermitian(<double *>output_pointer, ndim, shape,
+                        strides, self._hermitian_reflect,
+                        self._hermitian_counters)
+            elif self._precision == 1:
+                _fill_hermitian(<float *>output_pointer, ndim, shape,
+                        strides, self._hermitian_reflect,
+                        self._hermitian_counters)
+            else:
+                _fill_hermitian(<long double *>output_pointer, ndim, shape,
+                        strides, self._hermitian_reflect,
+                        self._hermitian_counters)
+
 cdef void count_char(char c, void *counter_ptr):
     '''
     On every call, increment the derefenced counter_ptr.
@@ -1769,4 +2381,9 @@ def forget_wisdom():
     fftwf_forget_wisdom()
     fftwl_forget_wisdom()
 
-
+# The convolution engine and the interfaces dispatch are built on the
+# FFTW class, so they are included after it.
+include 'convolve.pxi'
+include 'dispatch.pxi'
+include 'fftpack.pxi'
+include 'copy.pxi'
@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+Picking the number of threads and the planner effort for a transform is
+often guesswork. Too many threads make small transforms slower than one
+thread does, and the effort that pays off depends on the shape and on
+how often the transform is run. :func:`autotune` times the candidates
+for a transform on this machine and records the fastest in a table in a
+local file. The builders in :mod:`pyfftw.builders` and the functions in
+:mod:`pyfftw.interfaces` then look up that table when they are passed
+``threads='auto'`` or ``planner_effort='auto'``.
+
+For example::
+
+    >>> import pyfftw
+    >>> pyfftw.autotune((512, 512), 'complex128')
+    {'threads': 2, 'planner_effort': 'FFTW_MEASURE', ...}
+    >>> a = pyfftw.empty_aligned((512, 512), dtype='complex128')
+    >>> fft = pyfftw.builders.fft2(a, threads='auto',
+    ...         planner_effort='auto')
+
+Each candidate is a :class:`pyfftw.FFTW` object that is planned for a
+number of threads with a planner effort, out of place or (for the complex
+transforms) in place, and on arrays that are aligned for SIMD
+instructions or not. It is timed with :meth:`pyfftw.FFTW.execute`. The
+in place and alignment choices are recorded for reference, but only the
+number of threads and the planner effort are looked up by the builders.
+
+The table is kept in the JSON file given by the ``PYFFTW_AUTOTUNE_TABLE``
+environment variable, or by default in ``pyfftw/autotune.json`` in the
+user's cache directory (``$XDG_CACHE_HOME``, or ``~/.cache``). The
+decisions are kept separately for each kind of CPU, as identified by
+:func:`cpu_key`, so a table can be shared between machines. A transform
+is looked up by its kind, the shape and dtype of its input and its axes,
+so ``'auto'`` only helps with the transforms that have been tuned. Others
+use one thread and ``'FFTW_MEASURE'``.
+'''
+
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+from timeit import default_timer
+
+import numpy
+
+import pyfftw
+from .wisdom import _normalise_entry, _string_types, _transforms
+
+__all__ = ['autotune', 'lookup', 'cpu_key', 'table_path']
+
+_valid_efforts = ('FFTW_ESTIMATE', 'FFTW_MEASURE',
+        'FFTW_PATIENT', 'FFTW_EXHAUSTIVE')
+
+# What 'auto' means for a transform that is not in the table
+_default_threads = 1
+_default_effort = 'FFTW_MEASURE'
+
+# The tables that have been read, by path, with the inode, modification
+# time and size of the file when each was read (the file is replaced as
+# a whole when it is written).
+_tables = {}
+
+def table_path():
+    '''Return the path of the file that holds the table of decisions.
+    '''
+    path = os.environ.get('PYFFTW_AUTOTUNE_TABLE')
+
+    if not path:
+        cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+                os.path.expanduser('~'), '.cache')
+        path = os.path.join(cache_dir, 'pyfftw', 'autotune.json')
+
+    return path
+
+def cpu_key():
+    '''Return the string that identifies the kind of CPU of this machine
+    in the table, made of the machine type, the SIMD features from
+    :func:`pyfftw.cpu_info` and the number of CPUs.
+    '''
+    return '%s-%s-%dcpu' % (platform.machine() or 'unknown',
+            '+'.join(pyfftw.cpu_info()['simd_features']) or 'nosimd',
+            multiprocessing.cpu_count())
+
+def _transform_key(shape, dtype, axes, transform):
+    '''Return the checked transform, as with :mod:`pyfftw.wisdom`, and
+    its key in the table, as in ``'fftn complex128 64x64 axes=0,1'``.
+    The axes are made positive, and each is only counted once, in order.
+    '''
+    entry = _normalise_entry({'shape': shape, 'dtype': dtype, 'axes': axes,
+        'transform': transform}, _default_effort)
+
+    ndim = len(entry['shape'])
+    for axis in entry['axes']:
+        if not -ndim <= axis < ndim:
+            raise ValueError('Invalid axes: '
+                    'The axes list cannot contain invalid axes.')
+
+    entry['axes'] = tuple(sorted(set(axis % ndim for axis in entry['axes'])))
+
+    key = '%s %s %s axes=%s' % (entry['transform'], entry['dtype'],
+            'x'.join(str(n) for n in entry['shape']),
+            ','.join(str(axis) for axis in entry['axes']))
+
+    return entry, key
+
+def _read_table(path):
+    '''Return the table in the file at ``path`` (or an empty one if there
+    is no such file), reading it again only if it has changed.
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+
+    version = (stat.st_ino, stat.st_mtime, stat.st_size)
+
+    if path in _tables and _tables[path][0] == version:
+        return _tables[path][1]
+
+    with open(path, 'r') as f:
+        table = json.load(f)
+
+    _tables[path] = (version, table)
+
+    return table
+
+def _write_decision(path, key, decision):
+    '''Record ``decision`` for the transform ``key`` and this kind of CPU
+    in the table in the file at ``path``. The file is replaced in one go,
+    so it is never seen half written.
+    '''
+    directory = os.path.dirname(os.path.abspath(path))
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    table = dict(_read_table(path))
+    table[cpu_key()] = dict(table.get(cpu_key(), {}))
+    table[cpu_key()][key] = decision
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(table, f, indent=1, sort_keys=True)
+
+        os.replace(temp_path, path)
+
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def lookup(shape, dtype='complex128', axes=None, transform=None,
+        path=None):
+    '''Return the decision recorded by :func:`autotune` for the transform
+    described by the arguments (which are as for :func:`autotune`) on
+    this kind of CPU, or ``None`` if it has not been tuned.
+
+    The decision is a dictionary, as returned by :func:`autotune` but
+    without the ``'timings'``.
+    '''
+    entry, key = _transform_key(shape, dtype, axes, transform)
+
+    if path is None:
+        path = table_path()
+
+    return _read_table(path).get(cpu_key(), {}).get(key)
+
+def _resolve_auto(threads, planner_effort, shape, dtype, axes, transform):
+    '''Return ``threads`` and ``planner_effort`` with either that is
+    ``'auto'`` replaced by the decision in the table for the transform,
+    or by the defaults if there is none. A ``transform`` of ``None`` is
+    never looked up.
+    '''
+    decision = None
+
+    if transform is not None:
+        try:
+            decision = lookup(shape, dtype, axes, transform)
+        except ValueError:
+            pass
+
+    if threads == 'auto':
+        threads = decision['threads'] if decision else _default_threads
+
+    if planner_effort == 'auto':
+        planner_effort = (decision['planner_effort'] if decision
+                else _default_effort)
+
+    return threads, planner_effort
+
+def _candidate_arrays(entry, in_place, aligned):
+    '''Return the input and output arrays of a candidate for the
+    transform ``entry``. The arrays are the same one if ``in_place``
+    (which is only for the complex transforms), and if not ``aligned``,
+    they are one item off the SIMD alignment.
+    '''
+    direction, input_kind, output_kind = _transforms[entry['transform']]
+
+    input_dtype = numpy.dtype(entry['dtype'])
+    complex_dtype = numpy.result_type(input_dtype, 1j)
+    real_dtype = complex_dtype.type(0).real.dtype
+
+    input_shape = entry['shape']
+    output_shape = list(input_shape)
+    last_axis = entry['axes'][-1]
+
+    if output_kind == 'real':
+        output_shape[last_axis] = 2 * (input_shape[last_axis] - 1)
+        output_dtype = real_dtype
+    else:
+        if input_kind == 'real':
+            output_shape[last_axis] = input_shape[last_axis]//2 + 1
+        output_dtype = complex_dtype
+
+    def empty(shape, dtype):
+        offset = 0 if aligned else dtype.itemsize
+        size = int(numpy.prod(shape)) * dtype.itemsize
+        buffer = pyfftw.empty_aligned(size + offset, dtype='int8')
+
+        return numpy.frombuffer(buffer[offset:offset + size].data,
+                dtype=dtype).reshape(shape)
+
+    input_array = empty(input_shape, input_dtype)
+
+    if in_place:
+        output_array = input_array
+    else:
+        output_array = empty(output_shape, output_dtype)
+
+    return input_array, output_array, direction
+
+def _time_execute(FFTW_object, min_time, repeats):
+    '''Return the shortest time in seconds that one call to
+    ``FFTW_object.execute()`` took, over ``repeats`` runs of enough calls
+    to take at least ``min_time`` seconds.
+    '''
+    FFTW_object.execute()
+
+    number = 1
+    while True:
+        start = default_timer()
+        for n in range(number):
+            FFTW_object.execute()
+        elapsed = default_timer() - start
+
+        if elapsed >= min_time:
+            break
+
+        number *= 2 if elapsed <= 0 else max(2, int(min_time/elapsed))
+
+    best = elapsed / number
+    for each_repeat in range(repeats - 1):
+        start = default_timer()
+        for n in range(number):
+            FFTW_object.execute()
+        best = min(best, (default_timer() - start) / number)
+
+    return best
+
+def autotune(shape, dtype='complex128', axes=None, transform=None,
+        threads=None, planner_efforts=('FFTW_ESTIMATE', 'FFTW_MEASURE'),
+        in_place=None, aligned=(True, False), tolerance=0.05,
+        min_time=0.02, repeats=3, path=None, save=True):
+    '''Time the candidate configurations of a transform and return the
+    fastest, recording it in the table (see the module docs) so that
+    ``threads='auto'`` and ``planner_effort='auto'`` use it.
+
+    The transform is described as for :mod:`pyfftw.wisdom`: ``shape`` and
+    ``dtype`` are those of the input array, ``axes`` are the axes of the
+    transform (by default all of them), and ``transform`` is one of
+    ``'fftn'``, ``'ifftn'``, ``'rfftn'`` and ``'irfftn'`` (by default
+    ``'fftn'`` for a complex dtype and ``'rfftn'`` for a real one).
+
+    The candidates are every combination of:
+
+    * ``threads``: The numbers of threads to try. By default, the powers
+      of 2 up to the number of CPUs, and the number of CPUs.
+    * ``planner_efforts``: The planner efforts to try, which are timed in
+      order, so each is planned before the wisdom of any later one is
+      known. The wisdom of this process is set aside while they are
+      timed, and put back (along with the new wisdom) afterwards.
+    * ``in_place``: Whether the transform is in place. By default, both
+      for the complex transforms and out of place for the real ones,
+      which can only be out of place.
+    * ``aligned``: Whether the arrays are aligned for SIMD instructions.
+
+    Each candidate is timed as the shortest of ``repeats`` runs of enough
+    calls to :meth:`pyfftw.FFTW.execute` to take at least ``min_time``
+    seconds. Of the candidates within ``tolerance`` (as a fraction) of
+    the fastest, the one with the fewest threads, then the least planner
+    effort, then out of place and then aligned is picked.
+
+    The decision is returned as a dictionary of ``'threads'``,
+    ``'planner_effort'``, ``'in_place'``, ``'aligned'`` and ``'time'``
+    (the time of a call in seconds), along with ``'timings'``, a list of
+    the same for every candidate. Unless ``save`` is ``False``, it is
+    recorded (without the ``'timings'``) in the table in the file at
+    ``path``, which defaults to :func:`table_path`.
+    '''
+    entry, key = _transform_key(shape, dtype, axes, transform)
+
+    if threads is None:
+        cpu_count = multiprocessing.cpu_count()
+        threads = sorted(set([2**n for n in range(cpu_count.bit_length())
+            if 2**n <= cpu_count] + [cpu_count]))
+
+    elif not isinstance(threads, (list, tuple)):
+        threads = (threads,)
+
+    if isinstance(planner_efforts, _string_types):
+        planner_efforts = (planner_efforts,)
+
+    for planner_effort in planner_efforts:
+        if planner_effort not in _valid_efforts:
+            raise ValueError('Invalid planner effort: %s' % planner_effort)
+
+    for each_threads in threads:
+        if each_threads < 1:
+            raise ValueError('Invalid threads: %r; should be at least 1.'
+                    % (each_threads,))
+
+    complex_transform = _transforms[entry['transform']][1:] == (
+            'complex', 'complex')
+
+    if in_place is None:
+        in_place = (False, True) if complex_transform else (False,)
+
+    elif not isinstance(in_place, (list, tuple)):
+        in_place = (in_place,)
+
+    if not complex_transform and any(in_place):
+        raise ValueError('Invalid in_place: '
+                'Only the complex transforms can be in place.')
+
+    if not isinstance(aligned, (list, tuple)):
+        aligned = (aligned,)
+
+    timings = []
+    wisdom = pyfftw.export_wisdom()
+    pyfftw.forget_wisdom()
+
+    try:
+        for planner_effort, each_threads, each_in_place, each_aligned in (
+                itertools.product(planner_efforts, threads, in_place,
+                    aligned)):
+
+            input_array, output_array, direction = _candidate_arrays(
+                    entry, each_in_place, each_aligned)
+
+            FFTW_object = pyfftw.FFTW(input_array, output_array,
+                    entry['axes'], direction, (planner_effort,),
+                    each_threads)
+
+            input_array[:] = numpy.random.standard_normal(
+                    input_array.shape)
+
+            timings.append({'threads': each_threads,
+                'planner_effort': planner_effort,
+                'in_place': each_in_place,
+                'aligned': each_aligned,
+                'time': _time_execute(FFTW_object, min_time, repeats)})
+
+    finally:
+        pyfftw.import_wisdom(wisdom)
+
+    fastest = min(timing['time'] for timing in timings)
+
+    decision = dict(min(
+        (timing for timing in timings
+            if timing['time'] <= fastest * (1 + tolerance)),
+        key=lambda timing: (timing['threads'],
+            _valid_efforts.index(timing['planner_effort']),
+            timing['in_place'], not timing['aligned'])))
+
+    if save:
+        _write_decision(table_path() if path is None else path, key,
+                decision)
+
+    decision['timings'] = timings
+
+    return decision
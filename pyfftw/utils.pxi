@@ -38,6 +38,7 @@
 cimport numpy as np
 cimport cpu
 from libc.stdint cimport intptr_t
+import operator
 import warnings
 
 
@@ -53,9 +54,93 @@ if _simd_alignment == 16:
 elif _simd_alignment == 32:
     _valid_simd_alignments = (16, 32)
 
+elif _simd_alignment == 64:
+    _valid_simd_alignments = (16, 32, 64)
+
 else:
     _valid_simd_alignments = ()
 
+cdef int _simd_features = cpu.simd_features()
+
+# The names of the SIMD features, in the order they are reported
+_simd_feature_names = (
+        (cpu.SIMD_SSE, 'sse'),
+        (cpu.SIMD_SSE2, 'sse2'),
+        (cpu.SIMD_AVX, 'avx'),
+        (cpu.SIMD_AVX2, 'avx2'),
+        (cpu.SIMD_FMA, 'fma'),
+        (cpu.SIMD_AVX512F, 'avx512f'),
+        (cpu.SIMD_NEON, 'neon'),
+        (cpu.SIMD_SVE, 'sve'))
+
+def cpu_info():
+    '''cpu_info()
+
+    Return a dictionary describing the SIMD capabilities of the running
+    CPU, as found when :mod:`pyfftw` was imported.
+
+    The dictionary has the following keys:
+
+    * ``'simd_features'``: A tuple of the names of the SIMD instruction
+      sets that both the CPU and the operating system support, from
+      ``'sse'``, ``'sse2'``, ``'avx'``, ``'avx2'``, ``'fma'``,
+      ``'avx512f'``, ``'neon'`` and ``'sve'``.
+    * ``'simd_alignment'``: The same as :data:`pyfftw.simd_alignment`.
+    * ``'valid_simd_alignments'``: A tuple of the alignments that
+      :class:`pyfftw.FFTW` considers to allow SIMD operations.
+    '''
+    return {
+        'simd_features': tuple(
+            name for flag, name in _simd_feature_names
+            if _simd_features & flag),
+        'simd_alignment': _simd_alignment,
+        'valid_simd_alignments': _valid_simd_alignments}
+
+def next_fast_len(n, real=False):
+    '''next_fast_len(n, real=False)
+
+    Return the smallest length that is at least ``n`` and that FFTW
+    transforms quickly, for example to zero pad an array to before it is
+    transformed.
+
+    That is a length with no prime factors other than 2, 3, 5 and 7, for
+    which FFTW has optimised codelets. If ``real`` is ``True``, the length
+    is for a real transform, which FFTW is much faster at with even
+    lengths, so it is also even (unless ``n`` is less than 2).
+
+    This can be used in place of :func:`scipy.fft.next_fast_len`, which
+    is tuned to the radices of :mod:`scipy.fft`.
+    '''
+    n = operator.index(n)
+
+    if n < 0:
+        raise ValueError('Invalid n: n should not be negative.')
+
+    if real and n > 2:
+        return 2 * next_fast_len(-(-n // 2))
+
+    if n <= 6:
+        return n
+
+    # The smallest 2, 3, 5 and 7 smooth length so far, starting with
+    # the next power of 2.
+    best = 1 << (n - 1).bit_length()
+
+    p7 = 1
+    while p7 < best:
+        p75 = p7
+        while p75 < best:
+            p753 = p75
+            while p753 < best:
+                # The smallest power of 2 multiple that is at least n
+                quotient = -(-n // p753)
+                best = min(best, p753 << (quotient - 1).bit_length())
+                p753 *= 3
+            p75 *= 5
+        p7 *= 7
+
+    return best
+
 cpdef n_byte_align_empty(shape, n, dtype='float64', order='C'):
     '''n_byte_align_empty(shape, n, dtype='float64', order='C')
     This function is deprecated: ``empty_aligned`` should be used
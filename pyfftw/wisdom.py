@@ -0,0 +1,431 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Knowledge Economy Developments Ltd
+# Copyright 2014 David Wells
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+# David Wells
+# drwells <at> vt.edu
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+'''
+A command line tool that generates FFTW wisdom for a catalogue of
+transforms, planning them in parallel in a pool of processes, and writes
+it to a single file. Run it as::
+
+    python -m pyfftw.wisdom spec.json -o wisdom.json
+
+The specification lists the transforms to plan. Each has the following
+fields, of which only ``shape`` is required:
+
+* ``shape``: The shape of the input array.
+* ``dtype``: The dtype of the input array. The default is
+  ``'complex128'``.
+* ``axes``: The axes over which to take the transform. The default is all
+  of them.
+* ``threads``: The number of threads to plan for. The default is ``1``.
+* ``transform``: One of ``'fftn'``, ``'ifftn'``, ``'rfftn'`` and
+  ``'irfftn'``. The default is ``'fftn'`` for a complex dtype and
+  ``'rfftn'`` for a real one. The output of ``'irfftn'`` is of length
+  ``2*(m - 1)`` along the last axis, where ``m`` is the length of the
+  input, as with :func:`numpy.fft.irfftn`.
+* ``planner_effort``: The default is set by the ``--planner-effort``
+  option, which itself defaults to ``'FFTW_MEASURE'``.
+
+The specification can be a JSON or YAML file (the latter requires
+`PyYAML <http://pyyaml.org>`_) holding a list of transforms, or a CSV file
+with a header row naming the fields. In a CSV file, ``shape`` and ``axes``
+are given as integers separated by spaces or ``x``, as in ``64x64``.
+
+For example, this JSON specification plans a 2D complex transform and a
+batch of 1D real transforms in single precision::
+
+    [{"shape": [512, 512], "threads": 4},
+     {"shape": [64, 4096], "dtype": "float32", "axes": [1]}]
+
+The output file is JSON, with the wisdom encoded as by
+:func:`pyfftw.interfaces.cache.dump` (so it can be loaded with
+:func:`pyfftw.interfaces.cache.warm` or :func:`load_wisdom`) and with a
+report of the planning time of each transform. The report is also printed.
+
+With ``--missing-only``, the wisdom in an existing output file is loaded
+first, the transforms for which there is already wisdom are skipped, and
+the file is updated with the wisdom for the rest.
+
+The functions used by the tool are also available from Python.
+'''
+
+from __future__ import print_function
+
+import argparse
+import base64
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+import numpy
+
+import pyfftw
+
+__all__ = ['load_spec', 'generate', 'load_wisdom', 'save_wisdom', 'main']
+
+_transforms = {
+        'fftn': ('FFTW_FORWARD', 'complex', 'complex'),
+        'ifftn': ('FFTW_BACKWARD', 'complex', 'complex'),
+        'rfftn': ('FFTW_FORWARD', 'real', 'complex'),
+        'irfftn': ('FFTW_BACKWARD', 'complex', 'real')}
+
+_string_types = (str, type(u''))
+
+_valid_efforts = ('FFTW_ESTIMATE', 'FFTW_MEASURE',
+        'FFTW_PATIENT', 'FFTW_EXHAUSTIVE')
+
+# The fields of a transform in the specification and report, in order.
+_spec_fields = ('shape', 'dtype', 'axes', 'threads', 'transform',
+        'planner_effort')
+
+def _int_tuple(value):
+    '''Return ``value``, a sequence of integers or a string of integers
+    separated by spaces, commas or ``x``, as a tuple of ints.
+    '''
+    if isinstance(value, _string_types):
+        value = [each for each in re.split(r'[\s,x]+', value.strip())
+                if each]
+
+    elif not isinstance(value, (list, tuple)):
+        value = [value]
+
+    return tuple(int(each) for each in value)
+
+def _normalise_entry(entry, planner_effort):
+    '''Return the transform described by the dictionary ``entry`` with
+    every field filled in and checked.
+    '''
+    if 'shape' not in entry:
+        raise ValueError('Invalid specification: '
+                'every transform needs a shape.')
+
+    shape = _int_tuple(entry['shape'])
+    dtype = numpy.dtype(entry.get('dtype') or 'complex128')
+
+    if entry.get('axes') in (None, ''):
+        axes = tuple(range(len(shape)))
+    else:
+        axes = _int_tuple(entry['axes'])
+
+    threads = int(entry.get('threads') or 1)
+
+    transform = entry.get('transform') or (
+            'fftn' if dtype.kind == 'c' else 'rfftn')
+
+    if transform not in _transforms:
+        raise ValueError('Invalid transform: %s' % transform)
+
+    if (_transforms[transform][1] == 'complex') != (dtype.kind == 'c'):
+        raise ValueError('Invalid dtype: %s is not a valid input dtype '
+                'for %s' % (dtype, transform))
+
+    planner_effort = entry.get('planner_effort') or planner_effort
+
+    if planner_effort not in _valid_efforts:
+        raise ValueError('Invalid planner effort: %s' % planner_effort)
+
+    return {'shape': shape, 'dtype': dtype.name, 'axes': axes,
+            'threads': threads, 'transform': transform,
+            'planner_effort': planner_effort}
+
+def load_spec(path, planner_effort='FFTW_MEASURE', spec_format=None):
+    '''Read the specification of transforms at ``path``, returning a list
+    of dictionaries, each with all the fields filled in.
+
+    ``spec_format`` is one of ``'json'``, ``'yaml'`` and ``'csv'``. By
+    default it is taken from the extension of ``path``. ``planner_effort``
+    is used for the transforms that do not give one.
+    '''
+    if spec_format is None:
+        spec_format = os.path.splitext(path)[1].lstrip('.').lower()
+
+        if spec_format == 'yml':
+            spec_format = 'yaml'
+
+    with open(path, 'r') as f:
+        if spec_format == 'json':
+            entries = json.load(f)
+
+        elif spec_format == 'yaml':
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('Reading a YAML specification '
+                        'requires PyYAML.')
+
+            entries = yaml.safe_load(f)
+
+        elif spec_format == 'csv':
+            entries = list(csv.DictReader(f))
+
+        else:
+            raise ValueError('Invalid specification format: %s' %
+                    spec_format)
+
+    # Also allow the list to be under a single key
+    if isinstance(entries, dict) and 'transforms' in entries:
+        entries = entries['transforms']
+
+    return [_normalise_entry(entry, planner_effort) for entry in entries]
+
+def _create_fftw(entry, extra_flags=()):
+    '''Create the :class:`pyfftw.FFTW` object for ``entry``, on new aligned
+    arrays.
+    '''
+    direction, input_kind, output_kind = _transforms[entry['transform']]
+
+    input_dtype = numpy.dtype(entry['dtype'])
+    if input_kind == 'complex':
+        complex_dtype = input_dtype
+    else:
+        complex_dtype = numpy.result_type(input_dtype, 1j)
+
+    input_shape = entry['shape']
+    output_shape = list(input_shape)
+
+    last_axis = entry['axes'][-1]
+    if output_kind == 'real':
+        output_shape[last_axis] = 2 * (input_shape[last_axis] - 1)
+        output_dtype = complex_dtype.type(0).real.dtype
+    else:
+        if input_kind == 'real':
+            output_shape[last_axis] = input_shape[last_axis]//2 + 1
+        output_dtype = complex_dtype
+
+    input_array = pyfftw.empty_aligned(input_shape, input_dtype)
+    output_array = pyfftw.empty_aligned(output_shape, output_dtype)
+
+    return pyfftw.FFTW(input_array, output_array, entry['axes'], direction,
+            (entry['planner_effort'],) + tuple(extra_flags),
+            entry['threads'])
+
+def _has_wisdom(entry):
+    '''Return whether there is wisdom for ``entry`` in this process.
+    '''
+    try:
+        _create_fftw(entry, ('FFTW_WISDOM_ONLY',))
+    except RuntimeError:
+        return False
+
+    return True
+
+def _plan_entry(args):
+    '''Plan the transform in ``args``, returning the index of the entry,
+    the time in seconds planning took, the wisdom of this process and an
+    error message (or ``None``). Run in the worker processes.
+    '''
+    index, entry, wisdom = args
+
+    if wisdom is not None:
+        pyfftw.import_wisdom(wisdom)
+
+    try:
+        planning_start = time.time()
+        _create_fftw(entry)
+        planning_time = time.time() - planning_start
+
+    except Exception as e:
+        return index, None, None, '%s: %s' % (type(e).__name__, e)
+
+    return index, planning_time, pyfftw.export_wisdom(), None
+
+def generate(entries, wisdom=None, missing_only=False, processes=None):
+    '''Plan each of the transforms in ``entries``, as returned by
+    :func:`load_spec`, in a pool of ``processes`` processes (by default,
+    one per CPU). Returns a tuple of the wisdom, as returned by
+    :func:`pyfftw.export_wisdom`, and a report, which is a list of
+    dictionaries holding each transform along with its ``status`` and
+    ``planning_time``.
+
+    ``wisdom`` is wisdom to start from. It is imported into this process
+    and into every worker, and is included in the wisdom that is returned.
+    With ``missing_only``, transforms for which there is already wisdom are
+    not planned.
+
+    The wisdom from the workers is imported into this process too.
+    '''
+    if wisdom is not None:
+        pyfftw.import_wisdom(wisdom)
+
+    report = []
+    tasks = []
+    for index, entry in enumerate(entries):
+        entry = dict(entry)
+        entry['planning_time'] = None
+
+        if missing_only and _has_wisdom(entry):
+            entry['status'] = 'existing'
+        else:
+            entry['status'] = 'pending'
+            tasks.append((index, entry, wisdom))
+
+        report.append(entry)
+
+    if tasks:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        pool = multiprocessing.Pool(min(processes, len(tasks)))
+
+        try:
+            for index, planning_time, worker_wisdom, error in (
+                    pool.imap_unordered(_plan_entry, tasks)):
+
+                if error is None:
+                    pyfftw.import_wisdom(worker_wisdom)
+                    report[index]['status'] = 'planned'
+                    report[index]['planning_time'] = planning_time
+                else:
+                    report[index]['status'] = 'failed: ' + error
+
+        finally:
+            pool.close()
+            pool.join()
+
+    return pyfftw.export_wisdom(), report
+
+def load_wisdom(path):
+    '''Return the wisdom in the file at ``path``, which should have been
+    written by :func:`save_wisdom` (or
+    :func:`pyfftw.interfaces.cache.dump`), in the form returned by
+    :func:`pyfftw.export_wisdom`.
+    '''
+    with open(path, 'r') as f:
+        contents = json.load(f)
+
+    return tuple(base64.b64decode(each_wisdom)
+            for each_wisdom in contents['wisdom'])
+
+def save_wisdom(path, wisdom, report=()):
+    '''Write ``wisdom``, as returned by :func:`pyfftw.export_wisdom`, and
+    ``report``, as returned by :func:`generate`, to the file at ``path``.
+    '''
+    entries = []
+    for entry in report:
+        entry = dict(entry)
+        entry['shape'] = list(entry['shape'])
+        entry['axes'] = list(entry['axes'])
+        entries.append(entry)
+
+    with open(path, 'w') as f:
+        json.dump({
+            'wisdom': [base64.b64encode(each_wisdom).decode('ascii')
+                for each_wisdom in wisdom],
+            'entries': entries}, f, indent=1, sort_keys=True)
+
+def _format_report(report):
+    '''Return the report as a table.
+    '''
+    header = _spec_fields + ('planning_time', 'status')
+    rows = [header]
+
+    for entry in report:
+        row = []
+        for field in header:
+            value = entry[field]
+
+            if field == 'planning_time':
+                value = '' if value is None else '%.3f' % value
+            elif field == 'shape':
+                value = 'x'.join(str(each) for each in value)
+            elif field == 'axes':
+                value = ','.join(str(each) for each in value)
+
+            row.append(str(value))
+
+        rows.append(row)
+
+    widths = [max(len(row[n]) for row in rows) for n in range(len(header))]
+
+    return '\n'.join(
+            '  '.join(value.ljust(width)
+                for value, width in zip(row, widths)).rstrip()
+            for row in rows)
+
+def main(argv=None):
+    '''The entry point of ``python -m pyfftw.wisdom``. Returns the exit
+    status, which is non-zero if any transform failed to plan.
+    '''
+    parser = argparse.ArgumentParser(prog='python -m pyfftw.wisdom',
+            description='Generate FFTW wisdom for the transforms in a '
+            'specification, planning them in a pool of processes.')
+
+    parser.add_argument('spec',
+            help='the specification of the transforms (.json, .yaml or '
+            '.csv)')
+    parser.add_argument('-o', '--output', required=True,
+            help='the file to write the wisdom to')
+    parser.add_argument('-p', '--processes', type=int, default=None,
+            help='the number of processes (default: one per CPU)')
+    parser.add_argument('-e', '--planner-effort', default='FFTW_MEASURE',
+            choices=_valid_efforts,
+            help='the planner effort for transforms that do not give one')
+    parser.add_argument('-f', '--format', dest='spec_format', default=None,
+            choices=('json', 'yaml', 'csv'),
+            help='the format of the specification (default: from its '
+            'extension)')
+    parser.add_argument('-m', '--missing-only', action='store_true',
+            help='only plan the transforms that there is no wisdom for in '
+            'the output file, adding to it')
+
+    args = parser.parse_args(argv)
+
+    entries = load_spec(args.spec, args.planner_effort, args.spec_format)
+
+    wisdom = None
+    if args.missing_only and os.path.exists(args.output):
+        wisdom = load_wisdom(args.output)
+
+    wisdom, report = generate(entries, wisdom, args.missing_only,
+            args.processes)
+
+    save_wisdom(args.output, wisdom, report)
+
+    print(_format_report(report))
+
+    if any(entry['status'].startswith('failed') for entry in report):
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
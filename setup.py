@@ -189,6 +189,7 @@ class QuickTestCommand(Command):
             'test.test_pyfftw_real_backward.RealBackwardSingleFFTWTest',
             'test.test_pyfftw_real_backward.RealBackwardDoubleFFTWTest.test_2d',
             'test.test_pyfftw_real_backward.RealBackwardLongDoubleFFTWTest.test_2d',
+            'test.test_pyfftw_hermitian_forward.HermitianForwardDoubleFFTWTest',
             'test.test_pyfftw_wisdom',
             'test.test_pyfftw_utils',
             'test.test_pyfftw_call',
@@ -196,12 +197,19 @@ class QuickTestCommand(Command):
             'test.test_pyfftw_nbyte_align',
             'test.test_pyfftw_interfaces_cache',
             'test.test_pyfftw_multithreaded',
+            'test.test_pyfftw_convolver',
+            'test.test_pyfftw_scipy_signal_interface',
+            'test.test_pyfftw_scipy_fft_interface',
+            'test.test_pyfftw_distributed',
+            'test.test_pyfftw_chirpz',
+            'test.test_pyfftw_tuning',
             'test.test_pyfftw_numpy_interface.InterfacesNumpyFFTTestModule',
             'test.test_pyfftw_numpy_interface.InterfacesNumpyFFTTestFFT2',
             'test.test_pyfftw_numpy_interface.InterfacesNumpyFFTTestIFFT2',            
             'test.test_pyfftw_builders.BuildersTestFFTWWrapper',
             'test.test_pyfftw_builders.BuildersTestFFT2',
             'test.test_pyfftw_builders.BuildersTestIRFFT2',
+            'test.test_pyfftw_builders.BuildersTestRealToReal',
         ]
 
         import sys, subprocess
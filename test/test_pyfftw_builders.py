@@ -32,9 +32,11 @@
 # POSSIBILITY OF SUCH DAMAGE.
 #
 
-from pyfftw import builders, empty_aligned, byte_align, FFTW
+from pyfftw import (builders, empty_aligned, byte_align, FFTW,
+        next_fast_len, simd_alignment)
 from pyfftw.builders import _utils as utils
 from .test_pyfftw_base import run_test_suites
+from .test_pyfftw_scipy_fft_interface import direct_dct, direct_dst
 
 import unittest
 import numpy
@@ -42,6 +44,7 @@ from numpy import fft as np_fft
 import copy
 import inspect
 import warnings
+import sys
 warnings.filterwarnings('always')
 
 complex_dtypes = (numpy.complex64, numpy.complex128, numpy.clongdouble)
@@ -375,55 +378,71 @@ class BuildersTestFFT(unittest.TestCase):
                     _test_shape.append(each_dim*2)
                     slices.append(slice(None, None, 2))
 
-                input_array = dtype_tuple[1](_test_shape, dtype)[slices]
-                # check the input is non contiguous
-                self.assertFalse(input_array.flags['C_CONTIGUOUS'] or 
-                    input_array.flags['F_CONTIGUOUS'])
+                for order in ('C', 'F'):
+                    input_array = numpy.asarray(
+                            dtype_tuple[1](_test_shape, dtype),
+                            order=order)[slices]
 
+                    # An array with its smallest stride along the last
+                    # axis is planned on as it is
+                    self._test_auto_contiguous_input(input_array,
+                            s1, s2, _kwargs.copy(),
+                            order == 'C' or input_array.ndim == 1)
 
-                # Firstly check the non-contiguous case (for both
-                # FFTW and _FFTWWrapper)
-                _kwargs['auto_contiguous'] = False
-                
-                # We also need to make sure we're not copying due
-                # to a trivial misalignment
-                _kwargs['auto_align_input'] = False
+    def _test_auto_contiguous_input(self, input_array, s1, s2, _kwargs,
+            planned_on_strides):
 
-                FFTW_object = getattr(builders, self.func)(
-                        input_array, s1, **_kwargs)
-
-                internal_input_array = FFTW_object.input_array
-                flags = internal_input_array.flags
-                self.assertTrue(input_array is internal_input_array)
-                self.assertFalse(flags['C_CONTIGUOUS'] or 
-                    flags['F_CONTIGUOUS'])
+        # check the input is non contiguous
+        self.assertFalse(input_array.flags['C_CONTIGUOUS'] or 
+            input_array.flags['F_CONTIGUOUS'])
 
-                FFTW_object = getattr(builders, self.func)(
-                        input_array, s2, **_kwargs)
-
-                internal_input_array = FFTW_object.input_array
-                flags = internal_input_array.flags
-                # We actually expect the _FFTWWrapper to be C_CONTIGUOUS
-                self.assertTrue(flags['C_CONTIGUOUS'])
-
-                # Now for the contiguous case (for both
-                # FFTW and _FFTWWrapper)
-                _kwargs['auto_contiguous'] = True
-                FFTW_object = getattr(builders, self.func)(
-                        input_array, s1, **_kwargs)
 
-                internal_input_array = FFTW_object.input_array
-                flags = internal_input_array.flags
-                self.assertTrue(flags['C_CONTIGUOUS'] or 
-                    flags['F_CONTIGUOUS'])
-                
-                FFTW_object = getattr(builders, self.func)(
-                        input_array, s2, **_kwargs)
+        # Firstly check the non-contiguous case (for both
+        # FFTW and _FFTWWrapper)
+        _kwargs['auto_contiguous'] = False
+        
+        # We also need to make sure we're not copying due
+        # to a trivial misalignment
+        _kwargs['auto_align_input'] = False
+
+        FFTW_object = getattr(builders, self.func)(
+                input_array, s1, **_kwargs)
+
+        internal_input_array = FFTW_object.input_array
+        flags = internal_input_array.flags
+        self.assertTrue(input_array is internal_input_array)
+        self.assertFalse(flags['C_CONTIGUOUS'] or 
+            flags['F_CONTIGUOUS'])
+
+        FFTW_object = getattr(builders, self.func)(
+                input_array, s2, **_kwargs)
+
+        internal_input_array = FFTW_object.input_array
+        flags = internal_input_array.flags
+        # We actually expect the _FFTWWrapper to be C_CONTIGUOUS
+        self.assertTrue(flags['C_CONTIGUOUS'])
+
+        # Now for the contiguous case (for both
+        # FFTW and _FFTWWrapper)
+        _kwargs['auto_contiguous'] = True
+        FFTW_object = getattr(builders, self.func)(
+                input_array, s1, **_kwargs)
+
+        internal_input_array = FFTW_object.input_array
+        flags = internal_input_array.flags
+        if planned_on_strides:
+            self.assertTrue(input_array is internal_input_array)
+        else:
+            self.assertTrue(flags['C_CONTIGUOUS'] or 
+                flags['F_CONTIGUOUS'])
+        
+        FFTW_object = getattr(builders, self.func)(
+                input_array, s2, **_kwargs)
 
-                internal_input_array = FFTW_object.input_array
-                flags = internal_input_array.flags
-                # as above
-                self.assertTrue(flags['C_CONTIGUOUS'])
+        internal_input_array = FFTW_object.input_array
+        flags = internal_input_array.flags
+        # as above
+        self.assertTrue(flags['C_CONTIGUOUS'])
 
 
     def test_auto_align_input(self):
@@ -487,6 +506,131 @@ class BuildersTestFFT(unittest.TestCase):
 
                 self.assertTrue(type(FFTW_object) == FFTW)
 
+    def test_shift(self):
+        '''Test that shift_input and shift_output are the same as shifting
+        with numpy.fft.ifftshift and numpy.fft.fftshift.
+        '''
+        dtype_tuple = io_dtypes[functions[self.func]]
+        # The double precision dtype
+        dtype = dtype_tuple[0][1]
+
+        for test_shape, s, kwargs in self.test_data:
+            input_array = dtype_tuple[1](test_shape, dtype)
+
+            unique_axes = []
+            for axis in self.axes_from_kwargs(kwargs):
+                if axis % len(test_shape) not in unique_axes:
+                    unique_axes.append(axis % len(test_shape))
+
+            # The half spectrum is not shifted along the last axis
+            input_shift_axes = unique_axes
+            output_shift_axes = unique_axes
+
+            if functions[self.func] == 'c2r':
+                input_shift_axes = unique_axes[:-1]
+            elif functions[self.func] == 'r2c':
+                output_shift_axes = unique_axes[:-1]
+
+            if 'axes' in kwargs:
+                axes = {'axes': kwargs['axes']}
+            elif 'axis' in kwargs:
+                axes = {'axis': kwargs['axis']}
+            else:
+                axes = {}
+
+            for shift_input, shift_output in (
+                    (True, False), (False, True), (True, True)):
+
+                np_input_array = input_array
+                if shift_input:
+                    np_input_array = np_fft.ifftshift(
+                            input_array, input_shift_axes)
+
+                test_out_array = getattr(np_fft, self.func)(
+                        np_input_array, s, **axes)
+
+                if shift_output:
+                    test_out_array = np_fft.fftshift(
+                            test_out_array, output_shift_axes)
+
+                FFTW_object = getattr(builders, self.func)(
+                        input_array.copy(), s, shift_input=shift_input,
+                        shift_output=shift_output, **kwargs)
+
+                self.assertTrue(isinstance(FFTW_object, utils._FFTWWrapper))
+
+                # Once with the input in the object, and then from a call
+                output_array = FFTW_object().copy()
+                output_array_2 = FFTW_object(input_array)
+
+                self.assertTrue(numpy.allclose(output_array, test_out_array,
+                    rtol=1e-8, atol=1e-8))
+                self.assertTrue(numpy.allclose(output_array_2,
+                    test_out_array, rtol=1e-8, atol=1e-8))
+
+            with self.assertRaisesRegex(ValueError, 'Cannot avoid copy'):
+                getattr(builders, self.func)(input_array.copy(), s,
+                        avoid_copy=True, shift_input=True, **kwargs)
+
+    def test_pad(self):
+        '''Test that pad rounds up the lengths of the transform as if they
+        had been passed as s.
+        '''
+        dtype_tuple = io_dtypes[functions[self.func]]
+        # The double precision dtype
+        dtype = dtype_tuple[0][1]
+        real = functions[self.func] in ('r2c', 'c2r')
+
+        for test_shape, s, kwargs in self.test_data:
+            input_array = dtype_tuple[1](test_shape, dtype)
+            axes = self.axes_from_kwargs(kwargs)
+
+            if s is None:
+                lengths = [test_shape[axis] for axis in axes]
+
+                if functions[self.func] == 'c2r':
+                    lengths[-1] = 2 * (lengths[-1] - 1)
+            else:
+                lengths = list(numpy.atleast_1d(s))
+
+            for pad in ('fast', 'bucket'):
+                if pad == 'fast':
+                    padded = [next_fast_len(n) for n in lengths[:-1]]
+                    padded.append(next_fast_len(lengths[-1], real))
+                else:
+                    padded = [utils._next_bucket_len(n) for n in lengths]
+
+                if self.axes_kw == 'axis':
+                    padded = padded[0]
+
+                test_out_array = getattr(np_fft, self.func)(
+                        input_array, padded, **kwargs)
+
+                FFTW_object = getattr(builders, self.func)(
+                        input_array.copy(), s, pad=pad, **kwargs)
+
+                self.assertTrue(numpy.allclose(FFTW_object(),
+                    test_out_array, rtol=1e-8, atol=1e-8))
+
+        self.assertRaisesRegex(ValueError, 'Invalid pad',
+                getattr(builders, self.func), input_array, pad='bleh')
+
+    def test_real_input_hermitian_fill(self):
+        # A complex forward transform of real data should be done with
+        # a real transform, without promoting the input to complex.
+        if self.func not in ('fft', 'fft2', 'fftn'):
+            return
+
+        for dtype in real_dtypes:
+            for test_shape, s, kwargs in self.test_data:
+
+                FFTW_object = self.validate_pyfftw_object(make_real_data, 
+                        test_shape, dtype, s, kwargs)
+
+                self.assertEqual(FFTW_object.input_dtype, numpy.dtype(dtype))
+                self.assertEqual(FFTW_object.output_dtype, 
+                        utils._rc_dtype_pairs[numpy.dtype(dtype)])
+
     def test_persistent_padding(self):
         '''Test to confirm the padding it not touched after creation.
         '''
@@ -557,6 +701,32 @@ class BuildersTestFFT(unittest.TestCase):
                     self.validate_pyfftw_object, 
                     *(dtype_tuple[1], test_shape, dtype, s, kwargs))
 
+    def test_planning_timelimit(self):
+        '''Test the planning_timelimit argument
+        '''
+        dtype_tuple = io_dtypes[functions[self.func]]
+        test_shape = (16,)
+
+        for dtype in dtype_tuple[0]:
+            s = None
+            if self.axes_kw == 'axis':
+                kwargs = {'axis': -1}
+            else:
+                kwargs = {'axes': (-1,)}
+
+            for each_timelimit in (None, 0.0, 1.0):
+                kwargs['planning_timelimit'] = each_timelimit
+
+                # Should just work
+                self.validate_pyfftw_object(
+                        dtype_tuple[1], test_shape, dtype, s, kwargs)
+
+            kwargs['planning_timelimit'] = 'bleh'
+
+            self.assertRaises(TypeError,
+                    self.validate_pyfftw_object,
+                    *(dtype_tuple[1], test_shape, dtype, s, kwargs))
+
     def test_threads_arg(self):
         '''Test the threads argument
         '''
@@ -656,13 +826,27 @@ class BuildersTestFFT(unittest.TestCase):
                 non_contiguous_slices = (
                         [slice(None, None, 2)] * len(test_shape))
 
-                misaligned_input_array = dtype_tuple[1](
+                non_contiguous_input_array = numpy.asfortranarray(
+                        dtype_tuple[1](non_contiguous_shape, dtype))[
+                                non_contiguous_slices]
+
+                if len(test_shape) > 1:
+                    self.assertRaisesRegex(ValueError, 
+                            'Cannot avoid copy.*not contiguous.*',
+                            getattr(builders, self.func),
+                            non_contiguous_input_array, s, **_kwargs)
+
+                # An array with its smallest stride along the last axis is
+                # planned on as it is
+                non_contiguous_input_array = dtype_tuple[1](
                         non_contiguous_shape, dtype)[non_contiguous_slices]
 
-                self.assertRaisesRegex(ValueError, 
-                        'Cannot avoid copy.*not contiguous.*',
-                        getattr(builders, self.func),
-                        misaligned_input_array, s, **_kwargs)
+                FFTW_object = getattr(builders, self.func)(
+                        non_contiguous_input_array, s,
+                        auto_align_input=False, **_kwargs)
+
+                self.assertTrue(FFTW_object.input_array is
+                        non_contiguous_input_array)
 
                 # Offset by one from 16 byte aligned to guarantee it's not
                 # 16 byte aligned
@@ -1049,6 +1233,326 @@ class BuildersTestFFTWWrapper(unittest.TestCase):
             _input_array[self.FFTW_array_slicer]))
 
 
+class BuildersTestRealToReal(unittest.TestCase):
+
+    funcs = (('dct', 'dctn', direct_dct), ('dst', 'dstn', direct_dst))
+
+    def __init__(self, *args, **kwargs):
+
+        super(BuildersTestRealToReal, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def test_transforms(self):
+        x = numpy.random.randn(6, 10)
+
+        for func, nd_func, direct in self.funcs:
+            for dct_type in (1, 2, 3, 4):
+                for axis in (0, -1):
+                    FFTW_object = getattr(builders, func)(
+                            x, axis=axis, type=dct_type)
+
+                    self.assertTrue(isinstance(FFTW_object, FFTW))
+                    self.assertEqual(FFTW_object.output_dtype,
+                            numpy.dtype('float64'))
+                    self.assertTrue(numpy.allclose(
+                        FFTW_object(normalise_idft=False),
+                        direct(x, dct_type, axis)))
+
+                FFTW_object = getattr(builders, nd_func)(
+                        numpy.float32(x), type=dct_type)
+
+                self.assertEqual(FFTW_object.output_dtype,
+                        numpy.dtype('float32'))
+                self.assertTrue(numpy.allclose(
+                    FFTW_object(normalise_idft=False),
+                    direct(direct(x, dct_type, 0), dct_type, 1),
+                    rtol=1e-3, atol=1e-3))
+
+    def test_inverse_normalisation(self):
+        x = numpy.random.randn(12)
+
+        for func, nd_func, direct in self.funcs:
+            forward = getattr(builders, func)(x, type=2)
+            backward = getattr(builders, func)(forward(), type=3)
+
+            self.assertTrue(numpy.allclose(backward(), x))
+
+    def test_invalid_type(self):
+        x = numpy.random.randn(12)
+
+        for func, nd_func, direct in self.funcs:
+            for invalid_type in (0, 5, None):
+                self.assertRaisesRegex(ValueError, 'Invalid type',
+                        getattr(builders, func), x, type=invalid_type)
+                self.assertRaisesRegex(ValueError, 'Invalid type',
+                        getattr(builders, nd_func), x, type=invalid_type)
+
+class BuildersTestPrunedPadding(unittest.TestCase):
+
+    funcs = (('fftn', complex_dtypes, make_complex_data),
+            ('fft2', complex_dtypes, make_complex_data),
+            ('rfftn', real_dtypes, make_real_data),
+            ('rfft2', real_dtypes, make_real_data))
+
+    # Shapes, s and axes that pad along more than one axis
+    pruned_shapes = (
+            ((16, 12), (32, 24), None),
+            ((16, 12), (20, 12), None),
+            ((16, 12, 10), (32, 24, 20), None),
+            ((5, 16, 12), (32, 24), (0, 2)),
+            ((10, 12, 7), (8, 20, 9), None),
+            ((6, 7, 8), (12, 14), (-1, 0)))
+
+    def __init__(self, *args, **kwargs):
+
+        super(BuildersTestPrunedPadding, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def tolerance(self, dtype):
+        if dtype in (numpy.complex64, numpy.float32):
+            return {'rtol': 1e-3, 'atol': 1e-3}
+        else:
+            return {'rtol': 1e-8, 'atol': 1e-8}
+
+    def test_pruned_transforms(self):
+        for func, dtypes, make_data in self.funcs:
+            np_func = getattr(np_fft, func)
+
+            for a_shape, s, axes in self.pruned_shapes:
+                if func.endswith('2'):
+                    if len(s) != 2:
+                        continue
+
+                    if axes is None:
+                        axes = (-2, -1)
+
+                for dtype in dtypes:
+                    a = make_data(a_shape, dtype)
+
+                    FFTW_object = getattr(builders, func)(
+                            a.copy(), s, axes, prune_padding=True)
+
+                    self.assertTrue(
+                            isinstance(FFTW_object, utils._PrunedFFTW))
+
+                    ref = np_func(a, s, axes)
+                    output = FFTW_object()
+
+                    self.assertEqual(output.shape, ref.shape)
+                    self.assertTrue(numpy.allclose(output, ref,
+                        **self.tolerance(dtype)))
+
+                    # and with a new input, twice, so the padding of the
+                    # output array is reset
+                    b = make_data(a_shape, dtype)
+                    for n in range(2):
+                        self.assertTrue(numpy.allclose(FFTW_object(b),
+                            np_func(b, s, axes), **self.tolerance(dtype)))
+
+    def test_unpruned_transforms(self):
+        '''Test that the usual objects are returned when nothing would be
+        pruned, or when pruning is not offered.
+        '''
+        a = make_complex_data((16, 12), numpy.complex128)
+        r = make_real_data((16, 12), numpy.float64)
+
+        for FFTW_object in (
+                builders.fftn(a, prune_padding=True),
+                builders.rfft2(r, (16, 24), prune_padding=True),
+                builders.rfftn(r, (16, 24), prune_padding=True),
+                builders.fftn(r, (32, 24), prune_padding=True),
+                builders.fftn(a, (32, 24), shift_input=True,
+                    prune_padding=True),
+                builders.fftn(a, (32, 24))):
+
+            self.assertTrue(isinstance(FFTW_object, FFTW))
+
+    def test_stage_axes(self):
+        # The least padded axes go first
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8, 8), (16, 32, 8), [0, 1, 2], False), [2, 0, 1])
+
+        # The last axis of a real transform goes first
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8, 8), (16, 32, 8), [0, 1, 2], True), [2, 0, 1])
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8, 8), (16, 32, 16), [0, 1, 2], True), [2, 0, 1])
+
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8), (8, 16), [0, 1], False), [0, 1])
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8), (8, 16), [0, 1], True), None)
+        self.assertEqual(utils._pruned_stage_axes(
+            (8, 8), (8, 8), [0, 1], False), None)
+
+    def test_attributes(self):
+        a = make_real_data((6, 8, 10), numpy.float32)
+        FFTW_object = builders.rfftn(a, (8, 16), axes=(0, 2),
+                prune_padding=True)
+
+        self.assertEqual(FFTW_object.input_shape, (6, 8, 16))
+        self.assertEqual(FFTW_object.output_shape, (8, 8, 9))
+        self.assertEqual(FFTW_object.output_array.dtype,
+                numpy.dtype('complex64'))
+        self.assertEqual(FFTW_object.axes, (0, 2))
+        self.assertEqual(FFTW_object.direction, 'FFTW_FORWARD')
+        self.assertIs(FFTW_object(), FFTW_object.output_array)
+
+        # execute() transforms the internal input array
+        FFTW_object.input_array[:, :, :10] = a[::-1]
+        FFTW_object.execute()
+        self.assertTrue(numpy.allclose(FFTW_object.output_array,
+            np_fft.rfftn(a[::-1], (8, 16), axes=(0, 2)),
+            rtol=1e-3, atol=1e-3))
+
+    def test_invalid_input_shape(self):
+        a = make_complex_data((16, 12), numpy.complex128)
+        FFTW_object = builders.fftn(a, (32, 24), prune_padding=True)
+
+        self.assertRaisesRegex(ValueError, 'Invalid input shape',
+                FFTW_object, make_complex_data((15, 12), numpy.complex128))
+
+        # Bigger arrays are sliced to fit
+        b = make_complex_data((18, 14), numpy.complex128)
+        self.assertTrue(numpy.allclose(FFTW_object(b),
+            np_fft.fftn(b[:16, :12], (32, 24))))
+
+class BuildersTestPlanningArrays(unittest.TestCase):
+
+    def __init__(self, *args, **kwargs):
+
+        super(BuildersTestPlanningArrays, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def test_output_array(self):
+        a = make_complex_data((8, 16), numpy.complex128)
+        real_a = make_real_data((8, 16), numpy.float64)
+
+        # (function, input, kwargs, output shape, output dtype, result)
+        transforms = (
+                ('fft', a, {}, (8, 16), 'complex128', np_fft.fft(a)),
+                ('fft', a, {'n': 20}, (8, 20), 'complex128',
+                    np_fft.fft(a, 20)),
+                ('fft', real_a, {}, (8, 16), 'complex128',
+                    np_fft.fft(real_a)),
+                ('rfft', real_a, {}, (8, 9), 'complex128',
+                    np_fft.rfft(real_a)),
+                ('irfft', a, {}, (8, 30), 'float64', np_fft.irfft(a)),
+                ('fftn', a, {'s': (10, 16), 'shift_output': True},
+                    (10, 16), 'complex128',
+                    np_fft.fftshift(np_fft.fftn(a, (10, 16)))),
+                ('fft2', a, {'s': (16, 32), 'prune_padding': True},
+                    (16, 32), 'complex128', np_fft.fft2(a, (16, 32))),
+                ('dct', real_a, {}, (8, 16), 'float64', None))
+
+        for func, data, kwargs, shape, dtype, result in transforms:
+            # A slot in a larger buffer
+            buffer = empty_aligned((3,) + shape, dtype=dtype)
+            output_array = buffer[1]
+
+            FFTW_object = getattr(builders, func)(data,
+                    output_array=output_array, **kwargs)
+
+            self.assertTrue(
+                    FFTW_object.output_array.ctypes.data ==
+                    output_array.ctypes.data)
+
+            output = FFTW_object()
+            self.assertTrue(numpy.shares_memory(output, output_array))
+
+            if result is not None:
+                self.assertTrue(numpy.allclose(buffer[1], result))
+
+    def test_input_array(self):
+        a = make_complex_data((8, 16), numpy.complex128)
+
+        for kwargs, shape in (({}, (8, 16)), ({'n': 20}, (8, 20)),
+                ({'n': 10}, (8, 10)), ({'shift_output': True}, (8, 16))):
+
+            for planner_effort in ('FFTW_ESTIMATE', 'FFTW_MEASURE'):
+                input_array = empty_aligned(shape, dtype='complex128')
+                FFTW_object = builders.fft(a, input_array=input_array,
+                        planner_effort=planner_effort, **kwargs)
+
+                self.assertIs(FFTW_object.input_array, input_array)
+
+                test_output = np_fft.fft(a, shape[1])
+                if kwargs.get('shift_output'):
+                    test_output = np_fft.fftshift(test_output, -1)
+
+                # `a` is copied into the input array after planning
+                self.assertTrue(numpy.allclose(FFTW_object(), test_output))
+
+        # Passing `a` itself is like passing nothing
+        a = byte_align(a)
+        FFTW_object = builders.fft(a, input_array=a, avoid_copy=True)
+        self.assertIs(FFTW_object.input_array, a)
+
+        self.assertRaisesRegex(ValueError, 'Cannot avoid copy',
+                builders.fft, a, avoid_copy=True,
+                input_array=empty_aligned((8, 16), dtype='complex128'))
+
+    def test_in_place(self):
+        a = make_complex_data((8, 16), numpy.complex128)
+        buffer = empty_aligned((8, 16), dtype='complex128')
+
+        FFTW_object = builders.fft(a, input_array=buffer,
+                output_array=buffer)
+        self.assertTrue(numpy.allclose(FFTW_object(), np_fft.fft(a)))
+        self.assertTrue(numpy.allclose(buffer, np_fft.fft(a)))
+
+        # Planning into an output that holds `a` does not lose it
+        buffer[:] = a
+        FFTW_object = builders.fft(buffer, output_array=buffer)
+        self.assertTrue(numpy.allclose(FFTW_object(a), np_fft.fft(a)))
+
+        buffer[:] = a
+        FFTW_object = builders.fft(buffer, input_array=buffer,
+                output_array=buffer)
+        self.assertTrue(numpy.allclose(FFTW_object(), np_fft.fft(a)))
+
+    def test_invalid_arrays(self):
+        a = make_complex_data((8, 16), numpy.complex128)
+
+        for name in ('input_array', 'output_array'):
+            kind = name.split('_')[0]
+
+            self.assertRaisesRegex(ValueError, 'Invalid %s array' % kind,
+                    builders.fft, a, **{name: [0]*16})
+
+            self.assertRaisesRegex(ValueError, 'Invalid %s array' % kind,
+                    builders.fft, a,
+                    **{name: empty_aligned((8, 17), dtype='complex128')})
+
+            self.assertRaisesRegex(ValueError, 'Invalid %s dtype' % kind,
+                    builders.fft, a,
+                    **{name: empty_aligned((8, 16), dtype='complex64')})
+
+            read_only = empty_aligned((8, 16), dtype='complex128')
+            read_only.flags.writeable = False
+            self.assertRaisesRegex(ValueError, 'Invalid %s array' % kind,
+                    builders.fft, a, **{name: read_only})
+
+            # Arrays that are not aligned for SIMD instructions can only
+            # be planned on if auto_align_input is False.
+            unaligned = empty_aligned(8*16 + 1, dtype='complex128')[1:]
+            unaligned = unaligned.reshape(8, 16)
+
+            if simd_alignment > unaligned.itemsize:
+                self.assertRaisesRegex(ValueError,
+                        'Invalid %s alignment' % kind,
+                        builders.fft, a, **{name: unaligned})
+
+            FFTW_object = builders.fft(a, auto_align_input=False,
+                    **{name: unaligned})
+            self.assertTrue(numpy.allclose(FFTW_object(), np_fft.fft(a)))
+
 class BuildersTestUtilities(unittest.TestCase):
 
     def __init__(self, *args, **kwargs):
@@ -1058,6 +1562,21 @@ class BuildersTestUtilities(unittest.TestCase):
         if not hasattr(self, 'assertRaisesRegex'):
             self.assertRaisesRegex = self.assertRaisesRegexp
 
+    def test_next_bucket_len(self):
+        self.assertEqual([utils._next_bucket_len(n) for n in range(1, 10)],
+                [1, 2, 3, 4, 5, 6, 7, 8, 10])
+
+        ladder = sorted(set(utils._next_bucket_len(n)
+            for n in range(1, 4097)))
+        self.assertEqual(ladder[7:15], [8, 10, 12, 14, 16, 20, 24, 28])
+
+        # 4 lengths per octave, none of which are less than 3/4 used
+        self.assertEqual(len(ladder), 7 + 4 * 9 + 1)
+        for n in range(9, 4097):
+            self.assertTrue(n <= utils._next_bucket_len(n) < n * 4 / 3.0)
+
+        self.assertEqual(utils._next_bucket_len(numpy.int64(33)), 40)
+
     def test_setup_input_slicers(self):
         inputs = (
                 ((4, 5), (4, 5)),
@@ -1076,7 +1595,174 @@ class BuildersTestUtilities(unittest.TestCase):
                     utils._setup_input_slicers(*_input),
                     _output)
 
+    def test_setup_shifted_input_slicers(self):
+        # inputs are:
+        # (a.shape, input_shape, shift_axes)
+        inputs = (
+                ((4, 5), (4, 5), ()),
+                ((5,), (5,), (0,)),
+                ((5,), (7,), (0,)),
+                ((5,), (2,), (0,)),
+                ((4, 5), (4, 3), (1,)),
+                )
+
+        outputs = (
+                [((slice(0, 4), slice(0, 5)), (slice(0, 4), slice(0, 5)))],
+                [((slice(2, 5),), (slice(0, 3),)), 
+                    ((slice(0, 2),), (slice(3, 5),))],
+                [((slice(2, 5),), (slice(0, 3),)), 
+                    ((slice(0, 2),), (slice(3, 5),))],
+                [((slice(2, 4),), (slice(0, 2),))],
+                [((slice(0, 4), slice(2, 5)), (slice(0, 4), slice(0, 3)))],
+                )
+
+        for _input, _output in zip(inputs, outputs):
+            self.assertEqual(
+                    utils._setup_shifted_input_slicers(*_input),
+                    _output)
+
+        # Copying with the slicers is the same as shifting and then
+        # truncating or padding
+        a = numpy.random.randn(5, 6, 7)
+        for input_shape in ((5, 6, 7), (3, 4, 9), (8, 3, 7)):
+            shifted = numpy.zeros(input_shape)
+            for input_slicer, FFTW_slicer in (
+                    utils._setup_shifted_input_slicers(
+                        a.shape, input_shape, (0, 2))):
+
+                shifted[FFTW_slicer] = a[input_slicer]
+
+            common_slicer = tuple(slice(0, min(length, input_length))
+                    for length, input_length in zip(a.shape, input_shape))
+
+            test_shifted = numpy.zeros(input_shape)
+            test_shifted[common_slicer] = (
+                    np_fft.ifftshift(a, (0, 2))[common_slicer])
+
+            self.assertTrue(numpy.array_equal(shifted, test_shifted))
 
+    def test_fftshift_array(self):
+        for dtype in real_dtypes + complex_dtypes:
+            for shape, axes in (((7,), (0,)), ((8,), (0,)), ((5, 6), (0, 1)),
+                    ((4, 5, 7), (2, 0)), ((4, 5, 7), (1,))):
+
+                a = numpy.random.randn(*shape).astype(dtype)
+
+                if numpy.iscomplexobj(a):
+                    a += 1j*numpy.random.randn(*shape)
+
+                test_a = np_fft.fftshift(a, axes)
+
+                # Also a non-contiguous view
+                strided_a = numpy.empty(shape + (2,), dtype)[..., 1]
+                strided_a[:] = a
+
+                utils._fftshift_array(a, axes)
+                utils._fftshift_array(strided_a, axes)
+
+                self.assertTrue(numpy.array_equal(a, test_a))
+                self.assertTrue(numpy.array_equal(strided_a, test_a))
+
+    def test_copy_array(self):
+        for dtype in real_dtypes + complex_dtypes:
+            for shape in ((7,), (5, 6), (4, 5, 7)):
+                src = numpy.random.randn(*shape).astype(dtype)
+
+                # Contiguous, strided and reversed arrays
+                for dest, each_src in (
+                        (numpy.zeros(shape, dtype), src),
+                        (numpy.zeros(shape + (2,), dtype)[..., 1], src),
+                        (numpy.zeros(shape, dtype), src[::-1]),
+                        (numpy.zeros(shape, dtype).T, src.T)):
+
+                    utils._copy_array(dest, each_src)
+                    self.assertTrue(numpy.array_equal(dest, each_src))
+
+        # Different dtypes are copied by numpy
+        dest = numpy.zeros((4, 5), 'complex128')
+        src = numpy.random.randn(4, 5).astype('float32')
+        utils._copy_array(dest, src)
+        self.assertTrue(numpy.array_equal(dest, src))
+
+        self.assertRaisesRegex(ValueError, 'Invalid shapes',
+                utils._copy_array, numpy.zeros((4, 5)), numpy.zeros((5, 4)))
+
+    def test_zero_padding(self):
+        for dtype in real_dtypes + complex_dtypes:
+            for shape, box_shape in (((7,), (3,)), ((5, 6), (5, 2)),
+                    ((5, 6), (0, 6)), ((4, 5, 7), (2, 5, 3))):
+
+                box = tuple(slice(n) for n in box_shape)
+
+                for a in (numpy.empty(shape, dtype),
+                        numpy.empty(shape + (2,), dtype)[..., 1]):
+                    a[:] = numpy.random.randn(*shape)
+                    test_a = numpy.zeros(shape, dtype)
+                    test_a[box] = a[box]
+
+                    utils._zero_padding(a, box_shape)
+                    self.assertTrue(numpy.array_equal(a, test_a))
+
+        self.assertRaisesRegex(ValueError, 'Invalid box shape',
+                utils._zero_padding, numpy.zeros((4, 5)), (4,))
+
+    def test_copy_threads(self):
+        pyfftw_module = sys.modules[utils._copy_array.__module__]
+        min_bytes = pyfftw_module._min_copy_bytes_per_thread
+
+        # Small arrays are copied by each of the threads
+        pyfftw_module._min_copy_bytes_per_thread = 1
+
+        try:
+            for threads in (2, 3, 16):
+                src = numpy.random.randn(7, 5, 6) + 0j
+                dest = numpy.zeros_like(src)
+                utils._copy_array(dest, src[:, ::-1], threads)
+                self.assertTrue(numpy.array_equal(dest, src[:, ::-1]))
+
+                test_dest = numpy.zeros_like(src)
+                test_dest[:4, :3, :2] = src[:4, :3, :2]
+                utils._zero_padding(src, (4, 3, 2), threads)
+                self.assertTrue(numpy.array_equal(src, test_dest))
+
+        finally:
+            pyfftw_module._min_copy_bytes_per_thread = min_bytes
+
+    def test_copy_box_shape(self):
+        shape = (8, 6, 4)
+
+        for slicers, box_shape in (
+                ([slice(None)], (8, 6, 4)),
+                ([(slice(None), slice(3))], (8, 3, 4)),
+                ([[slice(0, 5), slice(None), slice(2)]], (5, 6, 2)),
+                ([(slice(0, 4), slice(0, 3)), (slice(4, 7), slice(0, 3))],
+                    (7, 3, 4)),
+                ([(slice(2, 5),)], (0, 0, 0)),
+                ([(slice(None, None, 2),)], (0, 0, 0)),
+                ([(Ellipsis, slice(2))], (0, 0, 0))):
+
+            self.assertEqual(utils._copy_box_shape(shape, slicers),
+                    box_shape)
+
+    def test_destroyed_input_padding(self):
+        # The padding of a destroyed input is zeroed again on each call
+        for s, shift_input in (((12, 10), False), ((12, 10), True),
+                ((4, 10), False), ((4, 10), True)):
+            a = numpy.random.randn(6, 7) + 1j*numpy.random.randn(6, 7)
+            fft = builders.fftn(a, s=s, overwrite_input=True,
+                    shift_input=shift_input, planner_effort='FFTW_ESTIMATE')
+
+            test_fft = builders.fftn(a, s=s, shift_input=shift_input,
+                    planner_effort='FFTW_ESTIMATE')
+
+            for n in range(2):
+                a = numpy.random.randn(6, 7) + 1j*numpy.random.randn(6, 7)
+                test_out = test_fft(a).copy()
+
+                # As a transform might leave it
+                fft.input_array[:] = 1e3
+
+                self.assertTrue(numpy.allclose(fft(a), test_out))
 
     def test_compute_array_shapes(self):
         # inputs are:
@@ -1220,6 +1906,62 @@ class BuildersTestUtilities(unittest.TestCase):
             self.assertRaisesRegex(ValueError, 'Shape error',
                     self._call_cook_nd_args, *(each_input,))
 
+    def test_planning_scratch_array(self):
+        a = empty_aligned((8, 12), dtype='complex128', n=64)
+
+        for each_array in (a, a[1:, 1:], a[::-2, ::3], a.T):
+            scratch = utils._planning_scratch_array(each_array)
+
+            self.assertEqual(scratch.shape, each_array.shape)
+            self.assertEqual(scratch.strides, each_array.strides)
+            self.assertEqual(scratch.dtype, each_array.dtype)
+            self.assertEqual(scratch.ctypes.data % 64,
+                    each_array.ctypes.data % 64)
+            self.assertFalse(numpy.may_share_memory(scratch, a))
+
+    def test_plans_on_strides(self):
+        a = empty_aligned((8, 12, 6), dtype='complex128')
+        interleaved = empty_aligned((64, 2), dtype='float64')
+
+        for each_array in (a[::2], a[:, ::-1, ::3], a[1:, :, 2],
+                a.transpose(1, 0, 2)[:, :, ::2], interleaved[:, 1]):
+            self.assertTrue(utils._plans_on_strides(each_array))
+
+        # Transposes, zero strides and strides that are not whole numbers
+        # of items
+        for each_array in (a.transpose(2, 0, 1)[::2],
+                numpy.asfortranarray(a)[::2],
+                numpy.broadcast_to(a[0], (4, 12, 6)),
+                numpy.lib.stride_tricks.as_strided(
+                    numpy.zeros(144, 'float64'), (64,), (17,))):
+            self.assertFalse(utils._plans_on_strides(each_array))
+
+    def test_planning_on_strides(self):
+        a = empty_aligned((16, 24), dtype='complex128')
+        a[:] = make_complex_data((16, 24), numpy.complex128)
+
+        for each_array in (a[::-1, ::2], a[::2, 1:], a[3:, 1]):
+            for each_builder in (builders.fft, builders.fftn):
+                FFTW_object = each_builder(each_array,
+                        planner_effort='FFTW_ESTIMATE',
+                        auto_align_input=False)
+
+                self.assertTrue(FFTW_object.input_array is each_array)
+                self.assertTrue(numpy.allclose(FFTW_object(),
+                    getattr(numpy.fft, each_builder.__name__)(each_array)))
+
+    def test_planning_leaves_input_untouched(self):
+        a = empty_aligned((32, 16), dtype='complex128')
+        a[:] = make_complex_data((32, 16), numpy.complex128)
+        a_copy = a.copy()
+
+        for each_array in (a, a[1:]):
+            FFTW_object = builders.fft2(each_array,
+                    planner_effort='FFTW_MEASURE')
+
+            self.assertTrue(FFTW_object.input_array is each_array)
+            self.assertTrue(numpy.array_equal(a, a_copy))
+
 test_cases = (
         BuildersTestFFTWWrapper,
         BuildersTestUtilities,
@@ -1234,7 +1976,10 @@ test_cases = (
         BuildersTestFFTN,
         BuildersTestIFFTN,
         BuildersTestRFFTN,
-        BuildersTestIRFFTN)
+        BuildersTestIRFFTN,
+        BuildersTestRealToReal,
+        BuildersTestPrunedPadding,
+        BuildersTestPlanningArrays)
 
 #test_set = {'BuildersTestRFFTN': ['test_dtype_coercian']}
 test_set = None
@@ -0,0 +1,238 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw import builders
+from pyfftw.builders import chirpz
+import numpy
+
+from .test_pyfftw_base import run_test_suites
+
+import unittest
+
+def make_complex_data(shape, dtype):
+    ar, ai = dtype(numpy.random.randn(2, *shape))
+    return ar + 1j*ai
+
+def direct_czt(a, m, w, z0, axis=-1):
+    '''The z-transform of ``a`` along ``axis`` at ``z0 * w**-k`` for ``k``
+    in ``range(m)``, by direct summation.
+    '''
+    a = numpy.moveaxis(numpy.asarray(a, numpy.complex128), axis, -1)
+    j = numpy.arange(a.shape[-1])
+    points = z0 * w**-numpy.arange(m, dtype=numpy.float64)
+
+    return numpy.moveaxis(
+            a.dot(points[None, :]**-j[:, None]), -1, axis)
+
+class BuildersChirpZTest(unittest.TestCase):
+
+    dtypes = (numpy.complex64, numpy.complex128)
+
+    def __init__(self, *args, **kwargs):
+
+        super(BuildersChirpZTest, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def tolerance(self, dtype):
+        if dtype == numpy.complex64:
+            return {'rtol': 1e-3, 'atol': 1e-3}
+        else:
+            return {'rtol': 1e-8, 'atol': 1e-8}
+
+    def test_czt_default_is_fft(self):
+        for dtype in self.dtypes:
+            for shape, axis in (((32,), -1), ((15, 7), 0), ((5, 12, 3), 1)):
+                a = make_complex_data(shape, dtype)
+
+                czt_object = builders.czt(a, axis=axis)
+                output = czt_object()
+
+                self.assertEqual(output.dtype, numpy.dtype(dtype))
+                self.assertTrue(numpy.allclose(output,
+                    numpy.fft.fft(a, axis=axis), **self.tolerance(dtype)))
+
+    def test_czt_contour(self):
+        w = 0.995 * numpy.exp(-0.07j)
+        z0 = 1.02 * numpy.exp(0.4j)
+
+        for dtype in self.dtypes:
+            for shape, m, axis in (
+                    ((37,), 20, -1),
+                    ((4, 37), 50, -1),
+                    ((21, 3), 9, 0)):
+
+                a = make_complex_data(shape, dtype)
+                czt_object = builders.czt(a, m, w, z0, axis=axis)
+
+                self.assertEqual(czt_object.output_array.shape[axis], m)
+                self.assertTrue(numpy.allclose(czt_object(),
+                    direct_czt(a, m, w, z0, axis), **self.tolerance(dtype)))
+
+    def test_czt_default_w(self):
+        a = make_complex_data((24,), numpy.complex128)
+        z0 = numpy.exp(0.3j)
+
+        self.assertTrue(numpy.allclose(builders.czt(a, 10, z0=z0)(),
+            direct_czt(a, 10, numpy.exp(-2j * numpy.pi / 10), z0)))
+
+    def test_real_input(self):
+        a = numpy.random.randn(4, 30)
+
+        czt_object = builders.czt(a, 8, 0.99, 1.1)
+        self.assertEqual(czt_object.output_array.dtype,
+                numpy.dtype('complex128'))
+        self.assertTrue(numpy.allclose(czt_object(),
+            direct_czt(a, 8, 0.99, 1.1)))
+
+        czt_object = builders.czt(a.astype('float32'), 8, 0.99, 1.1)
+        self.assertEqual(czt_object.output_array.dtype,
+                numpy.dtype('complex64'))
+
+    def test_zoom_fft(self):
+        a = numpy.random.randn(3, 64)
+
+        for fn, m, fs, endpoint in (
+                ([0.1, 0.3], 40, 2, False),
+                ([0.1, 0.3], 40, 2, True),
+                ((-100.0, 250.0), 25, 1000.0, True),
+                (0.5, 16, 2, False)):
+
+            if numpy.size(fn) == 1:
+                f1, f2 = 0, fn
+            else:
+                f1, f2 = fn
+
+            freqs = numpy.linspace(f1, f2, m, endpoint=endpoint)
+            ref = a.dot(numpy.exp(-2j * numpy.pi *
+                numpy.arange(64)[:, None] * freqs[None, :] / fs))
+
+            zoom_object = builders.zoom_fft(a, fn, m, fs=fs,
+                    endpoint=endpoint)
+            self.assertTrue(numpy.allclose(zoom_object(), ref))
+
+    def test_pruned_fft(self):
+        for dtype in self.dtypes:
+            for length, m, start, n in (
+                    (1000, 50, 1000, 2**20),
+                    (1000, 500, 1000, 1100),
+                    (1000, 30, 7, 600),
+                    (64, 64, 60, 100),
+                    (100, 10, -3, 4096)):
+
+                a = make_complex_data((2, length), dtype)
+
+                pruned_object = builders.pruned_fft(a, m, start=start, n=n)
+                ref = numpy.fft.fft(a, n)[:, numpy.arange(start, start + m)
+                        % n]
+
+                self.assertTrue(numpy.allclose(pruned_object(), ref,
+                    **self.tolerance(dtype)))
+
+                # and with a new input
+                b = make_complex_data((2, length), dtype)
+                ref = numpy.fft.fft(b, n)[:, numpy.arange(start, start + m)
+                        % n]
+                self.assertTrue(numpy.allclose(pruned_object(b), ref,
+                    **self.tolerance(dtype)))
+
+    def test_pruned_fft_length(self):
+        '''The FFTs scale with the band when it is much shorter than the
+        DFT, otherwise the DFT is used.
+        '''
+        a = numpy.random.randn(1000)
+
+        pruned_object = builders.pruned_fft(a, 50, start=1000, n=2**20)
+        self.assertTrue(pruned_object.fft_length < 2048)
+
+        pruned_object = builders.pruned_fft(a, 500, n=1100)
+        self.assertEqual(pruned_object.fft_length, 1100)
+
+    def test_chirps_cached(self):
+        a = numpy.random.randn(200)
+        chirpz._chirp_cache.clear()
+
+        czt_objects = [builders.czt(a, 30, 0.99, 1.01) for n in range(3)]
+        self.assertEqual(len(chirpz._chirp_cache), 1)
+        self.assertTrue(numpy.shares_memory(
+            czt_objects[0]._filter, czt_objects[2]._filter))
+
+        builders.czt(a, 31, 0.99, 1.01)
+        self.assertEqual(len(chirpz._chirp_cache), 2)
+
+        for n in range(chirpz._max_chirp_cache_entries + 4):
+            builders.czt(a, 30, 0.99, 1.0 + n)
+
+        self.assertEqual(len(chirpz._chirp_cache),
+                chirpz._max_chirp_cache_entries)
+
+    def test_attributes(self):
+        a = make_complex_data((8, 20), numpy.complex128)
+        czt_object = builders.czt(a, 12, 0.9, axis=0)
+
+        self.assertIs(czt_object.input_array, a)
+        self.assertEqual(czt_object.output_array.shape, (12, 20))
+        self.assertEqual(czt_object.axis, 0)
+        self.assertIs(czt_object(), czt_object.output_array)
+
+    def test_errors(self):
+        a = make_complex_data((16,), numpy.complex128)
+
+        self.assertRaisesRegex(ValueError, 'Invalid m',
+                builders.czt, a, 0)
+        self.assertRaisesRegex(ValueError, 'Invalid contour',
+                builders.czt, a, 8, 0)
+        self.assertRaisesRegex(ValueError, 'Invalid contour',
+                builders.czt, a, 8, 0.9, 0)
+        self.assertRaisesRegex(ValueError, 'Invalid fn',
+                builders.zoom_fft, a, [0.1, 0.2, 0.3])
+        self.assertRaisesRegex(ValueError, 'Invalid number',
+                builders.pruned_fft, a, 4, n=0)
+        self.assertRaisesRegex(ValueError, 'Invalid planner effort',
+                builders.czt, a, planner_effort='FFTW_FOO')
+        self.assertRaises(IndexError, builders.czt, a, 8, axis=1)
+
+        czt_object = builders.czt(a)
+        self.assertRaisesRegex(ValueError, 'Invalid input shape',
+                czt_object, numpy.zeros(15, numpy.complex128))
+
+test_cases = (
+        BuildersChirpZTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
@@ -322,6 +322,55 @@ class FFTWMiscTest(unittest.TestCase):
 
         self.assertEqual(new_fft.direction, 'FFTW_BACKWARD')
 
+    def test_r2r_direction_property(self):
+        '''Test the direction property of a real to real transform
+        '''
+        input_array = empty_aligned((16, 8), dtype='float64', n=16)
+        output_array = empty_aligned((16, 8), dtype='float64', n=16)
+
+        fft = FFTW(input_array, output_array, axes=(0, 1),
+                direction='FFTW_REDFT10')
+        self.assertEqual(fft.direction, ['FFTW_REDFT10', 'FFTW_REDFT10'])
+
+        fft = FFTW(input_array, output_array, axes=(0, 1, 0),
+                direction=['FFTW_REDFT10', 'FFTW_RODFT01', 'FFTW_DHT'])
+        self.assertEqual(fft.direction, ['FFTW_REDFT10', 'FFTW_RODFT01'])
+
+    def test_r2r_invalid_direction(self):
+        '''Test that the kinds of a real to real transform are checked
+        '''
+        input_array = empty_aligned((16, 8), dtype='float64', n=16)
+        output_array = empty_aligned((16, 8), dtype='float64', n=16)
+
+        self.assertRaisesRegex(ValueError, 'Invalid direction',
+                FFTW, input_array, output_array, direction='FFTW_FORWARD')
+
+        self.assertRaisesRegex(ValueError, 'Invalid direction',
+                FFTW, input_array, output_array, axes=(0, 1),
+                direction=['FFTW_REDFT10'])
+
+        self.assertRaisesRegex(ValueError, 'Invalid direction',
+                FFTW, self.input_array, self.output_array,
+                direction='FFTW_REDFT10')
+
+    def test_r2r_normalisation(self):
+        '''Test that only the inverse kinds of real to real transform are
+        normalised, by the logical size of the transform
+        '''
+        input_array = empty_aligned(8, dtype='float64', n=16)
+        output_array = empty_aligned(8, dtype='float64', n=16)
+        input_array[:] = numpy.random.randn(8)
+
+        forward = FFTW(input_array, output_array, direction='FFTW_REDFT10')
+        output = forward().copy()
+        self.assertTrue(numpy.allclose(
+            output, forward(normalise_idft=False)))
+
+        backward = FFTW(output_array, input_array.copy(),
+                direction='FFTW_REDFT01')
+        self.assertEqual(backward.N, 16)
+        self.assertTrue(numpy.allclose(backward(output), input_array))
+
     def test_axes_property(self):
         '''Test to see if the axes property returns the correct thing
         '''
@@ -0,0 +1,252 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw import Convolver
+import numpy
+
+from .test_pyfftw_base import run_test_suites
+
+import unittest
+from timeit import Timer
+
+class ConvolverTest(unittest.TestCase):
+
+    dtypes = (numpy.float32, numpy.float64, numpy.longdouble)
+    tap_lengths = (1, 7, 64, 301)
+
+    def __init__(self, *args, **kwargs):
+
+        super(ConvolverTest, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def tolerance(self, dtype):
+        if numpy.dtype(dtype) == numpy.dtype('float32'):
+            return {'rtol': 1e-3, 'atol': 1e-3}
+        else:
+            return {'rtol': 1e-8, 'atol': 1e-8}
+
+    def test_filter(self):
+        for dtype in self.dtypes:
+            for n_taps in self.tap_lengths:
+                taps = numpy.random.randn(n_taps).astype(dtype)
+                x = numpy.random.randn(5000).astype(dtype)
+
+                convolver = Convolver(taps, planner_effort='FFTW_ESTIMATE')
+                output = convolver.filter(x)
+
+                ref = numpy.convolve(
+                        x.astype('float64'), taps.astype('float64'))[:len(x)]
+
+                self.assertEqual(output.dtype, numpy.dtype(dtype))
+                self.assertEqual(output.shape, x.shape)
+                self.assertTrue(numpy.allclose(output, ref,
+                    **self.tolerance(dtype)))
+
+    def test_streaming(self):
+        for dtype in self.dtypes:
+            for n_taps in self.tap_lengths:
+                taps = numpy.random.randn(n_taps).astype(dtype)
+                x = numpy.random.randn(5000).astype(dtype)
+
+                convolver = Convolver(taps, planner_effort='FFTW_ESTIMATE')
+
+                # Chunks of varying sizes, some shorter than the filter
+                # and some longer than a block.
+                boundaries = [0, 1, 3, 200, 201, 1500, 1600, 4000, 5000]
+                outputs = []
+                for start, stop in zip(boundaries[:-1], boundaries[1:]):
+                    outputs.append(convolver(x[start:stop]))
+
+                output = numpy.concatenate(outputs)
+
+                ref = numpy.convolve(
+                        x.astype('float64'), taps.astype('float64'))[:len(x)]
+
+                self.assertTrue(numpy.allclose(output, ref,
+                    **self.tolerance(dtype)))
+
+    def test_reset(self):
+        taps = numpy.random.randn(31)
+        x = numpy.random.randn(500)
+
+        convolver = Convolver(taps, planner_effort='FFTW_ESTIMATE')
+        first_output = convolver.filter(x)
+        convolver.filter(numpy.random.randn(100))
+        convolver.reset()
+
+        self.assertTrue(numpy.allclose(convolver.filter(x), first_output))
+
+    def test_convolve(self):
+        for dtype in self.dtypes:
+            for n_taps in self.tap_lengths:
+                taps = numpy.random.randn(n_taps).astype(dtype)
+                x = numpy.random.randn(1234).astype(dtype)
+
+                convolver = Convolver(taps, planner_effort='FFTW_ESTIMATE')
+
+                # Put the stream into a non-trivial state
+                stream_chunk = numpy.random.randn(50)
+                stream_output = convolver.filter(stream_chunk)
+
+                output = convolver.convolve(x)
+
+                ref = numpy.convolve(x.astype('float64'), taps.astype('float64'))
+
+                self.assertEqual(output.shape, ref.shape)
+                self.assertTrue(numpy.allclose(output, ref,
+                    **self.tolerance(dtype)))
+
+                # The stream is unaffected
+                next_chunk = numpy.random.randn(50)
+                ref = numpy.convolve(
+                        numpy.concatenate((stream_chunk, next_chunk)),
+                        taps.astype('float64'))[50:100]
+
+                self.assertTrue(numpy.allclose(
+                    convolver.filter(next_chunk), ref,
+                    **self.tolerance(dtype)))
+
+    def test_block_size(self):
+        taps = numpy.random.randn(100)
+        x = numpy.random.randn(3000)
+
+        for block_size in (100, 128, 250, 4096):
+            convolver = Convolver(taps, block_size=block_size,
+                    planner_effort='FFTW_ESTIMATE')
+
+            self.assertEqual(convolver.block_size, block_size)
+            self.assertEqual(convolver.step, block_size - 99)
+            self.assertTrue(numpy.allclose(convolver.filter(x),
+                numpy.convolve(x, taps)[:len(x)]))
+
+    def test_default_block_size(self):
+        for n_taps in self.tap_lengths:
+            convolver = Convolver(numpy.random.randn(n_taps),
+                    planner_effort='FFTW_ESTIMATE')
+
+            block_size = convolver.block_size
+            self.assertEqual(convolver.n_taps, n_taps)
+            self.assertTrue(block_size >= 2 * n_taps)
+            # A power of two
+            self.assertEqual(block_size & (block_size - 1), 0)
+
+    def test_dtype(self):
+        taps = numpy.random.randn(10)
+        self.assertEqual(Convolver(taps).dtype, numpy.dtype('float64'))
+
+        taps = numpy.float32(taps)
+        self.assertEqual(Convolver(taps).dtype, numpy.dtype('float32'))
+
+        # integers default to double precision
+        taps = numpy.arange(10)
+        self.assertEqual(Convolver(taps).dtype, numpy.dtype('float64'))
+
+        convolver = Convolver(taps, dtype='float32')
+        self.assertEqual(convolver.dtype, numpy.dtype('float32'))
+        self.assertEqual(convolver.filter(numpy.arange(20)).dtype,
+                numpy.dtype('float32'))
+
+    def test_invalid_args(self):
+        self.assertRaisesRegex(ValueError, 'Invalid taps',
+                Convolver, numpy.random.randn(4, 4))
+
+        self.assertRaisesRegex(ValueError, 'Invalid taps',
+                Convolver, [])
+
+        self.assertRaisesRegex(TypeError, 'Invalid taps',
+                Convolver, numpy.ones(4, dtype='complex128'))
+
+        self.assertRaisesRegex(ValueError, 'Invalid dtype',
+                Convolver, numpy.ones(4), dtype='complex128')
+
+        self.assertRaisesRegex(ValueError, 'Invalid dtype',
+                Convolver, numpy.ones(4), dtype='int32')
+
+        self.assertRaisesRegex(ValueError, 'Invalid block size',
+                Convolver, numpy.ones(64), block_size=32)
+
+        convolver = Convolver(numpy.ones(4))
+        self.assertRaisesRegex(ValueError, 'Invalid input shape',
+                convolver.filter, numpy.ones((4, 4)))
+
+        self.assertRaisesRegex(ValueError, 'Invalid input shape',
+                convolver.convolve, numpy.ones((4, 4)))
+
+    def test_threads(self):
+        taps = numpy.random.randn(513)
+        x = numpy.random.randn(20000)
+
+        convolver = Convolver(taps, threads=2,
+                planner_effort='FFTW_ESTIMATE')
+
+        self.assertTrue(numpy.allclose(convolver.filter(x),
+            numpy.convolve(x, taps)[:len(x)]))
+
+    def test_time(self):
+        taps = numpy.random.randn(1024)
+        x = numpy.random.randn(2**18)
+
+        convolver = Convolver(taps)
+
+        self.timer_routine(lambda: convolver.filter(x),
+                lambda: numpy.convolve(x, taps)[:len(x)],
+                comparison_string='numpy.convolve')
+
+        self.assertTrue(True)
+
+    def timer_routine(self, pyfftw_callable, numpy_callable,
+            comparison_string):
+
+        N = 10
+
+        t = Timer(stmt=pyfftw_callable)
+        t_numpy = Timer(stmt=numpy_callable)
+
+        t_str = ("%.2f" % (1000.0/N*t.timeit(N)))+' ms'
+        t_numpy_str = ("%.2f" % (1000.0/N*t_numpy.timeit(N)))+' ms'
+
+        print('One run: '+ t_str + \
+                ' (versus ' + t_numpy_str + ' for ' + comparison_string + \
+                ')')
+
+test_cases = (
+        ConvolverTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
@@ -0,0 +1,185 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+import pyfftw
+import numpy
+import pickle
+
+try:
+    import dask.array
+
+except ImportError:
+    dask_missing = True
+
+else:
+    dask_missing = False
+    from pyfftw.interfaces import dask_fft
+
+import unittest
+from .test_pyfftw_base import run_test_suites
+
+@unittest.skipIf(dask_missing, 'dask is not installed, so this feature is '
+        'unavailable')
+class InterfacesDaskFFTTest(unittest.TestCase):
+
+    funcs = ('fft', 'ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
+            'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 'irfftn',
+            'hfft', 'ihfft')
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesDaskFFTTest, self).__init__(*args, **kwargs)
+
+        # Assume python 3, but keep backwards compatibility
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.complex_data = (numpy.random.randn(8, 16, 12) +
+                1j*numpy.random.randn(8, 16, 12))
+        self.real_data = self.complex_data.real.copy()
+
+        pyfftw.interfaces.cache.disable()
+
+    def tearDown(self):
+        pyfftw.interfaces.cache.disable()
+
+    def input_data(self, func, dtype=None):
+        if func in ('rfft', 'rfft2', 'rfftn', 'ihfft'):
+            data = self.real_data
+        else:
+            data = self.complex_data
+
+        if dtype is not None:
+            data = data.astype(dtype)
+
+        return data, dask.array.from_array(data, chunks=(3, 16, 12))
+
+    def test_funcs(self):
+        for func in self.funcs:
+            data, dask_data = self.input_data(func)
+
+            if func.endswith('2') or func.endswith('n'):
+                kwargs = {'axes': (1, 2)}
+            else:
+                kwargs = {}
+
+            output = getattr(dask_fft, func)(dask_data, **kwargs)
+            expected = getattr(numpy.fft, func)(data, **kwargs)
+
+            self.assertEqual(output.dtype, expected.dtype)
+
+            computed = output.compute(scheduler='synchronous')
+            self.assertEqual(computed.dtype, expected.dtype)
+            self.assertTrue(numpy.allclose(computed, expected), msg=func)
+
+    def test_lengths(self):
+        data, dask_data = self.input_data('rfftn')
+
+        output = dask_fft.rfftn(dask_data, s=(10, 20), axes=(1, 2))
+        self.assertTrue(numpy.allclose(
+            output.compute(scheduler='synchronous'),
+            numpy.fft.rfftn(data, s=(10, 20), axes=(1, 2))))
+
+        data, dask_data = self.input_data('fft')
+
+        output = dask_fft.fft(dask_data, n=7, axis=-1)
+        self.assertTrue(numpy.allclose(
+            output.compute(scheduler='synchronous'),
+            numpy.fft.fft(data, n=7, axis=-1)))
+
+    def test_precision(self):
+        for func in self.funcs:
+            data, dask_data = self.input_data(func, 'complex64'
+                    if numpy.iscomplexobj(self.input_data(func)[0])
+                    else 'float32')
+
+            if func.endswith('2') or func.endswith('n'):
+                output = getattr(dask_fft, func)(dask_data, axes=(1, 2))
+            else:
+                output = getattr(dask_fft, func)(dask_data)
+
+            self.assertEqual(output.dtype,
+                    output.compute(scheduler='synchronous').dtype)
+            self.assertIn(output.dtype, (numpy.dtype('float32'),
+                numpy.dtype('complex64')))
+
+    def test_plan_per_chunk_shape(self):
+        data, dask_data = self.input_data('fft2')
+
+        output = dask_fft.fft2(dask_data, axes=(1, 2), threads=2,
+                planner_effort='FFTW_ESTIMATE')
+        output.compute(scheduler='synchronous')
+
+        self.assertTrue(pyfftw.interfaces.cache.is_enabled())
+
+        keys = [key for key, hits, planning_time in
+                pyfftw.interfaces.cache._fftw_cache.records()
+                if key[0] == 'fft2' and key[1] != (0, 0, 0)]
+
+        # The chunks have two shapes, so there are two plans
+        self.assertEqual(sorted(key[1] for key in keys),
+                [(2, 16, 12), (3, 16, 12)])
+
+        for key in keys:
+            self.assertEqual(key[7], 'FFTW_ESTIMATE')
+            self.assertEqual(key[8], 2)
+
+    def test_chunked_axis(self):
+        data, dask_data = self.input_data('fft')
+
+        self.assertRaisesRegex(ValueError, 'chunk',
+                dask_fft.fft, dask_data, axis=0)
+
+    def test_pickle(self):
+        data, dask_data = self.input_data('fft')
+
+        output = dask_fft.fft(dask_data, threads=2)
+        graph = pickle.loads(pickle.dumps(dict(output.__dask_graph__())))
+
+        self.assertEqual(len(graph), len(output.__dask_graph__()))
+
+    def test_acquired_names(self):
+        for name in ('fftfreq', 'rfftfreq', 'fftshift', 'ifftshift'):
+            self.assertIs(getattr(dask_fft, name),
+                    getattr(dask.array.fft, name))
+
+test_cases = (
+        InterfacesDaskFFTTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
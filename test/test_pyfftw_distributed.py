@@ -0,0 +1,251 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw import builders
+from pyfftw.builders import distributed
+import numpy
+
+from .test_pyfftw_base import run_test_suites
+
+import unittest
+import multiprocessing
+from timeit import Timer
+
+def make_complex_data(shape, dtype):
+    ar, ai = dtype(numpy.random.randn(2, *shape))
+    return ar + 1j*ai
+
+class BuildersDistributedTestFFTN(unittest.TestCase):
+
+    func = 'fftn'
+    np_func = staticmethod(numpy.fft.fftn)
+
+    test_shapes = (
+            ((16, 16), {}),
+            ((32, 24, 8), {}),
+            ((15, 7, 9), {}),
+            ((8, 16, 12), {'axes': (1, 2)}),
+            ((8, 16, 12), {'axes': (2, 0)}),
+            ((6, 8, 10, 4), {'axes': (-1, -3)}),
+            ((16, 16), {'s': (20, 12)}),
+            ((12, 8, 10), {'s': (16, 6), 'axes': (0, 2)}),
+            )
+
+    dtypes = (numpy.complex64, numpy.complex128, numpy.clongdouble)
+
+    def __init__(self, *args, **kwargs):
+
+        super(BuildersDistributedTestFFTN, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def tolerance(self, dtype):
+        if dtype == numpy.complex64:
+            return {'rtol': 1e-3, 'atol': 1e-3}
+        else:
+            return {'rtol': 1e-8, 'atol': 1e-8}
+
+    def test_shapes_and_dtypes(self):
+        for dtype in self.dtypes:
+            for shape, kwargs in self.test_shapes:
+                a = make_complex_data(shape, dtype)
+
+                FFTW_object = getattr(distributed, self.func)(
+                        a, processes=3, planner_effort='FFTW_ESTIMATE',
+                        **kwargs)
+
+                try:
+                    output = FFTW_object()
+                    ref = self.np_func(a, **kwargs)
+
+                    self.assertEqual(output.dtype, numpy.dtype(dtype))
+                    self.assertEqual(output.shape, ref.shape)
+                    self.assertTrue(numpy.allclose(output, ref,
+                        **self.tolerance(dtype)))
+
+                    # and with a new input
+                    b = make_complex_data(shape, dtype)
+                    output = FFTW_object(b)
+                    self.assertTrue(numpy.allclose(output,
+                        self.np_func(b, **kwargs), **self.tolerance(dtype)))
+
+                finally:
+                    FFTW_object.close()
+
+    def test_real_input(self):
+        a = numpy.random.randn(16, 12)
+
+        with getattr(distributed, self.func)(a, processes=2) as FFTW_object:
+            self.assertEqual(FFTW_object.output_array.dtype,
+                    numpy.dtype('complex128'))
+            self.assertTrue(numpy.allclose(FFTW_object(),
+                self.np_func(a)))
+
+        a = numpy.random.randn(16, 12).astype('float32')
+
+        with getattr(distributed, self.func)(a, processes=2) as FFTW_object:
+            self.assertEqual(FFTW_object.output_array.dtype,
+                    numpy.dtype('complex64'))
+
+    def test_attributes(self):
+        a = make_complex_data((16, 8, 4), numpy.complex128)
+
+        with getattr(distributed, self.func)(a, axes=(0, 1),
+                processes=2) as FFTW_object:
+
+            self.assertIs(FFTW_object.input_array, FFTW_object.output_array)
+            self.assertEqual(FFTW_object.axes, (0, 1))
+            self.assertEqual(FFTW_object.processes, 2)
+
+            if self.func == 'fftn':
+                self.assertEqual(FFTW_object.direction, 'FFTW_FORWARD')
+            else:
+                self.assertEqual(FFTW_object.direction, 'FFTW_BACKWARD')
+
+    def test_processes_clamped(self):
+        a = make_complex_data((3, 16), numpy.complex128)
+
+        with getattr(distributed, self.func)(a, processes=8) as FFTW_object:
+            self.assertEqual(FFTW_object.processes, 3)
+            self.assertTrue(numpy.allclose(FFTW_object(), self.np_func(a)))
+
+    def test_default_processes(self):
+        a = make_complex_data((64, 64), numpy.complex128)
+
+        with getattr(distributed, self.func)(a) as FFTW_object:
+            self.assertEqual(FFTW_object.processes,
+                    min(multiprocessing.cpu_count(), 64))
+
+    def test_threads(self):
+        a = make_complex_data((32, 32, 32), numpy.complex128)
+
+        with getattr(distributed, self.func)(a, processes=2,
+                threads=2) as FFTW_object:
+
+            self.assertTrue(numpy.allclose(FFTW_object(), self.np_func(a)))
+
+    def test_close(self):
+        a = make_complex_data((16, 16), numpy.complex128)
+
+        FFTW_object = getattr(distributed, self.func)(a, processes=2)
+        processes = FFTW_object._processes
+
+        FFTW_object.close()
+
+        for process in processes:
+            self.assertFalse(process.is_alive())
+
+        self.assertRaisesRegex(RuntimeError, 'Invalid state',
+                FFTW_object)
+
+        # Closing again is harmless
+        FFTW_object.close()
+
+    def test_invalid_args(self):
+        a = make_complex_data((16, 16), numpy.complex128)
+        func = getattr(distributed, self.func)
+
+        self.assertRaisesRegex(ValueError, 'Invalid axes',
+                func, a, axes=(-1,))
+
+        self.assertRaisesRegex(ValueError, 'Invalid axes',
+                func, a[0])
+
+        self.assertRaisesRegex(ValueError, 'Invalid planner effort',
+                func, a, planner_effort='garbage')
+
+        self.assertRaisesRegex(ValueError, 'Invalid processes',
+                func, a, processes=0)
+
+        self.assertRaises(IndexError, func, a, axes=(0, 3))
+
+        with func(a, processes=2) as FFTW_object:
+            self.assertRaisesRegex(ValueError, 'Invalid input shape',
+                    FFTW_object, numpy.zeros((8, 16)))
+
+class BuildersDistributedTestIFFTN(BuildersDistributedTestFFTN):
+
+    func = 'ifftn'
+    np_func = staticmethod(numpy.fft.ifftn)
+
+    def test_normalise_idft(self):
+        a = make_complex_data((16, 16), numpy.complex128)
+
+        with distributed.ifftn(a, processes=2) as FFTW_object:
+            self.assertTrue(numpy.allclose(
+                FFTW_object(a, normalise_idft=False),
+                numpy.fft.ifftn(a) * a.size))
+
+class BuildersDistributedTestTiming(unittest.TestCase):
+
+    def test_time(self):
+        n_processes = min(multiprocessing.cpu_count(), 4)
+
+        a = make_complex_data((128, 128, 128), numpy.complex128)
+
+        with distributed.fftn(a, processes=n_processes) as FFTW_object:
+            threaded_FFTW_object = builders.fftn(a, threads=n_processes)
+
+            self.timer_routine(FFTW_object, threaded_FFTW_object,
+                    comparison_string='builders.fftn with threads=%d' %
+                    n_processes)
+
+        self.assertTrue(True)
+
+    def timer_routine(self, pyfftw_callable, comparison_callable,
+            comparison_string):
+
+        N = 10
+
+        t = Timer(stmt=pyfftw_callable)
+        t_comparison = Timer(stmt=comparison_callable)
+
+        t_str = ("%.2f" % (1000.0/N*t.timeit(N)))+' ms'
+        t_comparison_str = ("%.2f" % (1000.0/N*t_comparison.timeit(N)))+' ms'
+
+        print('One run: '+ t_str + \
+                ' (versus ' + t_comparison_str + ' for ' +
+                comparison_string + ')')
+
+test_cases = (
+        BuildersDistributedTestFFTN,
+        BuildersDistributedTestIFFTN,
+        BuildersDistributedTestTiming,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
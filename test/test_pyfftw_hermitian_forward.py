@@ -0,0 +1,182 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw import FFTW, empty_aligned
+import numpy
+
+from .test_pyfftw_base import FFTWBaseTest, run_test_suites
+
+import unittest
+
+class HermitianForwardDoubleFFTWTest(FFTWBaseTest):
+    '''Real forward transforms into an output the same shape as the 
+    input, which are filled in from the Hermitian symmetry.
+    '''
+
+    def setUp(self):
+
+        self.input_dtype = numpy.float64
+        self.output_dtype = numpy.complex128
+        self.np_fft_comparison = numpy.fft.fft
+
+        self.direction = 'FFTW_FORWARD'
+
+    def make_shapes(self):
+        self.shapes = (
+                ((16,), (0,)),
+                ((7,), (0,)),
+                ((2,), (0,)),
+                ((1,), (0,)),
+                ((256, 2048), (-1,)),
+                ((256, 2048), (-2, -1)),
+                ((255, 33), (-2, -1)),
+                ((33, 255), (-1, -2)),
+                ((5, 9, 6), (0, 2)),
+                ((5, 9, 6), (0, 1, 2)),
+                ((6, 5, 7), (2, 0, 1)),
+                ((5, 9, 6), (1,)))
+
+    def validate(self, a, b, axes, **kwargs):
+        fft = FFTW(a, b, axes=axes, **kwargs)
+
+        a[:] = numpy.random.randn(*a.shape)
+        b[:] = numpy.nan
+
+        fft.execute()
+
+        self.assertTrue(numpy.allclose(b, self.reference_fftn(a, axes),
+            rtol=1e-3, atol=1e-3))
+
+        return fft
+
+    def test_shapes(self):
+        for shape, axes in self.shapes:
+            a = empty_aligned(shape, dtype=self.input_dtype)
+            b = empty_aligned(shape, dtype=self.output_dtype)
+
+            self.validate(a, b, axes)
+
+    def test_non_contiguous(self):
+        a = empty_aligned((256, 2048), dtype=self.input_dtype)
+        b = empty_aligned((256, 2048), dtype=self.output_dtype)
+
+        # Some arbitrary and crazy slicing
+        a_sliced = a[12:200:3, 300:2041:9]
+        # b needs to be compatible
+        b_sliced = b[20:146:2, 100:1846:9]
+
+        self.validate(a_sliced, b_sliced, (-2, -1))
+        self.validate(a_sliced, b_sliced, (-1, -2), 
+                flags=('FFTW_ESTIMATE', 'FFTW_UNALIGNED'))
+
+    def test_threads(self):
+        a = empty_aligned((64, 512), dtype=self.input_dtype)
+        b = empty_aligned((64, 512), dtype=self.output_dtype)
+
+        self.validate(a, b, (-2, -1), threads=2)
+
+    def test_update_arrays(self):
+        a = empty_aligned((32, 15), dtype=self.input_dtype)
+        b = empty_aligned((32, 15), dtype=self.output_dtype)
+
+        fft = self.validate(a, b, (-2, -1))
+
+        new_a = empty_aligned((32, 15), dtype=self.input_dtype)
+        new_b = empty_aligned((32, 15), dtype=self.output_dtype)
+        new_a[:] = numpy.random.randn(32, 15)
+
+        fft(new_a, new_b)
+
+        self.assertTrue(fft.output_array is new_b)
+        self.assertTrue(numpy.allclose(new_b, 
+            self.reference_fftn(new_a, (-2, -1)), rtol=1e-3, atol=1e-3))
+
+    def test_wrong_length_fails(self):
+        a = empty_aligned((32, 16), dtype=self.input_dtype)
+        b = empty_aligned((32, 12), dtype=self.output_dtype)
+
+        with self.assertRaisesRegex(ValueError, 'Invalid shapes'):
+            FFTW(a, b)
+
+    def test_time(self):
+        a = empty_aligned((64, 4096), dtype=self.input_dtype)
+        b = empty_aligned((64, 4096), dtype=self.output_dtype)
+        a[:] = numpy.random.randn(64, 4096)
+
+        fft = FFTW(a, b)
+        c2c_fft = FFTW(b.copy(), b.copy())
+
+        self.timer_routine(lambda: fft(),
+                lambda: c2c_fft(a),
+                comparison_string='promoting to complex')
+
+class HermitianForwardSingleFFTWTest(HermitianForwardDoubleFFTWTest):
+
+    def setUp(self):
+
+        self.input_dtype = numpy.float32
+        self.output_dtype = numpy.complex64
+        self.np_fft_comparison = numpy.fft.fft
+
+        self.direction = 'FFTW_FORWARD'
+
+class HermitianForwardLongDoubleFFTWTest(HermitianForwardDoubleFFTWTest):
+
+    def setUp(self):
+
+        self.input_dtype = numpy.longdouble
+        self.output_dtype = numpy.clongdouble
+        self.np_fft_comparison = numpy.fft.fft
+
+        self.direction = 'FFTW_FORWARD'
+
+    @unittest.skip('numpy.fft has issues with this dtype.')
+    def test_time(self):
+        pass
+
+    def reference_fftn(self, a, axes):
+
+        a = numpy.asarray(a, dtype=numpy.float64)
+        return numpy.fft.fftn(a, axes=axes)
+
+test_cases = (
+        HermitianForwardDoubleFFTWTest,
+        HermitianForwardSingleFFTWTest,
+        HermitianForwardLongDoubleFFTWTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
@@ -34,6 +34,7 @@
 #
 
 
+import pyfftw
 from pyfftw import interfaces, builders
 import numpy
 
@@ -41,8 +42,13 @@ import unittest
 from .test_pyfftw_base import run_test_suites
 from .test_pyfftw_numpy_interface import InterfacesNumpyFFTTestFFT
 
+import json
+import os
+import shutil
+import tempfile
 import threading
 import time
+from timeit import Timer, default_timer
 
 '''Test the caching functionality of the interfaces package.
 '''
@@ -80,12 +86,12 @@ class CacheSpecificInterfacesUtils(unittest.TestCase):
         _Cache_class = interfaces.cache._Cache        
         class _SlowLookupCache(_Cache_class):
 
-            def _lookup(self, key):
-                return _Cache_class.lookup(self, key)
+            def _checkout(self, key):
+                return _Cache_class.checkout(self, key)
 
-            def lookup(self, key):
+            def checkout(self, key):
                 time.sleep(0.1)
-                return self._lookup(key)
+                return self._checkout(key)
 
         try:
             interfaces.cache._Cache = _SlowLookupCache
@@ -109,6 +115,51 @@ class CacheSpecificInterfacesUtils(unittest.TestCase):
             # Revert the monkey patching
             interfaces.cache._Cache = _Cache_class
     
+    def test_concurrent_calls(self):
+        '''Checks that many threads using the same transform at once all
+        get the right answers.
+        '''
+        data_shape = (16, 1024)
+        n_threads = 8
+        n_calls = 50
+
+        interfaces.cache.enable()
+        interfaces.cache.set_keepalive_time(10)
+
+        errors = []
+
+        def worker():
+            for n in range(n_calls):
+                ar, ai = numpy.random.randn(*(2,) + data_shape)
+                a = ar + 1j*ai
+
+                # The GIL is released during threaded execution, and the
+                # normalisation of the inverse is done after it, so
+                # sharing an object would give wrong answers here.
+                if not numpy.allclose(
+                        interfaces.numpy_fft.ifft(a, threads=2),
+                        numpy.fft.ifft(a)):
+                    errors.append(n)
+
+        try:
+            threads = [threading.Thread(target=worker)
+                    for n in range(n_threads)]
+
+            for each_thread in threads:
+                each_thread.start()
+
+            for each_thread in threads:
+                each_thread.join()
+
+            self.assertEqual(errors, [])
+
+            # At most one object per thread was ever needed
+            _cache = interfaces.cache._fftw_cache
+            self.assertTrue(1 <= _cache.n_objects <= n_threads)
+
+        finally:
+            interfaces.cache.disable()
+
 
 class InterfacesCacheTest(unittest.TestCase):
     
@@ -143,6 +194,40 @@ class InterfacesCacheTest(unittest.TestCase):
         interfaces.cache.disable()
         self.assertIs(interfaces.cache._fftw_cache, None)
 
+    def test_set_bounds(self):
+        with self.assertRaises(interfaces.cache.CacheError):
+            interfaces.cache.set_max_entries(10)
+
+        with self.assertRaises(interfaces.cache.CacheError):
+            interfaces.cache.set_max_bytes(10)
+
+        interfaces.cache.enable()
+
+        self.assertEqual(interfaces.cache._fftw_cache.max_entries,
+                interfaces.cache._default_max_entries)
+        self.assertEqual(interfaces.cache._fftw_cache.max_bytes,
+                interfaces.cache._default_max_bytes)
+
+        interfaces.cache.set_max_entries(10)
+        interfaces.cache.set_max_bytes(1000)
+
+        self.assertEqual(interfaces.cache._fftw_cache.max_entries, 10)
+        self.assertEqual(interfaces.cache._fftw_cache.max_bytes, 1000)
+
+        interfaces.cache.disable()
+
+    def test_planning_cost_recorded(self):
+        interfaces.cache.enable()
+        interfaces.cache.set_keepalive_time(10)
+
+        interfaces.numpy_fft.fft(numpy.random.randn(64) + 0j)
+
+        entries = list(interfaces.cache._fftw_cache._cache_dict.values())
+        self.assertEqual(len(entries), 1)
+        self.assertTrue(entries[0].cost > 0)
+
+        interfaces.cache.disable()
+
     def test_set_keepalive_time(self):
         with self.assertRaises(interfaces.cache.CacheError):
             interfaces.cache.set_keepalive_time(10)
@@ -155,6 +240,125 @@ class InterfacesCacheTest(unittest.TestCase):
 
         interfaces.cache.disable()
 
+    def test_dump_and_warm(self):
+        with self.assertRaises(interfaces.cache.CacheError):
+            interfaces.cache.dump('unused')
+
+        with self.assertRaises(interfaces.cache.CacheError):
+            interfaces.cache.warm('unused')
+
+        interfaces.cache.enable()
+        interfaces.cache.set_keepalive_time(10)
+
+        a = numpy.random.randn(64) + 1j*numpy.random.randn(64)
+        b = numpy.float32(numpy.random.randn(16, 8))
+
+        for n in range(3):
+            interfaces.numpy_fft.fft(a)
+
+        interfaces.numpy_fft.rfft(b, axis=0)
+
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, 'cache.json')
+
+        try:
+            interfaces.cache.dump(path)
+
+            with open(path) as f:
+                contents = json.load(f)
+
+            self.assertEqual(len(contents['wisdom']), 3)
+
+            transforms = contents['transforms']
+            self.assertEqual([record['func'] for record in transforms],
+                    ['fft', 'rfft'])
+            self.assertEqual([record['hits'] for record in transforms],
+                    [2, 0])
+            self.assertEqual(transforms[1]['shape'], [16, 8])
+            self.assertEqual(transforms[1]['axes'], 0)
+            self.assertTrue(transforms[0]['planning_time'] > 0)
+
+            # A new cache, as in a new process
+            interfaces.cache.disable()
+            interfaces.cache.enable()
+            interfaces.cache.set_keepalive_time(10)
+
+            self.assertEqual(interfaces.cache.warm(path), 2)
+            self.assertEqual(len(interfaces.cache._fftw_cache), 2)
+
+            output = interfaces.numpy_fft.rfft(b, axis=0)
+            self.assertTrue(numpy.allclose(output, numpy.fft.rfft(b, axis=0),
+                rtol=1e-4, atol=1e-4))
+
+            # Which came from the cache
+            self.assertEqual(len(interfaces.cache._fftw_cache), 2)
+            hits = dict((key[0], key_hits) for key, key_hits, _ in
+                    interfaces.cache._fftw_cache.records())
+            self.assertEqual(hits, {'fft': 0, 'rfft': 1})
+
+        finally:
+            shutil.rmtree(temp_dir)
+            interfaces.cache.disable()
+
+    def test_cached_call_unaligned_and_list_inputs(self):
+        interfaces.cache.enable()
+        interfaces.cache.set_keepalive_time(10)
+
+        a = pyfftw.empty_aligned(129, dtype='complex128')
+        a[:] = numpy.random.randn(129) + 1j*numpy.random.randn(129)
+
+        # The first call plans, and the later ones hit the cache with
+        # an aligned array, unaligned arrays and a list respectively.
+        for each_input in (a[1:].copy(), a[:-1], a[1:], list(a[1:])):
+            output = interfaces.numpy_fft.fft(each_input)
+
+            self.assertTrue(
+                    numpy.allclose(output, numpy.fft.fft(each_input)))
+
+        self.assertEqual(len(interfaces.cache._fftw_cache), 1)
+
+        interfaces.cache.disable()
+
+    def test_time(self):
+        '''Time a cached 256 point interfaces call against FFTW.execute.
+
+        The aim is for a cached call to be within a small margin of
+        FFTW.execute, which is not met: a call takes about ten times as
+        long (about 4.2 us against 0.4 us when this was written). Most of
+        the difference is checking the object out of the cache and back
+        in, which takes about 1.7 us. The rest is the argument handling,
+        the output allocation and the checks before executing. Only a
+        bound of twenty times is enforced, so that this does not become
+        worse.
+        '''
+        interfaces.cache.enable()
+        interfaces.cache.set_keepalive_time(10)
+
+        a = pyfftw.empty_aligned(256, dtype='complex128')
+        a[:] = numpy.random.randn(256) + 1j*numpy.random.randn(256)
+
+        fft_object = builders.fft(a)
+        interfaces.numpy_fft.fft(a)
+
+        N = 10000
+
+        t = Timer(stmt=lambda: interfaces.numpy_fft.fft(a))
+        t_execute = Timer(stmt=fft_object.execute)
+
+        # The best of a few runs, to keep out other load on the machine
+        call_time = min(t.repeat(3, N))/N
+        execute_time = min(t_execute.repeat(3, N))/N
+
+        t_str = ("%.2f" % (1e6*call_time))+' us'
+        t_execute_str = ("%.2f" % (1e6*execute_time))+' us'
+
+        print('One cached interfaces call: ' + t_str +
+                ' (versus ' + t_execute_str + ' for FFTW.execute)')
+
+        self.assertLess(call_time, 20 * execute_time)
+
+        interfaces.cache.disable()
+
 
 class CacheTest(unittest.TestCase):
 
@@ -203,6 +407,67 @@ class CacheTest(unittest.TestCase):
 
         self.assertIs(_cache.lookup(key), obj)
 
+    def test_checkout(self):
+        _cache = interfaces.cache._Cache(keepalive_time=10)
+
+        key = 'the key'
+
+        objects = [builders.fft(numpy.random.randn(16)) for n in range(2)]
+        _cache.insert(objects[0], key)
+        obj_nbytes = _cache.nbytes
+
+        # Nobody else gets a checked out object
+        self.assertIs(_cache.checkout(key), objects[0])
+        self.assertRaises(KeyError, _cache.checkout, key)
+        self.assertRaises(KeyError, _cache.lookup, key)
+        self.assertEqual(_cache.n_objects, 0)
+        self.assertEqual(_cache.nbytes, 0)
+
+        # ...until it is put back, alongside any new one
+        _cache.insert(objects[1], key)
+        _cache.release(objects[0], key)
+        _cache.release(objects[0], key)
+
+        self.assertEqual(len(_cache), 1)
+        self.assertEqual(_cache.n_objects, 2)
+        self.assertEqual(_cache.nbytes, 2 * obj_nbytes)
+
+        checked_out = [_cache.checkout(key), _cache.checkout(key)]
+        self.assertEqual(set(map(id, checked_out)), set(map(id, objects)))
+        self.assertRaises(KeyError, _cache.checkout, key)
+
+    def test_release_time(self):
+        '''Test putting a checked out object back, which happens on every
+        cache hit, is no slower than checking it out.
+        '''
+        _cache = interfaces.cache._Cache(keepalive_time=10)
+
+        key = 'the key'
+        _cache.insert(builders.fft(numpy.random.randn(16)), key)
+
+        N = 10000
+
+        def time_calls():
+            checkout_time = 0.0
+            release_time = 0.0
+
+            for n in range(N):
+                start = default_timer()
+                obj = _cache.checkout(key)
+                middle = default_timer()
+                _cache.release(obj, key)
+                checkout_time += middle - start
+                release_time += default_timer() - middle
+
+            return checkout_time, release_time
+
+        times = [time_calls() for n in range(3)]
+        checkout_time = min(each_times[0] for each_times in times)
+        release_time = min(each_times[1] for each_times in times)
+
+        self.assertLess(release_time, checkout_time)
+        self.assertEqual(_cache.n_objects, 1)
+
     def test_invalid_lookup(self):
         _cache = interfaces.cache._Cache()
 
@@ -275,6 +540,131 @@ class CacheTest(unittest.TestCase):
         time.sleep(old_keepalive_time * 8)
         self.assertRaises(KeyError, _cache.lookup, key)
 
+    def test_no_wakeups_when_idle(self):
+        _Cache_class = interfaces.cache._Cache
+
+        class _CountingCache(_Cache_class):
+            cull_count = 0
+
+            def _cull(self):
+                _CountingCache.cull_count += 1
+                return _Cache_class._cull(self)
+
+        _cache = _CountingCache(keepalive_time=0.05)
+        time.sleep(0.2)
+
+        # Only the initial cull
+        self.assertEqual(_CountingCache.cull_count, 1)
+
+        _cache.insert(builders.fft(numpy.random.randn(16)), 'the key')
+        time.sleep(0.2)
+
+        # Woken by the insert and then to cull the object
+        self.assertEqual(_CountingCache.cull_count, 3)
+        self.assertFalse('the key' in _cache)
+
+        time.sleep(0.2)
+        self.assertEqual(_CountingCache.cull_count, 3)
+
+    def test_max_entries(self):
+        _cache = interfaces.cache._Cache(keepalive_time=10, max_entries=3)
+
+        objects = [builders.fft(numpy.random.randn(16)) for n in range(5)]
+        for n, obj in enumerate(objects):
+            _cache.insert(obj, n)
+
+        self.assertEqual(len(_cache), 3)
+
+        # The oldest are evicted
+        for n in range(2):
+            self.assertFalse(n in _cache)
+
+        for n in range(2, 5):
+            self.assertIs(_cache.lookup(n), objects[n])
+
+        # ...unless they've been used since
+        _cache.lookup(2)
+        _cache.insert(objects[0], 0)
+        self.assertTrue(2 in _cache)
+        self.assertFalse(3 in _cache)
+
+        _cache.set_max_entries(1)
+        self.assertEqual(len(_cache), 1)
+        self.assertTrue(0 in _cache)
+
+        _cache.set_max_entries(None)
+        self.assertEqual(_cache.max_entries, None)
+
+        for n, obj in enumerate(objects):
+            _cache.insert(obj, n)
+
+        self.assertEqual(len(_cache), 5)
+
+    def test_max_bytes(self):
+        test_array = numpy.random.randn(64)
+        obj = builders.fft(test_array)
+        obj_nbytes = obj.input_array.nbytes + obj.output_array.nbytes
+
+        _cache = interfaces.cache._Cache(keepalive_time=10,
+                max_bytes=obj_nbytes * 2.5)
+
+        for n in range(4):
+            _cache.insert(builders.fft(test_array), n)
+
+        self.assertEqual(len(_cache), 2)
+        self.assertEqual(_cache.nbytes, obj_nbytes * 2)
+        self.assertTrue(2 in _cache and 3 in _cache)
+
+        _cache.set_max_bytes(obj_nbytes)
+        self.assertEqual(len(_cache), 1)
+        self.assertEqual(_cache.nbytes, obj_nbytes)
+
+        # An object that is too big is not kept at all
+        _cache.set_max_bytes(obj_nbytes - 1)
+        _cache.insert(obj, 'too big')
+        self.assertEqual(len(_cache), 0)
+        self.assertEqual(_cache.nbytes, 0)
+
+    def test_expensive_objects_kept(self):
+        _cache = interfaces.cache._Cache(keepalive_time=10, max_entries=2)
+
+        objects = [builders.fft(numpy.random.randn(16)) for n in range(4)]
+
+        _cache.insert(objects[0], 'expensive', 1.0)
+        _cache.insert(objects[1], 'cheap', 0.001)
+        _cache.insert(objects[2], 'cheap2', 0.001)
+
+        self.assertTrue('expensive' in _cache)
+        self.assertFalse('cheap' in _cache)
+
+        # ...but not forever
+        for n in range(2000):
+            _cache.insert(objects[3], n, 0.001)
+
+        self.assertFalse('expensive' in _cache)
+
+    def test_expensive_objects_kept_alive_longer(self):
+        _cache = interfaces.cache._Cache(keepalive_time=0.05)
+
+        obj = builders.fft(numpy.random.randn(16))
+        _cache.insert(obj, 'cheap')
+        _cache.insert(obj, 'expensive',
+                0.2/interfaces.cache._cost_keepalive_factor)
+
+        time.sleep(0.15)
+        self.assertFalse('cheap' in _cache)
+        self.assertIs(_cache.lookup('expensive'), obj)
+
+        time.sleep(0.35)
+        self.assertRaises(KeyError, _cache.lookup, 'expensive')
+
+    def test_invalid_bounds(self):
+        _cache = interfaces.cache._Cache()
+
+        self.assertRaises(ValueError, _cache.set_max_entries, -1)
+        self.assertRaises(ValueError, _cache.set_max_bytes, -1)
+        self.assertRaises(ValueError, _cache.set_max_bytes, 'foo')
+
 class InterfacesNumpyFFTCacheTestIFFT(InterfacesNumpyFFTCacheTestFFT):
     func = 'ifft'
 
@@ -32,7 +32,8 @@
 # POSSIBILITY OF SUCH DAMAGE.
 #
 
-from pyfftw import interfaces
+from pyfftw import interfaces, builders
+import pyfftw
 
 from .test_pyfftw_base import run_test_suites
 
@@ -560,6 +561,195 @@ class InterfacesNumpyFFTTestFFT(unittest.TestCase):
                         numpy.alltrue(input_array == orig_input_array))
 
 
+    def test_out(self):
+        '''Test that the result is written to the out argument, both when
+        it can be used directly and when it needs copying into.
+        '''
+        dtype_tuple = self.io_dtypes[functions[self.func]]
+        interface_func = getattr(self.test_interface, self.func)
+
+        for use_cache in (False, True):
+            if use_cache:
+                interfaces.cache.enable()
+
+            for dtype in dtype_tuple[0]:
+                for test_shape, s, kwargs in self.test_data:
+                    input_array = dtype_tuple[1](test_shape, dtype)
+
+                    ref = interface_func(input_array.copy(), s, **kwargs)
+
+                    out = numpy.empty_like(ref)
+                    strided_out = numpy.empty(
+                            ref.shape + (2,), ref.dtype)[..., 0]
+
+                    # Twice, so the second call is from the cache
+                    for each_out in (out, out, strided_out):
+                        output = interface_func(
+                                input_array, s, out=each_out, **kwargs)
+
+                        self.assertTrue(output is each_out)
+                        self.assertTrue(numpy.allclose(output, ref))
+
+                    self.assertRaisesRegex(ValueError,
+                            'Invalid output shape', interface_func,
+                            input_array, s, out=out[..., 1:], **kwargs)
+
+                    self.assertRaisesRegex(ValueError,
+                            'Invalid output dtype', interface_func,
+                            input_array, s, out=numpy.empty(
+                                ref.shape, dtype='int32'), **kwargs)
+
+            interfaces.cache.disable()
+
+    def test_shift(self):
+        '''Test that shift_input and shift_output are the same as shifting
+        with numpy.fft.ifftshift and numpy.fft.fftshift, with and without
+        the cache.
+        '''
+        if (self.test_interface is not interfaces.numpy_fft or
+                self.func in ('hfft', 'ihfft')):
+            # Not offered for these
+            return
+
+        dtype_tuple = self.io_dtypes[functions[self.func]]
+        interface_func = getattr(self.test_interface, self.func)
+
+        for use_cache in (False, True):
+            if use_cache:
+                interfaces.cache.enable()
+
+            for test_shape, s, kwargs in self.test_data:
+                # The double precision dtype
+                input_array = dtype_tuple[1](test_shape, dtype_tuple[0][1])
+
+                unique_axes = []
+                for axis in self.axes_from_kwargs(kwargs):
+                    if axis % len(test_shape) not in unique_axes:
+                        unique_axes.append(axis % len(test_shape))
+
+                # The half spectrum is not shifted along the last axis
+                input_shift_axes = unique_axes
+                output_shift_axes = unique_axes
+
+                if functions[self.func] == 'c2r':
+                    input_shift_axes = unique_axes[:-1]
+                elif functions[self.func] == 'r2c':
+                    output_shift_axes = unique_axes[:-1]
+
+                test_out_array = np_fft.fftshift(
+                        getattr(np_fft, self.func)(np_fft.ifftshift(
+                            input_array, input_shift_axes), s, **kwargs),
+                        output_shift_axes)
+
+                # Twice, so the second call is from the cache
+                for n in range(2):
+                    output_array = interface_func(input_array.copy(), s,
+                            shift_input=True, shift_output=True, **kwargs)
+
+                    self.assertTrue(numpy.allclose(output_array,
+                        test_out_array, rtol=1e-8, atol=1e-8))
+
+                    # and without shifting, from a different cache entry
+                    output_array = interface_func(input_array.copy(), s,
+                            **kwargs)
+
+                    self.assertTrue(numpy.allclose(output_array,
+                        getattr(np_fft, self.func)(input_array, s, **kwargs),
+                        rtol=1e-8, atol=1e-8))
+
+            interfaces.cache.disable()
+
+    def test_pad(self):
+        '''Test that pad rounds up the lengths of the transform as if they
+        had been passed as s, with and without the cache.
+        '''
+        if (self.test_interface is not interfaces.numpy_fft or
+                self.func in ('hfft', 'ihfft')):
+            # Not offered for these
+            return
+
+        dtype_tuple = self.io_dtypes[functions[self.func]]
+        interface_func = getattr(self.test_interface, self.func)
+        real = functions[self.func] in ('r2c', 'c2r')
+
+        for use_cache in (False, True):
+            if use_cache:
+                interfaces.cache.enable()
+
+            for test_shape, s, kwargs in self.test_data:
+                # The double precision dtype
+                input_array = dtype_tuple[1](test_shape, dtype_tuple[0][1])
+                axes = self.axes_from_kwargs(kwargs)
+
+                if s is None:
+                    lengths = [test_shape[axis] for axis in axes]
+
+                    if functions[self.func] == 'c2r':
+                        lengths[-1] = 2 * (lengths[-1] - 1)
+                else:
+                    lengths = list(numpy.atleast_1d(s))
+
+                padded = [pyfftw.next_fast_len(n) for n in lengths[:-1]]
+                padded.append(pyfftw.next_fast_len(lengths[-1], real))
+
+                if self.axes_kw == 'axis':
+                    padded = padded[0]
+
+                test_out_array = getattr(np_fft, self.func)(
+                        input_array, padded, **kwargs)
+
+                # Twice, so the second call is from the cache
+                for n in range(2):
+                    output_array = interface_func(input_array.copy(), s,
+                            pad='fast', **kwargs)
+
+                    self.assertTrue(numpy.allclose(output_array,
+                        test_out_array, rtol=1e-8, atol=1e-8))
+
+            interfaces.cache.disable()
+
+    def test_pad_cache_keys(self):
+        '''Test that arrays of many lengths padded to buckets need only an
+        object per bucket in the cache.
+        '''
+        if (self.test_interface is not interfaces.numpy_fft or
+                self.func in ('hfft', 'ihfft')):
+            return
+
+        dtype_tuple = self.io_dtypes[functions[self.func]]
+        interface_func = getattr(self.test_interface, self.func)
+
+        interfaces.cache.enable()
+
+        try:
+            for length in range(100, 160):
+                test_shape = (3, length)
+                input_array = dtype_tuple[1](test_shape, dtype_tuple[0][1])
+
+                if self.axes_kw == 'axis':
+                    kwargs = {'axis': -1}
+                else:
+                    kwargs = {'axes': (-1,)}
+
+                if functions[self.func] == 'c2r':
+                    length = 2 * (length - 1)
+
+                padded = builders._utils._next_bucket_len(length)
+                if self.axes_kw != 'axis':
+                    padded = (padded,)
+
+                self.assertTrue(numpy.allclose(
+                    interface_func(input_array, pad='bucket', **kwargs),
+                    getattr(np_fft, self.func)(input_array, padded,
+                        **kwargs)))
+
+            # The lengths are padded to 112, 128 and 160 (or to 224, 256
+            # and 320 for the inverse real transforms).
+            self.assertEqual(len(interfaces.cache._fftw_cache.records()), 3)
+
+        finally:
+            interfaces.cache.disable()
+
 class InterfacesNumpyFFTTestIFFT(InterfacesNumpyFFTTestFFT):
     func = 'ifft'
 
@@ -574,8 +764,42 @@ class InterfacesNumpyFFTTestHFFT(InterfacesNumpyFFTTestFFT):
     func = 'hfft'
     realinv = True
 
-class InterfacesNumpyFFTTestIHFFT(InterfacesNumpyFFTTestFFT):
+    # The transform without the conjugation, which uses the same objects
+    shared_func = 'irfft'
+
+    def test_shared_cache_objects(self):
+        '''Test that the cached objects shared with the transform without
+        the conjugation give the right results for both.
+        '''
+        dtype_tuple = self.io_dtypes[functions[self.func]]
+        interface_func = getattr(self.test_interface, self.func)
+        shared_func = getattr(self.test_interface, self.shared_func)
+
+        interfaces.cache.enable()
+
+        try:
+            for test_shape in ((16,), (17,), (6, 9)):
+                # The double precision dtype
+                input_array = dtype_tuple[1](test_shape, dtype_tuple[0][1])
+
+                for each_func in (shared_func, interface_func, shared_func,
+                        interface_func):
+
+                    output_array = each_func(input_array.copy())
+                    np_output_array = getattr(np_fft, each_func.__name__)(
+                            input_array)
+
+                    self.assertTrue(numpy.allclose(output_array,
+                        np_output_array, rtol=1e-8, atol=1e-8))
+
+        finally:
+            interfaces.cache.disable()
+
+class InterfacesNumpyFFTTestIHFFT(InterfacesNumpyFFTTestHFFT):
     func = 'ihfft'
+    realinv = False
+
+    shared_func = 'rfft'
 
 class InterfacesNumpyFFTTestFFT2(InterfacesNumpyFFTTestFFT):
     axes_kw = 'axes'    
@@ -641,6 +865,185 @@ class InterfacesNumpyFFTTestIRFFTN(InterfacesNumpyFFTTestFFTN):
     func = 'irfftn'
     realinv = True    
 
+# numpy.fft only takes out from numpy 2.0
+numpy_fft_has_out = 'out' in inspect.signature(np_fft.fft).parameters
+
+class InterfacesNumpyFFTInstallTest(unittest.TestCase):
+
+    funcs = ('fft', 'ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
+            'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 'irfftn',
+            'hfft', 'ihfft')
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesNumpyFFTInstallTest, self).__init__(*args, **kwargs)
+
+        # Assume python 3, but keep backwards compatibility
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.originals = dict((func, getattr(np_fft, func))
+                for func in self.funcs)
+        interfaces.cache.disable()
+
+    def tearDown(self):
+        interfaces.numpy_fft.uninstall()
+        interfaces.cache.disable()
+
+        for func in self.funcs:
+            setattr(np_fft, func, self.originals[func])
+
+    def test_install(self):
+        interfaces.numpy_fft.install(planner_effort='FFTW_ESTIMATE')
+
+        self.assertTrue(interfaces.cache.is_enabled())
+
+        for func in self.funcs:
+            self.assertIsNot(getattr(np_fft, func), self.originals[func])
+            self.assertEqual(getattr(np_fft, func).__name__, func)
+
+            # The signature is that of the numpy function, and not only
+            # through the __wrapped__ set by functools.wraps
+            self.assertEqual(inspect.signature(getattr(np_fft, func),
+                follow_wrapped=False),
+                inspect.signature(self.originals[func]))
+
+        interfaces.numpy_fft.uninstall()
+
+        self.assertFalse(interfaces.cache.is_enabled())
+
+        for func in self.funcs:
+            self.assertIs(getattr(np_fft, func), self.originals[func])
+
+    def test_transforms(self):
+        complex_data = (numpy.random.randn(6, 10) +
+                1j*numpy.random.randn(6, 10))
+
+        interfaces.numpy_fft.install(planner_effort='FFTW_ESTIMATE')
+
+        for func in self.funcs:
+            for dtype in ('float32', 'float64', 'longdouble', 'complex64',
+                    'complex128', 'int32'):
+
+                if func in ('rfft', 'rfft2', 'rfftn', 'ihfft'):
+                    if numpy.dtype(dtype).kind == 'c':
+                        continue
+                    data = complex_data.real.astype(dtype)
+                else:
+                    data = complex_data.astype(dtype)
+
+                for norm in (None, 'ortho', 'forward'):
+                    output = getattr(np_fft, func)(data, norm=norm)
+                    expected = self.originals[func](data, norm=norm)
+
+                    self.assertEqual(output.dtype, expected.dtype)
+                    self.assertTrue(numpy.allclose(output, expected,
+                        rtol=1e-4, atol=1e-4), msg=(func, dtype, norm))
+
+        output = np_fft.fft(complex_data, 7, 0)
+        self.assertTrue(numpy.allclose(output,
+            self.originals['fft'](complex_data, 7, 0)))
+
+        output = np_fft.irfft2(complex_data, s=(4, 6), axes=(1, 0))
+        self.assertTrue(numpy.allclose(output,
+            self.originals['irfft2'](complex_data, s=(4, 6), axes=(1, 0))))
+
+    def test_arguments(self):
+        data = numpy.random.randn(16, 8)
+
+        interfaces.numpy_fft.install(threads=2, planner_effort='FFTW_ESTIMATE',
+                planning_timelimit=1.0)
+
+        np_fft.rfft2(data)
+
+        keys = [key for key, hits, planning_time in
+                interfaces.cache._fftw_cache.records()]
+
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(keys[0][7], 'FFTW_ESTIMATE')
+        self.assertEqual(keys[0][8], 2)
+
+        # Installing again changes the arguments, but the cache is still
+        # disabled by uninstall
+        interfaces.numpy_fft.install(threads=3, planner_effort='FFTW_ESTIMATE')
+        np_fft.rfft2(data)
+
+        self.assertEqual(sorted(key[8] for key, hits, planning_time in
+            interfaces.cache._fftw_cache.records()), [2, 3])
+
+        interfaces.numpy_fft.uninstall()
+        self.assertFalse(interfaces.cache.is_enabled())
+
+    def test_cache_left_enabled(self):
+        interfaces.cache.enable()
+
+        interfaces.numpy_fft.install(planner_effort='FFTW_ESTIMATE')
+        interfaces.numpy_fft.uninstall()
+
+        self.assertTrue(interfaces.cache.is_enabled())
+
+    def test_invalid_arguments(self):
+        self.assertRaisesRegex(ValueError, 'Invalid planner effort',
+                interfaces.numpy_fft.install, planner_effort='FFTW_FOO')
+
+        self.assertRaisesRegex(ValueError, 'Invalid threads',
+                interfaces.numpy_fft.install, threads=0)
+
+        self.assertIs(np_fft.fft, self.originals['fft'])
+
+    @unittest.skipIf(not numpy_fft_has_out, 'numpy.fft has no out argument.')
+    def test_out(self):
+        data = numpy.random.randn(16) + 1j*numpy.random.randn(16)
+        out = numpy.empty(16, 'complex128')
+
+        interfaces.numpy_fft.install(planner_effort='FFTW_ESTIMATE')
+
+        self.assertIs(np_fft.fft(data, out=out), out)
+        self.assertTrue(numpy.allclose(out, self.originals['fft'](data)))
+
+    @unittest.skipIf(numpy_fft_has_out, 'numpy.fft has an out argument.')
+    def test_no_out(self):
+        data = numpy.random.randn(16) + 1j*numpy.random.randn(16)
+        out = numpy.empty(16, 'complex128')
+
+        interfaces.numpy_fft.install(planner_effort='FFTW_ESTIMATE')
+
+        # As with numpy.fft itself
+        for func in ('fft', 'fftn'):
+            self.assertRaises(TypeError, getattr(np_fft, func), data,
+                    out=out)
+            self.assertRaises(TypeError, getattr(np_fft, func), data,
+                    None, -1, None, out)
+
+    def test_patched(self):
+        data = numpy.random.randn(16)
+
+        with interfaces.patched(planner_effort='FFTW_ESTIMATE'):
+            self.assertIsNot(np_fft.rfft, self.originals['rfft'])
+            self.assertTrue(numpy.allclose(np_fft.rfft(data),
+                self.originals['rfft'](data)))
+
+        self.assertIs(np_fft.rfft, self.originals['rfft'])
+        self.assertFalse(interfaces.cache.is_enabled())
+
+        # The previous arguments are restored on leaving the block, even
+        # if there is an exception
+        interfaces.numpy_fft.install(threads=2, planner_effort='FFTW_ESTIMATE')
+
+        try:
+            with interfaces.patched(threads=3,
+                    planner_effort='FFTW_ESTIMATE'):
+                raise RuntimeError
+
+        except RuntimeError:
+            pass
+
+        np_fft.rfft(data)
+
+        self.assertEqual([key[8] for key, hits, planning_time in
+            interfaces.cache._fftw_cache.records()], [2])
+
 test_cases = (
         InterfacesNumpyFFTTestModule,
         InterfacesNumpyFFTTestFFT,
@@ -656,7 +1059,8 @@ test_cases = (
         InterfacesNumpyFFTTestFFTN,
         InterfacesNumpyFFTTestIFFTN,
         InterfacesNumpyFFTTestRFFTN,
-        InterfacesNumpyFFTTestIRFFTN,)
+        InterfacesNumpyFFTTestIRFFTN,
+        InterfacesNumpyFFTInstallTest,)
 
 #test_set = {'InterfacesNumpyFFTTestHFFT': ('test_valid',)}
 test_set = None
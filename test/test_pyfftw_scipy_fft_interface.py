@@ -0,0 +1,362 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw.interfaces import scipy_fft
+import pyfftw
+import numpy
+import multiprocessing
+
+try:
+    import scipy.fft
+
+except ImportError:
+    scipy_fft_missing = True
+
+else:
+    scipy_fft_missing = not hasattr(scipy.fft, 'set_backend')
+
+import unittest
+from .test_pyfftw_base import run_test_suites
+
+def direct_dct(x, type, axis=-1):
+    '''Compute the unnormalised DCT of ``type`` of ``x`` along ``axis``
+    directly from its definition (as per :func:`scipy.fft.dct`).
+    '''
+    x = numpy.moveaxis(numpy.asarray(x, dtype='float64'), axis, -1)
+    N = x.shape[-1]
+    n = numpy.arange(N)
+    k = n[:, None]
+
+    if type == 1:
+        matrix = 2 * numpy.cos(numpy.pi * k * n / (N - 1))
+        matrix[:, 0] = 1
+        matrix[:, -1] = (-1.0)**k[:, 0]
+    elif type == 2:
+        matrix = 2 * numpy.cos(numpy.pi * k * (2*n + 1) / (2*N))
+    elif type == 3:
+        matrix = 2 * numpy.cos(numpy.pi * n * (2*k + 1) / (2*N))
+        matrix[:, 0] = 1
+    else:
+        matrix = 2 * numpy.cos(numpy.pi * (2*n + 1) * (2*k + 1) / (4*N))
+
+    return numpy.moveaxis(numpy.dot(x, matrix.T), -1, axis)
+
+def direct_dst(x, type, axis=-1):
+    '''Compute the unnormalised DST of ``type`` of ``x`` along ``axis``
+    directly from its definition (as per :func:`scipy.fft.dst`).
+    '''
+    x = numpy.moveaxis(numpy.asarray(x, dtype='float64'), axis, -1)
+    N = x.shape[-1]
+    n = numpy.arange(N)
+    k = n[:, None]
+
+    if type == 1:
+        matrix = 2 * numpy.sin(numpy.pi * (n + 1) * (k + 1) / (N + 1))
+    elif type == 2:
+        matrix = 2 * numpy.sin(numpy.pi * (2*n + 1) * (k + 1) / (2*N))
+    elif type == 3:
+        matrix = 2 * numpy.sin(numpy.pi * (n + 1) * (2*k + 1) / (2*N))
+        matrix[:, -1] = (-1.0)**k[:, 0]
+    else:
+        matrix = 2 * numpy.sin(numpy.pi * (2*n + 1) * (2*k + 1) / (4*N))
+
+    return numpy.moveaxis(numpy.dot(x, matrix.T), -1, axis)
+
+# The norm modes of numpy.fft for the inverse of a hermitian transform
+swapped_norms = {None: 'forward', 'backward': 'forward', 'ortho': 'ortho',
+        'forward': 'backward'}
+
+norms = (None, 'backward', 'ortho', 'forward')
+
+class InterfacesScipyFFTTest(unittest.TestCase):
+
+    funcs = ('fft', 'ifft', 'fft2', 'ifft2', 'fftn', 'ifftn',
+            'rfft', 'irfft', 'rfft2', 'irfft2', 'rfftn', 'irfftn',
+            'hfft', 'ihfft')
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesScipyFFTTest, self).__init__(*args, **kwargs)
+
+        # Assume python 3, but keep backwards compatibility
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.real_data = numpy.random.randn(6, 10)
+        self.complex_data = (numpy.random.randn(6, 10) +
+                1j*numpy.random.randn(6, 10))
+
+    def tearDown(self):
+        pyfftw.interfaces.cache.disable()
+
+    def input_data(self, func):
+        if func in ('rfft', 'rfft2', 'rfftn', 'ihfft'):
+            return self.real_data
+        else:
+            return self.complex_data
+
+    def check_funcs(self):
+        for func in self.funcs:
+            x = self.input_data(func)
+
+            if func.endswith('2') or func.endswith('n'):
+                lengths = ({}, {'s': (4, 7)}, {'s': (8, 12)})
+            else:
+                lengths = ({}, {'n': 7}, {'n': 16})
+
+            for norm in norms:
+                for kwargs in lengths:
+                    output = getattr(scipy_fft, func)(
+                            x, norm=norm, **kwargs)
+                    expected = getattr(numpy.fft, func)(
+                            x, norm=norm, **kwargs)
+
+                    self.assertEqual(output.shape, expected.shape)
+                    self.assertTrue(numpy.allclose(output, expected),
+                            msg='%s, %s, %s' % (func, norm, kwargs))
+
+    def test_funcs(self):
+        self.check_funcs()
+
+    def test_funcs_with_cache(self):
+        pyfftw.interfaces.cache.enable()
+        self.check_funcs()
+        self.check_funcs()
+
+    def test_hermitian_nd(self):
+        for norm in norms:
+            for kwargs in ({}, {'s': (4, 8)}):
+                expected = numpy.fft.irfftn(numpy.conj(self.complex_data),
+                        norm=swapped_norms[norm], **kwargs)
+
+                self.assertTrue(numpy.allclose(scipy_fft.hfftn(
+                    self.complex_data, norm=norm, **kwargs), expected))
+                self.assertTrue(numpy.allclose(scipy_fft.hfft2(
+                    self.complex_data, norm=norm, **kwargs), expected))
+
+                expected = numpy.conj(numpy.fft.rfftn(self.real_data,
+                        norm=swapped_norms[norm], **kwargs))
+
+                self.assertTrue(numpy.allclose(scipy_fft.ihfftn(
+                    self.real_data, norm=norm, **kwargs), expected))
+                self.assertTrue(numpy.allclose(scipy_fft.ihfft2(
+                    self.real_data, norm=norm, **kwargs), expected))
+
+    def test_precision(self):
+        x = numpy.float32(self.real_data)
+
+        self.assertEqual(scipy_fft.fft(x).dtype, numpy.complex64)
+        self.assertEqual(scipy_fft.rfft(x, norm='ortho').dtype,
+                numpy.complex64)
+        self.assertEqual(scipy_fft.dct(x, norm='ortho').dtype,
+                numpy.float32)
+        self.assertEqual(scipy_fft.dct(x, type=3, norm='ortho').dtype,
+                numpy.float32)
+
+    def test_invalid_norm(self):
+        self.assertRaisesRegex(ValueError, 'Invalid norm',
+                scipy_fft.fft, self.complex_data, norm='unitary')
+        self.assertRaisesRegex(ValueError, 'Invalid norm',
+                scipy_fft.dct, self.real_data, norm='unitary')
+
+    def test_workers(self):
+        self.assertEqual(scipy_fft._workers_to_threads(3), 3)
+        self.assertEqual(scipy_fft._workers_to_threads(-1),
+                multiprocessing.cpu_count())
+
+        self.assertRaisesRegex(ValueError, 'Invalid workers',
+                scipy_fft._workers_to_threads, 0)
+        self.assertRaisesRegex(ValueError, 'Invalid workers',
+                scipy_fft._workers_to_threads, -10000)
+
+        self.assertTrue(numpy.allclose(
+            scipy_fft.fft2(self.complex_data, workers=2),
+            numpy.fft.fft2(self.complex_data)))
+
+    def test_plan(self):
+        self.assertRaises(NotImplementedError, scipy_fft.fft,
+                self.complex_data, plan=object())
+
+class InterfacesScipyFFTRealToRealTest(unittest.TestCase):
+
+    funcs = (('dct', direct_dct), ('dst', direct_dst))
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesScipyFFTRealToRealTest, self).__init__(
+                *args, **kwargs)
+
+        # Assume python 3, but keep backwards compatibility
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.x = numpy.random.randn(6, 10)
+
+    def test_definitions(self):
+        for func, direct in self.funcs:
+            for dct_type in (1, 2, 3, 4):
+                for axis in (0, 1, -1):
+                    output = getattr(scipy_fft, func)(
+                            self.x, type=dct_type, axis=axis)
+
+                    self.assertTrue(numpy.allclose(output,
+                        direct(self.x, dct_type, axis)))
+
+                padded = numpy.zeros((6, 12))
+                padded[:, :10] = self.x
+
+                self.assertTrue(numpy.allclose(
+                    getattr(scipy_fft, func)(self.x, type=dct_type, n=12),
+                    direct(padded, dct_type)))
+
+                self.assertTrue(numpy.allclose(
+                    getattr(scipy_fft, func)(self.x, type=dct_type, n=7),
+                    direct(self.x[:, :7], dct_type)))
+
+                self.assertTrue(numpy.allclose(
+                    getattr(scipy_fft, func + 'n')(self.x, type=dct_type),
+                    direct(direct(self.x, dct_type, 0), dct_type, 1)))
+
+    def test_inverse(self):
+        for func, direct in self.funcs:
+            for dct_type in (1, 2, 3, 4):
+                for norm in norms:
+                    output = getattr(scipy_fft, func)(
+                            self.x, type=dct_type, norm=norm)
+                    self.assertTrue(numpy.allclose(
+                        getattr(scipy_fft, 'i' + func)(
+                            output, type=dct_type, norm=norm), self.x))
+
+                    output = getattr(scipy_fft, func + 'n')(
+                            self.x, type=dct_type, norm=norm)
+                    self.assertTrue(numpy.allclose(
+                        getattr(scipy_fft, 'i' + func + 'n')(
+                            output, type=dct_type, norm=norm), self.x))
+
+    def test_orthonormal(self):
+        for func, direct in self.funcs:
+            for dct_type in (1, 2, 3, 4):
+                matrix = getattr(scipy_fft, func)(
+                        numpy.eye(8), type=dct_type, norm='ortho', axis=0)
+
+                self.assertTrue(numpy.allclose(
+                    numpy.dot(matrix.T, matrix), numpy.eye(8)))
+
+                # Without orthogonalizing, it is just scaled
+                output = getattr(scipy_fft, func)(self.x, type=dct_type,
+                        norm='ortho', orthogonalize=False)
+                self.assertTrue(numpy.allclose(output,
+                    direct(self.x, dct_type) / numpy.sqrt(
+                        scipy_fft._logical_size(self.x, None, (-1,),
+                            r2r=(func + 'n', dct_type)))))
+
+    def test_complex(self):
+        x = self.x + 1j*numpy.random.randn(*self.x.shape)
+
+        for func, direct in self.funcs:
+            output = getattr(scipy_fft, func)(x, norm='ortho')
+
+            self.assertTrue(numpy.allclose(output,
+                getattr(scipy_fft, func)(x.real, norm='ortho') +
+                1j*getattr(scipy_fft, func)(x.imag, norm='ortho')))
+
+    def test_invalid_type(self):
+        for func, direct in self.funcs:
+            for invalid_type in (0, 5, 'a'):
+                self.assertRaisesRegex(ValueError, 'Invalid type',
+                        getattr(scipy_fft, func), self.x, type=invalid_type)
+
+@unittest.skipIf(scipy_fft_missing, 'scipy.fft is not installed')
+class InterfacesScipyFFTCompareTest(unittest.TestCase):
+
+    def test_against_scipy(self):
+        x = numpy.random.randn(6, 10)
+
+        for func in scipy_fft._implemented:
+            for norm in norms:
+                kwargs = {'norm': norm}
+                self.assertTrue(numpy.allclose(
+                    getattr(scipy_fft, func)(x, **kwargs),
+                    getattr(scipy.fft, func)(x, **kwargs)),
+                    msg='%s, %s' % (func, norm))
+
+class InterfacesScipyFFTBackendTest(unittest.TestCase):
+
+    def test_domain(self):
+        self.assertEqual(scipy_fft.__ua_domain__, 'numpy.scipy.fft')
+
+    def test_ua_function(self):
+        x = numpy.random.randn(16)
+
+        def fft():
+            pass
+
+        def fftfreq():
+            pass
+
+        self.assertTrue(numpy.allclose(
+            scipy_fft.__ua_function__(fft, (x,), {'norm': 'ortho'}),
+            numpy.fft.fft(x, norm='ortho')))
+
+        self.assertIs(scipy_fft.__ua_function__(fftfreq, (16,), {}),
+                NotImplemented)
+
+    @unittest.skipIf(scipy_fft_missing, 'scipy.fft is not installed')
+    def test_set_backend(self):
+        x = numpy.random.randn(16, 8)
+
+        with scipy.fft.set_backend(scipy_fft, only=True):
+            output = scipy.fft.fft2(x, workers=2)
+            dct_output = scipy.fft.dctn(x, type=1, norm='ortho')
+
+            with scipy.fft.set_workers(2):
+                self.assertEqual(scipy_fft._workers_to_threads(None), 2)
+
+        self.assertTrue(numpy.allclose(output, numpy.fft.fft2(x)))
+        self.assertTrue(numpy.allclose(dct_output,
+            scipy.fft.dctn(x, type=1, norm='ortho')))
+
+test_cases = (
+        InterfacesScipyFFTTest,
+        InterfacesScipyFFTRealToRealTest,
+        InterfacesScipyFFTCompareTest,
+        InterfacesScipyFFTBackendTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
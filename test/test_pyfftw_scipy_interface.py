@@ -51,9 +51,11 @@ import unittest
 from .test_pyfftw_base import run_test_suites
 from . import test_pyfftw_numpy_interface
 
-'''pyfftw.interfaces.scipy_fftpack just wraps pyfftw.interfaces.numpy_fft.
+'''pyfftw.interfaces.scipy_fftpack mostly just wraps
+pyfftw.interfaces.numpy_fft.
 
-All the tests here just check that the call is made correctly.
+Most of the tests here just check that the call is made correctly. The
+exceptions are rfft and irfft, which pack the transforms themselves.
 '''
 
 funcs = ('fft','ifft', 'fft2', 'ifft2', 'fftn', 'ifftn', 
@@ -158,6 +160,111 @@ class InterfacesScipyFFTPackTestSimple(unittest.TestCase):
             self.assertIs(fftpack_attr, acquired_attr)
 
 
+@unittest.skipIf(scipy_missing, 'scipy is not installed, so this feature is'
+                 'unavailable')
+class InterfacesScipyFFTPackTestRealPacking(unittest.TestCase):
+    '''Tests for the packing of the real FFTs by
+    :func:`pyfftw.interfaces.scipy_fftpack.rfft` and
+    :func:`pyfftw.interfaces.scipy_fftpack.irfft`, which is done in C
+    rather than going through :mod:`pyfftw.interfaces.numpy_fft`.
+    '''
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesScipyFFTPackTestRealPacking, self).__init__(
+                *args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def tearDown(self):
+        pyfftw.interfaces.cache.disable()
+
+    def test_lengths_and_axes(self):
+        for each_cache_state in (False, True):
+            if each_cache_state:
+                pyfftw.interfaces.cache.enable()
+
+            for shape, axis in (((1, 3), 0), ((2,), -1), ((15,), 0),
+                    ((16,), -1), ((6, 9), 0), ((6, 9), -1), ((3, 4, 5), 1)):
+
+                for dtype in real_dtypes:
+                    x = make_r2c_real_data(shape, dtype)
+
+                    # Some versions of scipy reject long double arrays, in
+                    # which case only the round trip is checked.
+                    try:
+                        scipy.fftpack.rfft(x, axis=axis)
+                        has_reference = True
+                    except (ValueError, TypeError):
+                        has_reference = False
+
+                    # Repeated calls check the cached objects
+                    for n in range(2):
+                        y = scipy_fftpack.rfft(x, axis=axis)
+                        self.assertEqual(y.dtype, x.dtype)
+
+                        z = scipy_fftpack.irfft(y, axis=axis)
+                        self.assertEqual(z.dtype, x.dtype)
+                        self.assertTrue(numpy.allclose(z, x,
+                            rtol=1e-4, atol=1e-4))
+
+                        if has_reference:
+                            self.assertTrue(numpy.allclose(y,
+                                scipy.fftpack.rfft(x, axis=axis),
+                                rtol=1e-4, atol=1e-4))
+                            self.assertTrue(numpy.allclose(z,
+                                scipy.fftpack.irfft(y, axis=axis),
+                                rtol=1e-4, atol=1e-4))
+
+    def test_irfft_n(self):
+        y = make_c2r_real_data((8,), numpy.float64)
+
+        for n in (5, 8, 11):
+            self.assertTrue(numpy.allclose(scipy_fftpack.irfft(y, n),
+                scipy.fftpack.irfft(y, n)))
+
+    def test_non_contiguous(self):
+        x = make_r2c_real_data((12, 10), numpy.float64)[::2, ::-1]
+
+        self.assertTrue(numpy.allclose(scipy_fftpack.rfft(x),
+            scipy.fftpack.rfft(x)))
+        self.assertTrue(numpy.allclose(scipy_fftpack.irfft(x, axis=0),
+            scipy.fftpack.irfft(x, axis=0)))
+
+    def test_input_unchanged(self):
+        x = make_r2c_real_data((16,), numpy.float64)
+        x_copy = x.copy()
+
+        scipy_fftpack.irfft(x)
+        scipy_fftpack.rfft(x)
+        self.assertTrue(numpy.all(x == x_copy))
+
+    def test_out(self):
+        x = make_r2c_real_data((16,), numpy.float64)
+
+        # Misaligned arrays are copied into
+        for out in (numpy.empty(16), pyfftw.empty_aligned(17)[1:]):
+            y = scipy_fftpack.rfft(x, out=out)
+            self.assertIs(y, out)
+            self.assertTrue(numpy.allclose(y, scipy.fftpack.rfft(x)))
+
+            z = scipy_fftpack.irfft(x, out=out)
+            self.assertIs(z, out)
+            self.assertTrue(numpy.allclose(z, scipy.fftpack.irfft(x)))
+
+        self.assertRaisesRegex(ValueError, 'Invalid output shape',
+                scipy_fftpack.rfft, x, out=numpy.empty(15))
+        self.assertRaisesRegex(ValueError, 'Invalid output dtype',
+                scipy_fftpack.irfft, x, out=numpy.empty(16, 'float32'))
+
+    def test_complex_input_fails(self):
+        x = make_complex_data((16,), numpy.complex128)
+
+        self.assertRaises(TypeError, scipy_fftpack.rfft, x)
+        self.assertRaises(TypeError, scipy_fftpack.irfft, x)
+
+
 # Construct all the test classes automatically.
 built_classes = []
 for each_func in funcs:
@@ -181,7 +288,8 @@ for each_func in funcs:
 built_classes = tuple(built_classes)
 
 test_cases = (
-        InterfacesScipyFFTPackTestSimple,) + built_classes
+        InterfacesScipyFFTPackTestSimple,
+        InterfacesScipyFFTPackTestRealPacking,) + built_classes
 
 test_set = None
 #test_set = {'InterfacesScipyFFTPackTestIFFTN': ['test_auto_align_input']}
@@ -0,0 +1,382 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw.interfaces import scipy_signal
+import numpy
+
+from .test_pyfftw_base import run_test_suites
+
+import unittest
+from timeit import Timer
+
+def direct_convolve(in1, in2, axes=None):
+    '''Compute the full convolution of in1 and in2 along axes directly,
+    by accumulating shifted copies of in1.
+    '''
+    if axes is None:
+        axes = range(in1.ndim)
+
+    axes = [axis % in1.ndim for axis in axes]
+
+    out_shape = []
+    for n in range(in1.ndim):
+        if n in axes:
+            out_shape.append(in1.shape[n] + in2.shape[n] - 1)
+        else:
+            out_shape.append(max(in1.shape[n], in2.shape[n]))
+
+    output = numpy.zeros(out_shape,
+            dtype=numpy.result_type(in1, in2, numpy.float64))
+
+    in2_shape = [in2.shape[n] if n in axes else 1 for n in range(in1.ndim)]
+
+    for index in numpy.ndindex(*in2_shape):
+        in2_slicer = tuple(
+                index[n] if n in axes else slice(None)
+                for n in range(in1.ndim))
+        out_slicer = tuple(
+                slice(index[n], index[n] + in1.shape[n]) if n in axes
+                else slice(None) for n in range(in1.ndim))
+
+        weight = numpy.expand_dims(in2[in2_slicer], 0).reshape(
+                [1 if n in axes else in2.shape[n]
+                    for n in range(in1.ndim)])
+
+        output[out_slicer] += in1 * weight
+
+    return output
+
+def direct_mode(full, shape1, shape2, mode, axes=None):
+    if axes is None:
+        axes = range(full.ndim)
+
+    axes = [axis % full.ndim for axis in axes]
+
+    slicer = []
+    for n in range(full.ndim):
+        if n not in axes or mode == 'full':
+            slicer.append(slice(None))
+            continue
+
+        if mode == 'same':
+            length = shape1[n]
+        else:
+            length = abs(shape1[n] - shape2[n]) + 1
+
+        start = (full.shape[n] - length)//2
+        slicer.append(slice(start, start + length))
+
+    return full[tuple(slicer)]
+
+class InterfacesScipySignalFFTConvolveTest(unittest.TestCase):
+
+    func = 'fftconvolve'
+
+    test_shapes = (
+            ((100,), (10,), {}),
+            ((10,), (100,), {}),
+            ((33,), (33,), {}),
+            ((1,), (5,), {}),
+            ((32, 20), (5, 7), {}),
+            ((16, 40), (16, 3), {'axes': (-1,)}),
+            ((16, 40), (1, 3), {'axes': -1}),
+            ((6, 40), (6, 6), {'axes': [1]}),
+            ((5, 6, 7), (3, 6, 2), {'axes': (0, 2)}),
+            ((12, 9, 7), (3, 4, 2), {}),
+            )
+
+    dtypes = ('float32', 'float64', 'longdouble',
+            'complex64', 'complex128', 'clongdouble')
+
+    def __init__(self, *args, **kwargs):
+
+        super(InterfacesScipySignalFFTConvolveTest, self).__init__(
+                *args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def convolve(self, in1, in2, mode='full', **kwargs):
+        return getattr(scipy_signal, self.func)(in1, in2, mode, **kwargs)
+
+    def reference(self, in1, in2, mode='full', axes=None):
+        full = direct_convolve(in1, in2, axes)
+        return direct_mode(full, in1.shape, in2.shape, mode, axes)
+
+    def random(self, shape, dtype):
+        array = numpy.random.randn(*shape)
+
+        if numpy.dtype(dtype).kind == 'c':
+            array = array + 1j*numpy.random.randn(*shape)
+
+        return array.astype(dtype)
+
+    def tolerance(self, dtype):
+        if numpy.dtype(dtype) in (numpy.dtype('float32'),
+                numpy.dtype('complex64')):
+            return {'rtol': 1e-3, 'atol': 1e-3}
+        else:
+            return {'rtol': 1e-8, 'atol': 1e-8}
+
+    def test_modes(self):
+        for mode in ('full', 'same', 'valid'):
+            for dtype in self.dtypes:
+                for shape1, shape2, kwargs in self.test_shapes:
+                    in1 = self.random(shape1, dtype)
+                    in2 = self.random(shape2, dtype)
+
+                    axes = kwargs.get('axes', None)
+                    if isinstance(axes, int):
+                        axes = (axes,)
+
+                    if mode == 'valid':
+                        _axes = range(len(shape1)) if axes is None else axes
+                        if not (
+                                all(shape1[n] >= shape2[n] for n in _axes) or
+                                all(shape2[n] >= shape1[n] for n in _axes)):
+                            continue
+
+                    output = self.convolve(in1, in2, mode, **kwargs)
+                    ref = self.reference(in1, in2, mode, axes)
+
+                    self.assertEqual(output.dtype, numpy.dtype(dtype))
+                    self.assertEqual(output.shape, ref.shape)
+                    self.assertTrue(numpy.allclose(output, ref,
+                        **self.tolerance(dtype)))
+
+    def test_against_numpy_convolve(self):
+        in1 = numpy.random.randn(50)
+        in2 = numpy.random.randn(7)
+
+        for mode in ('full', 'same', 'valid'):
+            self.assertTrue(numpy.allclose(
+                self.convolve(in1, in2, mode),
+                numpy.convolve(in1, in2, mode)))
+
+    def test_mixed_dtypes(self):
+        in1 = numpy.random.randn(20).astype('float32')
+        in2 = numpy.random.randn(5)
+
+        output = self.convolve(in1, in2)
+        self.assertEqual(output.dtype, numpy.dtype('float64'))
+
+        output = self.convolve(in1, in2.astype('float32') + 0j)
+        self.assertEqual(output.dtype, numpy.dtype('complex64'))
+
+        output = self.convolve(numpy.arange(20), numpy.arange(3))
+        self.assertEqual(output.dtype, numpy.dtype('float64'))
+        self.assertTrue(numpy.allclose(output,
+            self.reference(numpy.arange(20), numpy.arange(3))))
+
+    def test_lists(self):
+        self.assertTrue(numpy.allclose(
+            self.convolve([1, 2, 3], [0, 1, 0.5]),
+            self.reference(numpy.array([1, 2, 3]), numpy.array([0, 1, 0.5]))))
+
+    def test_trivial_inputs(self):
+        self.assertEqual(
+            self.convolve(numpy.array(3.0), numpy.array(2.0)), 6.0)
+
+        self.assertEqual(
+            self.convolve(numpy.array([]), numpy.array([1.0])).size, 0)
+
+    def test_repeated_calls(self):
+        in1 = numpy.random.randn(64, 32)
+        in2 = numpy.random.randn(9, 3)
+
+        output = self.convolve(in1, in2)
+        output2 = self.convolve(in1, in2)
+
+        self.assertIsNot(output, output2)
+        self.assertTrue(numpy.all(output == output2))
+
+        # Modifying an output should not change the next one
+        output[:] = 0
+        self.assertTrue(numpy.all(self.convolve(in1, in2) == output2))
+
+        in3 = numpy.random.randn(64, 32)
+        self.assertTrue(numpy.allclose(self.convolve(in3, in2),
+            self.reference(in3, in2)))
+
+    def test_invalid_args(self):
+        in1 = numpy.random.randn(10, 10)
+
+        self.assertRaisesRegex(ValueError, 'Invalid mode',
+                self.convolve, in1, in1, 'bad_mode')
+
+        self.assertRaisesRegex(ValueError, 'Invalid shapes',
+                self.convolve, in1, numpy.random.randn(10))
+
+        self.assertRaisesRegex(ValueError, 'Invalid shapes',
+                self.convolve, in1, numpy.random.randn(5, 20), 'valid')
+
+        self.assertRaisesRegex(ValueError, 'Invalid shapes',
+                self.convolve, in1, numpy.random.randn(5, 7), axes=(0,))
+
+        self.assertRaisesRegex(ValueError, 'Invalid axes',
+                self.convolve, in1, in1, axes=(0, -2))
+
+        self.assertRaisesRegex(IndexError, 'Invalid axes',
+                self.convolve, in1, in1, axes=(2,))
+
+class InterfacesScipySignalOAConvolveTest(
+        InterfacesScipySignalFFTConvolveTest):
+
+    func = 'oaconvolve'
+
+    test_shapes = InterfacesScipySignalFFTConvolveTest.test_shapes + (
+            ((1000,), (7,), {}),
+            ((7,), (1000,), {}),
+            ((3, 500), (3, 11), {'axes': -1}),
+            ((3, 500), (1, 11), {'axes': -1}),
+            ((200, 150), (5, 6), {}),
+            ((200, 15), (5, 6), {}),
+            ((30, 200), (31, 6), {}),
+            )
+
+    def test_time(self):
+        in1 = numpy.random.randn(2**16)
+        in2 = numpy.random.randn(100)
+
+        # Plan both beforehand
+        self.convolve(in1, in2)
+        scipy_signal.fftconvolve(in1, in2)
+
+        self.timer_routine(lambda: self.convolve(in1, in2),
+                lambda: scipy_signal.fftconvolve(in1, in2),
+                comparison_string='fftconvolve')
+
+        self.assertTrue(True)
+
+    def timer_routine(self, pyfftw_callable, comparison_callable,
+            comparison_string):
+
+        N = 10
+
+        t = Timer(stmt=pyfftw_callable)
+        t_comparison = Timer(stmt=comparison_callable)
+
+        t_str = ("%.2f" % (1000.0/N*t.timeit(N)))+' ms'
+        t_comparison_str = ("%.2f" % (1000.0/N*t_comparison.timeit(N)))+' ms'
+
+        print('One run: '+ t_str + \
+                ' (versus ' + t_comparison_str + ' for ' +
+                comparison_string + ')')
+
+class InterfacesScipySignalCorrelateTest(
+        InterfacesScipySignalFFTConvolveTest):
+
+    func = 'correlate'
+
+    def reference(self, in1, in2, mode='full', axes=None):
+        if axes is None:
+            axes = range(in2.ndim)
+
+        axes = [axis % in2.ndim for axis in axes]
+
+        reverser = tuple(
+                slice(None, None, -1) if n in axes else slice(None)
+                for n in range(in2.ndim))
+
+        return super(InterfacesScipySignalCorrelateTest, self).reference(
+                in1, in2[reverser].conj(), mode, axes)
+
+    def test_against_numpy_convolve(self):
+        in1 = numpy.random.randn(50) + 1j*numpy.random.randn(50)
+        in2 = numpy.random.randn(7) + 1j*numpy.random.randn(7)
+
+        for mode in ('full', 'same', 'valid'):
+            self.assertTrue(numpy.allclose(
+                self.convolve(in1, in2, mode),
+                numpy.correlate(in1, in2, mode)))
+
+    def test_method(self):
+        in1 = numpy.random.randn(50)
+        in2 = numpy.random.randn(7)
+
+        self.assertTrue(numpy.allclose(
+            scipy_signal.correlate(in1, in2, 'full', 'fft'),
+            numpy.correlate(in1, in2, 'full')))
+
+        self.assertRaisesRegex(ValueError, 'Invalid method',
+                scipy_signal.correlate, in1, in2, 'full', 'direct')
+
+    def convolve(self, in1, in2, mode='full', **kwargs):
+        return scipy_signal.correlate(in1, in2, mode, **kwargs)
+
+class InterfacesScipySignalPlanReuseTest(unittest.TestCase):
+
+    def test_plans_reused(self):
+        in1 = numpy.random.randn(100)
+        in2 = numpy.random.randn(10)
+
+        scipy_signal.fftconvolve(in1, in2)
+        n_plans = len(scipy_signal._plan_cache.plans)
+
+        plan = list(scipy_signal._plan_cache.plans.values())[-1]
+
+        scipy_signal.fftconvolve(in1 + 1, in2)
+        scipy_signal.fftconvolve(in1, in2, 'same')
+
+        self.assertEqual(len(scipy_signal._plan_cache.plans), n_plans)
+        self.assertIs(list(scipy_signal._plan_cache.plans.values())[-1],
+                plan)
+
+    def test_plans_bounded(self):
+        for n in range(scipy_signal._max_cached_plans + 5):
+            scipy_signal.fftconvolve(
+                    numpy.random.randn(n + 2), numpy.random.randn(2))
+
+        self.assertEqual(len(scipy_signal._plan_cache.plans),
+                scipy_signal._max_cached_plans)
+
+    def test_threads(self):
+        in1 = numpy.random.randn(64, 64)
+        in2 = numpy.random.randn(17, 17)
+
+        self.assertTrue(numpy.allclose(
+            scipy_signal.fftconvolve(in1, in2, threads=2),
+            direct_convolve(in1, in2)))
+
+test_cases = (
+        InterfacesScipySignalFFTConvolveTest,
+        InterfacesScipySignalOAConvolveTest,
+        InterfacesScipySignalCorrelateTest,
+        InterfacesScipySignalPlanReuseTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
@@ -0,0 +1,202 @@
+# Copyright 2014 Knowledge Economy Developments Ltd
+# 
+# Henry Gomersall
+# heng@kedevelopments.co.uk
+#
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# * Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+#
+
+from pyfftw import autotune, builders, interfaces, tuning
+from pyfftw.builders import _utils as utils
+from .test_pyfftw_base import run_test_suites
+
+import numpy
+import json
+import os
+import platform
+import shutil
+import tempfile
+import unittest
+
+class TuningTest(unittest.TestCase):
+
+    # Quick timings, as only the bookkeeping is tested
+    timing_kwargs = {'min_time': 0.0005, 'repeats': 1}
+
+    def __init__(self, *args, **kwargs):
+
+        super(TuningTest, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.table_path = os.path.join(self.temp_dir, 'tables',
+                'autotune.json')
+
+        self.old_table_path = os.environ.get('PYFFTW_AUTOTUNE_TABLE')
+        os.environ['PYFFTW_AUTOTUNE_TABLE'] = self.table_path
+
+    def tearDown(self):
+        if self.old_table_path is None:
+            del os.environ['PYFFTW_AUTOTUNE_TABLE']
+        else:
+            os.environ['PYFFTW_AUTOTUNE_TABLE'] = self.old_table_path
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_table_path(self):
+        self.assertEqual(tuning.table_path(), self.table_path)
+
+        del os.environ['PYFFTW_AUTOTUNE_TABLE']
+        self.assertTrue(tuning.table_path().endswith(
+            os.path.join('pyfftw', 'autotune.json')))
+
+        os.environ['PYFFTW_AUTOTUNE_TABLE'] = self.table_path
+
+    def test_cpu_key(self):
+        key = tuning.cpu_key()
+        self.assertTrue(key.startswith(platform.machine()))
+        self.assertEqual(key, tuning.cpu_key())
+
+    def test_autotune(self):
+        decision = autotune((16, 12), 'complex128', threads=(1, 2),
+                **self.timing_kwargs)
+
+        # Every combination of 2 efforts, 2 thread counts, in place or
+        # not and aligned or not
+        self.assertEqual(len(decision['timings']), 16)
+        self.assertEqual(set(decision) - set(['timings']),
+                set(['threads', 'planner_effort', 'in_place', 'aligned',
+                    'time']))
+
+        fastest = min(timing['time'] for timing in decision['timings'])
+        self.assertTrue(decision['time'] <= fastest * 1.05)
+
+        # It is recorded for this kind of CPU
+        with open(self.table_path, 'r') as f:
+            table = json.load(f)
+
+        del decision['timings']
+        self.assertEqual(table[tuning.cpu_key()],
+                {'fftn complex128 16x12 axes=0,1': decision})
+
+        self.assertEqual(tuning.lookup((16, 12)), decision)
+        self.assertEqual(tuning.lookup((16, 12), axes=(-1, 0, 1)), decision)
+        self.assertIs(tuning.lookup((16, 12), transform='ifftn'), None)
+        self.assertIs(tuning.lookup((16, 13)), None)
+
+    def test_preference(self):
+        # With every candidate as good as the fastest, the simplest wins
+        decision = autotune((32,), 'complex64', threads=(2, 1),
+                planner_efforts=('FFTW_MEASURE', 'FFTW_ESTIMATE'),
+                tolerance=numpy.inf, save=False, **self.timing_kwargs)
+
+        self.assertEqual((decision['threads'], decision['planner_effort'],
+            decision['in_place'], decision['aligned']),
+            (1, 'FFTW_ESTIMATE', False, True))
+
+        self.assertFalse(os.path.exists(self.table_path))
+
+    def test_real_transforms(self):
+        for transform, shape in (('rfftn', (8, 16)), ('irfftn', (8, 9))):
+            dtype = 'float64' if transform == 'rfftn' else 'complex128'
+
+            decision = autotune(shape, dtype, transform=transform,
+                    threads=1, planner_efforts='FFTW_ESTIMATE',
+                    **self.timing_kwargs)
+
+            self.assertEqual(len(decision['timings']), 2)
+            self.assertFalse(decision['in_place'])
+            self.assertEqual(tuning.lookup(shape, dtype,
+                transform=transform)['threads'], 1)
+
+            self.assertRaisesRegex(ValueError, 'Invalid in_place',
+                    autotune, shape, dtype, transform=transform,
+                    in_place=True)
+
+    def test_invalid_arguments(self):
+        self.assertRaisesRegex(ValueError, 'Invalid planner effort',
+                autotune, (16,), planner_efforts=('FFTW_FAST',))
+
+        self.assertRaisesRegex(ValueError, 'Invalid threads',
+                autotune, (16,), threads=0)
+
+        self.assertRaisesRegex(ValueError, 'Invalid dtype',
+                autotune, (16,), 'float64', transform='fftn')
+
+        self.assertRaisesRegex(ValueError, 'Invalid axes',
+                autotune, (16,), axes=(1,))
+
+    def test_auto_arguments(self):
+        a = numpy.random.randn(16, 12) + 1j*numpy.random.randn(16, 12)
+
+        # Untuned transforms use the defaults
+        self.assertEqual(utils._resolve_auto('auto', 'auto', (16, 12),
+            'complex128', (0, 1), 'fftn'), (1, 'FFTW_MEASURE'))
+
+        FFTW_object = builders.fft2(a, threads='auto',
+                planner_effort='auto')
+        self.assertIn('FFTW_MEASURE', FFTW_object.flags)
+
+        tuning._write_decision(self.table_path,
+                'fftn complex128 16x12 axes=0,1',
+                {'threads': 2, 'planner_effort': 'FFTW_ESTIMATE',
+                    'in_place': False, 'aligned': True, 'time': 1e-6})
+
+        self.assertEqual(utils._resolve_auto('auto', 'auto', (16, 12),
+            'complex128', (-2, -1), 'fftn'), (2, 'FFTW_ESTIMATE'))
+
+        # Only the arguments that are 'auto' are looked up
+        self.assertEqual(utils._resolve_auto(3, 'auto', (16, 12),
+            'complex128', (-2, -1), 'fftn'), (3, 'FFTW_ESTIMATE'))
+
+        FFTW_object = builders.fft2(a, threads='auto',
+                planner_effort='auto')
+        self.assertIn('FFTW_ESTIMATE', FFTW_object.flags)
+        self.assertTrue(numpy.allclose(FFTW_object(), numpy.fft.fft2(a)))
+
+        # The padded input shape is looked up
+        FFTW_object = builders.fft2(a[:10], s=(16, 12),
+                planner_effort='auto')
+        self.assertIn('FFTW_ESTIMATE', FFTW_object.flags)
+
+        self.assertTrue(numpy.allclose(
+            interfaces.numpy_fft.fft2(a, threads='auto',
+                planner_effort='auto'), numpy.fft.fft2(a)))
+
+test_cases = (
+        TuningTest,)
+
+test_set = None
+
+if __name__ == '__main__':
+
+    run_test_suites(test_cases, test_set)
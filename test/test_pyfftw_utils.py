@@ -37,6 +37,7 @@ from .test_pyfftw_base import run_test_suites
 
 import unittest
 import pyfftw
+import numpy
 import platform
 import os
 
@@ -81,13 +82,87 @@ class UtilsTest(unittest.TestCase):
         cpus_info = get_cpus_info()
         
         for each_cpu in cpus_info:
-            if 'avx' in each_cpu['flags']:
+            if 'avx512f' in each_cpu['flags']:
+                self.assertTrue(pyfftw.simd_alignment == 64)
+            elif 'avx' in each_cpu['flags']:
                 self.assertTrue(pyfftw.simd_alignment == 32)
             elif 'sse' in each_cpu['flags']:
                 self.assertTrue(pyfftw.simd_alignment == 16)
             else:
                 self.assertTrue(pyfftw.simd_alignment == 1)
 
+    @unittest.skipIf('Linux' not in platform.system(),
+            'Skipping as we only have it set up for Linux at present.')
+    def test_cpu_info_features(self):
+        cpus_info = get_cpus_info()
+        features = pyfftw.cpu_info()['simd_features']
+
+        for each_cpu in cpus_info:
+            if 'flags' in each_cpu:
+                flags = each_cpu['flags'].split()
+            elif 'Features' in each_cpu:
+                flags = each_cpu['Features'].split()
+                # NEON is reported as asimd on AArch64
+                if 'asimd' in flags:
+                    flags.append('neon')
+            else:
+                continue
+
+            for feature in ('sse', 'sse2', 'avx', 'avx2', 'fma',
+                    'avx512f', 'neon', 'sve'):
+                self.assertEqual(feature in features, feature in flags)
+
+    def test_cpu_info(self):
+        info = pyfftw.cpu_info()
+
+        self.assertEqual(info['simd_alignment'], pyfftw.simd_alignment)
+        self.assertEqual(info['valid_simd_alignments'],
+                pyfftw.pyfftw._valid_simd_alignments)
+
+        if pyfftw.simd_alignment in (16, 32, 64):
+            self.assertEqual(info['valid_simd_alignments'][-1],
+                    pyfftw.simd_alignment)
+
+        if 'avx512f' in info['simd_features']:
+            self.assertEqual(pyfftw.simd_alignment, 64)
+        elif 'avx' in info['simd_features']:
+            self.assertEqual(pyfftw.simd_alignment, 32)
+        elif ('sse' in info['simd_features'] or
+                'neon' in info['simd_features']):
+            self.assertEqual(pyfftw.simd_alignment, 16)
+
+    def test_next_fast_len(self):
+        def is_fast(n):
+            for factor in (2, 3, 5, 7):
+                while n % factor == 0:
+                    n //= factor
+
+            return n == 1
+
+        for n in range(1, 2000):
+            fast_len = pyfftw.next_fast_len(n)
+
+            self.assertTrue(fast_len >= n and is_fast(fast_len))
+            self.assertFalse(any(is_fast(m) for m in range(n, fast_len)))
+
+            real_len = pyfftw.next_fast_len(n, real=True)
+
+            if n > 1:
+                self.assertTrue(real_len % 2 == 0 and is_fast(real_len))
+                self.assertFalse(any(is_fast(m) for m in
+                    range(n + n % 2, real_len, 2)))
+
+        self.assertEqual(pyfftw.next_fast_len(0), 0)
+        self.assertEqual(pyfftw.next_fast_len(1, real=True), 1)
+        self.assertEqual(pyfftw.next_fast_len(11), 12)
+        self.assertEqual(pyfftw.next_fast_len(1001), 1008)
+        self.assertEqual(pyfftw.next_fast_len(15, real=True), 16)
+        self.assertEqual(pyfftw.next_fast_len(2**40 + 1), 1100753141760)
+        self.assertEqual(pyfftw.next_fast_len(numpy.int32(13)), 14)
+
+        self.assertRaises(ValueError, pyfftw.next_fast_len, -1)
+        self.assertRaises(TypeError, pyfftw.next_fast_len, 10.5)
+
 test_cases = (
         UtilsTest,)
 
@@ -36,15 +36,27 @@ from pyfftw import (
         FFTW, empty_aligned,
         export_wisdom, import_wisdom, forget_wisdom)
 
+from pyfftw import wisdom
 from .test_pyfftw_base import run_test_suites
 
 import numpy
 import pickle
 
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
 class FFTWWisdomTest(unittest.TestCase):
-    
+
+    def __init__(self, *args, **kwargs):
+
+        super(FFTWWisdomTest, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
     def generate_wisdom(self):
         for each_dtype in (numpy.complex128, numpy.complex64, 
                 numpy.clongdouble):
@@ -85,9 +97,145 @@ class FFTWWisdomTest(unittest.TestCase):
 
         self.assertEqual(success, (True, True, True))
 
+    def test_wisdom_only(self):
+
+        forget_wisdom()
+
+        a = empty_aligned((1,1024), numpy.complex128, n=16)
+        b = empty_aligned(a.shape, dtype=a.dtype, n=16)
+
+        self.assertRaisesRegex(RuntimeError, 'No wisdom', FFTW, a, b,
+                flags=('FFTW_MEASURE', 'FFTW_WISDOM_ONLY'))
+
+        self.generate_wisdom()
+
+        fft = FFTW(a, b, flags=('FFTW_MEASURE', 'FFTW_WISDOM_ONLY'))
+        self.assertTrue('FFTW_WISDOM_ONLY' in fft.flags)
+
+
+class WisdomToolTest(unittest.TestCase):
+
+    spec = [
+            {'shape': [64, 32]},
+            {'shape': [128], 'dtype': 'float32'},
+            {'shape': [16, 33], 'transform': 'irfftn', 'axes': [1]},
+            {'shape': [48], 'dtype': 'complex64', 'transform': 'ifftn',
+                'threads': 2}]
+
+    def __init__(self, *args, **kwargs):
+
+        super(WisdomToolTest, self).__init__(*args, **kwargs)
+
+        if not hasattr(self, 'assertRaisesRegex'):
+            self.assertRaisesRegex = self.assertRaisesRegexp
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.spec_path = os.path.join(self.temp_dir, 'spec.json')
+        self.output_path = os.path.join(self.temp_dir, 'wisdom.json')
+
+        with open(self.spec_path, 'w') as f:
+            json.dump(self.spec, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_spec(self):
+        entries = wisdom.load_spec(self.spec_path, 'FFTW_PATIENT')
+
+        self.assertEqual(entries[0], {'shape': (64, 32),
+            'dtype': 'complex128', 'axes': (0, 1), 'threads': 1,
+            'transform': 'fftn', 'planner_effort': 'FFTW_PATIENT'})
+
+        self.assertEqual(entries[1]['transform'], 'rfftn')
+        self.assertEqual(entries[2]['axes'], (1,))
+        self.assertEqual(entries[3]['threads'], 2)
+
+        csv_path = os.path.join(self.temp_dir, 'spec.csv')
+        with open(csv_path, 'w') as f:
+            f.write('shape,dtype,axes,threads\n')
+            f.write('64x32,,,\n')
+            f.write('16 33,float64,1,2\n')
+
+        entries = wisdom.load_spec(csv_path)
+
+        self.assertEqual(entries[0]['shape'], (64, 32))
+        self.assertEqual(entries[0]['dtype'], 'complex128')
+        self.assertEqual(entries[1], {'shape': (16, 33),
+            'dtype': 'float64', 'axes': (1,), 'threads': 2,
+            'transform': 'rfftn', 'planner_effort': 'FFTW_MEASURE'})
+
+    def test_invalid_spec(self):
+        for entry, message in (
+                ({'dtype': 'float64'}, 'Invalid specification'),
+                ({'shape': [4], 'transform': 'dct'}, 'Invalid transform'),
+                ({'shape': [4], 'transform': 'irfftn',
+                    'dtype': 'float64'}, 'Invalid dtype'),
+                ({'shape': [4], 'planner_effort': 'FFTW_FOO'},
+                    'Invalid planner effort')):
+
+            with open(self.spec_path, 'w') as f:
+                json.dump([entry], f)
+
+            self.assertRaisesRegex(ValueError, message, wisdom.load_spec,
+                    self.spec_path)
+
+    def test_generate(self):
+        forget_wisdom()
+
+        self.assertEqual(wisdom.main([self.spec_path,
+            '-o', self.output_path, '-p', '2']), 0)
+
+        with open(self.output_path) as f:
+            contents = json.load(f)
+
+        self.assertEqual(len(contents['entries']), len(self.spec))
+        for entry in contents['entries']:
+            self.assertEqual(entry['status'], 'planned')
+            self.assertTrue(entry['planning_time'] >= 0)
+
+        # The wisdom in the file is enough to plan everything
+        forget_wisdom()
+        import_wisdom(wisdom.load_wisdom(self.output_path))
+
+        for entry in wisdom.load_spec(self.spec_path):
+            self.assertTrue(wisdom._has_wisdom(entry))
+
+        # ...so nothing is planned again with --missing-only
+        forget_wisdom()
+        self.spec.append({'shape': [80]})
+
+        with open(self.spec_path, 'w') as f:
+            json.dump(self.spec, f)
+
+        wisdom.main([self.spec_path, '-o', self.output_path,
+            '--missing-only'])
+
+        with open(self.output_path) as f:
+            contents = json.load(f)
+
+        self.spec.pop()
+
+        self.assertEqual([entry['status'] for entry in contents['entries']],
+                ['existing'] * (len(self.spec)) + ['planned'])
+
+    def test_failed_entry(self):
+        with open(self.spec_path, 'w') as f:
+            json.dump([{'shape': [16], 'axes': [3]}], f)
+
+        self.assertEqual(wisdom.main([self.spec_path,
+            '-o', self.output_path, '-p', '1']), 1)
+
+        with open(self.output_path) as f:
+            contents = json.load(f)
+
+        self.assertTrue(
+                contents['entries'][0]['status'].startswith('failed'))
+
 
 test_cases = (
-        FFTWWisdomTest,)
+        FFTWWisdomTest,
+        WisdomToolTest,)
 
 test_set = None
 